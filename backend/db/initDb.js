@@ -30,8 +30,11 @@ export function initDb(projectRoot) {
   db = new DatabaseSync(dbPath)
   db.exec('PRAGMA journal_mode = WAL')
 
-  const migrationPath = path.join(__dirname, 'migrations', '001_query_snapshots.sql')
-  db.exec(fs.readFileSync(migrationPath, 'utf-8'))
+  // 迁移脚本均为幂等的 CREATE ... IF NOT EXISTS，按文件名顺序执行
+  const migrationsDir = path.join(__dirname, 'migrations')
+  for (const file of fs.readdirSync(migrationsDir).filter((f) => f.endsWith('.sql')).sort()) {
+    db.exec(fs.readFileSync(path.join(migrationsDir, file), 'utf-8'))
+  }
 
   console.log(`[HistoryDB] ✓ ${dbPath}`)
   return db
@@ -0,0 +1,28 @@
+-- 异步技能任务（提交即返回 job id，结果可轮询，服务重启后保留）
+CREATE TABLE IF NOT EXISTS skill_jobs (
+  id TEXT PRIMARY KEY,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL,
+  started_at TEXT,
+  finished_at TEXT,
+  status TEXT NOT NULL DEFAULT 'queued',
+  skill_id TEXT NOT NULL,
+  skill_name TEXT NOT NULL DEFAULT '',
+  select_type TEXT NOT NULL DEFAULT '',
+  input_query TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  progress REAL,
+  stage TEXT,
+  message TEXT,
+  partial_text TEXT,
+  partial_length INTEGER NOT NULL DEFAULT 0,
+  error_message TEXT,
+  result_payload TEXT,
+  snapshot_id TEXT
+);
+
+CREATE INDEX IF NOT EXISTS skill_jobs_created_at_idx
+  ON skill_jobs (created_at DESC);
+
+CREATE INDEX IF NOT EXISTS skill_jobs_status_idx
+  ON skill_jobs (status);
@@ -27,6 +27,7 @@ import {
   listQuerySnapshots,
   getQuerySnapshotById
 } from './services/historyService.js'
+import { initJobService, submitJob, getJob, listJobs, cancelJob } from './services/jobService.js'
 import { requireAuth, requireTier, trackUsage } from './middleware/auth.js'
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url))
@@ -177,38 +178,32 @@ app.get('/api/skills', requireAuth, (req, res) => {
   res.json({ success: true, skills: getSkills() })
 })
 
-/**
- * 执行技能查询
- * 返回标准化 JSON 数据结构，不再返回文件路径
- * 临时文件在读取后立即清理，不留残留
- */
-app.post('/api/query', requireAuth, trackUsage, async (req, res) => {
-  const { skillId, query, selectType } = req.body
-
-  if (!skillId || !query) {
-    return res.status(400).json({ error: '缺少必要参数: skillId 和 query' })
-  }
-
+function resolveSkillRun(skillId) {
   const skill = getSkillConfig(skillId)
   if (!skill) {
-    return res.status(404).json({
-      error: `技能 "${skillId}" 未找到。请检查插件商店中是否存在该技能。`
-    })
+    return { status: 404, error: `技能 "${skillId}" 未找到。请检查插件商店中是否存在该技能。` }
   }
 
   const providerId = skill.apiKeyProvider || 'mx'
   const provider = resolveProvider(providerId)
   if (!provider) {
-    return res.status(500).json({
-      error: `技能 "${skillId}" 配置了未知的 apiKeyProvider: ${providerId}`
-    })
+    return { status: 500, error: `技能 "${skillId}" 配置了未知的 apiKeyProvider: ${providerId}` }
   }
   const apiKey = getActiveKey(provider)
   if (!apiKey) {
-    return res.status(400).json({
-      error: `${provider.label} 未设置。请在用户中心添加 ${provider.envVar}。`
-    })
+    return { status: 400, error: `${provider.label} 未设置。请在用户中心添加 ${provider.envVar}。` }
   }
+  return { skill, provider, apiKey }
+}
+
+/**
+ * 运行技能脚本并整理为 /api/query 的响应体（同步查询与异步任务共用）
+ * @returns {Promise<{ status: number, body: object }>}
+ */
+async function executeSkillQuery({ skillId, query, selectType, signal, onEvent }) {
+  const resolved = resolveSkillRun(skillId)
+  if (resolved.error) return { status: resolved.status, body: { error: resolved.error } }
+  const { skill, provider, apiKey } = resolved
 
   const scriptPath = path.join(skill._scriptDir, skill.script || 'get_data.py')
   const args = buildArgs(skill, query, selectType)
@@ -217,7 +212,11 @@ app.post('/api/query', requireAuth, trackUsage, async (req, res) => {
 
   let stdout = ''
   try {
-    stdout = await runPythonScript(scriptPath, args, { [provider.envVar]: apiKey })
+    stdout = await runPythonScript(scriptPath, args, { [provider.envVar]: apiKey }, {
+      signal,
+      onEvent,
+      idleTimeoutSec: skill.idleTimeoutSec
+    })
     const result = parseOutputToJson(stdout)
     writeSnapshotFile(snapshotDir, 'request.json', {
       skillId,
@@ -253,19 +252,22 @@ app.post('/api/query', requireAuth, trackUsage, async (req, res) => {
       snapshotDir
     })
 
-    res.json({
-      success: true,
-      skillId,
-      skillName: skill.title,
-      query,
-      selectType: selectType || '',
-      standardResult,
-      snapshotDir,
-      snapshotId,
-      ...result
-    })
+    return {
+      status: 200,
+      body: {
+        success: true,
+        skillId,
+        skillName: skill.title,
+        query,
+        selectType: selectType || '',
+        standardResult,
+        snapshotDir,
+        snapshotId,
+        ...result
+      }
+    }
   } catch (err) {
-    console.error(`[/api/query] ${skillId} 执行失败:`, err.message)
+    console.error(`[executeSkillQuery] ${skillId} 执行失败:`, err.message)
     writeSnapshotFile(snapshotDir, 'request.json', {
       skillId,
       skillName: skill.title,
@@ -302,17 +304,143 @@ app.post('/api/query', requireAuth, trackUsage, async (req, res) => {
       snapshotDir
     })
 
-    res.status(500).json({
-      success: false,
-      error: err.message,
-      snapshotDir,
-      standardResult,
-      snapshotId
-    })
+    return {
+      status: 500,
+      body: {
+        success: false,
+        error: err.message,
+        snapshotDir,
+        standardResult,
+        snapshotId
+      }
+    }
   } finally {
     // 无论成功失败，清理临时文件，保持服务器磁盘干净
     if (stdout) cleanupTempFiles(stdout)
   }
+}
+
+initJobService((job, { signal, onEvent }) =>
+  executeSkillQuery({
+    skillId: job.skill_id,
+    query: job.input_query,
+    selectType: job.select_type || undefined,
+    signal,
+    onEvent
+  })
+)
+
+/**
+ * 执行技能查询
+ * 返回标准化 JSON 数据结构，不再返回文件路径
+ * 临时文件在读取后立即清理，不留残留
+ *
+ * 流式模式（?stream=1 或 Accept: application/x-ndjson）：
+ * 以 NDJSON 逐行推送脚本进度事件，最后一行为 {"event":"result",...} 或 {"event":"error",...}；
+ * 客户端断开时终止 Python 进程。
+ */
+app.post('/api/query', requireAuth, trackUsage, async (req, res) => {
+  const { skillId, query, selectType } = req.body
+
+  if (!skillId || !query) {
+    return res.status(400).json({ error: '缺少必要参数: skillId 和 query' })
+  }
+
+  const resolved = resolveSkillRun(skillId)
+  if (resolved.error) {
+    return res.status(resolved.status).json({ error: resolved.error })
+  }
+
+  const streaming = req.query.stream === '1' || String(req.headers.accept || '').includes('application/x-ndjson')
+  const writeLine = (obj) => {
+    if (!res.writableEnded) res.write(`${JSON.stringify(obj)}\n`)
+  }
+  if (streaming) {
+    res.status(200)
+    res.setHeader('Content-Type', 'application/x-ndjson; charset=utf-8')
+    res.setHeader('Cache-Control', 'no-cache')
+    res.flushHeaders()
+  }
+
+  // 客户端提前断开：终止仍在运行的脚本
+  const abortController = new AbortController()
+  res.on('close', () => {
+    if (!res.writableEnded) abortController.abort()
+  })
+
+  const { status, body } = await executeSkillQuery({
+    skillId,
+    query,
+    selectType,
+    signal: abortController.signal,
+    onEvent: streaming ? writeLine : undefined
+  })
+  if (streaming) {
+    writeLine({ event: status < 400 ? 'result' : 'error', ...body })
+    res.end()
+  } else {
+    res.status(status).json(body)
+  }
+})
+
+/**
+ * 异步任务：提交后立即返回 jobId（HTTP 202），脚本在后台有界并发执行。
+ * 轮询 GET /api/jobs/:id 获取状态、进度、部分输出（partial_text）与最终结果（result，
+ * 结构与 /api/query 响应体一致）；DELETE /api/jobs/:id 取消。
+ */
+app.post('/api/jobs', requireAuth, trackUsage, (req, res) => {
+  const { skillId, query, selectType } = req.body
+
+  if (!skillId || !query) {
+    return res.status(400).json({ success: false, error: '缺少必要参数: skillId 和 query' })
+  }
+  const resolved = resolveSkillRun(skillId)
+  if (resolved.error) {
+    return res.status(resolved.status).json({ success: false, error: resolved.error })
+  }
+
+  try {
+    const job = submitJob({ skillId, skillName: resolved.skill.title, query, selectType })
+    res.status(202).json({ success: true, jobId: job.id, job })
+  } catch (e) {
+    console.error('[/api/jobs]', e.message)
+    res.status(500).json({ success: false, error: e.message || 'submit failed' })
+  }
+})
+
+/** 任务列表（不含 partial_text / result） */
+app.get('/api/jobs', requireAuth, (req, res) => {
+  try {
+    const items = listJobs({ limit: req.query.limit, offset: req.query.offset, status: req.query.status })
+    res.json({ success: true, items })
+  } catch (e) {
+    console.error('[/api/jobs]', e.message)
+    res.status(500).json({ success: false, error: e.message || 'list failed' })
+  }
+})
+
+/** 任务详情（状态 / 进度 / 部分输出 / 最终结果） */
+app.get('/api/jobs/:id', requireAuth, (req, res) => {
+  try {
+    const job = getJob(req.params.id)
+    if (!job) return res.status(404).json({ success: false, error: '任务不存在' })
+    res.json({ success: true, job })
+  } catch (e) {
+    console.error('[/api/jobs/:id]', e.message)
+    res.status(500).json({ success: false, error: e.message || 'load failed' })
+  }
+})
+
+/** 取消任务 */
+app.delete('/api/jobs/:id', requireAuth, (req, res) => {
+  try {
+    const job = cancelJob(req.params.id)
+    if (!job) return res.status(404).json({ success: false, error: '任务不存在' })
+    res.json({ success: true, job })
+  } catch (e) {
+    console.error('[/api/jobs/:id]', e.message)
+    res.status(500).json({ success: false, error: e.message || 'cancel failed' })
+  }
 })
 
 /** API Key 查询 */
@@ -0,0 +1,303 @@
+/**
+ * 异步技能任务（SQLite 表 skill_jobs）
+ *
+ * 长耗时技能（Alice 分析、研报生成等）通过 submitJob 提交后立即返回 job id，
+ * 由有界并发的执行器在后台运行，不再占用 HTTP 请求与连接：
+ * - 状态：queued → running → succeeded / failed / cancelled
+ * - 进度事件（progress / stage_*）与 partial 正文持续写入，客户端轮询 getJob 获取
+ * - 最终结果（与 /api/query 的响应体一致）持久化，服务重启后仍可查询
+ * - 启动时未完成的任务重新入队（每个任务最多执行 MAX_ATTEMPTS 次）
+ */
+import { randomUUID } from 'crypto'
+import { getDb } from '../db/initDb.js'
+
+const MAX_CONCURRENCY = Math.max(1, Number(process.env.AEOLUS_JOB_CONCURRENCY) || 2)
+const RETENTION_DAYS = Math.max(1, Number(process.env.AEOLUS_JOB_RETENTION_DAYS) || 7)
+const MAX_ATTEMPTS = 2
+const MAX_INPUT_QUERY = 10_000
+const MAX_ERROR_MSG = 8000
+const MAX_PARTIAL_CHARS = 64 * 1024
+const FLUSH_INTERVAL_MS = 500
+const DEFAULT_LIST_LIMIT = 50
+
+export const JOB_STATUSES = ['queued', 'running', 'succeeded', 'failed', 'cancelled']
+const TERMINAL = new Set(['succeeded', 'failed', 'cancelled'])
+
+/** (job, { signal, onEvent }) => Promise<{ status: number, body: object }> */
+let executeJob = null
+const queue = []
+/** id -> { controller, live }，live 为尚未落盘的进度字段 */
+const active = new Map()
+
+function nowIso() {
+  return new Date().toISOString()
+}
+
+function parsePayload(text) {
+  if (!text) return null
+  try {
+    return JSON.parse(text)
+  } catch {
+    return null
+  }
+}
+
+function prepare(sql) {
+  const stmt = getDb().prepare(sql)
+  stmt.setAllowBareNamedParameters(true)
+  return stmt
+}
+
+function updateJob(id, fields) {
+  const keys = Object.keys(fields)
+  if (!keys.length) return
+  const sets = keys.map((k) => `${k} = :${k}`).join(', ')
+  prepare(`UPDATE skill_jobs SET ${sets}, updated_at = :updated_at WHERE id = :id`).run({
+    ...fields,
+    updated_at: nowIso(),
+    id
+  })
+}
+
+function rowToJob(row, { includeResult = true } = {}) {
+  if (!row) return null
+  const job = {
+    id: row.id,
+    status: row.status,
+    created_at: row.created_at,
+    updated_at: row.updated_at,
+    started_at: row.started_at || null,
+    finished_at: row.finished_at || null,
+    skill_id: row.skill_id,
+    skill_name: row.skill_name,
+    select_type: row.select_type || '',
+    input_query: row.input_query || '',
+    attempts: Number(row.attempts) || 0,
+    progress: row.progress ?? null,
+    stage: row.stage || null,
+    message: row.message || null,
+    partial_length: Number(row.partial_length) || 0,
+    error_message: row.error_message || null,
+    snapshot_id: row.snapshot_id || null
+  }
+  if (includeResult) {
+    job.partial_text = row.partial_text || ''
+    job.result = parsePayload(row.result_payload)
+  }
+  return job
+}
+
+// ─── 进度事件 ─────────────────────────────────────────────────────
+
+function applyEvent(live, evt) {
+  switch (evt.event) {
+    case 'progress':
+      if (typeof evt.percent === 'number') live.progress = evt.percent
+      if (evt.stage) live.stage = String(evt.stage)
+      if (evt.message) live.message = String(evt.message)
+      break
+    case 'stage_started':
+    case 'stage_finished':
+      if (evt.stage) live.stage = String(evt.stage)
+      if (typeof evt.percent === 'number') live.progress = evt.percent
+      break
+    case 'stage_failed':
+      if (evt.error) live.message = String(evt.error)
+      break
+    case 'partial':
+      if (evt.text) {
+        const text = String(evt.text)
+        // 片段之间补换行，保持与描述文件相近的排版
+        live.partial = `${live.partial}${live.partial ? '\n' : ''}${text}`.slice(-MAX_PARTIAL_CHARS)
+        live.partialLength += text.length
+      }
+      break
+    default:
+      break
+  }
+  live.dirty = true
+}
+
+function flushLive(id) {
+  const entry = active.get(id)
+  if (!entry || !entry.live.dirty) return
+  const { live } = entry
+  live.dirty = false
+  updateJob(id, {
+    progress: live.progress,
+    stage: live.stage,
+    message: live.message,
+    partial_text: live.partial,
+    partial_length: live.partialLength
+  })
+}
+
+// ─── 执行器 ───────────────────────────────────────────────────────
+
+function pump() {
+  while (active.size < MAX_CONCURRENCY && queue.length) {
+    const id = queue.shift()
+    const row = prepare('SELECT * FROM skill_jobs WHERE id = :id').get({ id })
+    if (!row || row.status !== 'queued') continue
+    runJob(row)
+  }
+}
+
+async function runJob(row) {
+  const id = row.id
+  const controller = new AbortController()
+  const live = {
+    progress: row.progress ?? null,
+    stage: row.stage || null,
+    message: row.message || null,
+    partial: '',
+    partialLength: 0,
+    dirty: false
+  }
+  active.set(id, { controller, live })
+  updateJob(id, {
+    status: 'running',
+    started_at: nowIso(),
+    attempts: (Number(row.attempts) || 0) + 1,
+    partial_text: '',
+    partial_length: 0
+  })
+  const timer = setInterval(() => flushLive(id), FLUSH_INTERVAL_MS)
+
+  let finalFields
+  try {
+    const { status, body } = await executeJob(rowToJob(row, { includeResult: false }), {
+      signal: controller.signal,
+      onEvent: (evt) => applyEvent(live, evt)
+    })
+    const ok = status < 400 && body?.success !== false
+    finalFields = {
+      status: controller.signal.aborted ? 'cancelled' : ok ? 'succeeded' : 'failed',
+      progress: ok ? 100 : live.progress,
+      error_message: ok ? null : String(body?.error || `HTTP ${status}`).slice(0, MAX_ERROR_MSG),
+      result_payload: JSON.stringify(body ?? null),
+      snapshot_id: body?.snapshotId || null
+    }
+  } catch (err) {
+    finalFields = {
+      status: controller.signal.aborted ? 'cancelled' : 'failed',
+      error_message: String(err?.message || err).slice(0, MAX_ERROR_MSG)
+    }
+  } finally {
+    clearInterval(timer)
+  }
+
+  flushLive(id)
+  active.delete(id)
+  updateJob(id, { ...finalFields, finished_at: nowIso() })
+  pump()
+}
+
+// ─── 对外接口 ─────────────────────────────────────────────────────
+
+/**
+ * 启动时调用一次：注册执行函数，清理过期任务，并把未完成的任务重新入队
+ * @param {(job: object, opts: { signal: AbortSignal, onEvent: Function }) => Promise<{status: number, body: object}>} executor
+ */
+export function initJobService(executor) {
+  executeJob = executor
+
+  const cutoff = new Date(Date.now() - RETENTION_DAYS * 86400_000).toISOString()
+  prepare(
+    `DELETE FROM skill_jobs WHERE created_at < :cutoff AND status IN ('succeeded', 'failed', 'cancelled')`
+  ).run({ cutoff })
+
+  const pending = prepare(
+    `SELECT id, status, attempts FROM skill_jobs WHERE status IN ('queued', 'running') ORDER BY created_at ASC`
+  ).all()
+  let requeued = 0
+  for (const row of pending) {
+    if (row.status === 'running' && Number(row.attempts) >= MAX_ATTEMPTS) {
+      updateJob(row.id, {
+        status: 'failed',
+        error_message: '服务重启导致任务中断，且已达到最大重试次数',
+        finished_at: nowIso()
+      })
+      continue
+    }
+    if (row.status === 'running') updateJob(row.id, { status: 'queued' })
+    queue.push(row.id)
+    requeued++
+  }
+  if (requeued) console.log(`[JobService] 重新入队 ${requeued} 个未完成任务`)
+  pump()
+}
+
+/**
+ * @param {{ skillId: string, skillName?: string, query: string, selectType?: string }} p
+ * @returns {object} 新建的 job（status=queued）
+ */
+export function submitJob(p) {
+  if (!executeJob) throw new Error('[JobService] 未初始化，请先调用 initJobService()')
+  const id = randomUUID()
+  const ts = nowIso()
+  prepare(
+    `INSERT INTO skill_jobs (
+      id, created_at, updated_at, status, skill_id, skill_name, select_type, input_query
+    ) VALUES (
+      :id, :created_at, :updated_at, 'queued', :skill_id, :skill_name, :select_type, :input_query
+    )`
+  ).run({
+    id,
+    created_at: ts,
+    updated_at: ts,
+    skill_id: String(p.skillId || ''),
+    skill_name: String(p.skillName || ''),
+    select_type: String(p.selectType || ''),
+    input_query: String(p.query || '').slice(0, MAX_INPUT_QUERY)
+  })
+  queue.push(id)
+  pump()
+  return getJob(id, { includeResult: false })
+}
+
+/** 运行中的任务会先合并内存中尚未落盘的进度 */
+export function getJob(id, opts = {}) {
+  flushLive(String(id || ''))
+  const row = prepare('SELECT * FROM skill_jobs WHERE id = :id').get({ id: String(id || '') })
+  const job = rowToJob(row, opts)
+  if (job && job.status === 'queued') job.queue_position = queue.indexOf(job.id) + 1 || null
+  return job
+}
+
+/**
+ * @param {{ limit?: number, offset?: number, status?: string }} opts
+ */
+export function listJobs(opts = {}) {
+  const limit = Math.min(100, Math.max(1, Number(opts.limit) || DEFAULT_LIST_LIMIT))
+  const offset = Math.max(0, Number(opts.offset) || 0)
+  const status = JOB_STATUSES.includes(opts.status) ? opts.status : null
+  const rows = prepare(
+    `SELECT id, status, created_at, updated_at, started_at, finished_at, skill_id, skill_name,
+            select_type, input_query, attempts, progress, stage, message, partial_length,
+            error_message, snapshot_id
+     FROM skill_jobs
+     ${status ? 'WHERE status = :status' : ''}
+     ORDER BY created_at DESC
+     LIMIT :limit OFFSET :offset`
+  ).all(status ? { status, limit, offset } : { limit, offset })
+  return rows.map((r) => rowToJob(r, { includeResult: false }))
+}
+
+/**
+ * 取消任务：排队中直接标记 cancelled，运行中终止脚本（由 runJob 收尾）
+ * @returns {object|null} 取消后的 job；不存在返回 null
+ */
+export function cancelJob(id) {
+  const job = getJob(id, { includeResult: false })
+  if (!job || TERMINAL.has(job.status)) return job
+  const entry = active.get(job.id)
+  if (entry) {
+    entry.controller.abort()
+  } else {
+    const idx = queue.indexOf(job.id)
+    if (idx >= 0) queue.splice(idx, 1)
+    updateJob(job.id, { status: 'cancelled', finished_at: nowIso() })
+  }
+  return getJob(job.id, { includeResult: false })
+}
@@ -5,6 +5,8 @@
  * 1. 启动本地 Python 进程执行技能脚本
  * 2. 将 Python 脚本产出的文件（xlsx/csv/txt）直接解析为 JSON 结构
  * 3. 执行完成后清理临时文件，不留任何物理文件在磁盘上
+ * 4. 逐行解析 stderr 中的 NDJSON 进度事件（skills/_lib/progress_events.py），
+ *    支持取消与“长时间无输出”卡死检测
  *
  * 这样前端只需消费 JSON 数据，与文件路径完全解耦。
  */
@@ -23,6 +25,11 @@ const XLSX_API = XLSX?.utils ? XLSX : (XLSX?.default || {})
 const MAX_ROWS = 500
 const MAX_COLS = 60
 
+// 子进程连续无任何输出超过该秒数即判定卡死并终止；0 表示不限制。
+// 默认关闭：研报类脚本单次请求可静默二十分钟。会定时发 heartbeat 的技能在 manifest 中用 idleTimeoutSec 开启。
+const DEFAULT_IDLE_TIMEOUT_SEC = Number(process.env.AEOLUS_SKILL_IDLE_TIMEOUT_SEC ?? 0)
+const EVENT_PREFIX = '{"event":'
+
 /** True if value looks like a filesystem path (not a bare command like `python3`). */
 function looksLikeFilesystemPath(p) {
   if (!p || typeof p !== 'string') return false
@@ -60,10 +67,47 @@ function decodeOutput(chunks) {
   try { return new TextDecoder('gb18030').decode(buf) } catch { return utf8 }
 }
 
+/** 解析一行 NDJSON 进度事件；非事件行返回 null */
+export function parseProgressEvent(line) {
+  const s = String(line || '').trim()
+  if (!s.startsWith(EVENT_PREFIX)) return null
+  try {
+    const obj = JSON.parse(s)
+    return obj && typeof obj.event === 'string' ? obj : null
+  } catch {
+    return null
+  }
+}
+
+/** 按行切分流式输出（回调含换行的原始字节，保留编码），未完结的尾部留待下次 */
+function createLineSplitter(onLine) {
+  let pending = Buffer.alloc(0)
+  return {
+    push(chunk) {
+      pending = Buffer.concat([pending, Buffer.from(chunk)])
+      let idx
+      while ((idx = pending.indexOf(0x0a)) !== -1) {
+        onLine(pending.subarray(0, idx + 1))
+        pending = pending.subarray(idx + 1)
+      }
+    },
+    flush() {
+      if (pending.length) onLine(pending)
+      pending = Buffer.alloc(0)
+    }
+  }
+}
+
 /**
  * 执行 Python 脚本，返回原始 stdout 字符串
+ *
+ * options:
+ * - onEvent(evt)：收到进度事件时回调（stage_started / progress / partial / heartbeat ...）
+ * - signal：AbortSignal，触发后终止子进程（如客户端断开）
+ * - idleTimeoutSec：连续无输出的最长秒数，默认 AEOLUS_SKILL_IDLE_TIMEOUT_SEC（0），0 不限制
  */
-export async function runPythonScript(scriptPath, args = [], extraEnv = {}) {
+export async function runPythonScript(scriptPath, args = [], extraEnv = {}, options = {}) {
+  const { onEvent, signal, idleTimeoutSec = DEFAULT_IDLE_TIMEOUT_SEC } = options
   const pythonPath = getPythonPath()
 
   if (looksLikeFilesystemPath(pythonPath) && !fs.existsSync(pythonPath)) {
@@ -84,7 +128,8 @@ export async function runPythonScript(scriptPath, args = [], extraEnv = {}) {
       ...process.env,
       ...extraEnv,
       PYTHONIOENCODING: 'utf-8',
-      PYTHONUTF8: '1'
+      PYTHONUTF8: '1',
+      AEOLUS_PROGRESS: 'ndjson'
     }
     delete childEnv.PYTHONHOME
     delete childEnv.PYTHONPATH
@@ -98,16 +143,65 @@ export async function runPythonScript(scriptPath, args = [], extraEnv = {}) {
 
     const out = []
     const err = []
-    proc.stdout.on('data', (d) => out.push(Buffer.from(d)))
-    proc.stderr.on('data', (d) => err.push(Buffer.from(d)))
+    let lastActivity = Date.now()
+    let killedReason = ''
+
+    const kill = (reason) => {
+      if (killedReason || proc.exitCode !== null) return
+      killedReason = reason
+      proc.kill()
+    }
+
+    // 事件行交给 onEvent，不计入 stderr 文本，避免污染错误信息
+    const stderrLines = createLineSplitter((lineBuf) => {
+      const evt = parseProgressEvent(lineBuf.toString('utf8'))
+      if (evt) {
+        if (onEvent) {
+          try { onEvent(evt) } catch (e) { console.warn('[pythonRunner] onEvent 回调失败:', e.message) }
+        }
+        return
+      }
+      err.push(Buffer.from(lineBuf))
+    })
+
+    proc.stdout.on('data', (d) => {
+      lastActivity = Date.now()
+      out.push(Buffer.from(d))
+    })
+    proc.stderr.on('data', (d) => {
+      lastActivity = Date.now()
+      stderrLines.push(d)
+    })
+
+    const idleMs = Number(idleTimeoutSec) > 0 ? Number(idleTimeoutSec) * 1000 : 0
+    const idleTimer = idleMs
+      ? setInterval(() => {
+          if (Date.now() - lastActivity > idleMs) kill(`脚本连续 ${idleTimeoutSec}s 无输出，判定卡死已终止`)
+        }, Math.min(idleMs, 5000))
+      : null
+
+    const onAbort = () => kill('请求已取消，脚本已终止')
+    if (signal) {
+      if (signal.aborted) onAbort()
+      else signal.addEventListener('abort', onAbort, { once: true })
+    }
+
     proc.on('close', (code) => {
-      if (code !== 0) {
+      if (idleTimer) clearInterval(idleTimer)
+      if (signal) signal.removeEventListener('abort', onAbort)
+      stderrLines.flush()
+      if (killedReason) {
+        reject(new Error(killedReason))
+      } else if (code !== 0) {
         reject(new Error(`脚本执行失败 (exit ${code}): ${decodeOutput(err) || decodeOutput(out)}`))
       } else {
         resolve(decodeOutput(out))
       }
     })
-    proc.on('error', (e) => reject(new Error(`无法启动 Python 进程: ${e.message}`)))
+    proc.on('error', (e) => {
+      if (idleTimer) clearInterval(idleTimer)
+      reject(new Error(`无法启动 Python 进程: ${e.message}`))
+    })
   })
 }
 
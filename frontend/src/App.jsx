@@ -13,6 +13,7 @@ import { useAuth } from './hooks/useAuth.js'
 // ─── 配置 ───────────────────────────────────────────────────────────────────
 
 const API_BASE = import.meta.env.VITE_API_URL || ''
+const JOB_POLL_INTERVAL_MS = 2000
 const THEME_KEY = 'aeolus_theme_v2'
 const LEGACY_THEME_KEY = 'aeolus_theme'
 const SKILL_VENDOR_KEY = 'aeolus_skill_vendor'
@@ -381,6 +382,7 @@ export default function App() {
   const [query, setQuery] = useState('')
   const [selectType, setSelectType] = useState('A股')
   const [loading, setLoading] = useState(false)
+  const [jobProgress, setJobProgress] = useState(null)
   const [error, setError] = useState(null)
 
   // ── 结果（直接存 JSON，不再存文件路径）
@@ -545,11 +547,15 @@ export default function App() {
     resetResultState()
 
     try {
-      const res = await axios.post(`${API_BASE}/api/query`, {
+      const body = {
         skillId: selectedSkill.id,
         query: effectiveQuery,
         selectType: selectedSkill.needsSelectType ? selectType : undefined
-      })
+      }
+      // 长耗时技能走异步任务：提交后轮询，不占用长连接
+      const res = selectedSkill.longRunning
+        ? { data: await runSkillJob(body) }
+        : await axios.post(`${API_BASE}/api/query`, body)
       const data = res.data
       applyQueryResultToView(data)
       if (data.snapshotId) setActiveSnapshotId(data.snapshotId)
@@ -561,6 +567,26 @@ export default function App() {
       await fetchHistory()
     } finally {
       setLoading(false)
+      setJobProgress(null)
+    }
+  }
+
+  /** 提交异步任务并轮询至结束；失败时抛出与 axios 相同形状的错误 */
+  const runSkillJob = async (body) => {
+    const submitted = await axios.post(`${API_BASE}/api/jobs`, body)
+    const jobId = submitted.data.jobId
+    setJobProgress({ status: 'queued' })
+    for (;;) {
+      await new Promise((r) => setTimeout(r, JOB_POLL_INTERVAL_MS))
+      const res = await axios.get(`${API_BASE}/api/jobs/${encodeURIComponent(jobId)}`)
+      const job = res.data.job
+      setJobProgress({ status: job.status, percent: job.progress, message: job.message || job.stage })
+      if (job.status === 'succeeded') return job.result
+      if (job.status === 'failed' || job.status === 'cancelled') {
+        const err = new Error(job.error_message || (job.status === 'cancelled' ? '任务已取消' : '查询失败'))
+        err.response = { data: job.result || { error: err.message } }
+        throw err
+      }
     }
   }
 
@@ -1086,7 +1112,13 @@ export default function App() {
                   <motion.div animate={{ rotate: 360 }} transition={{ repeat: Infinity, duration: 1.5, ease: 'linear' }}>
                     <Loader2 className="w-10 h-10 text-primary mb-4" />
                   </motion.div>
-                  <p className="text-on-surface-variant text-sm font-medium tracking-wide">Executing skill...</p>
+                  <p className="text-on-surface-variant text-sm font-medium tracking-wide">
+                    {jobProgress
+                      ? jobProgress.status === 'queued'
+                        ? '任务排队中...'
+                        : `Executing skill...${jobProgress.percent != null ? ` ${Math.round(jobProgress.percent)}%` : ''}${jobProgress.message ? ` · ${jobProgress.message}` : ''}`
+                      : 'Executing skill...'}
+                  </p>
                 </div>
               ) : hasTableData && previewView === 'table' ? (
                 /* 表格视图 */
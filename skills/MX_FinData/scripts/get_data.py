@@ -12,7 +12,9 @@ import json
 import os
 import re
 import sys
+import time
 import uuid
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
@@ -72,6 +74,9 @@ if not EM_API_KEY:
 DEFAULT_SEARCH_API_URL = (
     "https://ai-saas.eastmoney.com/proxy/b/mcp/tool/searchData"
 )
+REQUEST_TIMEOUT_SEC = 30.0
+# 批量模式默认并发数
+BATCH_CONCURRENCY = int(os.environ.get("MX_FinData_BATCH_CONCURRENCY") or "8")
 
 def _get_default_output_dir() -> Path:
     """
@@ -439,16 +444,55 @@ def _make_result_base(query_text: str) -> Dict[str, Any]:
     }
 
 
+async def _fetch_tables(query: str, url: str, client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    请求接口并解析为表格数据（不写文件）。
+    成功返回 {tables, condition_parts, total_rows}；失败返回 {error, raw_preview(可选)}。
+    供单条查询与批量模式共用。
+    """
+    try:
+        body = _build_request_body(query)
+        resp = await client.post(
+            url,
+            json=body,
+            headers={
+                "Content-Type": "application/json",
+                "em_api_key": EM_API_KEY,
+            },
+        )
+        resp.raise_for_status()
+        data = resp.json()
+    except httpx.HTTPStatusError as exc:
+        return {"error": f"HTTP 错误: {exc.response.status_code} - {exc.response.text[:200]}"}
+    except Exception as exc:
+        return {"error": f"请求失败: {exc!s}"}
+
+    status_err = _check_business_status(data)
+    if status_err:
+        return {"error": status_err, "raw_preview": json.dumps(data, ensure_ascii=False)[:500]}
+
+    tables, condition_parts, total_rows, err = _parse_data_table_response(data)
+    if err:
+        return {"error": err, "raw_preview": json.dumps(data, ensure_ascii=False)[:500]}
+    return {"tables": tables, "condition_parts": condition_parts, "total_rows": total_rows}
+
+
 async def query_financial_data(
         query: str,
         output_dir: Optional[Path] = None,
         api_base: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
 ) -> Dict[str, Any]:
     """
     执行金融数据主查询流程并输出文件结果。
     完成接口请求、业务状态校验、表格解析与文件写入。
+    client 为空时自建并在结束后关闭；传入时复用调用方的连接池。
     返回包含文件路径、行数及错误信息的结果字典。
     """
+    if client is None:
+        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SEC) as own_client:
+            return await query_financial_data(query, output_dir, api_base, client=own_client)
+
     output_dir = output_dir or _get_default_output_dir()
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -456,46 +500,18 @@ async def query_financial_data(
     url = api_base or DEFAULT_SEARCH_API_URL
     result = _make_result_base(query)
 
-    try:
-        body = _build_request_body(query)
-        api_key = EM_API_KEY
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(
-                url,
-                json=body,
-                headers={
-                    "Content-Type": "application/json",
-                    "em_api_key": api_key,
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
-    except httpx.HTTPStatusError as exc:
-        result["error"] = f"HTTP 错误: {exc.response.status_code} - {exc.response.text[:200]}"
-        return result
-    except Exception as exc:
-        result["error"] = f"请求失败: {exc!s}"
-        return result
-
-    status_err = _check_business_status(data)
-    if status_err:
-        result["error"] = status_err
-        result["raw_preview"] = json.dumps(data, ensure_ascii=False)[:500]
-        return result
-
-    tables, condition_parts, total_rows, err = _parse_data_table_response(data)
-    if err:
-        result["error"] = err
-        result["raw_preview"] = json.dumps(data, ensure_ascii=False)[:500]
+    fetched = await _fetch_tables(query, url, client)
+    if "error" in fetched:
+        result.update(fetched)
         return result
 
     try:
         file_path, desc_path = _write_output_files(
             output_dir=output_dir,
             query_text=query,
-            tables=tables,
-            total_rows=total_rows,
-            condition_parts=condition_parts,
+            tables=fetched["tables"],
+            total_rows=fetched["total_rows"],
+            condition_parts=fetched["condition_parts"],
         )
     except ModuleNotFoundError as exc:
         result["error"] = f"写入 Excel 失败，缺少依赖: {exc.name}"
@@ -507,10 +523,180 @@ async def query_financial_data(
     result["file_path"] = str(file_path)
     result["csv_path"] = str(file_path)  # 兼容旧字段名
     result["description_path"] = str(desc_path)
-    result["row_count"] = total_rows
+    result["row_count"] = fetched["total_rows"]
     return result
 
 
+def _write_batch_workbook(file_path: Path, entries: List[Dict[str, Any]]) -> None:
+    """
+    批量结果写入单个工作簿：首个 sheet 为汇总（每个问句的状态、行数与错误），
+    之后每个成功的问句一个 sheet，多张表自上而下排列，表名单独占一行、表间空一行。
+    """
+    summary = pd.DataFrame(
+        [
+            {
+                "序号": e["index"] + 1,
+                "查询": e["query"],
+                "状态": "失败" if "error" in e else "成功",
+                "行数": e["row_count"],
+                "表数量": len(e.get("tables") or []),
+                "Sheet": e.get("sheet_name") or "",
+                "错误": e.get("error") or "",
+            }
+            for e in entries
+        ],
+        columns=["序号", "查询", "状态", "行数", "表数量", "Sheet", "错误"],
+    )
+    with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+        summary.to_excel(writer, sheet_name="汇总", index=False)
+        for e in entries:
+            if not e.get("sheet_name"):
+                continue
+            start_row = 0
+            for table in e["tables"]:
+                df = pd.DataFrame(table["rows"], columns=table["fieldnames"])
+                df.to_excel(writer, sheet_name=e["sheet_name"], startrow=start_row + 1, index=False)
+                writer.sheets[e["sheet_name"]].cell(row=start_row + 1, column=1, value=table["sheet_name"])
+                start_row += len(df) + 3
+
+
+def _write_batch_json(file_path: Path, entries: List[Dict[str, Any]]) -> None:
+    """
+    批量结果写入单个 JSON 文档；每张表为 {title, fieldnames, rows}，rows 为与 fieldnames 对齐的值列表。
+    """
+    doc = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "queries": [
+            {
+                "index": e["index"],
+                "query": e["query"],
+                "status": "error" if "error" in e else "ok",
+                "row_count": e["row_count"],
+                "conditions": e.get("condition_parts") or [],
+                "tables": [
+                    {
+                        "title": t["sheet_name"],
+                        "fieldnames": t["fieldnames"],
+                        "rows": [[row.get(f, "") for f in t["fieldnames"]] for row in t["rows"]],
+                    }
+                    for t in e.get("tables") or []
+                ],
+                **({"error": e["error"]} if "error" in e else {}),
+            }
+            for e in entries
+        ],
+    }
+    file_path.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+async def query_financial_data_batch(
+        queries: List[str],
+        output_dir: Optional[Path] = None,
+        *,
+        api_base: Optional[str] = None,
+        concurrency: int = BATCH_CONCURRENCY,
+        output_format: str = "xlsx",
+        on_result=None,
+) -> Dict[str, Any]:
+    """
+    批量查数：多个问句共用一个 httpx.AsyncClient，并发上限 concurrency。
+
+    - 每个问句完成（成功或失败）即回调 on_result(index, entry)；
+    - 相同问句只请求一次，结果复用；
+    - 全部完成后写入一个工作簿（output_format="xlsx"：汇总 sheet + 每个问句一个 sheet）
+      或一个 JSON 文档（output_format="json"），并生成描述 txt。
+    单个问句失败不影响其他问句，错误写入汇总与返回结果。
+    """
+    output_dir = Path(output_dir or _get_default_output_dir())
+    output_dir.mkdir(parents=True, exist_ok=True)
+    url = api_base or DEFAULT_SEARCH_API_URL
+    concurrency = max(1, concurrency)
+    started = time.monotonic()
+
+    sem = asyncio.Semaphore(concurrency)
+    entries: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+    indexes: Dict[str, List[int]] = {}
+    for i, q in enumerate(queries):
+        indexes.setdefault(q, []).append(i)
+
+    async def _one(query: str, client: httpx.AsyncClient) -> None:
+        async with sem:
+            fetched = await _fetch_tables(query, url, client)
+        for index in indexes[query]:
+            entry: Dict[str, Any] = {"index": index, "query": query, "row_count": fetched.get("total_rows", 0)}
+            entry.update({k: v for k, v in fetched.items() if k != "total_rows"})
+            entries[index] = entry
+            if on_result is not None:
+                on_result(index, entry)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT_SEC, limits=limits) as client:
+        await asyncio.gather(*(_one(q, client) for q in indexes))
+
+    done = [e for e in entries if e is not None]
+    used_sheet_names: Set[str] = {"汇总"}
+    width = len(str(len(done)))
+    for e in done:
+        if "error" not in e:
+            e["sheet_name"] = _safe_sheet_name(f"{e['index'] + 1:0{width}d}_{e['query']}", used_sheet_names)
+
+    unique_suffix = uuid.uuid4().hex[:8]
+    output_format = "json" if output_format == "json" else "xlsx"
+    file_path = output_dir / f"MX_FinData_batch_{unique_suffix}.{output_format}"
+    desc_path = output_dir / f"MX_FinData_batch_{unique_suffix}_description.txt"
+    summary: Dict[str, Any] = {
+        "total": len(queries),
+        "succeeded": sum(1 for e in done if "error" not in e),
+        "failed": sum(1 for e in done if "error" in e),
+        "row_count": sum(e["row_count"] for e in done),
+        "file_path": None,
+        "description_path": None,
+        "results": [
+            {k: e[k] for k in ("index", "query", "row_count", "sheet_name", "error") if k in e} for e in done
+        ],
+    }
+    try:
+        if output_format == "json":
+            _write_batch_json(file_path, done)
+        else:
+            _write_batch_workbook(file_path, done)
+    except ModuleNotFoundError as exc:
+        summary["error"] = f"写入 Excel 失败，缺少依赖: {exc.name}"
+        return summary
+    except Exception as exc:
+        summary["error"] = f"写入结果文件失败: {exc!s}"
+        return summary
+
+    description_lines = [
+        "金融数据批量查询结果说明",
+        "=" * 40,
+        f"数据文件路径: {file_path}",
+        f"问句数: {summary['total']}（成功 {summary['succeeded']}，失败 {summary['failed']}）",
+        f"数据行数: {summary['row_count']}",
+        f"耗时: {time.monotonic() - started:.1f}s",
+        "",
+        "各问句结果:",
+    ]
+    for e in done:
+        if "error" in e:
+            description_lines.append(f"  [{e['index'] + 1}] {e['query']}: 失败 - {e['error']}")
+        else:
+            sheets = ", ".join(t["sheet_name"] for t in e["tables"])
+            description_lines.append(
+                f"  [{e['index'] + 1}] {e['query']}: {e['row_count']} 行，Sheet {e['sheet_name']}（{sheets}）"
+            )
+    conditions = [(e, part) for e in done for part in e.get("condition_parts") or []]
+    if conditions:
+        description_lines.extend(["", "查询条件:"])
+        description_lines.extend(f"[{e['index'] + 1}] {part}" for e, part in conditions)
+    desc_path.write_text("\n".join(description_lines), encoding="utf-8")
+
+    summary["file_path"] = str(file_path)
+    summary["description_path"] = str(desc_path)
+    summary["elapsed_sec"] = round(time.monotonic() - started, 1)
+    return summary
+
+
 async def query_financial_data_direct(
         query: str,
         output_dir: Optional[Path] = None,
@@ -538,6 +724,19 @@ def _resolve_query_arg(args: argparse.Namespace) -> str:
     return query.strip()
 
 
+def _read_batch_queries(path: str) -> List[str]:
+    """
+    读取批量问句：每行一个，path 为 "-" 时读标准输入。
+    忽略空行与 # 开头的注释行。
+    """
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        text = Path(path).read_text(encoding="utf-8-sig")
+    lines = [ln.strip() for ln in text.splitlines()]
+    return [ln for ln in lines if ln and not ln.startswith("#")]
+
+
 def run_cli() -> None:
     """
     命令行执行入口。
@@ -553,8 +752,19 @@ def run_cli() -> None:
     parser.add_argument("query", nargs="?", help="查询问句")
     parser.add_argument("--query", dest="query_opt", help="查询问句（显式参数）")
     parser.add_argument("--metric", help="兼容旧参数；等价于 --query")
+    parser.add_argument("--batch-file", help="批量模式：每行一个问句的文本文件，\"-\" 表示从标准输入读取")
+    parser.add_argument("--format", dest="output_format", choices=["xlsx", "json"], default="xlsx",
+                        help="批量模式输出格式：一个工作簿（默认）或一个 JSON 文档")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="批量模式并发请求数")
     args = parser.parse_args()
 
+    if args.batch_file:
+        if args.query or args.query_opt or args.metric:
+            print("错误: --batch-file 不能与单条问句同时使用", file=sys.stderr)
+            sys.exit(1)
+        _run_batch_cli(args)
+        return
+
     try:
         query = _resolve_query_arg(args)
     except ValueError as exc:
@@ -589,5 +799,54 @@ def run_cli() -> None:
         loop.close()
 
 
+def _run_batch_cli(args: argparse.Namespace) -> None:
+    """
+    批量模式命令行：逐条打印完成进度，最后输出汇总文件路径。
+    全部问句失败时退出码为 2。
+    """
+    try:
+        queries = _read_batch_queries(args.batch_file)
+    except OSError as exc:
+        print(f"错误: 无法读取批量问句: {exc}", file=sys.stderr)
+        sys.exit(1)
+    if not queries:
+        print("错误: 批量问句为空", file=sys.stderr)
+        sys.exit(1)
+
+    finished = 0
+
+    def _on_result(index: int, entry: Dict[str, Any]) -> None:
+        nonlocal finished
+        finished += 1
+        status = f"失败 - {entry['error']}" if "error" in entry else f"{entry['row_count']} 行"
+        print(f"[{finished}/{len(queries)}] {entry['query']}: {status}", flush=True)
+
+    async def _main() -> Dict[str, Any]:
+        return await query_financial_data_batch(
+            queries,
+            _get_default_output_dir(),
+            concurrency=args.concurrency,
+            output_format=args.output_format,
+            on_result=_on_result,
+        )
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        summary = loop.run_until_complete(_main())
+    finally:
+        loop.close()
+
+    if "error" in summary:
+        print(f"错误: {summary['error']}", file=sys.stderr)
+        sys.exit(2)
+    print(f"成功: {summary['succeeded']}/{summary['total']}，失败: {summary['failed']}，耗时 {summary['elapsed_sec']}s")
+    print(f"文件: {summary['file_path']}")
+    print(f"描述: {summary['description_path']}")
+    print(f"行数: {summary['row_count']}")
+    if not summary["succeeded"]:
+        sys.exit(2)
+
+
 if __name__ == "__main__":
     run_cli()
@@ -9,11 +9,17 @@ import csv
 import json
 import os
 import re
+import sys
 import time
 import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Tuple, Optional
 import httpx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from macro_series_store import META_FIELDS, OBS_COLUMNS, MacroSeriesStore, period_end, store_enabled
 
 
 # █████████████████████████████████████████████████████████████████████████
@@ -70,18 +76,22 @@ DEFAULT_OUTPUT_DIR = Path.cwd() / "miaoxiang" / "MX_MacroData"
 # MCP 服务器地址
 DEFAULT_URL = "https://ai-saas.eastmoney.com"
 DEFAULT_PAHT = "/proxy/b/mcp/tool/searchMacroData"
+# 宽表中按日期降序排在最后的观测期列（年 / 年月日），其余观测期与属性列一起按名称升序
+_SORTED_PERIOD_RE = re.compile(r"^(?:\d{4}|\d{4}-\d{2}-\d{2})$")
 
-def _flatten_value(v: Any) -> str:
+def _flatten_value(v: Any) -> Any:
     """
-    将任意单元格值转换为字符串。
-    对 dict/list 使用 JSON 序列化，None 转为空字符串。
-    用于统一 CSV 写入时的字段格式。
+    将接口返回的单元格值转换为标量。
+    list 以逗号拼接，dict 使用 JSON 序列化，None 转为空字符串；数值保持原类型。
+    在解析时调用一次，之后的长表、透视与 CSV 写入均不再逐格处理。
     """
     if v is None:
         return ""
-    if isinstance(v, (dict, list)):
+    if isinstance(v, list):
+        return ", ".join(str(x) for x in v) if v else ""
+    if isinstance(v, dict):
         return json.dumps(v, ensure_ascii=False)
-    return str(v)
+    return v
 
 
 def _extract_frequency(entity_name: str) -> str:
@@ -118,9 +128,13 @@ def _extract_frequency(entity_name: str) -> str:
     return "unknown"
 
 
-def _parse_macro_table(data_item: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+def _empty_frames() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    return pd.DataFrame(columns=list(META_FIELDS)), pd.DataFrame(columns=list(OBS_COLUMNS))
+
+
+def _parse_macro_table(data_item: Dict[str, Any]) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
     """
-    解析宏观数据的table格式。
+    解析宏观数据的table格式，输出列式长表。
 
     根据实际返回数据格式：
     {
@@ -135,11 +149,14 @@ def _parse_macro_table(data_item: Dict[str, Any]) -> Tuple[List[Dict[str, Any]],
         "entityName": "GDP（年）"
     }
 
+    列名只分类一次：能识别为观测期的列（年 / 年月 / 年月日 / 季度）进入长表，
+    其余列（如「数据来源」）作为指标属性。
+
     Returns:
-        (rows, frequency) - 解析出的数据行和频率
+        (meta, obs, frequency)
+        meta: 每个指标一行，含 entity_name、entity_description、indicator_code、indicator_name、frequency 及属性列
+        obs: 长表 (indicator_code, period, obs_date, value)，period 为原始列名，obs_date 为期末日期 YYYYMMDD
     """
-    rows = []
-
     table = data_item.get("table", {})
     name_map = data_item.get("nameMap", {})
     entity_name = data_item.get("entityName", "")
@@ -147,9 +164,10 @@ def _parse_macro_table(data_item: Dict[str, Any]) -> Tuple[List[Dict[str, Any]],
 
     # 提取频率
     frequency = _extract_frequency(entity_name)
+    meta, obs = _empty_frames()
 
     if not table or not isinstance(table, dict):
-        return rows, frequency
+        return meta, obs, frequency
 
     # 获取列名（headName）
     headers = table.get("headName", [])
@@ -157,45 +175,51 @@ def _parse_macro_table(data_item: Dict[str, Any]) -> Tuple[List[Dict[str, Any]],
         # 尝试其他可能的列名键
         headers = table.get("date", [])
         if not headers:
-            return rows, frequency
+            return meta, obs, frequency
 
-    # 找出所有的指标键（排除headName、date等元数据键）
+    # 找出所有的指标键（排除headName、date等元数据键），空值指标跳过
     exclude_keys = {"headName", "headNameSub", "date"}
-    metric_keys = [k for k in table.keys() if k not in exclude_keys]
-
+    metric_keys = [k for k in table.keys() if k not in exclude_keys and table.get(k)]
     if not metric_keys:
-        return rows, frequency
-
-    # 对于每个指标键，创建一行数据
-    for metric_key in metric_keys:
-        values = table.get(metric_key, [])
-        if not values:
-            continue
-
-        # 获取指标名称（从nameMap或使用键名）
-        metric_name = name_map.get(metric_key, metric_key)
-
-        # 创建一行数据
-        row = {
-            "entity_name": entity_name,
-            "entity_description": description,
-            "indicator_code": metric_key,
-            "indicator_name": metric_name,
-            "frequency": frequency,  # 添加频率字段
-        }
-
-        # 将每个年份/字段的值添加到行中
-        for i, header in enumerate(headers):
-            if i < len(values):
-                value = values[i]
-                # 如果值是列表，可能需要特殊处理
-                if isinstance(value, list):
-                    value = ", ".join(str(v) for v in value) if value else ""
-                row[header] = value
-
-        rows.append(row)
-
-    return rows, frequency
+        return meta, obs, frequency
+
+    # 指标 × 列名 的值矩阵；值的个数少于列名时补缺失（不写入长表）
+    headers = [str(h) for h in headers]
+    matrix = np.full((len(metric_keys), len(headers)), None, dtype=object)
+    for i, metric_key in enumerate(metric_keys):
+        values = table[metric_key][: len(headers)]
+        if any(isinstance(v, (list, dict)) for v in values):
+            values = [None if v is None else _flatten_value(v) for v in values]
+        matrix[i, : len(values)] = values
+
+    obs_dates = np.array([period_end(h) for h in headers], dtype=object)
+    is_date = obs_dates != None  # noqa: E711  逐元素比较
+    date_idx = np.flatnonzero(is_date)
+    attr_idx = np.flatnonzero(~is_date)
+
+    codes = np.array(metric_keys, dtype=object)
+    meta = pd.DataFrame({
+        "entity_name": entity_name,
+        "entity_description": description,
+        "indicator_code": codes,
+        "indicator_name": [name_map.get(k, k) for k in metric_keys],
+        "frequency": frequency,
+    })
+    for j in attr_idx:
+        meta[headers[j]] = matrix[:, j]
+
+    values = matrix[:, date_idx].ravel()
+    keep = ~pd.isna(values) & (values != "")
+    values = values[keep]
+    if values.size and all(type(v) is float for v in values):
+        values = values.astype("float64")  # 纯浮点序列转为数值列，透视与写出均按列处理
+    obs = pd.DataFrame({
+        "indicator_code": np.repeat(codes, len(date_idx))[keep],
+        "period": np.tile(np.array(headers, dtype=object)[date_idx], len(codes))[keep],
+        "obs_date": np.tile(obs_dates[date_idx], len(codes))[keep],
+        "value": values,
+    })
+    return meta, obs, frequency
 
 
 def _build_headers() -> Dict[str, str]:
@@ -230,114 +254,84 @@ def _build_request_body(query: str) -> Dict[str, Any]:
     }
     return body
 
-def _write_csv_file(rows: List[Dict[str, Any]], frequency: str, unique_suffix: str, output_dir: Path) -> Tuple[Path, int]:
+def _pivot_wide(meta: pd.DataFrame, obs: pd.DataFrame) -> pd.DataFrame:
     """
-    将指定频率的数据写入单个 CSV 文件。
-    自动整理列顺序并优先展示关键字段与日期列。
-    返回 (csv_path, row_count)。
+    长表一次性透视为宽表：每个指标一行，观测期为列，指标顺序与 meta 一致。
+    列顺序沿用原宽表：关键字段在前；其余属性列与 YYYY-MM、季度等观测期按名称升序；
+    最后是 YYYY / YYYY-MM-DD 观测期，降序（最新在前）。
     """
-    if not rows:
-        return None, 0
-
-    # 列名：统一取所有出现过的键
-    fieldnames_set: Dict[str, None] = {}
-    for row in rows:
-        for k in row:
-            fieldnames_set[k] = None
+    meta = meta.drop_duplicates("indicator_code", keep="first").reset_index(drop=True)
+    obs = obs[obs["indicator_code"].isin(meta["indicator_code"])]
 
-    # 调整列的顺序，让重要字段靠前
-    priority_fields = ["entity_name", "indicator_name", "indicator_code", "frequency", "数据来源"]
-    fieldnames = []
-    for field in priority_fields:
-        if field in fieldnames_set:
-            fieldnames.append(field)
-            del fieldnames_set[field]
-
-    # 将日期列排序
-    date_fields = []
-    other_fields = []
-    for field in fieldnames_set.keys():
-        # 判断是否是日期格式（年或年月日）
-        if (field.isdigit() and len(field) == 4) or \
-           (re.match(r'^\d{4}-\d{2}-\d{2}$', field)):  # 匹配 YYYY-MM-DD 格式
-            date_fields.append(field)
-        else:
-            other_fields.append(field)
+    periods = obs["period"].drop_duplicates().tolist()
+    row_of = pd.Index(meta["indicator_code"]).get_indexer(obs["indicator_code"])
+    col_of = pd.Index(periods).get_indexer(obs["period"])
 
-    # 日期降序排列（最新的在前）
-    date_fields.sort(reverse=True)
-    other_fields.sort()
+    values = obs["value"].to_numpy()
+    if values.dtype.kind == "f":
+        grid = np.full((len(meta), len(periods)), np.nan)
+    else:
+        grid = np.full((len(meta), len(periods)), None, dtype=object)
+    grid[row_of, col_of] = values  # 同一 (指标, 期) 重复时以后出现的为准
 
-    fieldnames.extend(other_fields)
-    fieldnames.extend(date_fields)
+    priority_fields = ["entity_name", "indicator_name", "indicator_code", "frequency", "数据来源"]
+    fieldnames = [f for f in priority_fields if f in meta.columns]
+    sorted_periods = sorted((p for p in periods if _SORTED_PERIOD_RE.match(p)), reverse=True)
+    other_fields = [c for c in meta.columns if c not in fieldnames]
+    other_fields.extend(p for p in periods if not _SORTED_PERIOD_RE.match(p))
+    fieldnames.extend(sorted(other_fields))
+    fieldnames.extend(sorted_periods)
+    table = pd.concat([meta, pd.DataFrame(grid, columns=periods)], axis=1)
+    return table[fieldnames]
+
+
+def _write_csv_file(
+    meta: pd.DataFrame,
+    obs: pd.DataFrame,
+    frequency: str,
+    unique_suffix: str,
+    output_dir: Path,
+    layout: str = "wide",
+) -> Tuple[Path, int]:
+    """
+    将指定频率的数据写入单个 CSV 文件。
+    wide：透视为宽表（每指标一行、日期降序为列）；long：直接写长表（每个观测一行）。
+    返回 (csv_path, row_count)。
+    """
+    if meta.empty:
+        return None, 0
 
-    # 生成文件名
-    csv_path = output_dir / f"MX_MacroData_{unique_suffix}_{frequency}.csv"
+    if layout == "long":
+        info = meta.drop_duplicates("indicator_code")[["indicator_code", "indicator_name", "entity_name", "frequency"]]
+        table = obs.merge(info, on="indicator_code", how="inner")
+        order = {code: i for i, code in enumerate(info["indicator_code"])}
+        table = table.assign(_order=table["indicator_code"].map(order))
+        table = table.sort_values(["_order", "obs_date"], kind="mergesort")
+        table["date"] = pd.to_datetime(table["obs_date"], format="%Y%m%d").dt.strftime("%Y-%m-%d")
+        table = table[["entity_name", "indicator_name", "indicator_code", "frequency", "period", "date", "value"]]
+        csv_path = output_dir / f"MX_MacroData_{unique_suffix}_{frequency}_long.csv"
+    else:
+        table = _pivot_wide(meta, obs)
+        csv_path = output_dir / f"MX_MacroData_{unique_suffix}_{frequency}.csv"
 
-    # 写CSV
+    # 整表转为对象矩阵后交给 csv.writer：缺失值写为空，数值按 Python repr 输出（与 DictWriter 时一致）
+    cells = table.to_numpy(dtype=object)
+    cells[pd.isna(cells)] = None
     with open(csv_path, "w", newline="", encoding="utf-8-sig") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-        writer.writeheader()
-        for row in rows:
-            writer.writerow({k: _flatten_value(v) for k, v in row.items()})
+        writer = csv.writer(f)
+        writer.writerow(table.columns)
+        writer.writerows(cells.tolist())
+    return csv_path, len(table)
 
-    return csv_path, len(rows)
 
-
-# async def query_macro_data(
-async def query_macro_data(
-    query: str,
-    output_dir: Optional[Path] = None,  # Python 3.6 兼容
-    api_base: Optional[str] = None,      # Python 3.6 兼容
-) -> Dict[str, Any]:
+def _collect_macro_frames(data: Any) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
     """
-    通过文本查询宏观数据，将返回的JSON转为CSV并生成描述txt。
-
-    Args:
-        query: 自然语言查询，如「中国GDP」
-        output_dir: 保存CSV和txt的目录；默认当前目录
-
-    Returns:
-        包含 csv_paths, description_path, row_counts, error(若有) 的字典
+    解析接口 data 字段，合并所有表格为 (meta, obs) 长表并收集描述信息。
+    依次尝试 dataTables 与 rawDataTables 两种返回结构。
+    返回 (meta, obs, description_parts)。
     """
-    output_dir = output_dir or Path.cwd()
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    result: Dict[str, Any] = {
-        "csv_paths": [],  # 改为列表，支持多个CSV文件
-        "description_path": None,
-        "row_counts": {},  # 频率 -> 行数
-        "query": query,
-    }
-    unique_suffix = uuid.uuid4().hex[:8]
-    try:
-        headers = _build_headers()
-        body = _build_request_body(query)
-        api_base = DEFAULT_URL.rstrip("/")
-        url = f"{api_base}{DEFAULT_PAHT}"
-        print(f"发送请求到: {url}")
-        print(f"请求体: {json.dumps(body, ensure_ascii=False)}")
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(
-                url,
-                json=body,
-                headers=headers,
-            )
-            resp.raise_for_status()
-            data = resp.json().get("data")
-
-
-    except httpx.HTTPStatusError as e:
-        result["error"] = f"HTTP错误: {e.response.status_code} - {e.response.text[:200]}"
-        return result
-    except Exception as e:
-        result["error"] = f"请求失败: {e!s}"
-        return result
-
-    # 解析返回的数据结构 - 按频率分组
-    frequency_groups: Dict[str, List[Dict[str, Any]]] = {}
+    metas: List[pd.DataFrame] = []
+    observations: List[pd.DataFrame] = []
     description_parts = []
 
     # 检查可能的返回路径
@@ -352,12 +346,11 @@ async def query_macro_data(
             for item_list in data_list:
 
                 # 解析table数据，同时获取频率
-                rows, frequency = _parse_macro_table(item_list)
+                meta, obs, frequency = _parse_macro_table(item_list)
 
-                if rows:
-                    if frequency not in frequency_groups:
-                        frequency_groups[frequency] = []
-                    frequency_groups[frequency].extend(rows)
+                if not meta.empty:
+                    metas.append(meta)
+                    observations.append(obs)
 
                     # 收集描述信息
                     entity_name = item_list.get("entityName", "")
@@ -383,7 +376,7 @@ async def query_macro_data(
                             description_parts.append(f"单位 [{frequency}]: {unit_name}")
 
         # 情况3：rawDataTables
-        if not frequency_groups:
+        if not metas:
             raw_data_list = data.get("rawDataTables", [])
             if raw_data_list and isinstance(raw_data_list, list):
                 for item_list in raw_data_list:
@@ -394,23 +387,138 @@ async def query_macro_data(
                         if not isinstance(data_item, dict):
                             continue
 
-                        rows, frequency = _parse_macro_table(data_item)
-                        if rows:
-                            if frequency not in frequency_groups:
-                                frequency_groups[frequency] = []
-                            frequency_groups[frequency].extend(rows)
+                        meta, obs, _ = _parse_macro_table(data_item)
+                        if not meta.empty:
+                            metas.append(meta)
+                            observations.append(obs)
+
+    if not metas:
+        return (*_empty_frames(), description_parts)
+    return pd.concat(metas, ignore_index=True), pd.concat(observations, ignore_index=True), description_parts
+
+
+def _split_by_frequency(meta: pd.DataFrame, obs: pd.DataFrame) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    按频率拆分长表，频率顺序与指标首次出现的顺序一致。
+    合并时其他表格带来的属性列（如年度表的「数据来源」）在本组全为空，逐组去掉。
+    """
+    groups: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+    for frequency, group in meta.groupby("frequency", sort=False):
+        group = group.dropna(axis=1, how="all")
+        groups[frequency] = (group, obs[obs["indicator_code"].isin(group["indicator_code"])])
+    return groups
+
 
-    if not frequency_groups:
+def _open_store() -> Optional[MacroSeriesStore]:
+    """
+    打开本地宏观序列库；MACRO_SERIES_STORE=off 或数据目录不可写时返回 None。
+    """
+    if not store_enabled():
+        return None
+    try:
+        return MacroSeriesStore()
+    except Exception as e:
+        print(f"本地序列库不可用，直接请求接口: {e!s}", file=sys.stderr)
+        return None
+
+
+# async def query_macro_data(
+async def query_macro_data(
+    query: str,
+    output_dir: Optional[Path] = None,  # Python 3.6 兼容
+    api_base: Optional[str] = None,      # Python 3.6 兼容
+    refresh: bool = False,
+    layout: str = "wide",
+) -> Dict[str, Any]:
+    """
+    通过文本查询宏观数据，将返回的JSON转为CSV并生成描述txt。
+
+    同一问句再次查询时，若所涉指标都没有到期的新一期数据，直接由本地序列库拼出 CSV，不请求接口。
+
+    Args:
+        query: 自然语言查询，如「中国GDP」
+        output_dir: 保存CSV和txt的目录；默认当前目录
+        refresh: 为 True 时忽略本地序列库，强制请求接口
+        layout: wide（默认，每指标一行、日期为列）或 long（每个观测一行，不做透视）
+
+    Returns:
+        包含 csv_paths, description_path, row_counts, source, error(若有) 的字典
+    """
+    output_dir = output_dir or Path.cwd()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    result: Dict[str, Any] = {
+        "csv_paths": [],  # 改为列表，支持多个CSV文件
+        "description_path": None,
+        "row_counts": {},  # 频率 -> 行数
+        "query": query,
+    }
+    unique_suffix = uuid.uuid4().hex[:8]
+    api_base = DEFAULT_URL.rstrip("/")
+    url = f"{api_base}{DEFAULT_PAHT}"
+
+    store = _open_store()
+    entry = store.lookup(query) if store and not refresh else None
+    store_note = ""
+    if entry and entry.codes and not store.due_codes(entry.codes):
+        meta, obs = store.assemble(entry)
+        description_parts = entry.description_parts
+        store_note = f"本地序列库（接口数据获取于 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.fetched_at))}）"
+        print(f"命中本地序列库: {len(entry.codes)} 个指标，无待发布的新数据")
+    else:
+        try:
+            headers = _build_headers()
+            body = _build_request_body(query)
+            print(f"发送请求到: {url}")
+            print(f"请求体: {json.dumps(body, ensure_ascii=False)}")
+
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                resp = await client.post(
+                    url,
+                    json=body,
+                    headers=headers,
+                )
+                resp.raise_for_status()
+                data = resp.json().get("data")
+
+        except Exception as e:
+            if isinstance(e, httpx.HTTPStatusError):
+                error = f"HTTP错误: {e.response.status_code} - {e.response.text[:200]}"
+            else:
+                error = f"请求失败: {e!s}"
+            if not entry:
+                result["error"] = error
+                return result
+            # 接口不可用时沿用本地已有序列
+            meta, obs = store.assemble(entry)
+            description_parts = entry.description_parts
+            store_note = f"本地序列库（接口请求失败，沿用 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.fetched_at))} 的数据: {error}）"
+            print(f"{error}，改用本地序列库", file=sys.stderr)
+        else:
+            meta, obs, description_parts = _collect_macro_frames(data)
+            if store and not meta.empty:
+                try:
+                    entry = store.save(query, meta, obs, description_parts)
+                    meta, obs = store.assemble(entry)
+                except Exception as e:
+                    print(f"写入本地序列库失败: {e!s}", file=sys.stderr)
+    if store:
+        store.close()
+
+    if meta.empty:
         result["error"] = "无法解析表格数据"
-        result["raw_preview"] = json.dumps(data, ensure_ascii=False)[:500]
+        if not store_note:
+            result["raw_preview"] = json.dumps(data, ensure_ascii=False)[:500]
         return result
 
     # 按频率分别写入CSV文件
     csv_paths = []
     row_counts = {}
-    for frequency, rows in frequency_groups.items():
-        print(f"处理频率 [{frequency}] 的数据: {len(rows)} 行")
-        csv_path, row_count = _write_csv_file(rows, frequency, unique_suffix, output_dir)
+    frequency_groups = _split_by_frequency(meta, obs)
+    for frequency, (group_meta, group_obs) in frequency_groups.items():
+        print(f"处理频率 [{frequency}] 的数据: {len(group_meta)} 个指标, {len(group_obs)} 个观测值")
+        csv_path, row_count = _write_csv_file(group_meta, group_obs, frequency, unique_suffix, output_dir, layout)
         if csv_path:
             csv_paths.append(str(csv_path))
             row_counts[frequency] = row_count
@@ -463,6 +571,8 @@ async def query_macro_data(
         f"接口: {url}",
         f"查询时间: {time.strftime('%Y-%m-%d %H:%M:%S')}",
     ])
+    if store_note:
+        description_lines.append(f"数据读取自: {store_note}")
 
     desc_path.write_text("\n".join(description_lines), encoding="utf-8")
     print(f"描述文件已保存到: {desc_path}")
@@ -470,6 +580,7 @@ async def query_macro_data(
     result["csv_paths"] = csv_paths
     result["description_path"] = str(desc_path)
     result["row_counts"] = row_counts
+    result["source"] = "store" if store_note else "api"
     return result
 
 
@@ -480,13 +591,15 @@ def run_cli() -> None:
     根据执行结果打印文件路径或错误信息。
     """
     import argparse
-    import sys
     """命令行入口：从参数或 stdin 读取查询文本，执行并打印结果路径。"""
 
     parser = argparse.ArgumentParser(description='通过自然语言查询宏观经济数据')
 
     # 添加query参数
     parser.add_argument('--query', type=str, help='自然语言查询，如「查询近五年中国GDP」', required=True)
+    parser.add_argument('--refresh', action='store_true', help='忽略本地序列库，强制请求接口')
+    parser.add_argument('--layout', choices=['wide', 'long'], default='wide',
+                        help='CSV 布局：wide 每指标一行、日期为列（默认）；long 每个观测一行')
     args = parser.parse_args()
     print(f"查数问句: {args.query}")
     if not args.query:
@@ -495,7 +608,7 @@ def run_cli() -> None:
         sys.exit(1)
     async def _main() -> None:
         out_dir = Path(os.environ.get("MX_MacroData_OUTPUT_DIR", str(DEFAULT_OUTPUT_DIR)))
-        r = await query_macro_data(args.query, output_dir=out_dir)
+        r = await query_macro_data(args.query, output_dir=out_dir, refresh=args.refresh, layout=args.layout)
         if "error" in r:
             print(f"错误: {r['error']}", file=sys.stderr)
             if "raw_preview" in r:
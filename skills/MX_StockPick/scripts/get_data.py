@@ -11,12 +11,15 @@ import asyncio
 import csv
 import json
 import os
-import re
+import sys
 import uuid
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import httpx
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from markdown_table import parse_table
+
 # █████████████████████████████████████████████████████████████████████████
 # ██                                                                  ██
 # ██   ███████╗███╗   ███╗     █████╗ ██████╗ ██╗    ██╗ ██████╗       ██
@@ -72,23 +75,31 @@ DEFAULT_OUTPUT_DIR = Path.cwd() / "miaoxiang" / "MX_StockPick"
 print('默认输出目录为：',DEFAULT_OUTPUT_DIR.absolute())
 # MCP 服务器地址
 MCP_URL = "https://ai-saas.eastmoney.com/proxy/b/mcp/tool/selectSecurity"
+# 分页：每页条数（0 表示不分页，一次返回全量）与最多请求的页数
+PAGE_SIZE = int(os.environ.get("MX_StockPick_PAGE_SIZE") or "0")
+MAX_PAGES = int(os.environ.get("MX_StockPick_MAX_PAGES") or "200")
+# 选板块时不输出的列
+SECTOR_BLOCKED_COLUMNS = {"板块编码", "指数内码"}
 
 
 def get_metadata(
         query: str = "",
         selectType: str = "",
+        pageNo: Optional[int] = None,
+        pageSize: Optional[int] = None,
 ) -> dict:
     """
     生成 MCP 调用所需的 meta_data 字典
 
     Args:
         query: 查询文本
+        pageNo / pageSize: 分页参数；pageSize 为空时不携带，服务端返回全量
 
     Returns:
         包含完整 meta 信息的字典
     """
 
-    return {
+    meta = {
         "query": query,
         "selectType": selectType,
         "toolContext": {
@@ -98,6 +109,10 @@ def get_metadata(
             },
         },
     }
+    if pageSize:
+        meta["pageNo"] = pageNo or 1
+        meta["pageSize"] = pageSize
+    return meta
 def _build_column_map(columns: List[Dict]) -> Dict:
     """
     从 MCP 返回的 columns 构建 英文列名 -> 中文列名 的映射。
@@ -127,208 +142,255 @@ def _columns_order(columns: List[Dict]) -> List[str]:
     return order
 
 
-def _parse_partial_results_table(partial_results: str) -> List[Dict]:
+def _parse_partial_results_table(partial_results: str) -> Tuple[List[str], List[List[str]]]:
     """
-    将 partialResults 的 Markdown 表格字符串解析为行字典列表。
+    将 partialResults 的 Markdown 表格字符串解析为 (表头, 行列表)。
     格式: "|序号|代码|名称|...|\\n|---|\\n|1|000001|平安银行|...|"
+    单元格内的 \\| 还原为竖线；列数不一致的行按表头补空或截断。
     """
-    if not partial_results or not isinstance(partial_results, str):
-        return []
-    lines = [ln.strip() for ln in partial_results.strip().splitlines() if ln.strip()]
-    if not lines:
-        return []
-
-    # 表头行：按 | 分割，去掉首尾空
-    def split_cells(line: str) -> List[str]:
-        return [c.strip() for c in line.split("|") if c.strip() != ""]
-
-    header_cells = split_cells(lines[0])
-    if not header_cells:
-        return []
-    # 跳过分隔行（如 |---|---|）
-    data_start = 1
-    if data_start < len(lines) and re.match(r"^[\s\|\-]+$", lines[data_start]):
-        data_start = 2
-    rows = []
-    for i in range(data_start, len(lines)):
-        cells = split_cells(lines[i])
-        if len(cells) != len(header_cells):
-            # 列数不一致时按长度对齐，缺的补空
-            if len(cells) < len(header_cells):
-                cells.extend([""] * (len(header_cells) - len(cells)))
-            else:
-                cells = cells[: len(header_cells)]
-        rows.append(dict(zip(header_cells, cells)))
-    return rows
+    header, rows, _ = parse_table(partial_results)
+    return header, rows
 
 
-def _datalist_to_rows(
-        datalist: List[Dict],
-        column_map: Dict,
-        column_order: List[str],
-) -> List[Dict]:
+def _output_columns(
+        columns: List[Dict],
+        first_row: Dict,
+) -> List[Tuple[str, str]]:
     """
-    将 datalist 中每行的英文键按 column_map 替换为中文键，保证顺序与 partialResults 风格一致。
-    覆盖全部 datalist 数据。
+    计算一次输出列计划 [(英文键, 中文列名)]，之后每行按同一键列表取值。
+    列顺序与 columns 一致，只保留首行中出现的字段；中文列名重复时保留首次出现的位置、取最后一个字段的值。
+    columns 与首行字段完全对不上时，按首行的原始键输出（不丢数据）。
+    """
+    column_map = _build_column_map(columns)
+    by_name: Dict[str, str] = {}
+    for en_key in _columns_order(columns):
+        if en_key in first_row:
+            by_name[column_map.get(en_key, en_key)] = en_key
+    if not by_name:
+        for en_key in first_row:
+            by_name[column_map.get(en_key, en_key)] = en_key
+    return [(en_key, cn_name) for cn_name, en_key in by_name.items()]
+
+
+def _cell_text(val: Any) -> str:
+    """单元格转为 CSV 文本：None 为空，dict/list 序列化为 JSON。"""
+    if val is None:
+        return ""
+    if isinstance(val, (Dict, List)):
+        return json.dumps(val, ensure_ascii=False)
+    return str(val)
+
+
+def _datalist_rows(datalist: List[Dict], keys: List[str]) -> Iterator[List[str]]:
+    """
+    按输出列计划逐行转换 datalist，缺失字段写空；生成器，不在内存中保留转换后的整表。
     """
-    if not datalist:
-        return []
-
-    rows = []
     for row in datalist:
         if not isinstance(row, Dict):
             continue
-        cn_row = {}
-        for en_key in column_order:
-            if en_key not in row:
-                continue
-            cn_name = column_map.get(en_key, en_key)
-            val = row[en_key]
-            if val is None:
-                cn_row[cn_name] = ""
-            elif isinstance(val, (Dict, List)):
-                cn_row[cn_name] = json.dumps(val, ensure_ascii=False)
-            else:
-                cn_row[cn_name] = str(val)
-        rows.append(cn_row)
+        yield [_cell_text(row.get(k)) for k in keys]
 
-    return rows
 
-
-def _drop_columns_for_sector(rows: List[Dict], select_type: str) -> List[Dict]:
+def _drop_columns_for_sector(plan: List[Tuple[Any, str]], select_type: str) -> List[Tuple[Any, str]]:
     """
-    当选择类型为“板块”时，移除不需要输出的列。
+    当选择类型为“板块”时，从输出列计划中移除不需要输出的列。
     目前按需求移除：
     - 板块编码
     - 指数内码
     """
-    if select_type != "板块" or not rows:
-        return rows
+    if select_type != "板块":
+        return plan
+    return [(key, name) for key, name in plan if str(name).strip() not in SECTOR_BLOCKED_COLUMNS]
 
-    blocked = {"板块编码", "指数内码"}
-    cleaned_rows = []
-    for row in rows:
-        if not isinstance(row, Dict):
-            continue
-        cleaned_row = {
-            k: v
-            for k, v in row.items()
-            if str(k).strip() not in blocked
-        }
-        cleaned_rows.append(cleaned_row)
-    return cleaned_rows
+
+def _result_node(raw: Dict) -> Tuple[List[Dict], List[Dict]]:
+    """
+    从 MCP 返回中取出 (dataList, columns)，兼容 allResults/result 为 None 的场景。
+    """
+    all_results = raw.get("allResults")
+    if not isinstance(all_results, dict):
+        all_results = {}
+    result_node = all_results.get("result")
+    if not isinstance(result_node, dict):
+        result_node = {}
+
+    dataList = result_node.get("dataList", [])
+    if not isinstance(dataList, list):
+        dataList = []
+
+    columns = result_node.get("columns", [])
+    if not isinstance(columns, list):
+        columns = []
+    return dataList, columns
 
 
 async def query_MX_StockPick(
         query: str,
         selectType: str,
-        output_dir: Path
+        output_dir: Path,
+        page_size: Optional[int] = None,
+        max_pages: Optional[int] = None,
 ) -> Dict:
     """
     通过自然语言查询进行选股（A股/港股/美股）、选板块、选基金；
     使用 MCP 股票基金筛选工具，将返回的 datalist 按 columns 转为中文列名 CSV 并生成描述文件。
 
+    列映射只在首页计算一次，之后逐页、逐行转换并写入 CSV。page_size > 0 时按页请求
+    （pageNo / pageSize），遇到短页、累计条数达到 securityCount 或达到 max_pages 时停止；
+    服务端未分页（单页超过 page_size 或重复返回同一页）时按已取得的数据结束。
+
     Args:
         query: 自然语言查询，如「股价大于1000元的股票」「港股科技龙头」「新能源板块」「白酒主题基金」
         selectType: 选股指定标的类型，格式：A股、港股、美股、基金、ETF、可转债、板块
         output_dir: 保存 CSV 和描述文件的目录；默认 workspace/MX_StockPick
+        page_size: 每页条数；默认取环境变量 MX_StockPick_PAGE_SIZE，0 表示不分页
+        max_pages: 最多请求的页数；默认取环境变量 MX_StockPick_MAX_PAGES
 
     Returns:
-        包含 csv_path, description_path, row_count, query，selectType；若失败则含 error。
+        包含 csv_path, description_path, row_count, query，selectType，pages；若失败则含 error。
     """
     output_dir.mkdir(parents=True, exist_ok=True)
+    page_size = PAGE_SIZE if page_size is None else max(0, page_size)
+    max_pages = MAX_PAGES if max_pages is None else max(1, max_pages)
 
     result = {
         "csv_path": None,
         "description_path": None,
         "row_count": 0,
         "query": query,
-        "selectType": selectType
+        "selectType": selectType,
+        "pages": 0,
     }
 
-    try:
-        raw = await mcp_single_call_v2(
-            {"query": query, "selectType": selectType},
-        )
-    except Exception as e:
-        result["error"] = f"MCP 调用失败: {e!s}"
-        return result
-
-    if not raw or not isinstance(raw, Dict):
-        result["error"] = "MCP 返回为空或非 JSON 对象"
-        result["raw_preview"] = str(raw)[:500] if raw else ""
-        return result
-
-    # 使用 datalist（全量），兼容 allResults/result 为 None 的场景
-    all_results = raw.get("allResults")
-    if not isinstance(all_results, dict):
-        all_results = {}
-    result_node = all_results.get("result")
-    if not isinstance(result_node, dict):
-        result_node = {}
-
-    # 若无 datalist 则回退到解析 partialResults 表格字符串
-    dataList = result_node.get("dataList", [])
-    if not isinstance(dataList, list):
-        dataList = []
-
-    columns = result_node.get("columns", [])
-    if not isinstance(columns, list):
-        columns = []
-
-    rows = []
-    data_source = ""
-
-    if dataList:
-        column_map = _build_column_map(columns)
-        column_order = _columns_order(columns)
-        rows = _datalist_to_rows(dataList, column_map, column_order)
-        data_source = "dataList"
-
-    if not rows:
-        partial_results = raw.get("partialResults")
-        if partial_results:
-            rows = _parse_partial_results_table(partial_results)
-            data_source = "partialResults"
-
-    if not rows:
-        if raw.get("securityCount", -1) == 0:
-            result["error"] = "无符合问句要求的"+selectType
-        else:
-            result["error"] = "返回中无有效 datalist 且 partialResults 无法解析或为空"
-        return result
-
-    rows = _drop_columns_for_sector(rows, selectType)
-    if not rows:
-        result["error"] = "过滤板块字段后无可输出数据"
-        return result
-
-    fieldnames = list(rows[0].keys())
     unique_suffix = uuid.uuid4().hex[:8]
     csv_path = output_dir / f"MX_StockPick_{unique_suffix}.csv"
     desc_path = output_dir / f"MX_StockPick_{unique_suffix}_description.txt"
 
+    fieldnames: List[str] = []
+    row_count = 0
+    pages = 0
+    data_source = ""
+    security_count = None
+    truncated = False
+    first_raw: Optional[Dict] = None
+    previous_head = None
+
     with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-        writer.writeheader()
-        for row in rows:
-            writer.writerow(row)
+        writer = csv.writer(f)
+        page_no = 1
+        while True:
+            arguments = {"query": query, "selectType": selectType}
+            if page_size:
+                arguments.update({"pageNo": page_no, "pageSize": page_size})
+            try:
+                raw = await mcp_single_call_v2(arguments)
+            except Exception as e:
+                if pages == 0:
+                    result["error"] = f"MCP 调用失败: {e!s}"
+                    break
+                truncated = True
+                break
+
+            if not raw or not isinstance(raw, Dict):
+                if pages == 0:
+                    result["error"] = "MCP 返回为空或非 JSON 对象"
+                    result["raw_preview"] = str(raw)[:500] if raw else ""
+                else:
+                    truncated = True
+                break
+            if first_raw is None:
+                first_raw = raw
+                security_count = raw.get("securityCount")
+
+            dataList, columns = _result_node(raw)
+            head = next((r for r in dataList if isinstance(r, Dict)), None)
+            if head is None or head == previous_head:
+                break
+            previous_head = head
+
+            if not fieldnames:
+                full_plan = _output_columns(columns, head)
+                if not full_plan:
+                    break  # 首行无任何字段：按无有效 datalist 处理，回退 partialResults
+                plan = _drop_columns_for_sector(full_plan, selectType)
+                if not plan:
+                    result["error"] = "过滤板块字段后无可输出数据"
+                    break
+                keys = [en_key for en_key, _ in plan]
+                fieldnames = [cn_name for _, cn_name in plan]
+                writer.writerow(fieldnames)
+                data_source = "dataList"
+
+            for cells in _datalist_rows(dataList, keys):
+                writer.writerow(cells)
+                row_count += 1
+            pages += 1
+
+            if not page_size or len(dataList) != page_size:
+                break
+            if isinstance(security_count, int) and 0 < security_count <= row_count:
+                break
+            if pages >= max_pages:
+                truncated = True
+                break
+            page_no += 1
+
+        # 若无 datalist 则回退到解析 partialResults 表格字符串
+        if not row_count and "error" not in result and first_raw is not None:
+            header, table_rows = _parse_partial_results_table(first_raw.get("partialResults"))
+            if table_rows:
+                plan = _drop_columns_for_sector(list(enumerate(header)), selectType)
+                if not plan:
+                    result["error"] = "过滤板块字段后无可输出数据"
+                else:
+                    fieldnames = [name for _, name in plan]
+                    f.seek(0)
+                    f.truncate()
+                    writer.writerow(fieldnames)
+                    if len(plan) == len(header):
+                        writer.writerows(table_rows)
+                    else:
+                        index = [i for i, _ in plan]
+                        writer.writerows([cells[i] for i in index] for cells in table_rows)
+                    row_count = len(table_rows)
+                    pages = 1
+                    data_source = "partialResults"
+
+    if not row_count:
+        csv_path.unlink(missing_ok=True)
+        if "error" not in result:
+            if first_raw is not None and first_raw.get("securityCount", -1) == 0:
+                result["error"] = "无符合问句要求的"+selectType
+            else:
+                result["error"] = "返回中无有效 datalist 且 partialResults 无法解析或为空"
+        return result
 
     description_lines = [
         "选股/选板块/选基金 结果说明",
         "=" * 40,
         f"查询内容: {query}",
-        f"数据行数: {len(rows)}（来源: {data_source}）",
+        f"数据行数: {row_count}（来源: {data_source}）",
         f"列名（中文）: {', '.join(fieldnames)}",
+    ]
+    if page_size:
+        description_lines.append(f"分页: 每页 {page_size} 条，共请求 {pages} 页")
+    if isinstance(security_count, int) and security_count > row_count:
+        description_lines.append(f"符合条件总数: {security_count}")
+    if truncated:
+        description_lines.append(f"注意: 分页在第 {pages} 页后中止（达到页数上限或请求失败），结果不完整。")
+    description_lines.extend([
         "",
         "说明: 数据来源于 MCP 股票基金筛选；"
         + ("列名已按 columns 映射为中文。" if data_source == "dataList" else "表格来自 partialResults。"),
-    ]
+    ])
     desc_path.write_text("\n".join(description_lines), encoding="utf-8")
 
     result["csv_path"] = str(csv_path)
     result["description_path"] = str(desc_path)
-    result["row_count"] = len(rows)
+    result["row_count"] = row_count
+    result["pages"] = pages
+    if truncated:
+        result["truncated"] = True
     return result
 
 
@@ -346,6 +408,10 @@ def run_cli() -> None:
     parser.add_argument('--select-type', dest='selectType',
                         choices=['A股', '港股', '美股', '基金', 'ETF', '可转债', '板块'],
                         help='选股指定标的类型', required=True)
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='按页请求的每页条数（默认取 MX_StockPick_PAGE_SIZE，0 为不分页）')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='最多请求的页数（默认取 MX_StockPick_MAX_PAGES，200）')
     args = parser.parse_args()
 
     print(f"Query: {args.query}，SelectType: {args.selectType}")
@@ -357,7 +423,13 @@ def run_cli() -> None:
 
     async def _main() -> None:
         out_dir = Path(os.environ.get("MX_StockPick_OUTPUT_DIR", str(DEFAULT_OUTPUT_DIR)))
-        r = await query_MX_StockPick(args.query, args.selectType, output_dir=out_dir)
+        r = await query_MX_StockPick(
+            args.query,
+            args.selectType,
+            output_dir=out_dir,
+            page_size=args.page_size,
+            max_pages=args.max_pages,
+        )
         if "error" in r:
             print(f"错误: {r['error']}", file=sys.stderr)
             if "raw_preview" in r:
@@ -381,7 +453,12 @@ async def mcp_single_call_v2(arguments):
 
     query = arguments.get("query", "")
     selectType = arguments.get("selectType", "")
-    meta = get_metadata(query=query, selectType=selectType)
+    meta = get_metadata(
+        query=query,
+        selectType=selectType,
+        pageNo=arguments.get("pageNo"),
+        pageSize=arguments.get("pageSize"),
+    )
     result_data = {}
 
     try:
@@ -3,6 +3,14 @@
 
 通过 wind-mcp-skill 的 analytics_data.get_financial_data 接口查询，
 将 MCP 返回整理为描述文件供 Aeolus 解析展示。
+
+默认由 skills/_lib/wind_mcp_client 在进程内直连 Wind MCP（复用 keep-alive 连接）；
+httpx 不可用或设置 WIND_MCP_TRANSPORT=node 时回退为调用 node scripts/cli.mjs。
+两条路径的成功输出与失败 envelope 一致。
+
+批量模式（--codes / --codes-file）对代码列表调用结构化行情工具（price_indicators / kline），
+按块拼接 windcode、有界并发扇出，合并为一张表并逐代码记录错误；
+K 线经 skills/_lib/wind_kline_cache 本地缓存，只补拉缺口区间。
 """
 
 from __future__ import annotations
@@ -13,10 +21,19 @@ import os
 import re
 import subprocess
 import sys
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+
+import wind_mcp_client
+from progress_events import get_reporter
+from wind_kline_cache import KlineCache
+
 WIND_API_KEY = (os.environ.get("WIND_API_KEY") or "").strip()
 
 if not WIND_API_KEY:
@@ -55,14 +72,30 @@ def _normalize_question(query: str) -> str:
     return re.sub(r"\s+", "", q)
 
 
-def _run_wind_call(question: str) -> Tuple[int, str, str]:
-    params = json.dumps({"question": question, "lang": "CNS"}, ensure_ascii=False)
+def _use_native_client() -> bool:
+    if (os.environ.get("WIND_MCP_TRANSPORT") or "").strip().lower() == "node":
+        return False
+    return wind_mcp_client.httpx is not None
+
+
+def _call_tool(server_type: str, tool_name: str, arguments: Dict[str, Any]) -> Tuple[int, str, str]:
+    """返回 (退出码, stdout, stderr)，语义与 ``node cli.mjs call`` 相同。"""
+    if _use_native_client():
+        try:
+            result = wind_mcp_client.get_shared_client().call_tool(server_type, tool_name, arguments)
+        except wind_mcp_client.WindMcpError as exc:
+            return 1, json.dumps(exc.envelope(), ensure_ascii=False), ""
+        return 0, json.dumps(result, ensure_ascii=False), ""
+
+    if not CLI_PATH.is_file():
+        raise FileNotFoundError(f"未找到 Wind CLI: {CLI_PATH}")
+    params = json.dumps(arguments, ensure_ascii=False)
     cmd = [
         "node",
         str(CLI_PATH),
         "call",
-        "analytics_data",
-        "get_financial_data",
+        server_type,
+        tool_name,
         params,
     ]
     env = {**os.environ, "WIND_API_KEY": WIND_API_KEY}
@@ -78,6 +111,10 @@ def _run_wind_call(question: str) -> Tuple[int, str, str]:
     return proc.returncode, proc.stdout or "", proc.stderr or ""
 
 
+def _run_wind_call(question: str) -> Tuple[int, str, str]:
+    return _call_tool("analytics_data", "get_financial_data", {"question": question, "lang": "CNS"})
+
+
 def _parse_error_envelope(stdout: str) -> str:
     try:
         data = json.loads(stdout)
@@ -217,9 +254,6 @@ def _write_outputs(query: str, result_text: str, output_dir: Path) -> Tuple[Path
 
 
 def run_query(query: str, output_dir: Optional[Path] = None) -> None:
-    if not CLI_PATH.is_file():
-        raise FileNotFoundError(f"未找到 Wind CLI: {CLI_PATH}")
-
     question = _normalize_question(query)
     out_dir = output_dir or _default_output_dir()
 
@@ -250,6 +284,331 @@ def run_query(query: str, output_dir: Optional[Path] = None) -> None:
             pass
 
 
+# ───── 批量模式：代码列表 × 指标列表 → 结构化工具并发扇出 ─────
+
+BULK_TOOLS: Dict[str, Dict[str, Tuple[str, str]]] = {
+    "price_indicators": {
+        "stock": ("stock_data", "get_stock_price_indicators"),
+        "global_stock": ("global_stock_data", "get_global_stock_price_indicators"),
+        "fund": ("fund_data", "get_fund_price_indicators"),
+        "index": ("index_data", "get_index_price_indicators"),
+    },
+    "kline": {
+        "stock": ("stock_data", "get_stock_kline"),
+        "global_stock": ("global_stock_data", "get_global_stock_kline"),
+        "fund": ("fund_data", "get_fund_kline"),
+        "index": ("index_data", "get_index_kline"),
+    },
+}
+# 快照类工具按逗号拼接多个 windcode 一次请求；K 线每个代码本身就是多行，默认逐个请求
+DEFAULT_CHUNK_SIZE = {"price_indicators": 20, "kline": 1}
+DEFAULT_CONCURRENCY = 4
+BULK_CODE_COLUMN = "windcode"
+CODE_COLUMN_CANDIDATES = ("windcode", "Wind代码", "证券代码", "代码", "code")
+# 可原样重试的错误（cli.mjs 处方：等待 3-5 秒后重试）；以及重试无意义、应终止整批的错误
+RETRYABLE_ERRORS = {"RATE_LIMIT_QPS", "SERVER_5XX", "NETWORK_ERROR"}
+FATAL_ERRORS = {"KEY_MISSING", "KEY_INVALID", "KEY_FORBIDDEN_SERVER", "RATE_LIMIT_DAILY", "BALANCE_INSUFFICIENT"}
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF_SEC = 3.0
+
+BulkError = Tuple[str, str]
+
+
+def _parse_codes(raw: str) -> List[str]:
+    """按逗号 / 分号 / 空白拆分代码，统一大写并保序去重。"""
+    seen: Dict[str, None] = {}
+    for token in re.split(r"[,，;；\s]+", raw or ""):
+        code = token.strip().upper()
+        if code:
+            seen.setdefault(code, None)
+    return list(seen)
+
+
+def _error_fields(stdout: str, stderr: str) -> BulkError:
+    try:
+        data = json.loads(stdout)
+    except json.JSONDecodeError:
+        data = None
+    err = data.get("error") if isinstance(data, dict) else None
+    if isinstance(err, dict):
+        return str(err.get("code") or "UNKNOWN"), str(err.get("agent_action") or err.get("hint") or "")
+    return "UNKNOWN", (stdout.strip() or stderr.strip() or "Wind 调用失败")[:500]
+
+
+def _call_with_retry(server_type: str, tool_name: str, arguments: Dict[str, Any]) -> Tuple[Any, Optional[BulkError]]:
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        code, stdout, stderr = _call_tool(server_type, tool_name, arguments)
+        if code == 0:
+            try:
+                return json.loads(stdout), None
+            except json.JSONDecodeError:
+                return None, ("RESPONSE_PARSE_ERROR", f"Wind 返回非 JSON: {stdout[:200]}")
+        err = _error_fields(stdout, stderr)
+        if err[0] not in RETRYABLE_ERRORS or attempt == RETRY_ATTEMPTS:
+            return None, err
+        time.sleep(RETRY_BACKOFF_SEC * attempt)
+    return None, ("UNKNOWN", "Wind 调用失败")
+
+
+def _attribute_rows(rows: List[Dict[str, Any]], codes: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """为每行补上 windcode 列；无法可靠归属到代码时返回 None（调用方改为逐个请求）。
+
+    只信任带代码列的行：多代码请求的返回没有代码列时不按位置对应（服务端跳过 / 重排代码会张冠李戴）。
+    """
+    col = next((c for c in CODE_COLUMN_CANDIDATES if c in rows[0]), None)
+    if col is not None:
+        wanted = set(codes)
+        out = []
+        for row in rows:
+            code = str(row.get(col) or "").strip().upper()
+            if code in wanted:
+                out.append({BULK_CODE_COLUMN: code, **{k: v for k, v in row.items() if k not in (BULK_CODE_COLUMN, col)}})
+        return out
+    if len(codes) == 1:
+        return [{BULK_CODE_COLUMN: codes[0], **row} for row in rows]
+    return None
+
+
+class _BulkRunner:
+    """分块并发调用结构化工具，合并结果行并记录逐代码错误。"""
+
+    def __init__(
+        self,
+        server_type: str,
+        tool_name: str,
+        base_args: Dict[str, Any],
+        reporter=None,
+        kline_cache: Optional[KlineCache] = None,
+    ):
+        self.server_type = server_type
+        self.tool_name = tool_name
+        self.base_args = base_args
+        self.reporter = reporter
+        self.kline_cache = kline_cache
+        self._fatal: Optional[BulkError] = None
+        self._lock = threading.Lock()
+
+    def _record_fatal(self, err: BulkError) -> None:
+        if err[0] in FATAL_ERRORS:
+            with self._lock:
+                self._fatal = self._fatal or err
+
+    def run_chunk(self, codes: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, BulkError]]:
+        if self._fatal is not None:
+            return [], {c: self._fatal for c in codes}
+        if self.kline_cache is not None:
+            return self._run_cached_kline(codes)
+
+        args = {**self.base_args, "windcode": ",".join(codes)}
+        payload, err = _call_with_retry(self.server_type, self.tool_name, args)
+        if err is not None:
+            if err[0] in FATAL_ERRORS:
+                self._record_fatal(err)
+                return [], {c: err for c in codes}
+            if len(codes) > 1:
+                return self._run_each(codes)
+            return [], {codes[0]: err}
+
+        text = _extract_text_payload(payload)
+        inner = _try_parse_inner_json(text)
+        rows = (_rows_from_payload(inner) if inner is not None else None) or []
+        attributed = _attribute_rows(rows, codes) if rows else []
+        if attributed is None:
+            return self._run_each(codes)
+
+        found = {r[BULK_CODE_COLUMN] for r in attributed}
+        errors: Dict[str, BulkError] = {}
+        for c in codes:
+            if c not in found:
+                errors[c] = ("NO_RESULTS", text.strip()[:200] if not rows else "返回结果中没有该代码")
+        return attributed, errors
+
+    def _run_each(self, codes: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, BulkError]]:
+        rows: List[Dict[str, Any]] = []
+        errors: Dict[str, BulkError] = {}
+        for c in codes:
+            r, e = self.run_chunk([c])
+            rows.extend(r)
+            errors.update(e)
+        return rows, errors
+
+    def _run_cached_kline(self, codes: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, BulkError]]:
+        """K 线走本地缓存：只对缓存缺口区间调用 Wind。"""
+        begin, end = self.base_args["begin_date"], self.base_args["end_date"]
+        rows: List[Dict[str, Any]] = []
+        errors: Dict[str, BulkError] = {}
+        for code in codes:
+            if self._fatal is not None:
+                errors[code] = self._fatal
+                continue
+            try:
+                bars = self.kline_cache.get_bars(
+                    code, begin, end, lambda b, e, c=code: self._fetch_kline(c, b, e)
+                )
+            except _KlineFetchError as exc:
+                self._record_fatal(exc.error)
+                errors[code] = exc.error
+                continue
+            except ValueError as exc:
+                errors[code] = ("RESPONSE_PARSE_ERROR", str(exc))
+                continue
+            if not bars:
+                errors[code] = ("NO_RESULTS", f"{begin}~{end} 区间内没有 K 线")
+                continue
+            rows.extend({BULK_CODE_COLUMN: code, **bar} for bar in bars)
+        return rows, errors
+
+    def _fetch_kline(self, code: str, begin: str, end: str) -> List[Dict[str, Any]]:
+        args = {**self.base_args, "windcode": code, "begin_date": begin, "end_date": end}
+        payload, err = _call_with_retry(self.server_type, self.tool_name, args)
+        if err is not None:
+            if err[0] == "NO_RESULTS":  # 区间内无交易日（停牌 / 节假日）同样记为已覆盖
+                return []
+            raise _KlineFetchError(err)
+        inner = _try_parse_inner_json(_extract_text_payload(payload))
+        return (_rows_from_payload(inner) if inner is not None else None) or []
+
+
+class _KlineFetchError(Exception):
+    def __init__(self, error: BulkError):
+        super().__init__(f"[{error[0]}] {error[1]}")
+        self.error = error
+
+
+def run_bulk(
+    codes: List[str],
+    *,
+    indexes: str = "",
+    tool: str = "price_indicators",
+    asset: str = "stock",
+    begin_date: str = "",
+    end_date: str = "",
+    chunk_size: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_cache: bool = True,
+) -> Tuple[List[Dict[str, Any]], Dict[str, BulkError]]:
+    """对代码列表批量取数，返回 (按输入代码顺序合并的行, {代码: (错误码, 处方)})。
+
+    kline 模式指定 begin_date 且 use_cache 时经 KlineCache 读取（end_date 缺省为今天），
+    重复的区间请求不再消耗 Wind 额度。
+    """
+    if not codes:
+        raise ValueError("缺少代码列表")
+    server_type, tool_name = BULK_TOOLS[tool][asset]
+    base_args: Dict[str, Any] = {}
+    if tool == "price_indicators":
+        idx = ",".join(i.strip() for i in re.split(r"[,，]", indexes or "") if i.strip())
+        if not idx:
+            raise ValueError("price_indicators 模式需要 --indexes（字段见 references/indicators.md）")
+        base_args["indexes"] = idx
+    else:
+        if begin_date:
+            base_args["begin_date"] = begin_date
+        if end_date:
+            base_args["end_date"] = end_date
+
+    kline_cache: Optional[KlineCache] = None
+    if tool == "kline" and use_cache and begin_date:
+        base_args.setdefault("end_date", time.strftime("%Y%m%d"))
+        extra = {k: v for k, v in base_args.items() if k not in ("begin_date", "end_date")}
+        kline_cache = KlineCache(KlineCache.namespace_for(server_type, tool_name, extra))
+
+    size = max(1, chunk_size or DEFAULT_CHUNK_SIZE[tool])
+    chunks = [codes[i : i + size] for i in range(0, len(codes), size)]
+    reporter = get_reporter(source="Wind_FinData")
+    runner = _BulkRunner(server_type, tool_name, base_args, reporter=reporter, kline_cache=kline_cache)
+
+    rows: List[Dict[str, Any]] = []
+    errors: Dict[str, BulkError] = {}
+    with reporter.stage("bulk", percent=0, done_percent=95):
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks)))) as pool:
+            futures = [pool.submit(runner.run_chunk, chunk) for chunk in chunks]
+            for done, fut in enumerate(as_completed(futures), 1):
+                chunk_rows, chunk_errors = fut.result()
+                rows.extend(chunk_rows)
+                errors.update(chunk_errors)
+                reporter.progress(95 * done / len(chunks), message=f"已完成 {done}/{len(chunks)} 批", stage="bulk")
+
+    if kline_cache is not None:
+        st = kline_cache.stats
+        reporter.progress(
+            95,
+            message=f"K 线缓存：{st['hit_codes']} 个代码直接命中，补拉 {st['fetched_ranges']} 段 / {st['fetched_rows']} 行",
+            stage="bulk",
+        )
+
+    order = {c: i for i, c in enumerate(codes)}
+    rows.sort(key=lambda r: order.get(r[BULK_CODE_COLUMN], len(order)))
+    return rows, {c: errors[c] for c in codes if c in errors}
+
+
+def _write_bulk_outputs(
+    codes: List[str],
+    label: str,
+    rows: List[Dict[str, Any]],
+    errors: Dict[str, BulkError],
+    output_dir: Path,
+) -> Tuple[Path, Optional[Path]]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = uuid.uuid4().hex[:8]
+    desc_path = output_dir / f"Wind_FinData_bulk_{suffix}_description.txt"
+    data_path: Optional[Path] = None
+
+    lines = [
+        "万得 Wind 批量数据查询结果",
+        "=" * 40,
+        f"查询内容: {label}",
+        f"描述文件: {desc_path}",
+        f"代码数: {len(codes)}（成功 {len(codes) - len(errors)}，失败 {len(errors)}）",
+        f"行数: {len(rows)}",
+        "",
+        "数据来源于万得 Wind 金融数据服务",
+    ]
+
+    if rows or errors:
+        try:
+            import pandas as pd
+
+            data_path = output_dir / f"Wind_FinData_bulk_{suffix}.xlsx"
+            with pd.ExcelWriter(data_path) as writer:
+                pd.DataFrame(rows or [{BULK_CODE_COLUMN: None}]).to_excel(writer, index=False, sheet_name="数据")
+                if errors:
+                    pd.DataFrame(
+                        [{BULK_CODE_COLUMN: c, "错误码": e[0], "说明": e[1]} for c, e in errors.items()]
+                    ).to_excel(writer, index=False, sheet_name="错误")
+            lines.insert(4, f"数据文件: {data_path}")
+        except Exception as exc:
+            data_path = None
+            lines.append(f"\n(未能导出 Excel: {exc})")
+
+    if errors:
+        lines += ["", "--- 失败代码 ---", ""]
+        lines += [f"{c}: [{e[0]}] {e[1]}" for c, e in errors.items()]
+
+    desc_path.write_text("\n".join(lines), encoding="utf-8")
+    return desc_path, data_path
+
+
+def run_bulk_query(codes: List[str], output_dir: Optional[Path] = None, **kwargs: Any) -> None:
+    rows, errors = run_bulk(codes, **kwargs)
+    if errors and not rows:
+        first = next(iter(errors.values()))
+        raise RuntimeError(f"[{first[0]}] {first[1]}（{len(errors)} 个代码全部失败）")
+
+    tool = kwargs.get("tool", "price_indicators")
+    label = f"{tool} × {len(codes)} 个代码"
+    if kwargs.get("indexes"):
+        label += f"；指标: {kwargs['indexes']}"
+    desc_path, data_path = _write_bulk_outputs(codes, label, rows, errors, output_dir or _default_output_dir())
+
+    if data_path:
+        print(f"文件: {data_path}")
+    print(f"描述: {desc_path}")
+    print(f"行数: {len(rows)}")
+    if errors:
+        print(f"失败代码: {', '.join(errors)}", file=sys.stderr)
+
+
 def main() -> None:
     if hasattr(sys.stdout, "reconfigure"):
         sys.stdout.reconfigure(encoding="utf-8")
@@ -259,15 +618,44 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="万得 Wind 自然语言查数")
     parser.add_argument("query", nargs="?", help="查询问句")
     parser.add_argument("--query", dest="query_opt", help="查询问句（显式参数）")
+    bulk = parser.add_argument_group("批量模式（指定 --codes 或 --codes-file 时启用）")
+    bulk.add_argument("--codes", help="Wind 代码列表，逗号分隔，如 600519.SH,000001.SZ")
+    bulk.add_argument("--codes-file", type=Path, help="代码列表文件（逗号 / 换行分隔）")
+    bulk.add_argument("--indexes", default="", help="行情指标，逗号分隔（见 references/indicators.md）")
+    bulk.add_argument("--tool", choices=sorted(BULK_TOOLS), default="price_indicators")
+    bulk.add_argument("--asset", choices=sorted(BULK_TOOLS["price_indicators"]), default="stock")
+    bulk.add_argument("--begin-date", default="", help="K 线起始日 YYYYMMDD")
+    bulk.add_argument("--end-date", default="", help="K 线结束日 YYYYMMDD")
+    bulk.add_argument("--chunk-size", type=int, default=None, help="每次请求的代码数")
+    bulk.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="并发请求数")
+    bulk.add_argument("--no-cache", action="store_true", help="K 线不读写本地缓存")
     args = parser.parse_args()
 
+    raw_codes = args.codes or ""
+    if args.codes_file:
+        raw_codes += "," + args.codes_file.read_text(encoding="utf-8")
+    codes = _parse_codes(raw_codes)
+
     query = (args.query_opt or args.query or "").strip()
-    if not query:
+    if not query and not codes:
         parser.print_help(sys.stderr)
         sys.exit(1)
 
     try:
-        run_query(query)
+        if codes:
+            run_bulk_query(
+                codes,
+                indexes=args.indexes,
+                tool=args.tool,
+                asset=args.asset,
+                begin_date=args.begin_date,
+                end_date=args.end_date,
+                chunk_size=args.chunk_size,
+                concurrency=args.concurrency,
+                use_cache=not args.no_cache,
+            )
+        else:
+            run_query(query)
     except Exception as exc:
         print(f"错误: {exc}", file=sys.stderr)
         sys.exit(2)
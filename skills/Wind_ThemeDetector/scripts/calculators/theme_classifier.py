@@ -22,6 +22,7 @@ themes_config format:
 """
 
 from collections import Counter
+from typing import Optional
 
 
 def classify_themes(
@@ -232,13 +233,24 @@ def _industry_overlap_ratio(theme_a: dict, theme_b: dict) -> float:
     return len(intersection) / smaller if smaller > 0 else 0.0
 
 
-def enrich_vertical_themes(themes: list[dict]) -> None:
+def enrich_vertical_themes(
+    themes: list[dict],
+    sector_etfs: Optional[dict[str, list[str]]] = None,
+    sector_stocks: Optional[dict[str, list[str]]] = None,
+) -> None:
     """Add ETFs and stocks to vertical themes from overlapping seeds or sector mapping.
 
     Mutates vertical themes in place:
     1. If a seed theme shares >= 50% industry overlap, inherit its ETFs/stocks.
-    2. Otherwise, assign sector ETF from SECTOR_ETFS mapping.
+    2. Otherwise, assign sector ETF from sector_etfs (default: SECTOR_ETFS).
+
+    sector_stocks defaults to SECTOR_REPRESENTATIVE_STOCKS; non-US universes
+    pass their own mappings.
     """
+    if sector_etfs is None:
+        sector_etfs = SECTOR_ETFS
+    if sector_stocks is None:
+        sector_stocks = SECTOR_REPRESENTATIVE_STOCKS
     seed_themes = [t for t in themes if t.get("theme_origin") == "seed"]
 
     for theme in themes:
@@ -265,7 +277,7 @@ def enrich_vertical_themes(themes: list[dict]) -> None:
         sector_weights = theme.get("sector_weights", {})
         if sector_weights:
             primary_sector = max(sector_weights, key=sector_weights.get)
-            etfs = SECTOR_ETFS.get(primary_sector, [])
+            etfs = sector_etfs.get(primary_sector, [])
             if etfs:
                 theme["proxy_etfs"] = list(etfs)
         else:
@@ -277,7 +289,7 @@ def enrich_vertical_themes(themes: list[dict]) -> None:
             ]
             if sectors:
                 primary = max(set(sectors), key=sectors.count)
-                etfs = SECTOR_ETFS.get(primary, [])
+                etfs = sector_etfs.get(primary, [])
                 if etfs:
                     theme["proxy_etfs"] = list(etfs)
 
@@ -300,7 +312,7 @@ def enrich_vertical_themes(themes: list[dict]) -> None:
             primary_sector = max(set(sectors), key=sectors.count) if sectors else None
 
         if primary_sector:
-            stocks = SECTOR_REPRESENTATIVE_STOCKS.get(primary_sector, [])
+            stocks = sector_stocks.get(primary_sector, [])
             if stocks:
                 theme["static_stocks"] = list(stocks)
 
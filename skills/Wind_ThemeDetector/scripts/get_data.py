@@ -2,6 +2,7 @@
 万得 Wind 主题检测（theme-detector）Aeolus 适配层。
 
 调用内嵌 theme_detector.py，将 Markdown 报告写入描述文件供前端展示。
+theme_detector 的 NDJSON 进度事件经 progress_events 逐行转发给后端。
 """
 
 from __future__ import annotations
@@ -14,6 +15,9 @@ import uuid
 from pathlib import Path
 from typing import Optional, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from progress_events import get_reporter, run_streaming
+
 SKILL_ROOT = Path(__file__).resolve().parent.parent
 DETECTOR_SCRIPT = SKILL_ROOT / "scripts" / "theme_detector.py"
 DEFAULT_TIMEOUT_SEC = int(os.environ.get("WIND_THEME_DETECTOR_TIMEOUT_SEC") or "1200")
@@ -39,17 +43,13 @@ def _run_detector(output_dir: Path) -> Tuple[int, str, str]:
     if fmp_key:
         cmd.extend(["--fmp-api-key", fmp_key])
 
-    proc = subprocess.run(
+    return run_streaming(
         cmd,
         cwd=str(SKILL_ROOT),
         env={**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONUTF8": "1"},
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        timeout=DEFAULT_TIMEOUT_SEC,
+        timeout_sec=DEFAULT_TIMEOUT_SEC,
+        reporter=get_reporter(source="Wind_ThemeDetector"),
     )
-    return proc.returncode, proc.stdout or "", proc.stderr or ""
 
 
 def _latest_report_paths(output_dir: Path) -> Tuple[Optional[Path], Optional[Path]]:
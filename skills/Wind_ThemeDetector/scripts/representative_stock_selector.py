@@ -7,8 +7,12 @@ Selects representative stocks for market themes using a fallback chain:
 2. FINVIZ Public screener (finvizfinance, free)
 3. FMP ETF Holdings (paid API)
 4. Static stocks (config fallback)
+
+Screen and holdings results can be persisted across runs through an optional
+StockScreenCache (see stock_screen_cache.py).
 """
 
+import copy
 import csv
 import io
 import logging
@@ -204,6 +208,7 @@ class RepresentativeStockSelector:
         rate_limit_sec: float = 1.0,
         max_per_industry: int = 4,
         min_cap: str = "small",
+        cache=None,  # Optional[StockScreenCache]
     ):
         self._finviz_elite_key = finviz_elite_key
         self._fmp_api_key = fmp_api_key
@@ -213,6 +218,7 @@ class RepresentativeStockSelector:
         self._min_cap = min_cap
         self._industry_cache: dict[tuple[str, bool], list[dict]] = {}
         self._etf_cache: dict[str, list[dict]] = {}
+        self._persistent_cache = cache
         self._last_request_time: float = 0.0
         self._source_states: dict[str, _SourceState] = {
             "elite": _SourceState(),
@@ -257,6 +263,13 @@ class RepresentativeStockSelector:
         else:
             return "circuit_broken"
 
+    @property
+    def cache_stats(self) -> dict[str, dict]:
+        """Persistent cache hit/miss counts per namespace ({} when no cache)."""
+        if self._persistent_cache is None:
+            return {}
+        return self._persistent_cache.stats()
+
     # -- Main entry point ----------------------------------------------------
 
     def select_stocks(self, theme: dict, max_stocks: int = 10) -> list[dict]:
@@ -276,8 +289,15 @@ class RepresentativeStockSelector:
                 candidates.extend(self._industry_cache[cache_key][: self._max_per_industry])
                 continue
 
-            stocks: list[dict] = []
             fetch_limit = max(max_stocks, self._max_per_industry * 2)
+            persistent_key = self._screen_cache_key(industry, is_bearish, fetch_limit)
+            cached = self._cache_get("screen", persistent_key)
+            if cached is not None:
+                self._industry_cache[cache_key] = cached
+                candidates.extend(cached[: self._max_per_industry])
+                continue
+
+            stocks: list[dict] = []
 
             # Elite attempt
             if (
@@ -298,6 +318,8 @@ class RepresentativeStockSelector:
             # Score and cache
             stocks = self._compute_composite_score(stocks, is_bearish)
             self._industry_cache[cache_key] = stocks
+            if stocks:
+                self._cache_put("screen", persistent_key, stocks)
             candidates.extend(stocks[: self._max_per_industry])
 
         # Priority 1.5: 2nd pass - fill from cache for single-industry themes
@@ -326,7 +348,12 @@ class RepresentativeStockSelector:
                 if etf in self._etf_cache:
                     candidates.extend(self._etf_cache[etf])
                     continue
-                holdings = self._fetch_etf_holdings(etf, limit=max_stocks)
+                persistent_key = f"{etf}|{max_stocks}"
+                holdings = self._cache_get("holdings", persistent_key)
+                if holdings is None:
+                    holdings = self._fetch_etf_holdings(etf, limit=max_stocks)
+                    if holdings:
+                        self._cache_put("holdings", persistent_key, holdings)
                 self._etf_cache[etf] = holdings
                 candidates.extend(holdings)
 
@@ -346,6 +373,29 @@ class RepresentativeStockSelector:
 
         return self._merge_and_rank(candidates, max_stocks)
 
+    # -- Persistent cache ----------------------------------------------------
+
+    def _screen_cache_key(self, industry: str, is_bearish: bool, fetch_limit: int) -> str:
+        """Key covering every input that shapes a screen result."""
+        direction = "bearish" if is_bearish else "bullish"
+        return f"{self._finviz_mode}|{self._min_cap}|{direction}|{fetch_limit}|{industry}"
+
+    def _cache_get(self, namespace: str, key: str) -> Optional[list[dict]]:
+        if self._persistent_cache is None:
+            return None
+        value = self._persistent_cache.get(namespace, key)
+        # Hand out copies so _merge_and_rank never mutates cached entries
+        return copy.deepcopy(value) if isinstance(value, list) else None
+
+    def _cache_put(self, namespace: str, key: str, stocks: list[dict]) -> None:
+        if self._persistent_cache is not None:
+            self._persistent_cache.put(namespace, key, copy.deepcopy(stocks))
+
+    def save_cache(self) -> None:
+        """Flush the persistent cache to disk (no-op without a cache)."""
+        if self._persistent_cache is not None:
+            self._persistent_cache.save()
+
     # -- Fetch methods -------------------------------------------------------
 
     def _fetch_finviz_elite(self, industry: str, limit: int, is_bearish: bool) -> list[dict]:
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Theme Detector - Persistent Stock Screen Cache
+
+Cross-run cache for RepresentativeStockSelector results. Industry screens
+(FINVIZ Elite/Public) and ETF holdings (FMP etf-holder) change slowly, so
+they are persisted to a JSON file with per-namespace TTLs:
+
+- "screen":   FINVIZ industry screens (default 1h)
+- "holdings": FMP ETF holdings (default 24h)
+
+Entries older than their namespace TTL are treated as misses and pruned on
+save. Hit/miss counters are tracked per namespace for status reporting.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTLS: dict[str, float] = {
+    "screen": 3600.0,
+    "holdings": 86400.0,
+}
+
+_CACHE_VERSION = 1
+
+
+class StockScreenCache:
+    """JSON-file backed cache with per-namespace TTLs.
+
+    Args:
+        path: Cache file path. None keeps the cache in memory only.
+        ttls: Overrides for DEFAULT_TTLS (seconds per namespace).
+    """
+
+    def __init__(self, path: Optional[str] = None, ttls: Optional[dict[str, float]] = None):
+        self._path = path
+        self._ttls: dict[str, float] = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: dict[str, dict[str, dict]] = {}
+        self._stats: dict[str, dict[str, int]] = {
+            ns: {"hits": 0, "misses": 0} for ns in self._ttls
+        }
+        self._dirty = False
+        self._load()
+
+    # -- Public API ----------------------------------------------------------
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return a fresh cached value or None (counted as hit/miss)."""
+        stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is None or self._is_expired(namespace, entry):
+            stats["misses"] += 1
+            return None
+        stats["hits"] += 1
+        return entry["value"]
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        """Store a value stamped with the current time."""
+        self._entries.setdefault(namespace, {})[key] = {
+            "fetched_at": time.time(),
+            "value": value,
+        }
+        self._dirty = True
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-namespace hits, misses and hit_rate (0.0-1.0 or None)."""
+        result: dict[str, dict[str, Any]] = {}
+        for ns, s in self._stats.items():
+            total = s["hits"] + s["misses"]
+            result[ns] = {
+                "hits": s["hits"],
+                "misses": s["misses"],
+                "hit_rate": round(s["hits"] / total, 4) if total else None,
+            }
+        return result
+
+    def save(self) -> None:
+        """Write fresh entries to disk atomically. No-op when unchanged or in-memory."""
+        if not self._path or not self._dirty:
+            return
+
+        payload = {"version": _CACHE_VERSION, "entries": {}}
+        for ns, entries in self._entries.items():
+            fresh = {k: e for k, e in entries.items() if not self._is_expired(ns, e)}
+            if fresh:
+                payload["entries"][ns] = fresh
+
+        tmp_path = f"{self._path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path)
+            self._dirty = False
+        except OSError:
+            logger.exception("Failed to write stock screen cache %s", self._path)
+
+    # -- Internals -----------------------------------------------------------
+
+    def _is_expired(self, namespace: str, entry: dict) -> bool:
+        ttl = self._ttls.get(namespace, 0.0)
+        fetched_at = entry.get("fetched_at") or 0.0
+        return time.time() - fetched_at > ttl
+
+    def _load(self) -> None:
+        """Load entries from disk. A missing or corrupt file starts empty."""
+        if not self._path or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable stock screen cache %s", self._path)
+            return
+
+        if not isinstance(payload, dict) or payload.get("version") != _CACHE_VERSION:
+            return
+        entries = payload.get("entries")
+        if isinstance(entries, dict):
+            self._entries = {
+                ns: dict(items) for ns, items in entries.items() if isinstance(items, dict)
+            }
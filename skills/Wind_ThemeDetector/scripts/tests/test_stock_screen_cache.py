@@ -0,0 +1,190 @@
+"""Tests for stock_screen_cache module and its RepresentativeStockSelector integration."""
+
+import json
+from unittest.mock import patch
+
+from representative_stock_selector import RepresentativeStockSelector
+from stock_screen_cache import DEFAULT_TTLS, StockScreenCache
+
+
+def _stock(symbol, industry="Gold", cap=10_000_000_000):
+    return {
+        "symbol": symbol,
+        "source": "finviz_public",
+        "market_cap": cap,
+        "change": 5.0,
+        "volume": 1_000_000,
+        "matched_industries": [industry],
+        "reasons": [f"Public screener: {industry}"],
+    }
+
+
+def _gold_theme():
+    return {
+        "direction": "bullish",
+        "matching_industries": [{"name": "Gold"}],
+        "proxy_etfs": [],
+        "static_stocks": [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# StockScreenCache
+# ---------------------------------------------------------------------------
+
+
+class TestStockScreenCache:
+    def test_default_ttls(self):
+        assert DEFAULT_TTLS["screen"] == 3600.0
+        assert DEFAULT_TTLS["holdings"] == 86400.0
+
+    def test_miss_then_hit(self):
+        cache = StockScreenCache()
+        assert cache.get("screen", "k") is None
+        cache.put("screen", "k", [1, 2])
+        assert cache.get("screen", "k") == [1, 2]
+        stats = cache.stats()["screen"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_hit_rate_none_without_lookups(self):
+        assert StockScreenCache().stats()["holdings"]["hit_rate"] is None
+
+    def test_expired_entry_is_miss(self):
+        cache = StockScreenCache(ttls={"screen": 10})
+        with patch("stock_screen_cache.time.time", return_value=1000.0):
+            cache.put("screen", "k", ["x"])
+        with patch("stock_screen_cache.time.time", return_value=1011.0):
+            assert cache.get("screen", "k") is None
+
+    def test_ttls_are_per_namespace(self):
+        cache = StockScreenCache(ttls={"screen": 10, "holdings": 100})
+        with patch("stock_screen_cache.time.time", return_value=1000.0):
+            cache.put("screen", "k", ["s"])
+            cache.put("holdings", "k", ["h"])
+        with patch("stock_screen_cache.time.time", return_value=1050.0):
+            assert cache.get("screen", "k") is None
+            assert cache.get("holdings", "k") == ["h"]
+
+    def test_survives_restart(self, tmp_path):
+        path = str(tmp_path / "sub" / "cache.json")
+        cache = StockScreenCache(path)
+        cache.put("holdings", "SMH|10", [{"symbol": "NVDA"}])
+        cache.save()
+
+        reloaded = StockScreenCache(path)
+        assert reloaded.get("holdings", "SMH|10") == [{"symbol": "NVDA"}]
+
+    def test_save_prunes_expired(self, tmp_path):
+        path = str(tmp_path / "cache.json")
+        cache = StockScreenCache(path, ttls={"screen": 10})
+        with patch("stock_screen_cache.time.time", return_value=1000.0):
+            cache.put("screen", "old", ["x"])
+        with patch("stock_screen_cache.time.time", return_value=1005.0):
+            cache.put("screen", "new", ["y"])
+        with patch("stock_screen_cache.time.time", return_value=1012.0):
+            cache.save()
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        assert list(payload["entries"]["screen"]) == ["new"]
+
+    def test_corrupt_file_starts_empty(self, tmp_path):
+        path = tmp_path / "cache.json"
+        path.write_text("{not json", encoding="utf-8")
+        cache = StockScreenCache(str(path))
+        assert cache.get("screen", "k") is None
+
+    def test_save_without_path_is_noop(self):
+        cache = StockScreenCache()
+        cache.put("screen", "k", ["x"])
+        cache.save()  # must not raise
+
+
+# ---------------------------------------------------------------------------
+# Selector integration
+# ---------------------------------------------------------------------------
+
+
+class TestSelectorPersistentCache:
+    def test_warm_run_serves_fully_from_cache(self, tmp_path):
+        path = str(tmp_path / "cache.json")
+
+        cold = RepresentativeStockSelector(cache=StockScreenCache(path))
+        with (
+            patch.object(
+                cold, "_fetch_finviz_public", return_value=[_stock("NEM"), _stock("GOLD")]
+            ) as fetch,
+            patch.object(cold, "_rate_limit"),
+        ):
+            cold_result = cold.select_stocks(_gold_theme(), max_stocks=5)
+        assert fetch.call_count == 1
+        cold.save_cache()
+
+        warm = RepresentativeStockSelector(cache=StockScreenCache(path))
+        with patch.object(warm, "_fetch_finviz_public") as fetch:
+            warm_result = warm.select_stocks(_gold_theme(), max_stocks=5)
+        fetch.assert_not_called()
+        assert warm.query_count == 0
+        assert [s["symbol"] for s in warm_result] == [s["symbol"] for s in cold_result]
+        assert warm.cache_stats["screen"]["hit_rate"] == 1.0
+
+    def test_empty_screen_not_persisted(self):
+        cache = StockScreenCache()
+        sel = RepresentativeStockSelector(cache=cache)
+        with (
+            patch.object(sel, "_fetch_finviz_public", return_value=[]),
+            patch.object(sel, "_rate_limit"),
+        ):
+            sel.select_stocks(_gold_theme(), max_stocks=5)
+        assert sel._screen_cache_key("Gold", False, 8) not in cache._entries.get("screen", {})
+
+    def test_cache_key_includes_direction(self):
+        sel = RepresentativeStockSelector()
+        assert sel._screen_cache_key("Gold", True, 10) != sel._screen_cache_key("Gold", False, 10)
+
+    def test_etf_holdings_cached(self):
+        cache = StockScreenCache()
+        holdings = [dict(_stock("NVDA"), source="etf_holdings", matched_industries=[])]
+        theme = {
+            "direction": "bullish",
+            "matching_industries": [],
+            "proxy_etfs": ["SMH"],
+            "static_stocks": [],
+        }
+
+        first = RepresentativeStockSelector(fmp_api_key="key", cache=cache)
+        with patch.object(first, "_fetch_etf_holdings", return_value=holdings) as fetch:
+            first.select_stocks(theme, max_stocks=5)
+        assert fetch.call_count == 1
+
+        second = RepresentativeStockSelector(fmp_api_key="key", cache=cache)
+        with patch.object(second, "_fetch_etf_holdings") as fetch:
+            result = second.select_stocks(theme, max_stocks=5)
+        fetch.assert_not_called()
+        assert [s["symbol"] for s in result] == ["NVDA"]
+        assert cache.stats()["holdings"]["hits"] == 1
+
+    def test_cached_entries_not_mutated_by_merge(self):
+        cache = StockScreenCache()
+        sel = RepresentativeStockSelector(cache=cache)
+        theme = {
+            "direction": "bullish",
+            "matching_industries": [{"name": "Gold"}, {"name": "Silver"}],
+            "proxy_etfs": [],
+            "static_stocks": [],
+        }
+        with (
+            patch.object(
+                sel,
+                "_fetch_finviz_public",
+                side_effect=lambda industry, limit, is_bearish: [_stock("DUAL", industry)],
+            ),
+            patch.object(sel, "_rate_limit"),
+        ):
+            sel.select_stocks(theme, max_stocks=5)
+        cached = cache.get("screen", sel._screen_cache_key("Gold", False, 8))
+        assert cached[0]["reasons"] == ["Public screener: Gold"]
+
+    def test_cache_stats_empty_without_cache(self):
+        assert RepresentativeStockSelector().cache_stats == {}
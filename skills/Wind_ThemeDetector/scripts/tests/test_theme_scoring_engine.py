@@ -0,0 +1,161 @@
+"""Tests for theme_scoring_engine (vectorized batch scoring)."""
+
+import random
+from unittest.mock import patch
+
+import pytest
+import theme_scoring_engine
+from calculators.lifecycle_calculator import (
+    extremity_clustering_score,
+    price_extreme_saturation_score,
+    valuation_premium_score,
+)
+from theme_scoring_engine import build_scoring_context, score_themes
+
+SECTORS = ["Technology", "Energy", "Healthcare", "Financial"]
+
+
+def _maybe(rng, value, p_none=0.2):
+    return None if rng.random() < p_none else value
+
+
+def _make_inputs(n_themes=40, n_symbols=120, n_etfs=15, seed=7):
+    """Random themes/metrics covering None values, duplicates and missing symbols."""
+    rng = random.Random(seed)
+    symbols = [f"S{i}" for i in range(n_symbols)]
+    stock_metrics_map = {}
+    for s in symbols[: n_symbols - 10]:  # last 10 symbols have no metrics
+        m = {
+            "symbol": s,
+            "dist_from_52w_high": _maybe(rng, round(rng.uniform(0, 0.3), 4)),
+            "dist_from_52w_low": _maybe(rng, round(rng.uniform(0, 0.3), 4)),
+            "pe_ratio": _maybe(rng, round(rng.uniform(-10, 80), 2)),
+        }
+        if rng.random() < 0.9:
+            m["rsi_14"] = _maybe(rng, round(rng.uniform(10, 90), 2))
+        else:
+            m["rsi"] = _maybe(rng, round(rng.uniform(10, 90), 2))
+        stock_metrics_map[s] = m
+
+    etfs = [f"E{i}" for i in range(n_etfs)]
+    etf_volume_map = {
+        e: {
+            "vol_20d": _maybe(rng, rng.uniform(1e5, 5e6)),
+            "vol_60d": _maybe(rng, rng.uniform(1e5, 5e6)),
+        }
+        for e in etfs[:-3]
+    }
+
+    sector_uptrend = {
+        sec: {"ratio": rng.uniform(0, 0.5), "ma_10": rng.uniform(0, 0.5), "slope": rng.uniform(-1, 1)}
+        for sec in SECTORS[:3]
+    }
+
+    themes, theme_stocks, theme_details = [], {}, {}
+    for i in range(n_themes):
+        direction = rng.choice(["bullish", "bearish"])
+        industries = [
+            {
+                "name": f"Ind{i}_{j}",
+                "weighted_return": rng.uniform(-30, 30),
+                "perf_1m": _maybe(rng, rng.uniform(-10, 10)),
+                "perf_3m": _maybe(rng, rng.uniform(-20, 20)),
+                "perf_6m": _maybe(rng, rng.uniform(-30, 30)),
+                "perf_1y": _maybe(rng, rng.uniform(-40, 40)),
+            }
+            for j in range(rng.randint(0, 6))
+        ]
+        themes.append(
+            {
+                "theme_name": f"Theme {i}",
+                "direction": direction,
+                "matching_industries": industries,
+                "proxy_etfs": rng.sample(etfs, rng.randint(0, 4)),
+                "sector_weights": {sec: rng.random() for sec in rng.sample(SECTORS, 2)},
+            }
+        )
+        stocks = [rng.choice(symbols) for _ in range(rng.randint(0, 12))]
+        theme_stocks[i] = stocks
+        theme_details[i] = [{"symbol": s, "source": "static"} for s in stocks]
+
+    etf_catalog = {f"Theme {i}": rng.randint(0, 15) for i in range(0, n_themes, 2)}
+    return themes, theme_stocks, theme_details, stock_metrics_map, etf_volume_map, sector_uptrend, etf_catalog
+
+
+def _score(inputs, **kwargs):
+    themes, stocks, details, metrics, etf_vol, uptrend, catalog = inputs
+    ctx = build_scoring_context(metrics, etf_vol, uptrend, catalog, False, "FINVIZ-Public")
+    return score_themes(themes, stocks, details, ctx, **kwargs)
+
+
+class TestIdenticalOutput:
+    def test_vectorized_matches_scalar(self):
+        inputs = _make_inputs()
+        vectorized = _score(inputs)
+        with patch.object(theme_scoring_engine, "np", None):
+            scalar = _score(inputs)
+        assert vectorized == scalar
+
+    @pytest.mark.parametrize("batch_size", [1, 3, 1000])
+    def test_batch_size_does_not_change_output(self, batch_size):
+        inputs = _make_inputs()
+        assert _score(inputs, batch_size=batch_size) == _score(inputs)
+
+    def test_process_pool_matches_in_process(self):
+        inputs = _make_inputs(n_themes=30)
+        assert _score(inputs, workers=2, batch_size=8) == _score(inputs)
+
+    def test_lifecycle_subscores_match_calculators(self):
+        inputs = _make_inputs()
+        themes, theme_stocks, _, metrics, *_ = inputs
+        scored = _score(inputs)
+        for idx, (theme, result) in enumerate(zip(themes, scored)):
+            is_bearish = theme["direction"] == "bearish"
+            sms = []
+            for s in theme_stocks[idx]:
+                if s in metrics:
+                    sm = dict(metrics[s])
+                    if "rsi_14" in sm:
+                        sm["rsi"] = sm["rsi_14"]
+                    sms.append(sm)
+            mb = result["maturity_breakdown"]
+            assert mb["extremity_clustering"] == round(
+                extremity_clustering_score(sms, is_bearish), 2
+            )
+            assert mb["price_extreme_saturation"] == round(
+                price_extreme_saturation_score(sms, is_bearish), 2
+            )
+            assert mb["valuation_premium"] == round(valuation_premium_score(sms), 2)
+            assert result["lifecycle_data_quality"] == ("sufficient" if sms else "insufficient")
+
+
+class TestScoreThemes:
+    def test_preserves_theme_order_and_passthrough(self):
+        inputs = _make_inputs(n_themes=5)
+        themes, theme_stocks, theme_details, *_ = inputs
+        scored = _score(inputs)
+        assert [t["name"] for t in scored] == [t["theme_name"] for t in themes]
+        for idx, t in enumerate(scored):
+            assert t["representative_stocks"] == theme_stocks[idx]
+            assert t["stock_details"] == theme_details[idx]
+
+    def test_empty_themes(self):
+        ctx = build_scoring_context({}, {}, {}, {}, False, "FINVIZ-Public")
+        assert score_themes([], {}, {}, ctx) == []
+
+    def test_theme_without_stocks_defaults_to_50(self):
+        ctx = build_scoring_context({}, {}, {}, {}, False, "FINVIZ-Public")
+        theme = {"theme_name": "T", "direction": "bullish", "matching_industries": []}
+        (result,) = score_themes([theme], {}, {}, ctx)
+        assert result["maturity_breakdown"]["extremity_clustering"] == 50.0
+        assert result["maturity_breakdown"]["valuation_premium"] == 50.0
+        assert result["heat_breakdown"]["volume_intensity"] == 50.0
+        assert result["stock_data"] == "unavailable"
+
+    def test_valuation_even_count_median(self):
+        metrics = {s: {"pe_ratio": pe} for s, pe in zip("ABCD", [11.0, 22.0, 44.0, 66.0])}
+        ctx = build_scoring_context(metrics, {}, {}, {}, False, "FINVIZ-Public")
+        theme = {"theme_name": "T", "direction": "bullish", "matching_industries": []}
+        (result,) = score_themes([theme], {0: list("ABCD")}, {}, ctx)
+        # median 33 -> premium 1.5 -> (1.5 - 0.5) * 32 = 32
+        assert result["maturity_breakdown"]["valuation_premium"] == 32.0
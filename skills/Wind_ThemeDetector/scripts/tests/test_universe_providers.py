@@ -0,0 +1,235 @@
+"""Tests for universe_providers (market universe abstraction, A-share via Tushare)."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from universe_providers import (
+    ASHARE_INDUSTRY_TO_SECTOR,
+    FinvizUniverseProvider,
+    TushareAShareUniverseProvider,
+    compute_industry_performance,
+    compute_sector_uptrend,
+    get_universe_provider,
+)
+
+
+class FakePro:
+    """Minimal Tushare pro client serving a synthetic market."""
+
+    def __init__(self, dates, codes, industries, pct_by_code):
+        self.dates = dates
+        self.codes = codes
+        self.industries = industries
+        self.pct_by_code = pct_by_code
+        self.calls = []
+
+    def trade_cal(self, **kwargs):
+        self.calls.append(("trade_cal", kwargs))
+        return pd.DataFrame({"cal_date": self.dates})
+
+    def stock_basic(self, **kwargs):
+        self.calls.append(("stock_basic", kwargs))
+        return pd.DataFrame(
+            {"ts_code": self.codes, "name": self.codes, "industry": self.industries}
+        )
+
+    def daily(self, trade_date, **kwargs):
+        self.calls.append(("daily", trade_date))
+        i = self.dates.index(trade_date)
+        return pd.DataFrame(
+            {
+                "ts_code": self.codes,
+                "trade_date": trade_date,
+                "pct_chg": [self.pct_by_code[c][i] for c in self.codes],
+            }
+        )
+
+    def daily_basic(self, trade_date, **kwargs):
+        self.calls.append(("daily_basic", trade_date))
+        return pd.DataFrame({"ts_code": self.codes, "circ_mv": [1.0] * len(self.codes)})
+
+
+def _fake_market(n_dates=80):
+    end = pd.Timestamp.now().normalize()
+    dates = list(pd.bdate_range(end=end, periods=n_dates).strftime("%Y%m%d"))
+    codes = ["600001.SH", "600002.SH", "000001.SZ", "000002.SZ"]
+    industries = ["半导体", "半导体", "银行", "银行"]
+    pct = {
+        "600001.SH": [1.0] * n_dates,
+        "600002.SH": [1.0] * n_dates,
+        "000001.SZ": [-0.5] * n_dates,
+        "000002.SZ": [-0.5] * n_dates,
+    }
+    return FakePro(dates, codes, industries, pct)
+
+
+# ---------------------------------------------------------------------------
+# Pure computations
+# ---------------------------------------------------------------------------
+
+
+class TestComputeIndustryPerformance:
+    def test_compound_returns_in_percent(self):
+        pct = np.full((10, 2), 1.0)
+        dates = [f"202501{d:02d}" for d in range(1, 11)]
+        result = compute_industry_performance(
+            pct, dates, np.array(["半导体", "半导体"], dtype=object)
+        )
+        (row,) = result
+        assert row["name"] == "半导体"
+        assert row["sector"] == "Technology"
+        assert row["stock_count"] == 2
+        assert row["perf_1w"] == pytest.approx((1.01**5 - 1) * 100, abs=1e-4)
+        # Windows longer than the panel are unavailable
+        assert row["perf_1m"] is None
+
+    def test_market_cap_weighting(self):
+        pct = np.array([[10.0, 0.0]] * 6)
+        dates = [f"202501{d:02d}" for d in range(1, 7)]
+        inds = np.array(["银行", "银行"], dtype=object)
+        (row,) = compute_industry_performance(pct, dates, inds, np.array([3.0, 1.0]))
+        assert row["perf_1w"] == pytest.approx(0.75 * (1.1**5 - 1) * 100, abs=1e-4)
+
+    def test_new_listing_excluded_from_window(self):
+        pct = np.full((6, 2), 1.0)
+        pct[:3, 1] = np.nan  # listed 3 days ago, first-day jump excluded
+        pct[3, 1] = 44.0
+        dates = [f"202501{d:02d}" for d in range(1, 7)]
+        (row,) = compute_industry_performance(pct, dates, np.array(["银行", "银行"], dtype=object))
+        assert row["perf_1w"] == pytest.approx((1.01**5 - 1) * 100, abs=1e-4)
+
+    def test_ytd_uses_previous_year_close(self):
+        pct = np.full((4, 1), 1.0)
+        dates = ["20241230", "20241231", "20250102", "20250103"]
+        (row,) = compute_industry_performance(pct, dates, np.array(["银行"], dtype=object))
+        assert row["perf_ytd"] == pytest.approx((1.01**2 - 1) * 100, abs=1e-4)
+
+    def test_empty_panel(self):
+        assert compute_industry_performance(np.empty((0, 0)), [], np.array([], dtype=object)) == []
+
+
+class TestComputeSectorUptrend:
+    def test_rising_vs_falling_sector(self):
+        n = 80
+        pct = np.column_stack([np.full(n, 1.0), np.full(n, -1.0)])
+        dates = [f"2025{i:04d}" for i in range(n)]
+        result = compute_sector_uptrend(
+            pct, dates, np.array(["Technology", "Financial"], dtype=object)
+        )
+        assert result["Technology"]["ratio"] == 1.0
+        assert result["Financial"]["ratio"] == 0.0
+        assert set(result["Technology"]) == {"ratio", "ma_10", "slope", "trend", "latest_date"}
+
+    def test_insufficient_history(self):
+        pct = np.full((30, 1), 1.0)
+        assert compute_sector_uptrend(pct, ["x"] * 30, np.array(["Technology"], dtype=object)) == {}
+
+
+# ---------------------------------------------------------------------------
+# Providers
+# ---------------------------------------------------------------------------
+
+
+class TestTushareAShareUniverseProvider:
+    def test_industry_perf_and_uptrend(self, tmp_path):
+        pro = _fake_market()
+        provider = TushareAShareUniverseProvider(pro=pro, cache_dir=str(tmp_path), rate_limit_sec=0)
+        industries = {i["name"]: i for i in provider.get_industry_performance()}
+        assert industries["半导体"]["perf_1w"] > 0 > industries["银行"]["perf_1w"]
+        assert industries["银行"]["sector"] == "Financial"
+
+        uptrend = provider.get_sector_uptrend()
+        assert uptrend["Technology"]["ratio"] == 1.0
+        assert uptrend["Financial"]["ratio"] == 0.0
+
+    def test_daily_bars_fetched_once_per_date_and_cached(self, tmp_path):
+        pro = _fake_market()
+        first = TushareAShareUniverseProvider(pro=pro, cache_dir=str(tmp_path), rate_limit_sec=0)
+        first.get_industry_performance()
+        daily_calls = [c for c in pro.calls if c[0] == "daily"]
+        assert len(daily_calls) == len(pro.dates)
+        assert first.stats["fetched_dates"] == len(pro.dates)
+
+        pro.calls.clear()
+        second = TushareAShareUniverseProvider(pro=pro, cache_dir=str(tmp_path), rate_limit_sec=0)
+        second.get_industry_performance()
+        assert pro.calls == []
+        assert second.stats["cached_dates"] == len(pro.dates)
+
+    def test_unpublished_latest_date_skipped(self, tmp_path):
+        pro = _fake_market()
+        original = pro.daily
+
+        def daily(trade_date, **kwargs):
+            if trade_date == pro.dates[-1]:
+                return pd.DataFrame()
+            return original(trade_date, **kwargs)
+
+        pro.daily = daily
+        provider = TushareAShareUniverseProvider(pro=pro, cache_dir=str(tmp_path), rate_limit_sec=0)
+        provider.get_industry_performance()
+        assert provider._panel["dates"][-1] == pro.dates[-2]
+
+    def test_missing_token_raises(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("TUSHARE_TOKEN", raising=False)
+        with pytest.raises(RuntimeError, match="TUSHARE_TOKEN"):
+            TushareAShareUniverseProvider(cache_dir=str(tmp_path))
+
+    def test_api_errors_raise_runtime_error(self, tmp_path):
+        pro = _fake_market()
+
+        def stock_basic(**kwargs):
+            raise ConnectionError("quota exceeded")
+
+        pro.stock_basic = stock_basic
+        provider = TushareAShareUniverseProvider(pro=pro, cache_dir=str(tmp_path), rate_limit_sec=0)
+        with pytest.raises(RuntimeError, match="stock_basic.*quota exceeded"):
+            provider.get_industry_performance()
+
+    def test_empty_past_date_cached(self, tmp_path):
+        pro = _fake_market()
+        original = pro.daily
+        holiday = pro.dates[-10]
+
+        def daily(trade_date, **kwargs):
+            if trade_date == holiday:
+                pro.calls.append(("daily", trade_date))
+                return pd.DataFrame()
+            return original(trade_date, **kwargs)
+
+        pro.daily = daily
+        TushareAShareUniverseProvider(pro=pro, cache_dir=str(tmp_path), rate_limit_sec=0).get_industry_performance()
+        pro.calls.clear()
+        provider = TushareAShareUniverseProvider(pro=pro, cache_dir=str(tmp_path), rate_limit_sec=0)
+        provider.get_industry_performance()
+        assert ("daily", holiday) not in pro.calls
+        assert holiday in provider._panel["dates"]
+
+    def test_themes_config_keywords_are_tushare_industries(self):
+        from config_loader import load_themes_config
+
+        config, _ = load_themes_config(TushareAShareUniverseProvider.themes_config_path)
+        for theme in config["cross_sector"]:
+            for kw in theme["matching_keywords"]:
+                assert kw in ASHARE_INDUSTRY_TO_SECTOR
+
+
+class TestFinvizUniverseProvider:
+    def test_converts_to_percent_and_adds_sector(self):
+        raw = [{"name": "Semiconductors", "perf_1w": 0.05, "perf_1m": None}]
+        with patch("finviz_performance_client.get_industry_performance", return_value=raw):
+            (ind,) = FinvizUniverseProvider(
+                {"Semiconductors": "Technology"}
+            ).get_industry_performance()
+        assert ind["perf_1w"] == pytest.approx(5.0)
+        assert ind["perf_1m"] is None
+        assert ind["sector"] == "Technology"
+
+
+def test_get_universe_provider():
+    assert get_universe_provider("us", {}).market == "us"
+    with pytest.raises(ValueError):
+        get_universe_provider("jp", {})
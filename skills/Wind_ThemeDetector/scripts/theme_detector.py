@@ -20,36 +20,30 @@ import os
 import sys
 import time
 from datetime import datetime
-from typing import Optional
 
 # Ensure scripts directory is on the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from calculators.heat_calculator import (
-    breadth_signal_score,
-    calculate_theme_heat,
-    momentum_strength_score,
-    uptrend_signal_score,
-    volume_intensity_score,
-)
 from calculators.industry_ranker import get_top_bottom_industries, rank_industries
-from calculators.lifecycle_calculator import (
-    calculate_lifecycle_maturity,
-    classify_stage,
-    estimate_duration_score,
-    etf_proliferation_score,
-    extremity_clustering_score,
-    price_extreme_saturation_score,
-    valuation_premium_score,
-)
 from calculators.theme_classifier import classify_themes
 from report_generator import generate_json_report, generate_markdown_report, save_reports
-from scorer import (
-    calculate_confidence,
-    determine_data_mode,
-    score_theme,
+from scorer import determine_data_mode
+from theme_scoring_engine import (  # noqa: F401 (detect_divergence re-exported)
+    build_scoring_context,
+    detect_divergence,
+    score_themes,
 )
 
+# Optional NDJSON progress events shared by Aeolus skills (skills/_lib/progress_events.py);
+# silently disabled when the helper is not available.
+_LIB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "_lib")
+if os.path.isdir(_LIB_DIR) and _LIB_DIR not in sys.path:
+    sys.path.append(_LIB_DIR)
+try:
+    from progress_events import get_reporter
+except ImportError:
+    get_reporter = None
+
 # Heavy-dependency modules (pandas/numpy/yfinance/finvizfinance) are imported
 # lazily inside main() to allow lightweight helpers like _get_representative_stocks
 # to be imported without triggering sys.exit(1) when pandas is absent.
@@ -230,6 +224,19 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Detect trending market themes from FINVIZ industry data"
     )
+    parser.add_argument(
+        "--market",
+        choices=["us", "cn"],
+        default="us",
+        help="Industry universe: us = FINVIZ industries, cn = A-share industries via Tushare "
+        "(default: us)",
+    )
+    parser.add_argument(
+        "--tushare-cache-dir",
+        default=None,
+        help="Cache directory for Tushare daily bars (--market cn, "
+        "default: <data dir>/theme_detector/ashare)",
+    )
     parser.add_argument(
         "--fmp-api-key",
         default=os.environ.get("FMP_API_KEY"),
@@ -292,32 +299,57 @@ def parse_args() -> argparse.Namespace:
         default="small",
         help="Minimum market cap for dynamic stock selection (default: small=$300mln+)",
     )
+    parser.add_argument(
+        "--stock-cache-path",
+        default=os.environ.get("THEME_DETECTOR_STOCK_CACHE"),
+        help="Persistent cache file for dynamic stock screens "
+        "(env: THEME_DETECTOR_STOCK_CACHE, default: <data dir>/theme_detector/stock_screen_cache.json)",
+    )
+    parser.add_argument(
+        "--no-stock-cache",
+        action="store_true",
+        default=False,
+        help="Disable the persistent dynamic stock cache",
+    )
+    parser.add_argument(
+        "--screen-cache-ttl",
+        type=float,
+        default=3600.0,
+        help="TTL in seconds for cached FINVIZ industry screens (default: 3600)",
+    )
+    parser.add_argument(
+        "--holdings-cache-ttl",
+        type=float,
+        default=86400.0,
+        help="TTL in seconds for cached FMP ETF holdings (default: 86400)",
+    )
+    parser.add_argument(
+        "--scoring-workers",
+        type=int,
+        default=1,
+        help="Worker processes for theme scoring (default: 1 = in-process)",
+    )
     return parser.parse_args()
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
-def _add_sector_info(industries: list[dict]) -> list[dict]:
-    """Add sector field to each industry dict from INDUSTRY_TO_SECTOR mapping."""
-    for ind in industries:
-        name = ind.get("name", "")
-        ind["sector"] = INDUSTRY_TO_SECTOR.get(name, "Unknown")
-    return industries
-
+def _report_progress(progress, percent: float, stage: str, message: str) -> None:
+    """Emit an NDJSON progress event when the shared reporter is available."""
+    if progress is not None:
+        progress.progress(percent, message=message, stage=stage)
 
-def _convert_perf_to_pct(industries: list[dict]) -> list[dict]:
-    """Convert FINVIZ decimal performance values to percentage.
 
-    finvizfinance returns 0.05 for 5%. Our calculators expect 5.0.
-    """
-    perf_keys = ["perf_1w", "perf_1m", "perf_3m", "perf_6m", "perf_1y", "perf_ytd"]
-    for ind in industries:
-        for key in perf_keys:
-            val = ind.get(key)
-            if val is not None:
-                ind[key] = val * 100.0
-    return industries
+def _default_stock_cache_path() -> str:
+    """Default persistent stock cache location (AEOLUS_DATA_DIR or repo data/)."""
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    if not data_dir:
+        repo_root = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        )
+        data_dir = os.path.join(repo_root, "data")
+    return os.path.join(data_dir, "theme_detector", "stock_screen_cache.json")
 
 
 def _get_representative_stocks(
@@ -357,87 +389,6 @@ def _get_representative_stocks(
     return static, details
 
 
-def detect_divergence(heat_breakdown: dict, direction: str) -> dict | None:
-    """Detect divergence between price momentum and breadth signals."""
-    momentum = heat_breakdown.get("momentum_strength", 50)
-    uptrend = heat_breakdown.get("uptrend_signal", 50)
-    gap = momentum - uptrend
-    if abs(gap) < 25:
-        return None
-    if gap > 0:
-        return {
-            "type": "narrow_rally",
-            "gap": round(gap, 1),
-            "description": "Price momentum strong but breadth weak — concentrated/fragile move",
-        }
-    else:
-        desc = (
-            "Breadth improving ahead of price — potential reversal candidate"
-            if direction == "bearish"
-            else "Breadth improving ahead of price — potential acceleration candidate"
-        )
-        return {
-            "type": "internal_recovery",
-            "gap": round(abs(gap), 1),
-            "description": desc,
-        }
-
-
-def _calculate_breadth_ratio(theme: dict) -> Optional[float]:
-    """Estimate breadth ratio from theme's matching industries.
-
-    For bullish: ratio of industries with positive weighted_return.
-    For bearish: ratio of industries with negative weighted_return.
-    """
-    industries = theme.get("matching_industries", [])
-    if not industries:
-        return None
-
-    is_bearish = theme.get("direction") == "bearish"
-    if is_bearish:
-        count = sum(1 for ind in industries if ind.get("weighted_return", 0) < 0)
-    else:
-        count = sum(1 for ind in industries if ind.get("weighted_return", 0) > 0)
-
-    return count / len(industries)
-
-
-def _get_theme_uptrend_data(theme: dict, sector_uptrend: dict) -> list[dict]:
-    """Build sector_data for uptrend_signal_score from theme's sector weights.
-
-    Maps theme sectors to uptrend data with weights.
-    """
-    sector_weights = theme.get("sector_weights", {})
-    if not sector_weights or not sector_uptrend:
-        return []
-
-    sector_data = []
-    for sector_name, weight in sector_weights.items():
-        uptrend_entry = sector_uptrend.get(sector_name)
-        if uptrend_entry and uptrend_entry.get("ratio") is not None:
-            sector_data.append(
-                {
-                    "sector": sector_name,
-                    "ratio": uptrend_entry["ratio"],
-                    "ma_10": uptrend_entry.get("ma_10") or 0,
-                    "slope": uptrend_entry.get("slope") or 0,
-                    "weight": weight,
-                }
-            )
-
-    return sector_data
-
-
-def _get_theme_weighted_return(theme: dict) -> float:
-    """Calculate aggregate weighted return for a theme from its industries."""
-    industries = theme.get("matching_industries", [])
-    if not industries:
-        return 0.0
-
-    returns = [ind.get("weighted_return", 0.0) for ind in industries]
-    return sum(returns) / len(returns)
-
-
 # ---------------------------------------------------------------------------
 # Main orchestrator
 # ---------------------------------------------------------------------------
@@ -447,15 +398,28 @@ def main():
     from calculators.theme_classifier import deduplicate_themes, enrich_vertical_themes
     from config_loader import load_themes_config
     from etf_scanner import ETFScanner
-    from finviz_performance_client import cap_outlier_performances, get_industry_performance
-    from uptrend_client import fetch_sector_uptrend_data, is_data_stale
+    from finviz_performance_client import cap_outlier_performances
+    from universe_providers import get_universe_provider
+    from uptrend_client import is_data_stale
 
     args = parse_args()
+    progress = get_reporter("theme_detector") if get_reporter else None
+
+    provider_kwargs = {}
+    if args.market == "cn":
+        provider_kwargs["cache_dir"] = args.tushare_cache_dir
+    try:
+        provider = get_universe_provider(args.market, INDUSTRY_TO_SECTOR, **provider_kwargs)
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
 
     # -----------------------------------------------------------------------
     # Step 0: Load theme configuration (YAML or inline fallback)
     # -----------------------------------------------------------------------
-    themes_config, etf_catalog = load_themes_config(args.themes_config)
+    themes_config, etf_catalog = load_themes_config(
+        args.themes_config or provider.themes_config_path
+    )
     start_time = time.time()
 
     # Determine data mode
@@ -466,6 +430,8 @@ def main():
     data_mode = determine_data_mode(fmp_available, finviz_mode == "elite")
 
     print("Theme Detector starting...", file=sys.stderr)
+    _report_progress(progress, 2, "config", "Theme Detector starting")
+    print(f"  Market: {args.market}", file=sys.stderr)
     print(f"  Data mode: {data_mode}", file=sys.stderr)
     print(f"  FINVIZ mode: {finviz_mode}", file=sys.stderr)
     print(f"  FMP API: {'available' if fmp_available else 'not available'}", file=sys.stderr)
@@ -474,6 +440,7 @@ def main():
 
     metadata = {
         "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "market": args.market,
         "data_mode": data_mode,
         "finviz_mode": finviz_mode,
         "fmp_available": fmp_available,
@@ -483,26 +450,30 @@ def main():
     }
 
     # -----------------------------------------------------------------------
-    # Step 1: Fetch FINVIZ industry performance
+    # Step 1: Fetch industry performance (percent values with sector info)
     # -----------------------------------------------------------------------
-    print("Fetching FINVIZ industry performance...", file=sys.stderr)
-    raw_industries = get_industry_performance()
+    print(f"Fetching industry performance ({provider.source_name})...", file=sys.stderr)
+    _report_progress(progress, 5, "industries", "Fetching industry performance")
+    try:
+        raw_industries = provider.get_industry_performance()
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
     if not raw_industries:
-        print("ERROR: No industry data from FINVIZ. Exiting.", file=sys.stderr)
+        print(f"ERROR: No industry data from {provider.source_name}. Exiting.", file=sys.stderr)
         sys.exit(1)
 
-    metadata["data_sources"]["finviz_industries"] = len(raw_industries)
+    metadata["data_sources"][provider.source_name] = len(raw_industries)
     print(f"  Got {len(raw_industries)} industries", file=sys.stderr)
 
-    # Convert decimal to percentage, filter outliers, and add sector info
-    industries = _convert_perf_to_pct(raw_industries)
-    industries = cap_outlier_performances(industries)
-    industries = _add_sector_info(industries)
+    # Filter outliers
+    industries = cap_outlier_performances(raw_industries)
 
     # -----------------------------------------------------------------------
     # Step 2: Rank industries by momentum
     # -----------------------------------------------------------------------
     print("Ranking industries by momentum...", file=sys.stderr)
+    _report_progress(progress, 20, "ranking", "Ranking industries by momentum")
     ranked = rank_industries(industries)
     industry_rankings = get_top_bottom_industries(ranked, n=15)
     print(
@@ -514,6 +485,7 @@ def main():
     # Step 3: Classify themes
     # -----------------------------------------------------------------------
     print("Classifying themes...", file=sys.stderr)
+    _report_progress(progress, 25, "classify", "Classifying themes")
     themes = classify_themes(ranked, themes_config)
     print(f"  Detected {len(themes)} themes (seed + vertical)", file=sys.stderr)
 
@@ -521,7 +493,7 @@ def main():
         print("WARNING: No themes detected. Generating empty report.", file=sys.stderr)
 
     # Step 3.3: Enrich vertical themes with ETFs + deduplicate
-    enrich_vertical_themes(themes)
+    enrich_vertical_themes(themes, provider.sector_etfs, provider.sector_stocks)
     themes = deduplicate_themes(themes)
     print(f"  After enrich/dedup: {len(themes)} themes", file=sys.stderr)
 
@@ -552,11 +524,26 @@ def main():
     # Step 4: Collect all stock symbols for batch download
     # -----------------------------------------------------------------------
     print("Selecting representative stocks...", file=sys.stderr)
+    _report_progress(progress, 35, "stocks", "Selecting representative stocks")
 
     # Create dynamic selector if requested
     selector = None
-    if args.dynamic_stocks:
+    if args.dynamic_stocks and not provider.supports_dynamic_stocks:
+        print(
+            f"  WARNING: --dynamic-stocks is not supported for --market {args.market}; "
+            "using static stocks",
+            file=sys.stderr,
+        )
+    elif args.dynamic_stocks:
         from representative_stock_selector import RepresentativeStockSelector
+        from stock_screen_cache import StockScreenCache
+
+        stock_cache = None
+        if not args.no_stock_cache:
+            stock_cache = StockScreenCache(
+                args.stock_cache_path or _default_stock_cache_path(),
+                ttls={"screen": args.screen_cache_ttl, "holdings": args.holdings_cache_ttl},
+            )
 
         selector = RepresentativeStockSelector(
             finviz_elite_key=args.finviz_api_key,
@@ -564,8 +551,11 @@ def main():
             finviz_mode=finviz_mode,
             rate_limit_sec=1.0,
             min_cap=args.dynamic_min_cap,
+            cache=stock_cache,
         )
         print("  Dynamic stock selection: ON", file=sys.stderr)
+        if stock_cache is not None:
+            print(f"  Dynamic stock cache: {stock_cache.path}", file=sys.stderr)
 
     # Use index-based keys to avoid collisions when multiple themes share
     # the same name (e.g. two "{Sector} Sector Concentration" themes for
@@ -586,6 +576,7 @@ def main():
     print(f"  Total unique stocks: {len(all_symbols_list)}", file=sys.stderr)
 
     if selector:
+        selector.save_cache()
         print(f"  Dynamic stock queries: {selector.query_count}", file=sys.stderr)
         print(f"  Dynamic stock failures: {selector.failure_count}", file=sys.stderr)
         print(f"  Dynamic stock status: {selector.status}", file=sys.stderr)
@@ -596,6 +587,14 @@ def main():
             name: {"disabled": s.disabled, "failures": s.total_failures}
             for name, s in selector.source_states.items()
         }
+        cache_stats = selector.cache_stats
+        if cache_stats:
+            metadata["data_sources"]["dynamic_stocks_cache"] = cache_stats
+            for ns, cs in cache_stats.items():
+                print(
+                    f"  Dynamic stock cache ({ns}): {cs['hits']} hits, {cs['misses']} misses",
+                    file=sys.stderr,
+                )
 
     # -----------------------------------------------------------------------
     # Step 5: Batch fetch stock metrics (yfinance)
@@ -605,6 +604,7 @@ def main():
 
     if all_symbols_list:
         print(f"Batch downloading {len(all_symbols_list)} stocks...", file=sys.stderr)
+        _report_progress(progress, 50, "stock_metrics", "Downloading stock metrics")
         all_metrics = scanner.batch_stock_metrics(all_symbols_list)
         for m in all_metrics:
             stock_metrics_map[m["symbol"]] = m
@@ -616,6 +616,7 @@ def main():
     # Step 6: Fetch ETF volume ratios for each theme's proxy ETFs
     # -----------------------------------------------------------------------
     print("Fetching ETF volume data...", file=sys.stderr)
+    _report_progress(progress, 65, "etf_volume", "Fetching ETF volume data")
     etf_volume_map: dict[str, dict] = {}
     all_etfs = set()
     for theme in themes:
@@ -650,7 +651,12 @@ def main():
     # Step 7: Fetch uptrend-dashboard data
     # -----------------------------------------------------------------------
     print("Fetching uptrend ratio data...", file=sys.stderr)
-    sector_uptrend = fetch_sector_uptrend_data()
+    _report_progress(progress, 75, "uptrend", "Fetching uptrend ratio data")
+    try:
+        sector_uptrend = provider.get_sector_uptrend()
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
     stale_data = False
 
     if sector_uptrend:
@@ -666,152 +672,30 @@ def main():
         print("  WARNING: Uptrend data unavailable", file=sys.stderr)
         metadata["data_sources"]["uptrend_error"] = "fetch failed"
 
+    provider_stats = getattr(provider, "stats", None)
+    if provider_stats:
+        metadata["data_sources"]["tushare_cache"] = dict(provider_stats)
+
     # -----------------------------------------------------------------------
     # Step 8: Score each theme
     # -----------------------------------------------------------------------
     print("Scoring themes...", file=sys.stderr)
-    scored_themes = []
-
-    for idx, theme in enumerate(themes):
-        theme_name = theme["theme_name"]
-        direction = theme["direction"]
-        is_bearish = direction == "bearish"
-        stocks = theme_stocks.get(idx, [])
-
-        # --- Theme Heat ---
-        # Momentum: average weighted_return of matching industries
-        theme_wr = _get_theme_weighted_return(theme)
-        momentum = momentum_strength_score(theme_wr)
-
-        # Volume: average ETF volume ratio
-        etf_vol_ratios = []
-        for etf_sym in theme.get("proxy_etfs", []):
-            vol = etf_volume_map.get(etf_sym, {})
-            if vol.get("vol_20d") is not None and vol.get("vol_60d") is not None:
-                etf_vol_ratios.append((vol["vol_20d"], vol["vol_60d"]))
-
-        if etf_vol_ratios:
-            avg_20d = sum(r[0] for r in etf_vol_ratios) / len(etf_vol_ratios)
-            avg_60d = sum(r[1] for r in etf_vol_ratios) / len(etf_vol_ratios)
-            volume = volume_intensity_score(avg_20d, avg_60d)
-        else:
-            volume = None  # defaults to 50
-
-        # Uptrend signal
-        sector_data = _get_theme_uptrend_data(theme, sector_uptrend)
-        if sector_data:
-            uptrend = uptrend_signal_score(sector_data, is_bearish)
-        else:
-            uptrend = None  # defaults to 50
-
-        # Breadth signal
-        breadth_ratio = _calculate_breadth_ratio(theme)
-        n_industries = len(theme.get("matching_industries", []))
-        breadth = breadth_signal_score(breadth_ratio, industry_count=n_industries)
-
-        heat = calculate_theme_heat(momentum, volume, uptrend, breadth)
-
-        heat_breakdown = {
-            "momentum_strength": round(momentum, 2),
-            "volume_intensity": round(volume, 2) if volume is not None else 50.0,
-            "uptrend_signal": round(uptrend, 2) if uptrend is not None else 50.0,
-            "breadth_signal": round(breadth, 2),
-        }
-
-        # --- Divergence detection ---
-        divergence = detect_divergence(heat_breakdown, direction)
-
-        # --- Lifecycle Maturity ---
-        # Get stock-level metrics for this theme
-        theme_stock_metrics = [stock_metrics_map[s] for s in stocks if s in stock_metrics_map]
-
-        # Remap keys: rsi_14 -> rsi (lifecycle_calculator expects "rsi")
-        for sm in theme_stock_metrics:
-            if "rsi_14" in sm:
-                sm["rsi"] = sm["rsi_14"]
-
-        # Duration: from industry performance timeframes
-        avg_perfs = _average_industry_perfs(theme.get("matching_industries", []))
-        duration = estimate_duration_score(
-            avg_perfs.get("perf_1m"),
-            avg_perfs.get("perf_3m"),
-            avg_perfs.get("perf_6m"),
-            avg_perfs.get("perf_1y"),
-            is_bearish,
-        )
-
-        # Extremity clustering
-        extremity = extremity_clustering_score(theme_stock_metrics, is_bearish)
-
-        # Price extreme saturation
-        price_extreme = price_extreme_saturation_score(theme_stock_metrics, is_bearish)
-
-        # Valuation premium
-        valuation = valuation_premium_score(theme_stock_metrics)
-
-        # ETF proliferation
-        etf_count = etf_catalog.get(theme_name, 0)
-        etf_prolif = etf_proliferation_score(etf_count)
-
-        maturity = calculate_lifecycle_maturity(
-            duration, extremity, price_extreme, valuation, etf_prolif
-        )
-        stage = classify_stage(maturity)
-
-        maturity_breakdown = {
-            "duration_estimate": round(duration, 2),
-            "extremity_clustering": round(extremity, 2),
-            "price_extreme_saturation": round(price_extreme, 2),
-            "valuation_premium": round(valuation, 2),
-            "etf_proliferation": round(etf_prolif, 2),
-        }
-
-        # --- Confidence ---
-        quant_confirmed = momentum > 50
-        breadth_confirmed = (uptrend is not None and uptrend > 55) if uptrend else False
-        narrative_confirmed = False  # Pending Claude WebSearch
-        confidence = calculate_confidence(
-            quant_confirmed, breadth_confirmed, narrative_confirmed, stale_data
-        )
-
-        # --- Score theme ---
-        score = score_theme(
-            round(heat, 2),
-            round(maturity, 2),
-            stage,
-            direction,
-            confidence,
-            data_mode,
-        )
-
-        # Lifecycle data quality flag
-        lifecycle_quality = "sufficient" if theme_stock_metrics else "insufficient"
-
-        # Build full theme result
-        scored_theme = {
-            "name": theme_name,
-            "direction": direction,
-            "heat": round(heat, 2),
-            "maturity": round(maturity, 2),
-            "stage": stage,
-            "confidence": confidence,
-            "heat_label": score["heat_label"],
-            "heat_breakdown": heat_breakdown,
-            "maturity_breakdown": maturity_breakdown,
-            "lifecycle_data_quality": lifecycle_quality,
-            "representative_stocks": stocks,
-            "stock_details": theme_stock_details.get(idx, []),
-            "proxy_etfs": theme.get("proxy_etfs", []),
-            "industries": [ind.get("name", "") for ind in theme.get("matching_industries", [])],
-            "sector_weights": theme.get("sector_weights", {}),
-            "stock_data": "available" if theme_stock_metrics else "unavailable",
-            "data_mode": data_mode,
-            "stale_data_penalty": stale_data,
-            "theme_origin": theme.get("theme_origin", "seed"),
-            "name_confidence": theme.get("name_confidence", "high"),
-            "divergence": divergence,
-        }
-        scored_themes.append(scored_theme)
+    _report_progress(progress, 85, "scoring", "Scoring themes")
+    scoring_context = build_scoring_context(
+        stock_metrics_map,
+        etf_volume_map,
+        sector_uptrend,
+        etf_catalog,
+        stale_data,
+        data_mode,
+    )
+    scored_themes = score_themes(
+        themes,
+        theme_stocks,
+        theme_stock_details,
+        scoring_context,
+        workers=args.scoring_workers,
+    )
 
     # Sort by heat descending
     scored_themes.sort(key=lambda t: t["heat"], reverse=True)
@@ -820,6 +704,7 @@ def main():
     # Step 9: Generate reports
     # -----------------------------------------------------------------------
     print("Generating reports...", file=sys.stderr)
+    _report_progress(progress, 95, "reports", "Generating reports")
 
     json_report = generate_json_report(scored_themes, industry_rankings, sector_uptrend, metadata)
     md_report = generate_markdown_report(json_report, top_n_detail=args.top)
@@ -840,23 +725,11 @@ def main():
     print(f"  JSON:     {paths['json']}", file=sys.stderr)
     print(f"  Markdown: {paths['markdown']}", file=sys.stderr)
     print(f"  Themes:   {len(scored_themes)}", file=sys.stderr)
+    _report_progress(progress, 100, "done", f"Detected {len(scored_themes)} themes")
 
     # Print JSON to stdout for programmatic consumption
     print(json.dumps(json_report, indent=2, default=str))
 
 
-def _average_industry_perfs(industries: list[dict]) -> dict:
-    """Average performance across theme's matching industries."""
-    if not industries:
-        return {}
-
-    perf_keys = ["perf_1m", "perf_3m", "perf_6m", "perf_1y"]
-    result = {}
-    for key in perf_keys:
-        vals = [ind.get(key) for ind in industries if ind.get(key) is not None]
-        result[key] = sum(vals) / len(vals) if vals else None
-    return result
-
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Theme Detector - Batch Scoring Engine
+
+Scores classified themes (Step 8 of theme_detector.main) in batches.
+
+Stock and ETF metrics are packed once into compact NumPy arrays indexed by
+symbol id (ThemeScoringContext). Per-theme stock lists then become id arrays,
+and the stock-derived lifecycle sub-scores (extremity clustering, price
+extreme saturation, valuation premium) and ETF volume averages are computed
+for a whole batch of themes with grouped NumPy reductions instead of
+per-theme dict scans.
+
+Batches can optionally be scored on a process pool; the read-only context is
+shipped to each worker once via the pool initializer.
+
+Output is identical to the serial per-theme loop. Without NumPy the engine
+falls back to the scalar calculators in calculators/lifecycle_calculator.py.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+from calculators.heat_calculator import (
+    breadth_signal_score,
+    calculate_theme_heat,
+    momentum_strength_score,
+    uptrend_signal_score,
+    volume_intensity_score,
+)
+from calculators.lifecycle_calculator import (
+    calculate_lifecycle_maturity,
+    classify_stage,
+    estimate_duration_score,
+    etf_proliferation_score,
+    extremity_clustering_score,
+    price_extreme_saturation_score,
+    valuation_premium_score,
+)
+from scorer import calculate_confidence, score_theme
+
+DEFAULT_BATCH_SIZE = 256
+
+
+# ---------------------------------------------------------------------------
+# Per-theme helpers (industry-level inputs)
+# ---------------------------------------------------------------------------
+
+
+def detect_divergence(heat_breakdown: dict, direction: str) -> dict | None:
+    """Detect divergence between price momentum and breadth signals."""
+    momentum = heat_breakdown.get("momentum_strength", 50)
+    uptrend = heat_breakdown.get("uptrend_signal", 50)
+    gap = momentum - uptrend
+    if abs(gap) < 25:
+        return None
+    if gap > 0:
+        return {
+            "type": "narrow_rally",
+            "gap": round(gap, 1),
+            "description": "Price momentum strong but breadth weak — concentrated/fragile move",
+        }
+    else:
+        desc = (
+            "Breadth improving ahead of price — potential reversal candidate"
+            if direction == "bearish"
+            else "Breadth improving ahead of price — potential acceleration candidate"
+        )
+        return {
+            "type": "internal_recovery",
+            "gap": round(abs(gap), 1),
+            "description": desc,
+        }
+
+
+def _calculate_breadth_ratio(theme: dict) -> Optional[float]:
+    """Estimate breadth ratio from theme's matching industries.
+
+    For bullish: ratio of industries with positive weighted_return.
+    For bearish: ratio of industries with negative weighted_return.
+    """
+    industries = theme.get("matching_industries", [])
+    if not industries:
+        return None
+
+    is_bearish = theme.get("direction") == "bearish"
+    if is_bearish:
+        count = sum(1 for ind in industries if ind.get("weighted_return", 0) < 0)
+    else:
+        count = sum(1 for ind in industries if ind.get("weighted_return", 0) > 0)
+
+    return count / len(industries)
+
+
+def _get_theme_uptrend_data(theme: dict, sector_uptrend: dict) -> list[dict]:
+    """Build sector_data for uptrend_signal_score from theme's sector weights.
+
+    Maps theme sectors to uptrend data with weights.
+    """
+    sector_weights = theme.get("sector_weights", {})
+    if not sector_weights or not sector_uptrend:
+        return []
+
+    sector_data = []
+    for sector_name, weight in sector_weights.items():
+        uptrend_entry = sector_uptrend.get(sector_name)
+        if uptrend_entry and uptrend_entry.get("ratio") is not None:
+            sector_data.append(
+                {
+                    "sector": sector_name,
+                    "ratio": uptrend_entry["ratio"],
+                    "ma_10": uptrend_entry.get("ma_10") or 0,
+                    "slope": uptrend_entry.get("slope") or 0,
+                    "weight": weight,
+                }
+            )
+
+    return sector_data
+
+
+def _get_theme_weighted_return(theme: dict) -> float:
+    """Calculate aggregate weighted return for a theme from its industries."""
+    industries = theme.get("matching_industries", [])
+    if not industries:
+        return 0.0
+
+    returns = [ind.get("weighted_return", 0.0) for ind in industries]
+    return sum(returns) / len(returns)
+
+
+def _average_industry_perfs(industries: list[dict]) -> dict:
+    """Average performance across theme's matching industries."""
+    if not industries:
+        return {}
+
+    perf_keys = ["perf_1m", "perf_3m", "perf_6m", "perf_1y"]
+    result = {}
+    for key in perf_keys:
+        vals = [ind.get(key) for ind in industries if ind.get(key) is not None]
+        result[key] = sum(vals) / len(vals) if vals else None
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Shared read-only context
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ThemeScoringContext:
+    """Read-only inputs shared by every theme in a scoring run.
+
+    Metric arrays are aligned with symbol_ids / etf_ids. Each value array has
+    a matching *_present mask so that None (absent) stays distinct from NaN.
+    """
+
+    stock_metrics_map: dict[str, dict]
+    etf_volume_map: dict[str, dict]
+    sector_uptrend: dict
+    etf_catalog: dict[str, int]
+    stale_data: bool
+    data_mode: str
+    symbol_ids: dict[str, int] = field(default_factory=dict)
+    etf_ids: dict[str, int] = field(default_factory=dict)
+    arrays: dict[str, Any] = field(default_factory=dict)
+
+
+def _metric_array(rows: list[dict], key: str, fallback_key: Optional[str] = None):
+    """Pack one metric into (values, present) arrays."""
+    values = np.zeros(len(rows), dtype=np.float64)
+    present = np.zeros(len(rows), dtype=bool)
+    for i, row in enumerate(rows):
+        if fallback_key is not None and fallback_key in row:
+            v = row[fallback_key]
+        else:
+            v = row.get(key)
+        if v is not None:
+            values[i] = v
+            present[i] = True
+    return values, present
+
+
+def build_scoring_context(
+    stock_metrics_map: dict[str, dict],
+    etf_volume_map: dict[str, dict],
+    sector_uptrend: dict,
+    etf_catalog: dict[str, int],
+    stale_data: bool,
+    data_mode: str,
+) -> ThemeScoringContext:
+    """Pack stock/ETF metrics into symbol-indexed arrays."""
+    ctx = ThemeScoringContext(
+        stock_metrics_map=stock_metrics_map,
+        etf_volume_map=etf_volume_map,
+        sector_uptrend=sector_uptrend or {},
+        etf_catalog=etf_catalog or {},
+        stale_data=stale_data,
+        data_mode=data_mode,
+    )
+    if np is None:
+        return ctx
+
+    symbols = list(stock_metrics_map)
+    rows = [stock_metrics_map[s] for s in symbols]
+    ctx.symbol_ids = {s: i for i, s in enumerate(symbols)}
+    # lifecycle_calculator reads "rsi"; the scanner emits "rsi_14"
+    ctx.arrays["rsi"], ctx.arrays["rsi_present"] = _metric_array(rows, "rsi", "rsi_14")
+    for key in ("dist_from_52w_high", "dist_from_52w_low", "pe_ratio"):
+        ctx.arrays[key], ctx.arrays[f"{key}_present"] = _metric_array(rows, key)
+
+    etfs = list(etf_volume_map)
+    etf_rows = [etf_volume_map[e] or {} for e in etfs]
+    ctx.etf_ids = {e: i for i, e in enumerate(etfs)}
+    ctx.arrays["vol_20d"], p20 = _metric_array(etf_rows, "vol_20d")
+    ctx.arrays["vol_60d"], p60 = _metric_array(etf_rows, "vol_60d")
+    ctx.arrays["vol_present"] = p20 & p60
+    return ctx
+
+
+# ---------------------------------------------------------------------------
+# Batch (vectorized) stock / ETF aggregates
+# ---------------------------------------------------------------------------
+
+
+def _grouped_ids(lists: list[list[str]], ids: dict[str, int]):
+    """Flatten per-theme symbol lists into (flat_ids, labels, counts)."""
+    id_lists = [[ids[s] for s in symbols if s in ids] for symbols in lists]
+    counts = np.fromiter((len(x) for x in id_lists), dtype=np.int64, count=len(id_lists))
+    flat = np.fromiter(chain.from_iterable(id_lists), dtype=np.int64, count=int(counts.sum()))
+    labels = np.repeat(np.arange(len(id_lists)), counts)
+    return flat, labels, counts
+
+
+def _saturation_scores(labels, valid, hit, n: int):
+    """min(100, hit/valid * 200) per group; 50.0 where a group has no valid rows."""
+    valid_n = np.bincount(labels, weights=valid, minlength=n)
+    hit_n = np.bincount(labels, weights=hit, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.minimum(100.0, hit_n / valid_n * 200.0)
+    return np.where(valid_n > 0, scores, 50.0)
+
+
+def _valuation_scores(labels, pe, valid, n: int):
+    """Median-P/E premium score per group (needs 3+ positive P/E values)."""
+    scores = np.full(n, 50.0)
+    vals = pe[valid]
+    labs = labels[valid]
+    if vals.size == 0:
+        return scores
+    order = np.lexsort((vals, labs))
+    vals = vals[order]
+    m = np.bincount(labs, minlength=n)
+    starts = np.cumsum(m) - m
+    eligible = np.nonzero(m >= 3)[0]
+    if eligible.size == 0:
+        return scores
+    em = m[eligible]
+    mid = starts[eligible] + em // 2
+    odd = em % 2 == 1
+    medians = np.where(odd, vals[mid], (vals[mid - 1] + vals[mid]) / 2)
+    premium = medians / 22.0
+    scores[eligible] = np.minimum(100.0, np.maximum(0.0, (premium - 0.5) * 32.0))
+    return scores
+
+
+def _batch_stock_scores(
+    ctx: ThemeScoringContext, stock_lists: list[list[str]], bearish_flags: list[bool]
+) -> list[tuple[float, float, float, bool]]:
+    """(extremity, price_extreme, valuation, has_metrics) for each theme."""
+    n = len(stock_lists)
+    if n == 0:
+        return []
+    a = ctx.arrays
+    flat, labels, counts = _grouped_ids(stock_lists, ctx.symbol_ids)
+    elem_bearish = np.asarray(bearish_flags, dtype=bool)[labels]
+
+    rsi = a["rsi"][flat]
+    rsi_valid = a["rsi_present"][flat]
+    rsi_hit = rsi_valid & np.where(elem_bearish, rsi < 30, rsi > 70)
+    extremity = _saturation_scores(labels, rsi_valid, rsi_hit, n)
+
+    dist = np.where(elem_bearish, a["dist_from_52w_low"][flat], a["dist_from_52w_high"][flat])
+    dist_valid = np.where(
+        elem_bearish,
+        a["dist_from_52w_low_present"][flat],
+        a["dist_from_52w_high_present"][flat],
+    )
+    price_extreme = _saturation_scores(labels, dist_valid, dist_valid & (dist <= 0.05), n)
+
+    pe = a["pe_ratio"][flat]
+    pe_valid = a["pe_ratio_present"][flat] & (pe > 0)
+    valuation = _valuation_scores(labels, pe, pe_valid, n)
+
+    return [
+        (float(extremity[i]), float(price_extreme[i]), float(valuation[i]), bool(counts[i]))
+        for i in range(n)
+    ]
+
+
+def _batch_etf_volumes(
+    ctx: ThemeScoringContext, etf_lists: list[list[str]]
+) -> list[Optional[tuple[float, float]]]:
+    """(avg_20d, avg_60d) over each theme's proxy ETFs, None if no usable ETF."""
+    n = len(etf_lists)
+    if n == 0:
+        return []
+    a = ctx.arrays
+    flat, labels, _ = _grouped_ids(etf_lists, ctx.etf_ids)
+    valid = a["vol_present"][flat]
+    sum_20 = np.bincount(labels, weights=np.where(valid, a["vol_20d"][flat], 0.0), minlength=n)
+    sum_60 = np.bincount(labels, weights=np.where(valid, a["vol_60d"][flat], 0.0), minlength=n)
+    count = np.bincount(labels, weights=valid, minlength=n)
+    return [
+        (float(sum_20[i] / count[i]), float(sum_60[i] / count[i])) if count[i] > 0 else None
+        for i in range(n)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Scalar fallback (no NumPy)
+# ---------------------------------------------------------------------------
+
+
+def _scalar_stock_scores(
+    ctx: ThemeScoringContext, stocks: list[str], is_bearish: bool
+) -> tuple[float, float, float, bool]:
+    metrics = []
+    for s in stocks:
+        sm = ctx.stock_metrics_map.get(s)
+        if sm is None:
+            continue
+        if "rsi_14" in sm:
+            sm = {**sm, "rsi": sm["rsi_14"]}
+        metrics.append(sm)
+    return (
+        extremity_clustering_score(metrics, is_bearish),
+        price_extreme_saturation_score(metrics, is_bearish),
+        valuation_premium_score(metrics),
+        bool(metrics),
+    )
+
+
+def _scalar_etf_volume(ctx: ThemeScoringContext, etfs: list[str]) -> Optional[tuple[float, float]]:
+    ratios = []
+    for etf_sym in etfs:
+        vol = ctx.etf_volume_map.get(etf_sym, {})
+        if vol.get("vol_20d") is not None and vol.get("vol_60d") is not None:
+            ratios.append((vol["vol_20d"], vol["vol_60d"]))
+    if not ratios:
+        return None
+    return (
+        sum(r[0] for r in ratios) / len(ratios),
+        sum(r[1] for r in ratios) / len(ratios),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Theme assembly
+# ---------------------------------------------------------------------------
+
+
+def _assemble_theme(
+    ctx: ThemeScoringContext,
+    theme: dict,
+    stocks: list[str],
+    stock_details: list[dict],
+    stock_scores: tuple[float, float, float, bool],
+    etf_volume: Optional[tuple[float, float]],
+) -> dict:
+    """Build one scored theme dict from precomputed stock/ETF aggregates."""
+    theme_name = theme["theme_name"]
+    direction = theme["direction"]
+    is_bearish = direction == "bearish"
+    data_mode = ctx.data_mode
+    stale_data = ctx.stale_data
+
+    # --- Theme Heat ---
+    momentum = momentum_strength_score(_get_theme_weighted_return(theme))
+    volume = volume_intensity_score(*etf_volume) if etf_volume is not None else None
+
+    sector_data = _get_theme_uptrend_data(theme, ctx.sector_uptrend)
+    uptrend = uptrend_signal_score(sector_data, is_bearish) if sector_data else None
+
+    breadth_ratio = _calculate_breadth_ratio(theme)
+    n_industries = len(theme.get("matching_industries", []))
+    breadth = breadth_signal_score(breadth_ratio, industry_count=n_industries)
+
+    heat = calculate_theme_heat(momentum, volume, uptrend, breadth)
+
+    heat_breakdown = {
+        "momentum_strength": round(momentum, 2),
+        "volume_intensity": round(volume, 2) if volume is not None else 50.0,
+        "uptrend_signal": round(uptrend, 2) if uptrend is not None else 50.0,
+        "breadth_signal": round(breadth, 2),
+    }
+
+    divergence = detect_divergence(heat_breakdown, direction)
+
+    # --- Lifecycle Maturity ---
+    extremity, price_extreme, valuation, has_metrics = stock_scores
+
+    avg_perfs = _average_industry_perfs(theme.get("matching_industries", []))
+    duration = estimate_duration_score(
+        avg_perfs.get("perf_1m"),
+        avg_perfs.get("perf_3m"),
+        avg_perfs.get("perf_6m"),
+        avg_perfs.get("perf_1y"),
+        is_bearish,
+    )
+
+    etf_prolif = etf_proliferation_score(ctx.etf_catalog.get(theme_name, 0))
+
+    maturity = calculate_lifecycle_maturity(
+        duration, extremity, price_extreme, valuation, etf_prolif
+    )
+    stage = classify_stage(maturity)
+
+    maturity_breakdown = {
+        "duration_estimate": round(duration, 2),
+        "extremity_clustering": round(extremity, 2),
+        "price_extreme_saturation": round(price_extreme, 2),
+        "valuation_premium": round(valuation, 2),
+        "etf_proliferation": round(etf_prolif, 2),
+    }
+
+    # --- Confidence ---
+    quant_confirmed = momentum > 50
+    breadth_confirmed = (uptrend is not None and uptrend > 55) if uptrend else False
+    narrative_confirmed = False  # Pending Claude WebSearch
+    confidence = calculate_confidence(
+        quant_confirmed, breadth_confirmed, narrative_confirmed, stale_data
+    )
+
+    score = score_theme(
+        round(heat, 2),
+        round(maturity, 2),
+        stage,
+        direction,
+        confidence,
+        data_mode,
+    )
+
+    return {
+        "name": theme_name,
+        "direction": direction,
+        "heat": round(heat, 2),
+        "maturity": round(maturity, 2),
+        "stage": stage,
+        "confidence": confidence,
+        "heat_label": score["heat_label"],
+        "heat_breakdown": heat_breakdown,
+        "maturity_breakdown": maturity_breakdown,
+        "lifecycle_data_quality": "sufficient" if has_metrics else "insufficient",
+        "representative_stocks": stocks,
+        "stock_details": stock_details,
+        "proxy_etfs": theme.get("proxy_etfs", []),
+        "industries": [ind.get("name", "") for ind in theme.get("matching_industries", [])],
+        "sector_weights": theme.get("sector_weights", {}),
+        "stock_data": "available" if has_metrics else "unavailable",
+        "data_mode": data_mode,
+        "stale_data_penalty": stale_data,
+        "theme_origin": theme.get("theme_origin", "seed"),
+        "name_confidence": theme.get("name_confidence", "high"),
+        "divergence": divergence,
+    }
+
+
+def score_theme_batch(
+    ctx: ThemeScoringContext,
+    themes: list[dict],
+    stock_lists: list[list[str]],
+    detail_lists: list[list[dict]],
+) -> list[dict]:
+    """Score a batch of themes; results are in input order."""
+    bearish_flags = [t["direction"] == "bearish" for t in themes]
+    etf_lists = [t.get("proxy_etfs", []) for t in themes]
+
+    if np is not None and ctx.arrays:
+        stock_scores = _batch_stock_scores(ctx, stock_lists, bearish_flags)
+        etf_volumes = _batch_etf_volumes(ctx, etf_lists)
+    else:
+        stock_scores = [
+            _scalar_stock_scores(ctx, stocks, bearish)
+            for stocks, bearish in zip(stock_lists, bearish_flags)
+        ]
+        etf_volumes = [_scalar_etf_volume(ctx, etfs) for etfs in etf_lists]
+
+    return [
+        _assemble_theme(ctx, theme, stocks, details, ss, ev)
+        for theme, stocks, details, ss, ev in zip(
+            themes, stock_lists, detail_lists, stock_scores, etf_volumes
+        )
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Process pool
+# ---------------------------------------------------------------------------
+
+_WORKER_CONTEXT: Optional[ThemeScoringContext] = None
+
+
+def _init_worker(ctx: ThemeScoringContext) -> None:
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = ctx
+
+
+def _score_batch_in_worker(
+    themes: list[dict], stock_lists: list[list[str]], detail_lists: list[list[dict]]
+) -> list[dict]:
+    return score_theme_batch(_WORKER_CONTEXT, themes, stock_lists, detail_lists)
+
+
+def score_themes(
+    themes: list[dict],
+    theme_stocks: dict[int, list[str]],
+    theme_stock_details: dict[int, list[dict]],
+    ctx: ThemeScoringContext,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> list[dict]:
+    """Score all themes in batches, optionally across a process pool.
+
+    Args:
+        themes: Classified themes (index-aligned with theme_stocks keys).
+        theme_stocks: {theme_index: [ticker, ...]}
+        theme_stock_details: {theme_index: [stock detail dict, ...]}
+        ctx: Context from build_scoring_context().
+        workers: Process count; <= 1 scores in-process.
+        batch_size: Themes per vectorized batch / pool task.
+
+    Returns:
+        Scored theme dicts in the same order as themes (unsorted).
+    """
+    batch_size = max(1, batch_size)
+    batches = []
+    for start in range(0, len(themes), batch_size):
+        idxs = range(start, min(start + batch_size, len(themes)))
+        batches.append(
+            (
+                [themes[i] for i in idxs],
+                [theme_stocks.get(i, []) for i in idxs],
+                [theme_stock_details.get(i, []) for i in idxs],
+            )
+        )
+
+    if workers <= 1 or len(batches) <= 1:
+        results: list[dict] = []
+        for batch in batches:
+            results.extend(score_theme_batch(ctx, *batch))
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(batches)),
+        initializer=_init_worker,
+        initargs=(ctx,),
+    ) as pool:
+        futures = [pool.submit(_score_batch_in_worker, *batch) for batch in batches]
+        results = []
+        for fut in futures:
+            results.extend(fut.result())
+    return results
@@ -0,0 +1,692 @@
+#!/usr/bin/env python3
+"""
+Theme Detector - Market Universe Providers
+
+A universe provider supplies the market-specific inputs of the pipeline:
+
+- get_industry_performance(): industry dicts in percent form
+  {name, sector, perf_1w, perf_1m, perf_3m, perf_6m, perf_1y, perf_ytd}
+  ready for cap_outlier_performances() -> rank_industries() -> classify_themes()
+- get_sector_uptrend(): sector uptrend dict in the fetch_sector_uptrend_data() format
+- themes_config_path / sector_etfs / sector_stocks: market defaults for theme
+  classification and vertical theme enrichment
+
+Providers:
+- FinvizUniverseProvider: US FINVIZ industries + Monty's uptrend dashboard
+- TushareAShareUniverseProvider: A-share industries from Tushare stock_basic,
+  performance and breadth computed from bulk-fetched, locally cached daily bars
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None  # type: ignore[assignment]
+    pd = None  # type: ignore[assignment]
+
+from calculators.theme_classifier import SECTOR_ETFS, SECTOR_REPRESENTATIVE_STOCKS
+
+PERF_KEYS = ["perf_1w", "perf_1m", "perf_3m", "perf_6m", "perf_1y", "perf_ytd"]
+
+
+class UniverseProvider:
+    """Base class for market universe providers."""
+
+    market: str = ""
+    source_name: str = ""
+    themes_config_path: Optional[str] = None
+    sector_etfs: dict[str, list[str]] = SECTOR_ETFS
+    sector_stocks: dict[str, list[str]] = SECTOR_REPRESENTATIVE_STOCKS
+    supports_dynamic_stocks: bool = False
+
+    def get_industry_performance(self) -> list[dict]:
+        """Return industry dicts with sector and perf_* values in percent."""
+        raise NotImplementedError
+
+    def get_sector_uptrend(self) -> dict[str, dict]:
+        """Return {sector: {ratio, ma_10, slope, trend, latest_date}}, {} if unavailable."""
+        return {}
+
+
+# ---------------------------------------------------------------------------
+# US: FINVIZ
+# ---------------------------------------------------------------------------
+
+
+class FinvizUniverseProvider(UniverseProvider):
+    """US industries from FINVIZ group performance."""
+
+    market = "us"
+    source_name = "finviz_industries"
+    supports_dynamic_stocks = True
+
+    def __init__(self, industry_to_sector: dict[str, str]):
+        self._industry_to_sector = industry_to_sector
+
+    def get_industry_performance(self) -> list[dict]:
+        from finviz_performance_client import get_industry_performance
+
+        industries = get_industry_performance()
+        # finvizfinance returns 0.05 for 5%; calculators expect 5.0
+        for ind in industries:
+            for key in PERF_KEYS:
+                val = ind.get(key)
+                if val is not None:
+                    ind[key] = val * 100.0
+            ind["sector"] = self._industry_to_sector.get(ind.get("name", ""), "Unknown")
+        return industries
+
+    def get_sector_uptrend(self) -> dict[str, dict]:
+        from uptrend_client import fetch_sector_uptrend_data
+
+        return fetch_sector_uptrend_data()
+
+
+# ---------------------------------------------------------------------------
+# A-share: Tushare
+# ---------------------------------------------------------------------------
+
+# Tushare stock_basic.industry -> sector (FINVIZ sector names, so sector_weights,
+# vertical themes and the report stay market-agnostic)
+ASHARE_INDUSTRY_TO_SECTOR: dict[str, str] = {
+    # Technology
+    "半导体": "Technology",
+    "元器件": "Technology",
+    "IT设备": "Technology",
+    "通信设备": "Technology",
+    "软件服务": "Technology",
+    "电器仪表": "Technology",
+    # Communication Services
+    "互联网": "Communication Services",
+    "电信运营": "Communication Services",
+    "影视音像": "Communication Services",
+    "出版业": "Communication Services",
+    "广告包装": "Communication Services",
+    # Healthcare
+    "化学制药": "Healthcare",
+    "生物制药": "Healthcare",
+    "中成药": "Healthcare",
+    "医药商业": "Healthcare",
+    "医疗保健": "Healthcare",
+    # Financial
+    "银行": "Financial",
+    "证券": "Financial",
+    "保险": "Financial",
+    "多元金融": "Financial",
+    # Real Estate
+    "全国地产": "Real Estate",
+    "区域地产": "Real Estate",
+    "房产服务": "Real Estate",
+    "园区开发": "Real Estate",
+    # Consumer Defensive
+    "白酒": "Consumer Defensive",
+    "啤酒": "Consumer Defensive",
+    "红黄酒": "Consumer Defensive",
+    "软饮料": "Consumer Defensive",
+    "乳制品": "Consumer Defensive",
+    "食品": "Consumer Defensive",
+    "农业综合": "Consumer Defensive",
+    "种植业": "Consumer Defensive",
+    "渔业": "Consumer Defensive",
+    "林业": "Consumer Defensive",
+    "饲料": "Consumer Defensive",
+    "日用化工": "Consumer Defensive",
+    "超市连锁": "Consumer Defensive",
+    # Consumer Cyclical
+    "家用电器": "Consumer Cyclical",
+    "家居用品": "Consumer Cyclical",
+    "纺织": "Consumer Cyclical",
+    "服饰": "Consumer Cyclical",
+    "汽车整车": "Consumer Cyclical",
+    "汽车配件": "Consumer Cyclical",
+    "汽车服务": "Consumer Cyclical",
+    "摩托车": "Consumer Cyclical",
+    "文教休闲": "Consumer Cyclical",
+    "旅游服务": "Consumer Cyclical",
+    "旅游景点": "Consumer Cyclical",
+    "酒店餐饮": "Consumer Cyclical",
+    "百货": "Consumer Cyclical",
+    "电器连锁": "Consumer Cyclical",
+    "商品城": "Consumer Cyclical",
+    "其他商业": "Consumer Cyclical",
+    "商贸代理": "Consumer Cyclical",
+    "批发业": "Consumer Cyclical",
+    # Industrials
+    "电气设备": "Industrials",
+    "工程机械": "Industrials",
+    "专用机械": "Industrials",
+    "机械基件": "Industrials",
+    "化工机械": "Industrials",
+    "轻工机械": "Industrials",
+    "农用机械": "Industrials",
+    "纺织机械": "Industrials",
+    "机床制造": "Industrials",
+    "运输设备": "Industrials",
+    "船舶": "Industrials",
+    "航空": "Industrials",
+    "空运": "Industrials",
+    "机场": "Industrials",
+    "港口": "Industrials",
+    "水运": "Industrials",
+    "路桥": "Industrials",
+    "高速公路": "Industrials",
+    "铁路": "Industrials",
+    "公路": "Industrials",
+    "公共交通": "Industrials",
+    "仓储物流": "Industrials",
+    "建筑工程": "Industrials",
+    "装修装饰": "Industrials",
+    "环境保护": "Industrials",
+    "综合类": "Industrials",
+    # Energy
+    "煤炭开采": "Energy",
+    "焦炭加工": "Energy",
+    "石油开采": "Energy",
+    "石油加工": "Energy",
+    "石油贸易": "Energy",
+    # Basic Materials
+    "黄金": "Basic Materials",
+    "铜": "Basic Materials",
+    "铝": "Basic Materials",
+    "铅锌": "Basic Materials",
+    "小金属": "Basic Materials",
+    "普钢": "Basic Materials",
+    "特种钢": "Basic Materials",
+    "钢加工": "Basic Materials",
+    "矿物制品": "Basic Materials",
+    "化工原料": "Basic Materials",
+    "农药化肥": "Basic Materials",
+    "塑料": "Basic Materials",
+    "橡胶": "Basic Materials",
+    "化纤": "Basic Materials",
+    "染料涂料": "Basic Materials",
+    "造纸": "Basic Materials",
+    "水泥": "Basic Materials",
+    "玻璃": "Basic Materials",
+    "陶瓷": "Basic Materials",
+    "其他建材": "Basic Materials",
+    # Utilities
+    "新型电力": "Utilities",
+    "火力发电": "Utilities",
+    "水力发电": "Utilities",
+    "供气供热": "Utilities",
+    "水务": "Utilities",
+}
+
+# yfinance tickers (.SS / .SZ) so ETFScanner can read A-share ETFs/stocks
+ASHARE_SECTOR_ETFS: dict[str, list[str]] = {
+    "Technology": ["515000.SS"],
+    "Healthcare": ["512010.SS"],
+    "Financial": ["510230.SS"],
+    "Consumer Defensive": ["159928.SZ"],
+    "Basic Materials": ["512400.SS"],
+    "Energy": ["515220.SS"],
+    "Real Estate": ["512200.SS"],
+    "Utilities": ["159611.SZ"],
+    "Communication Services": ["512980.SS"],
+}
+
+ASHARE_SECTOR_STOCKS: dict[str, list[str]] = {
+    "Technology": ["688981.SS", "002371.SZ", "000977.SZ", "300308.SZ", "002415.SZ"],
+    "Communication Services": ["600941.SS", "002602.SZ", "002555.SZ", "300413.SZ", "002027.SZ"],
+    "Healthcare": ["600276.SS", "300760.SZ", "603259.SS", "300015.SZ", "000538.SZ"],
+    "Financial": ["600036.SS", "601318.SS", "600030.SS", "300059.SZ", "601398.SS"],
+    "Real Estate": ["000002.SZ", "600048.SS", "001979.SZ", "600383.SS", "000069.SZ"],
+    "Consumer Defensive": ["600519.SS", "000858.SZ", "600887.SS", "603288.SS", "000568.SZ"],
+    "Consumer Cyclical": ["002594.SZ", "000333.SZ", "000651.SZ", "601888.SS", "600104.SS"],
+    "Industrials": ["300750.SZ", "600031.SS", "601668.SS", "601766.SS", "600150.SS"],
+    "Energy": ["601088.SS", "600188.SS", "601857.SS", "600028.SS", "601225.SS"],
+    "Basic Materials": ["601899.SS", "600309.SS", "600585.SS", "603993.SS", "600019.SS"],
+    "Utilities": ["600900.SS", "600011.SS", "003816.SZ", "600025.SS", "600886.SS"],
+}
+
+# Trading-day windows per perf key (perf_ytd is derived from the calendar)
+ASHARE_PERF_WINDOWS: dict[str, int] = {
+    "perf_1w": 5,
+    "perf_1m": 21,
+    "perf_3m": 63,
+    "perf_6m": 126,
+    "perf_1y": 252,
+}
+
+# Breadth definition for A-share sector uptrend: close > SMA50 and SMA20 > SMA50
+_UPTREND_FAST = 20
+_UPTREND_SLOW = 50
+_UPTREND_HISTORY = 15
+
+
+def _default_ashare_cache_dir() -> str:
+    """A-share bar cache under AEOLUS_DATA_DIR or the repo data/ directory."""
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    if not data_dir:
+        repo_root = os.path.dirname(
+            os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        )
+        data_dir = os.path.join(repo_root, "data")
+    return os.path.join(data_dir, "theme_detector", "ashare")
+
+
+def _ashare_to_yfinance(ts_code: str) -> str:
+    """600519.SH -> 600519.SS (yfinance suffix); .SZ/.BJ unchanged."""
+    return ts_code[:-3] + ".SS" if ts_code.endswith(".SH") else ts_code
+
+
+class TushareAShareUniverseProvider(UniverseProvider):
+    """A-share industries built from Tushare classification and daily bars.
+
+    Daily bars are pulled in bulk per trade date (pro.daily(trade_date=...)
+    returns the whole market in one call) and cached as one .npz per date, so
+    after the first run only newly published dates are fetched. Industry
+    performance is the circulating-market-cap weighted compound return of
+    constituents (equal weighted when daily_basic is unavailable).
+
+    Args:
+        token: Tushare Pro token (default: TUSHARE_TOKEN env).
+        cache_dir: Local cache directory.
+        pro: Pre-built Tushare pro client (mainly for tests).
+        history_days: Trading days of history kept for the perf windows.
+        rate_limit_sec: Minimum interval between Tushare calls.
+    """
+
+    market = "cn"
+    source_name = "tushare_industries"
+    themes_config_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "themes_ashare.yaml"
+    )
+    sector_etfs = ASHARE_SECTOR_ETFS
+    sector_stocks = ASHARE_SECTOR_STOCKS
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        pro=None,
+        history_days: int = 253,
+        rate_limit_sec: float = 0.13,
+    ):
+        if np is None or pd is None:
+            raise RuntimeError("pandas/numpy are required for the A-share universe")
+        self._token = (token or os.environ.get("TUSHARE_TOKEN") or "").strip()
+        if pro is None and not self._token:
+            raise RuntimeError("TUSHARE_TOKEN is required for --market cn")
+        self._cache_dir = cache_dir or _default_ashare_cache_dir()
+        self._pro = pro
+        self._history_days = history_days
+        self._rate_limit_sec = rate_limit_sec
+        self._last_request_time = 0.0
+        self._panel: Optional[dict] = None
+        self.stats: dict[str, int] = {"api_calls": 0, "cached_dates": 0, "fetched_dates": 0}
+
+    # -- Public API ----------------------------------------------------------
+
+    def get_industry_performance(self) -> list[dict]:
+        panel = self._load_panel()
+        if panel is None:
+            return []
+        return compute_industry_performance(
+            panel["pct_chg"],
+            panel["dates"],
+            panel["industries"],
+            panel["weights"],
+        )
+
+    def get_sector_uptrend(self) -> dict[str, dict]:
+        panel = self._load_panel()
+        if panel is None:
+            return {}
+        sectors = np.array(
+            [ASHARE_INDUSTRY_TO_SECTOR.get(ind, "Unknown") for ind in panel["industries"]],
+            dtype=object,
+        )
+        return compute_sector_uptrend(panel["pct_chg"], panel["dates"], sectors)
+
+    # -- Tushare access ------------------------------------------------------
+
+    def _client(self):
+        if self._pro is None:
+            try:
+                import tushare as ts
+            except ImportError as e:
+                raise RuntimeError("tushare package is required for --market cn") from e
+
+            self._pro = ts.pro_api(self._token)
+        return self._pro
+
+    def _call(self, api: str, **kwargs):
+        """Rate-limited Tushare call; network / quota / permission errors become RuntimeError."""
+        now = time.time()
+        elapsed = now - self._last_request_time
+        if elapsed < self._rate_limit_sec:
+            time.sleep(self._rate_limit_sec - elapsed)
+        self._last_request_time = time.time()
+        self.stats["api_calls"] += 1
+        client = self._client()
+        try:
+            return getattr(client, api)(**kwargs)
+        except Exception as e:
+            raise RuntimeError(f"Tushare {api} failed: {e}") from e
+
+    # -- Cached datasets -----------------------------------------------------
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self._cache_dir, *parts)
+
+    def _daily_refresh_json(self, name: str, fetch) -> Optional[list]:
+        """Load a JSON list cached for today, else fetch + store it."""
+        path = self._path(name)
+        today = datetime.now().strftime("%Y%m%d")
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    payload = json.load(f)
+                if payload.get("fetched") == today:
+                    return payload["rows"]
+            except (OSError, ValueError, KeyError):
+                pass
+        rows = fetch()
+        if rows:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"fetched": today, "rows": rows}, f, ensure_ascii=False)
+        return rows
+
+    def _open_dates(self) -> list[str]:
+        """Open SSE trade dates (YYYYMMDD, ascending) up to today."""
+
+        def fetch():
+            end = datetime.now()
+            start = end - timedelta(days=int(self._history_days * 1.6) + 30)
+            df = self._call(
+                "trade_cal",
+                exchange="SSE",
+                start_date=start.strftime("%Y%m%d"),
+                end_date=end.strftime("%Y%m%d"),
+                is_open="1",
+            )
+            if df is None or df.empty:
+                return []
+            return sorted(str(d) for d in df["cal_date"])
+
+        dates = self._daily_refresh_json("trade_cal.json", fetch) or []
+        today = datetime.now().strftime("%Y%m%d")
+        return [d for d in dates if d <= today]
+
+    def _stock_basic(self) -> list[list[str]]:
+        """[[ts_code, industry], ...] for listed A-shares."""
+
+        def fetch():
+            df = self._call(
+                "stock_basic", exchange="", list_status="L", fields="ts_code,name,industry"
+            )
+            if df is None or df.empty:
+                return []
+            df = df.dropna(subset=["industry"])
+            return df[["ts_code", "industry"]].astype(str).values.tolist()
+
+        return self._daily_refresh_json("stock_basic.json", fetch) or []
+
+    def _daily_bars(self, trade_date: str):
+        """(ts_codes, pct_chg) for one trade date, from cache or one bulk call."""
+        path = self._path("daily", f"{trade_date}.npz")
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    self.stats["cached_dates"] += 1
+                    return data["ts_code"], data["pct_chg"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+        df = self._call("daily", trade_date=trade_date, fields="ts_code,trade_date,pct_chg")
+        if df is None or df.empty:
+            if trade_date >= datetime.now().strftime("%Y%m%d"):
+                # Not published yet (intraday) - do not cache
+                return None
+            # A past date with no bars stays empty; cache it so it is not re-requested
+            codes = np.array([], dtype="U12")
+            pct = np.array([], dtype=np.float64)
+        else:
+            codes = df["ts_code"].astype(str).to_numpy(dtype="U12")
+            pct = pd.to_numeric(df["pct_chg"], errors="coerce").to_numpy(dtype=np.float64)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, ts_code=codes, pct_chg=pct)
+        self.stats["fetched_dates"] += 1
+        return codes, pct
+
+    def _weights(self, trade_date: str, codes) -> Optional[np.ndarray]:
+        """Circulating market cap per code for trade_date, None if unavailable."""
+        path = self._path("daily_basic", f"{trade_date}.npz")
+        mv_codes = mv = None
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    mv_codes, mv = data["ts_code"], data["circ_mv"]
+            except (OSError, ValueError, KeyError):
+                pass
+        if mv_codes is None:
+            try:
+                df = self._call("daily_basic", trade_date=trade_date, fields="ts_code,circ_mv")
+            except Exception as e:
+                print(f"WARNING: daily_basic unavailable ({e}); equal weighting", file=sys.stderr)
+                return None
+            if df is None or df.empty:
+                return None
+            mv_codes = df["ts_code"].astype(str).to_numpy(dtype="U12")
+            mv = pd.to_numeric(df["circ_mv"], errors="coerce").to_numpy(dtype=np.float64)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(path, ts_code=mv_codes, circ_mv=mv)
+        return pd.Series(mv, index=mv_codes).reindex(codes).to_numpy(dtype=np.float64)
+
+    def _load_panel(self) -> Optional[dict]:
+        """Build the (dates x codes) pct_chg panel for the listed universe."""
+        if self._panel is not None:
+            return self._panel
+
+        basics = self._stock_basic()
+        open_dates = self._open_dates()
+        if not basics or not open_dates:
+            print("WARNING: Tushare stock_basic/trade_cal unavailable", file=sys.stderr)
+            return None
+
+        codes = np.array([row[0] for row in basics], dtype="U12")
+        industries = np.array([row[1] for row in basics], dtype=object)
+        code_index = pd.Index(codes)
+
+        # Walk back from the newest open date; skip a not-yet-published latest date
+        window = open_dates[-(self._history_days + 1) :]
+        dates: list[str] = []
+        rows: list[np.ndarray] = []
+        for i, trade_date in enumerate(window):
+            bars = self._daily_bars(trade_date)
+            if bars is None or len(bars[0]) == 0:
+                if i == len(window) - 1:
+                    continue
+                bars = (np.array([], dtype="U12"), np.array([], dtype=np.float64))
+            row = np.full(len(codes), np.nan)
+            pos = code_index.get_indexer(bars[0])
+            mask = pos >= 0
+            row[pos[mask]] = bars[1][mask]
+            dates.append(trade_date)
+            rows.append(row)
+
+        if not rows:
+            return None
+
+        pct_chg = np.vstack(rows)
+        self._panel = {
+            "dates": dates,
+            "codes": codes,
+            "industries": industries,
+            "pct_chg": pct_chg,
+            "weights": self._weights(dates[-1], codes),
+        }
+        return self._panel
+
+
+# ---------------------------------------------------------------------------
+# Vectorized computations (pure functions over the panel)
+# ---------------------------------------------------------------------------
+
+
+def _cumulative_log_returns(pct_chg: np.ndarray) -> np.ndarray:
+    """(n_dates + 1, n_codes) cumulative log growth; missing days count as flat."""
+    log_ret = np.log1p(np.nan_to_num(pct_chg, nan=0.0) / 100.0)
+    return np.vstack([np.zeros((1, pct_chg.shape[1])), np.cumsum(log_ret, axis=0)])
+
+
+def _ytd_window(dates: list[str]) -> Optional[int]:
+    """Trading days since the last close of the previous year, None if not covered."""
+    if not dates:
+        return None
+    year = dates[-1][:4]
+    first_this_year = next((i for i, d in enumerate(dates) if d[:4] == year), None)
+    if first_this_year is None or first_this_year == 0:
+        return None
+    return len(dates) - first_this_year
+
+
+def compute_industry_performance(
+    pct_chg: np.ndarray,
+    dates: list[str],
+    industries: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> list[dict]:
+    """Industry perf dicts (percent) from a (dates x codes) pct_chg panel.
+
+    A stock contributes to a window only if it traded on or before the first
+    day of the window (so IPO-day jumps are excluded). Industry values are
+    weighted means of constituent compound returns.
+    """
+    n_dates, n_codes = pct_chg.shape
+    if n_dates == 0 or n_codes == 0:
+        return []
+
+    growth = _cumulative_log_returns(pct_chg)
+    observed = ~np.isnan(pct_chg)
+    first_obs = np.where(observed.any(axis=0), observed.argmax(axis=0), n_dates)
+
+    windows = dict(ASHARE_PERF_WINDOWS)
+    ytd = _ytd_window(dates)
+    if ytd is not None:
+        windows["perf_ytd"] = ytd
+
+    if weights is None:
+        w = np.ones(n_codes)
+    else:
+        w = np.where(np.isfinite(weights) & (weights > 0), weights, 0.0)
+
+    frame = {"industry": industries, "_w": w}
+    for key in PERF_KEYS:
+        k = windows.get(key)
+        if k is None or k > n_dates:
+            frame[key] = np.full(n_codes, np.nan)
+            continue
+        ret = np.expm1(growth[-1] - growth[-1 - k])
+        listed = first_obs <= n_dates - k
+        frame[key] = np.where(listed, ret, np.nan)
+
+    df = pd.DataFrame(frame)
+    grouped_counts = df.groupby("industry", sort=True).size()
+    result = pd.DataFrame(index=grouped_counts.index)
+    for key in PERF_KEYS:
+        valid = df[key].notna() & (df["_w"] > 0)
+        num = (df[key].where(valid, 0.0) * df["_w"]).groupby(df["industry"]).sum()
+        den = df["_w"].where(valid, 0.0).groupby(df["industry"]).sum()
+        result[key] = (num / den.replace(0.0, np.nan)) * 100.0
+
+    out = []
+    for name, row in result.iterrows():
+        entry = {
+            "name": name,
+            "sector": ASHARE_INDUSTRY_TO_SECTOR.get(name, "Unknown"),
+            "stock_count": int(grouped_counts[name]),
+        }
+        for key in PERF_KEYS:
+            val = row[key]
+            entry[key] = None if pd.isna(val) else round(float(val), 4)
+        out.append(entry)
+    return out
+
+
+def _rolling_mean(prices: np.ndarray, window: int) -> np.ndarray:
+    """Trailing SMA along axis 0; rows before the first full window are NaN."""
+    csum = np.cumsum(prices, axis=0)
+    out = np.full(prices.shape, np.nan)
+    out[window - 1] = csum[window - 1] / window
+    out[window:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def compute_sector_uptrend(
+    pct_chg: np.ndarray,
+    dates: list[str],
+    sectors: np.ndarray,
+    history: int = _UPTREND_HISTORY,
+) -> dict[str, dict]:
+    """Per-sector uptrend ratio in the uptrend_client format.
+
+    A stock is in an uptrend when its adjusted close is above SMA50 and
+    SMA20 is above SMA50. ratio = share of sector constituents in uptrend
+    (stocks need a full SMA50 history); ma_10 and slope are taken over the
+    trailing daily ratio series.
+    """
+    from uptrend_client import _calculate_slope
+
+    n_dates = pct_chg.shape[0]
+    if n_dates < _UPTREND_SLOW + history:
+        return {}
+
+    prices = np.exp(_cumulative_log_returns(pct_chg)[1:])
+    sma_fast = _rolling_mean(prices, _UPTREND_FAST)
+    sma_slow = _rolling_mean(prices, _UPTREND_SLOW)
+
+    observed = ~np.isnan(pct_chg)
+    first_obs = np.where(observed.any(axis=0), observed.argmax(axis=0), n_dates)
+
+    rows = slice(n_dates - history, n_dates)
+    in_uptrend = (prices[rows] > sma_slow[rows]) & (sma_fast[rows] > sma_slow[rows])
+    row_idx = np.arange(n_dates)[rows][:, None]
+    eligible = first_obs[None, :] <= row_idx - (_UPTREND_SLOW - 1)
+
+    latest = dates[-1]
+    latest_date = f"{latest[:4]}-{latest[4:6]}-{latest[6:]}"
+    result = {}
+    for sector in sorted(set(sectors.tolist())):
+        if sector == "Unknown":
+            continue
+        cols = sectors == sector
+        counts = eligible[:, cols].sum(axis=1)
+        if counts[-1] == 0:
+            continue
+        ups = (in_uptrend[:, cols] & eligible[:, cols]).sum(axis=1)
+        ratios = np.where(counts > 0, ups / np.maximum(counts, 1), np.nan)
+        series = [float(r) for r in ratios if not np.isnan(r)]
+        slope = _calculate_slope(series[-5:])
+        result[sector] = {
+            "ratio": round(series[-1], 4),
+            "ma_10": round(sum(series[-10:]) / len(series[-10:]), 4),
+            "slope": slope,
+            "trend": "up" if slope and slope > 0 else "down",
+            "latest_date": latest_date,
+        }
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+
+def get_universe_provider(market: str, industry_to_sector: dict[str, str], **kwargs):
+    """Return the provider for market ("us" or "cn")."""
+    if market == "us":
+        return FinvizUniverseProvider(industry_to_sector)
+    if market == "cn":
+        return TushareAShareUniverseProvider(**kwargs)
+    raise ValueError(f"Unknown market: {market}")
@@ -0,0 +1,348 @@
+"""
+Base64 附件流式落盘（Aeolus 共享层）。
+
+妙想研报类接口（行业研报、首次覆盖、跟踪报告、专题研报、业绩点评）在一个 JSON 响应里
+用 pdfBase64 / wordBase64 等字段内联几十 MB 的附件。原先的 resp.json() + base64.b64decode
+会同时持有响应文本、解析后的字符串和解码后的字节三份完整拷贝。
+
+Base64JsonReader 逐块读取响应体：
+- 指定字段（如 pdfBase64）的字符串值不进入内存，按固定大小分块解码后直接写入临时文件；
+- 其余 JSON 照常拼接并在结束时 json.loads，附件字段的值替换为 SpooledBase64
+  （str 子类，字面值是 "<base64 N bytes>" 占位，日志 / JSON 输出不会膨胀）；
+- save_base64(value, path) 统一保存附件：SpooledBase64 直接改名到目标路径，
+  普通字符串按块解码写入，不再生成完整的解码副本。
+
+峰值内存约为 JSON 骨架 + 一个解码块（DECODE_CHUNK_CHARS），与附件大小无关。
+未被保存的临时文件在进程退出时删除。
+"""
+
+from __future__ import annotations
+
+import atexit
+import binascii
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+DECODE_CHUNK_CHARS = 4 * 1024 * 1024  # 4 的倍数
+READ_CHUNK_BYTES = 256 * 1024
+MAX_KEY_BYTES = 256
+
+_B64_DELETE = bytes(b for b in range(256) if not (chr(b).isalnum() and b < 128) and b not in b"+/-_=")
+_STRING_STOP_RE = re.compile(rb'["\\]')
+_UNICODE_ESCAPE_RE = re.compile(rb"\\u([0-9a-fA-F]{4})")
+_COMPLETE_ESCAPE_RE = re.compile(rb"\\(?:u[0-9a-fA-F]{4}|[^u])")
+_OTHER_ESCAPE_RE = re.compile(rb"\\.", re.DOTALL)
+_WS = b" \t\r\n"
+
+_spooled_files: Set[str] = set()
+_spooled_lock = threading.Lock()
+
+
+def _cleanup_spooled() -> None:
+    for path in list(_spooled_files):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+atexit.register(_cleanup_spooled)
+
+
+class SpooledBase64(str):
+    """已解码落盘的附件字段值；path 为临时文件，size 为解码后字节数。"""
+
+    path: str
+    size: int
+
+    def __new__(cls, path: str, size: int):
+        obj = super().__new__(cls, f"<base64 {size} bytes>")
+        obj.path = path
+        obj.size = size
+        return obj
+
+
+def _unescape_b64(segment: bytes) -> bytes:
+    """JSON 字符串转义还原：\\/ → /，\\uXXXX → 字符，\\n \\r 等换行转义丢弃。"""
+    if b"\\" not in segment:
+        return segment
+    if b"\\u" in segment:
+        segment = _UNICODE_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)).encode("ascii", "ignore"), segment)
+    return _OTHER_ESCAPE_RE.sub(b"", segment.replace(b"\\/", b"/"))
+
+
+class _ChunkedDecoder:
+    """把 base64 字符分块解码写入二进制文件（兼容 URL-safe 字母表与换行）。"""
+
+    def __init__(self, fh, chunk_chars: int = DECODE_CHUNK_CHARS):
+        self._fh = fh
+        self._chunk = max(4, chunk_chars - chunk_chars % 4)
+        self._buf = bytearray()
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        self._buf += data.translate(None, _B64_DELETE)
+        if len(self._buf) >= self._chunk:
+            n = len(self._buf) - len(self._buf) % 4
+            self._emit(bytes(self._buf[:n]))
+            del self._buf[:n]
+
+    def finish(self) -> None:
+        if self._buf:
+            tail = bytes(self._buf)
+            tail += b"=" * (-len(tail) % 4)
+            self._emit(tail)
+            self._buf.clear()
+
+    def _emit(self, data: bytes) -> None:
+        if b"-" in data or b"_" in data:
+            data = data.replace(b"-", b"+").replace(b"_", b"/")
+        raw = binascii.a2b_base64(data)
+        self._fh.write(raw)
+        self.size += len(raw)
+
+
+class Base64JsonReader:
+    """流式读取 JSON 响应体，keys 中字段的字符串值直接解码落盘。
+
+    用法::
+
+        reader = Base64JsonReader({"pdfBase64", "wordBase64"}, spool_dir=out_dir)
+        for chunk in chunks:
+            reader.feed(chunk)
+        payload = reader.result()   # 附件字段为 SpooledBase64
+    """
+
+    _NORMAL, _STRING, _B64 = range(3)
+
+    def __init__(self, keys: Iterable[str], spool_dir: Optional[Path] = None):
+        self._keys = {k.encode("utf-8") for k in keys}
+        self._spool_dir = Path(spool_dir) if spool_dir else None
+        self._skeleton = bytearray()
+        self._state = self._NORMAL
+        self._escape = False
+        self._str_start = 0
+        self._last_string: Optional[bytes] = None
+        self._after_colon_key: Optional[bytes] = None
+        self._await_colon = False
+        self._carry = b""
+        self._fh = None
+        self._decoder: Optional[_ChunkedDecoder] = None
+        self._spool_path = ""
+        self._spooled: Dict[str, SpooledBase64] = {}
+
+    def feed(self, data: bytes) -> None:
+        i, n = 0, len(data)
+        while i < n:
+            if self._state == self._NORMAL:
+                i = self._feed_normal(data, i, n)
+            elif self._state == self._STRING:
+                i = self._feed_string(data, i, n)
+            else:
+                i = self._feed_b64(data, i, n)
+
+    def result(self) -> Any:
+        if self._state != self._NORMAL:
+            self._abort_spool()
+            raise ValueError("JSON 响应不完整（字符串未结束）")
+        try:
+            parsed = json.loads(bytes(self._skeleton).decode("utf-8"))
+        except ValueError as exc:
+            raise ValueError(f"JSON 解析失败: {exc}") from exc
+        finally:
+            self._skeleton = bytearray()
+        return self._restore(parsed)
+
+    # ── 状态机 ──
+
+    def _feed_normal(self, data: bytes, i: int, n: int) -> int:
+        while i < n:
+            b = data[i]
+            if b in _WS:
+                self._skeleton.append(b)
+                i += 1
+                continue
+            if self._await_colon:
+                self._await_colon = False
+                if b == 0x3A:  # ':'
+                    self._skeleton.append(b)
+                    self._after_colon_key = self._last_string if self._last_string in self._keys else None
+                    i += 1
+                    continue
+            key, self._after_colon_key = self._after_colon_key, None
+            if b == 0x22:  # '"'
+                i += 1
+                if key is not None:
+                    self._start_spool()
+                    self._state = self._B64
+                else:
+                    self._skeleton.append(b)
+                    self._str_start = len(self._skeleton)
+                    self._state = self._STRING
+                return i
+            self._skeleton.append(b)
+            i += 1
+        return i
+
+    def _feed_string(self, data: bytes, i: int, n: int) -> int:
+        if self._escape:
+            self._skeleton.append(data[i])
+            self._escape = False
+            i += 1
+        while i < n:
+            m = _STRING_STOP_RE.search(data, i)
+            if m is None:
+                self._skeleton += data[i:]
+                return n
+            j = m.start()
+            self._skeleton += data[i:j]
+            if data[j] == 0x5C:  # '\\'
+                self._skeleton.append(0x5C)
+                if j + 1 < n:
+                    self._skeleton.append(data[j + 1])
+                    i = j + 2
+                    continue
+                self._escape = True
+                return n
+            self._skeleton.append(0x22)
+            length = len(self._skeleton) - 1 - self._str_start
+            self._last_string = bytes(self._skeleton[self._str_start : -1]) if length <= MAX_KEY_BYTES else None
+            self._await_colon = True
+            self._state = self._NORMAL
+            return j + 1
+        return i
+
+    def _feed_b64(self, data: bytes, i: int, n: int) -> int:
+        # base64 字母表不含引号，第一个 '"' 即字符串结束；整段批量处理转义，避免逐字节循环
+        j = data.find(b'"', i)
+        segment = self._carry + data[i : n if j < 0 else j]
+        self._carry = b""
+        if j < 0:
+            tail = segment.rfind(b"\\", max(0, len(segment) - 6))
+            if tail >= 0 and not _COMPLETE_ESCAPE_RE.match(segment, tail):
+                segment, self._carry = segment[:tail], segment[tail:]
+        self._decoder.write(_unescape_b64(segment))
+        if j < 0:
+            return n
+        self._finish_spool()
+        self._state = self._NORMAL
+        return j + 1
+
+    # ── 落盘 ──
+
+    def _start_spool(self) -> None:
+        if self._spool_dir is not None:
+            self._spool_dir.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=".b64_", suffix=".part", dir=str(self._spool_dir) if self._spool_dir else None)
+        with _spooled_lock:
+            _spooled_files.add(path)
+        self._fh = os.fdopen(fd, "wb")
+        self._decoder = _ChunkedDecoder(self._fh)
+        self._spool_path = path
+
+    def _finish_spool(self) -> None:
+        self._decoder.finish()
+        self._fh.close()
+        if not self._decoder.size:
+            _discard(self._spool_path)
+        token = f"\x00spooled:{len(self._spooled)}"
+        self._spooled[token] = SpooledBase64(self._spool_path, self._decoder.size)
+        self._skeleton += json.dumps(token).encode("ascii")
+        self._fh = self._decoder = None
+
+    def _abort_spool(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            _discard(self._spool_path)
+            self._fh = self._decoder = None
+
+    def _restore(self, obj: Any) -> Any:
+        if not self._spooled:
+            return obj
+        if isinstance(obj, dict):
+            return {k: self._restore(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self._restore(v) for v in obj]
+        if isinstance(obj, str) and obj in self._spooled:
+            return self._spooled[obj]
+        return obj
+
+
+def _discard(path: str) -> None:
+    with _spooled_lock:
+        _spooled_files.discard(path)
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def read_json_with_attachments(
+    chunks: Iterable[bytes], keys: Iterable[str], spool_dir: Optional[Path] = None
+) -> Any:
+    """同步版：逐块读取（如 urllib 响应的 iter(lambda: resp.read(n), b"")）并解析。"""
+    reader = Base64JsonReader(keys, spool_dir=spool_dir)
+    for chunk in chunks:
+        reader.feed(chunk)
+    return reader.result()
+
+
+def iter_response(resp, chunk_bytes: int = READ_CHUNK_BYTES) -> Iterable[bytes]:
+    """把 file-like 响应（urllib）按块迭代。"""
+    return iter(lambda: resp.read(chunk_bytes), b"")
+
+
+def has_base64(value: Any) -> bool:
+    if isinstance(value, SpooledBase64):
+        return value.size > 0
+    return isinstance(value, str) and bool(value.strip())
+
+
+def save_base64(value: Any, path: Path) -> bool:
+    """保存附件字段到 path：SpooledBase64 直接改名，普通字符串分块解码；空值返回 False。
+
+    解码失败抛出 binascii.Error / ValueError，由调用方决定如何提示。
+    """
+    path = Path(path)
+    if isinstance(value, SpooledBase64):
+        if not value.size or not os.path.exists(value.path):
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(value.path, path)
+        except OSError:
+            shutil.move(value.path, path)
+        with _spooled_lock:
+            _spooled_files.discard(value.path)
+        return True
+    if not isinstance(value, str) or not value.strip():
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.part")
+    try:
+        with tmp.open("wb") as fh:
+            decoder = _ChunkedDecoder(fh)
+            for start in range(0, len(value), DECODE_CHUNK_CHARS):
+                decoder.write(value[start : start + DECODE_CHUNK_CHARS].encode("ascii", "ignore"))
+            decoder.finish()
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return True
+
+
+__all__ = [
+    "Base64JsonReader",
+    "SpooledBase64",
+    "has_base64",
+    "iter_response",
+    "read_json_with_attachments",
+    "save_base64",
+]
@@ -0,0 +1,349 @@
+"""
+宏观指标序列本地库（Aeolus 共享层）。
+
+searchMacroData 每次都返回所请求指标的完整历史（如 GDP 自 1990 年代起），而宏观数据至多按月更新。
+本模块把解析后的序列落到本地 SQLite，重复问句直接由本地拼出宽表：
+
+- ``series``：以 indicator_code 为主键，保存名称、实体、频率、非日期列（如「数据来源」）、
+  最新观测期与最近刷新时间；
+- ``observations``：(indicator_code, period) 为主键的长表，period 为接口原始列名（``2025`` / ``2025-06-30``），
+  另存归一化的期末日期 obs_date 用于判断是否有新数据待发布；value 列不声明类型，数值与文本（如「140.2万亿」）按原类型保存；
+- ``queries``：归一化问句 → 指标代码列表、最早观测期与说明文字；
+- 读写均为长表 DataFrame：meta（每指标一行）+ obs（indicator_code, period, obs_date, value），
+  由调用方在需要宽表时一次性透视；
+- 发布判断（release_due）：最新观测期之后的下一期已结束、且距上次刷新超过 RECHECK_SEC 时才重新请求
+  （日度序列间隔 DAILY_RECHECK_SEC）；无论是否到期，超过 MAX_AGE_SEC 也会刷新一次以吸收修订值。
+
+默认路径：$AEOLUS_DATA_DIR/macro/series.sqlite3，未设置时为仓库 data/macro/series.sqlite3。
+MACRO_SERIES_STORE=off 时调用方不读写本地库。
+"""
+
+from __future__ import annotations
+
+import calendar
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+SCHEMA_VERSION = 2
+META_FIELDS = ("entity_name", "entity_description", "indicator_code", "indicator_name", "frequency")
+OBS_COLUMNS = ("indicator_code", "period", "obs_date", "value")
+RECHECK_SEC = 86400
+DAILY_RECHECK_SEC = 4 * 3600
+MAX_AGE_SEC = 30 * 86400
+FREQUENCY_MONTHS = {"yearly": 12, "quarterly": 3, "monthly": 1}
+FREQUENCY_DAYS = {"weekly": 7, "daily": 1}
+
+_CN_TZ = timezone(timedelta(hours=8))
+_WS_RE = re.compile(r"\s+")
+_YEAR_RE = re.compile(r"^(\d{4})年?$")
+_MONTH_RE = re.compile(r"^(\d{4})[-/.年](\d{1,2})月?$")
+_DAY_RE = re.compile(r"^(\d{4})[-/.年](\d{1,2})[-/.月](\d{1,2})日?$")
+_QUARTER_RE = re.compile(r"^(\d{4})\s*[-_]?\s*[Qq]([1-4])$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    indicator_code TEXT PRIMARY KEY,
+    indicator_name TEXT NOT NULL,
+    entity_name TEXT NOT NULL,
+    entity_description TEXT NOT NULL,
+    frequency TEXT NOT NULL,
+    attrs TEXT NOT NULL,
+    last_obs TEXT,
+    refreshed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    indicator_code TEXT NOT NULL,
+    period TEXT NOT NULL,
+    obs_date TEXT NOT NULL,
+    value NOT NULL,
+    PRIMARY KEY (indicator_code, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_observations_date ON observations (indicator_code, obs_date);
+CREATE TABLE IF NOT EXISTS queries (
+    query_key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    codes TEXT NOT NULL,
+    first_obs TEXT,
+    description TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def store_enabled() -> bool:
+    return (os.environ.get("MACRO_SERIES_STORE") or "").strip().lower() not in ("0", "off", "false", "no")
+
+
+def default_db_path() -> Path:
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    base = Path(data_dir) if data_dir else REPO_ROOT / "data"
+    return base / "macro" / "series.sqlite3"
+
+
+def normalize_query(query: str) -> str:
+    return _WS_RE.sub(" ", query or "").strip().lower()
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def period_end(period: Any) -> Optional[str]:
+    """接口列名 → 期末日期 YYYYMMDD：``2025`` → 20251231，``2025-06`` → 20250630；非日期列返回 None。"""
+    text = str(period).strip()
+    try:
+        m = _DAY_RE.match(text)
+        if m:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3))).strftime("%Y%m%d")
+        m = _MONTH_RE.match(text)
+        if m:
+            return _month_end(int(m.group(1)), int(m.group(2))).strftime("%Y%m%d")
+        m = _QUARTER_RE.match(text)
+        if m:
+            return _month_end(int(m.group(1)), int(m.group(2)) * 3).strftime("%Y%m%d")
+        m = _YEAR_RE.match(text)
+        if m:
+            return f"{m.group(1)}1231"
+    except ValueError:
+        return None
+    return None
+
+
+def next_period_end(frequency: str, last_obs: str) -> Optional[str]:
+    """last_obs 之后下一期的期末日期；频率未知时返回 None。"""
+    d = datetime.strptime(last_obs, "%Y%m%d").date()
+    if frequency in FREQUENCY_DAYS:
+        return (d + timedelta(days=FREQUENCY_DAYS[frequency])).strftime("%Y%m%d")
+    months = FREQUENCY_MONTHS.get(frequency)
+    if not months:
+        return None
+    total = d.year * 12 + d.month - 1 + months
+    return _month_end(total // 12, total % 12 + 1).strftime("%Y%m%d")
+
+
+def release_due(frequency: str, last_obs: Optional[str], refreshed_at: float, now: Optional[float] = None) -> bool:
+    """是否可能已有新一期数据发布（需要重新请求接口）。"""
+    now = time.time() if now is None else now
+    age = now - refreshed_at
+    if age >= MAX_AGE_SEC:
+        return True
+    if age < (DAILY_RECHECK_SEC if frequency == "daily" else RECHECK_SEC):
+        return False
+    if not last_obs:
+        return True
+    upcoming = next_period_end(frequency, last_obs)
+    if upcoming is None:
+        return True
+    return datetime.fromtimestamp(now, _CN_TZ).strftime("%Y%m%d") > upcoming
+
+
+@dataclass
+class QueryEntry:
+    query: str
+    codes: List[str]
+    first_obs: Optional[str]
+    description_parts: List[str]
+    fetched_at: float
+
+
+class MacroSeriesStore:
+    """宏观序列库：save() 合并接口结果，assemble() 按问句读回长表。"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else default_db_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # v1 以 JSON 文本保存观测值；本地库只是接口缓存，直接重建
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS series; DROP TABLE IF EXISTS observations; DROP TABLE IF EXISTS queries;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "MacroSeriesStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── 读取 ──
+
+    def lookup(self, query: str) -> Optional[QueryEntry]:
+        row = self._conn.execute(
+            "SELECT query, codes, first_obs, description, fetched_at FROM queries WHERE query_key = ?",
+            (normalize_query(query),),
+        ).fetchone()
+        if row is None:
+            return None
+        return QueryEntry(row[0], json.loads(row[1]), row[2], json.loads(row[3]), row[4])
+
+    def due_codes(self, codes: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """需要刷新的指标代码（本地没有的也算）。"""
+        codes = list(codes)
+        if not codes:
+            return []
+        marks = ",".join("?" * len(codes))
+        known = {
+            r[0]: r[1:]
+            for r in self._conn.execute(
+                f"SELECT indicator_code, frequency, last_obs, refreshed_at FROM series WHERE indicator_code IN ({marks})",
+                codes,
+            )
+        }
+        return [c for c in codes if c not in known or release_due(*known[c], now=now)]
+
+    def assemble(self, entry: QueryEntry) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """按问句读出 (meta, obs) 长表：meta 按问句记录的指标顺序，obs 只含不早于 first_obs 的观测期。"""
+        if not entry.codes:
+            return pd.DataFrame(columns=list(META_FIELDS)), pd.DataFrame(columns=list(OBS_COLUMNS))
+        marks = ",".join("?" * len(entry.codes))
+        series = {
+            r[0]: r
+            for r in self._conn.execute(
+                "SELECT indicator_code, entity_name, entity_description, indicator_name, frequency, attrs"
+                f" FROM series WHERE indicator_code IN ({marks})",
+                entry.codes,
+            )
+        }
+        records = []
+        for code in entry.codes:
+            if code not in series:
+                continue
+            _, entity_name, entity_description, indicator_name, frequency, attrs = series[code]
+            records.append(
+                {
+                    "entity_name": entity_name,
+                    "entity_description": entity_description,
+                    "indicator_code": code,
+                    "indicator_name": indicator_name,
+                    "frequency": frequency,
+                    **json.loads(attrs),
+                }
+            )
+        meta = pd.DataFrame.from_records(records, columns=None if records else list(META_FIELDS))
+        obs = pd.read_sql_query(
+            "SELECT indicator_code, period, obs_date, value FROM observations"
+            f" WHERE indicator_code IN ({marks}) AND obs_date >= ?",
+            self._conn,
+            params=[*entry.codes, entry.first_obs or ""],
+        )
+        return meta, obs
+
+    def stats(self) -> Dict[str, Any]:
+        one = lambda sql: self._conn.execute(sql).fetchone()[0]  # noqa: E731
+        return {
+            "series": one("SELECT COUNT(*) FROM series"),
+            "observations": one("SELECT COUNT(*) FROM observations"),
+            "queries": one("SELECT COUNT(*) FROM queries"),
+            "path": str(self.db_path),
+        }
+
+    # ── 写入 ──
+
+    def save(
+        self,
+        query: str,
+        meta: pd.DataFrame,
+        obs: pd.DataFrame,
+        description_parts: Iterable[str] = (),
+        now: Optional[float] = None,
+    ) -> QueryEntry:
+        """合并一次接口结果（同一观测期以新值为准），并记录问句 → 指标映射。
+
+        meta 每指标一行（META_FIELDS 以外的列记为属性，如「数据来源」），obs 为 OBS_COLUMNS 长表。
+        """
+        now = time.time() if now is None else now
+        codes = list(dict.fromkeys(str(c) for c in meta["indicator_code"] if c)) if not meta.empty else []
+        obs = obs[obs["indicator_code"].isin(codes)] if codes else obs.iloc[:0]
+        first_obs = str(obs["obs_date"].min()) if not obs.empty else None
+        attr_columns = [c for c in meta.columns if c not in META_FIELDS]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO observations (indicator_code, period, obs_date, value) VALUES (?, ?, ?, ?)",
+                zip(
+                    obs["indicator_code"].tolist(),
+                    obs["period"].tolist(),
+                    obs["obs_date"].tolist(),
+                    obs["value"].tolist(),
+                ),
+            )
+            marks = ",".join("?" * len(codes))
+            last_obs = dict(
+                self._conn.execute(
+                    f"SELECT indicator_code, MAX(obs_date) FROM observations WHERE indicator_code IN ({marks})"
+                    " GROUP BY indicator_code",
+                    codes,
+                ).fetchall()
+            ) if codes else {}
+            seen = set()
+            for row in meta.to_dict("records"):
+                code = str(row.get("indicator_code") or "")
+                if not code or code in seen:
+                    continue
+                seen.add(code)
+                attrs = {c: row[c] for c in attr_columns if not _is_missing(row[c])}
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO series (indicator_code, indicator_name, entity_name, entity_description,"
+                    " frequency, attrs, last_obs, refreshed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        code,
+                        str(row.get("indicator_name") or code),
+                        str(row.get("entity_name") or ""),
+                        str(row.get("entity_description") or ""),
+                        str(row.get("frequency") or "unknown"),
+                        json.dumps(attrs, ensure_ascii=False, default=str),
+                        last_obs.get(code),
+                        now,
+                    ),
+                )
+            entry = QueryEntry(query, codes, first_obs, list(dict.fromkeys(description_parts)), now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (query_key, query, codes, first_obs, description, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_query(query),
+                    query,
+                    json.dumps(codes, ensure_ascii=False),
+                    first_obs,
+                    json.dumps(entry.description_parts, ensure_ascii=False),
+                    now,
+                ),
+            )
+        return entry
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+__all__ = [
+    "META_FIELDS",
+    "OBS_COLUMNS",
+    "MacroSeriesStore",
+    "QueryEntry",
+    "default_db_path",
+    "next_period_end",
+    "normalize_query",
+    "period_end",
+    "release_due",
+    "store_enabled",
+]
@@ -0,0 +1,118 @@
+"""
+GFM（GitHub Flavored Markdown）表格解析（Aeolus 共享层）。
+
+妙想类接口在没有结构化 dataList 时会把结果放在 Markdown 表格字符串里（如选股的 partialResults），
+宽泛的筛选可达上万行。本模块逐行扫描一遍，直接产出列式结构 ``(表头, 行列表)``，
+调用方按列下标取值写 CSV，不再为每行构造 dict：
+
+- 首尾的 ``|`` 可省略；``\\|`` 为单元格内的竖线，不作为分隔符；
+- 第二行为对齐行（``---`` / ``:--`` / ``--:`` / ``:-:``）时跳过，并返回各列对齐方式；
+- 行的单元格数与表头不一致时按 GFM 规则处理：多出的丢弃，缺少的补空字符串；
+- 表格在空行或不含竖线的行处结束，表格之前的说明文字会被跳过。
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import List, Optional, Tuple
+
+_ESCAPED_PIPE = "\\|"
+_PLACEHOLDER = "\ue000"  # 私有区字符，解析期间暂代 \| 的位置
+_ALIGN_CELL_RE = re.compile(r"^:?-+:?$")
+
+
+def _split_row(line: str) -> List[str]:
+    """一行 → 单元格列表：去掉首尾可省略的竖线后 split；只有含空白 / 占位符的行才逐格处理。"""
+    s = line.strip()
+    if s.startswith("|"):
+        s = s[1:]
+    if s.endswith("|"):
+        s = s[:-1]
+    cells = s.split("|")
+    if " " in s or "\t" in s:
+        cells = [c.strip() for c in cells]
+    if _PLACEHOLDER in s:
+        cells = [c.replace(_PLACEHOLDER, "|") for c in cells]
+    return cells
+
+
+def _alignments(cells: List[str]) -> Optional[List[str]]:
+    """对齐行 → ['left' | 'right' | 'center' | ''] 列表；不是对齐行时返回 None。"""
+    if not cells:
+        return None
+    out = []
+    for cell in cells:
+        cell = cell.strip()
+        if not _ALIGN_CELL_RE.match(cell):
+            return None
+        if cell.startswith(":") and cell.endswith(":"):
+            out.append("center")
+        elif cell.endswith(":"):
+            out.append("right")
+        elif cell.startswith(":"):
+            out.append("left")
+        else:
+            out.append("")
+    return out
+
+
+def parse_table(text: str) -> Tuple[List[str], List[List[str]], List[str]]:
+    """解析文本中的第一张表格，返回 (表头, 数据行, 各列对齐方式)；没有表格时三者均为空列表。"""
+    if not text or not isinstance(text, str):
+        return [], [], []
+    # \| 在整段文本上一次性换成占位符，之后按行 split 即可
+    if _ESCAPED_PIPE in text:
+        text = text.replace(_ESCAPED_PIPE, _PLACEHOLDER)
+    lines = text.splitlines()
+    n = len(lines)
+    i = 0
+    while i < n and "|" not in lines[i]:
+        i += 1
+    if i >= n:
+        return [], [], []
+
+    header = _split_row(lines[i])
+    width = len(header)
+    i += 1
+    aligns: List[str] = [""] * width
+    if i < n:
+        parsed = _alignments(_split_row(lines[i]))
+        if parsed is not None:
+            aligns = (parsed + [""] * width)[:width]
+            i += 1
+
+    rows: List[List[str]] = []
+    append = rows.append
+    pad = [""] * width
+    for line in lines[i:]:
+        if "|" not in line:
+            break
+        cells = _split_row(line)
+        if len(cells) != width:
+            cells = (cells + pad)[:width]
+        append(cells)
+    return header, rows, aligns
+
+
+def _bench(rows: int = 10000) -> None:
+    cols = ["序号", "代码", "名称", "最新价", "涨跌幅", "总市值", "所属行业", "备注"]
+    lines = ["|" + "|".join(cols) + "|", "|" + "|".join([":---:"] * len(cols)) + "|"]
+    for k in range(rows):
+        lines.append(f"|{k + 1}|{k:06d}|股票{k}|{10 + k % 97}.{k % 100:02d}|{k % 21 - 10}.5%|{k * 13}亿|行业{k % 31}|A\\|B|")
+    text = "\n".join(lines)
+    start = time.perf_counter()
+    header, data, _ = parse_table(text)
+    elapsed = time.perf_counter() - start
+    print(f"{len(data)} 行 × {len(header)} 列，{len(text) / 1e6:.2f} MB：{elapsed * 1000:.1f} ms")
+
+
+__all__ = ["parse_table"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="GFM 表格解析基准")
+    parser.add_argument("--bench", type=int, default=10000, help="生成并解析的行数")
+    _bench(parser.parse_args().bench)
@@ -0,0 +1,277 @@
+"""
+技能进度事件（NDJSON）共享工具（Aeolus）。
+
+长耗时技能通过 ProgressReporter 向 stderr 输出结构化进度事件，每行一个 JSON 对象，
+且第一个键固定为 "event"，便于后端逐行识别：
+
+    {"event": "stage_started", "ts": 1739950000.12, "source": "theme_detector", "stage": "industries"}
+    {"event": "progress", "ts": ..., "percent": 40, "message": "Scoring themes..."}
+    {"event": "partial", "ts": ..., "text": "……Alice 已返回的部分正文……"}
+
+仅当环境变量 AEOLUS_PROGRESS=ndjson 时输出（后端 runPythonScript 会自动设置），
+命令行直接运行时不改变原有输出。stdout 仍保留给 “描述: <path>” 等文件路径行。
+
+run_streaming() 以逐行回调方式运行子进程，替代 subprocess.run(capture_output=True)：
+子进程的进度事件原样转发，并支持总超时与“无输出”空闲超时（判定卡死后终止子进程）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence, TextIO, Tuple
+
+PROGRESS_ENV = "AEOLUS_PROGRESS"
+PROGRESS_FORMAT = "ndjson"
+EVENT_PREFIX = '{"event":'
+
+EVENT_TYPES = (
+    "stage_started",
+    "stage_finished",
+    "stage_failed",
+    "progress",
+    "partial",
+    "heartbeat",
+)
+
+MAX_PARTIAL_CHARS = 4000
+HEARTBEAT_INTERVAL_SEC = 15.0
+
+
+def progress_enabled() -> bool:
+    return (os.environ.get(PROGRESS_ENV) or "").strip().lower() == PROGRESS_FORMAT
+
+
+def is_event_line(line: str) -> bool:
+    return line.lstrip().startswith(EVENT_PREFIX)
+
+
+def parse_event(line: str) -> Optional[dict]:
+    """解析一行进度事件；非事件行返回 None。"""
+    if not is_event_line(line):
+        return None
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict) or not isinstance(obj.get("event"), str):
+        return None
+    return obj
+
+
+class ProgressReporter:
+    """向 stderr 逐行写出 NDJSON 进度事件（未启用时所有方法均为空操作）。"""
+
+    def __init__(
+        self,
+        source: str = "",
+        stream: Optional[TextIO] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.source = source
+        self._stream = stream
+        self._enabled = progress_enabled() if enabled is None else enabled
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def emit(self, event: str, **fields) -> None:
+        if not self._enabled:
+            return
+        payload: Dict[str, object] = {"event": event, "ts": round(time.time(), 3)}
+        if self.source:
+            payload["source"] = self.source
+        payload.update({k: v for k, v in fields.items() if v is not None})
+        self._write(payload)
+
+    def forward(self, event: dict) -> None:
+        """原样转发子进程事件（保留其 source）。"""
+        if not self._enabled:
+            return
+        payload = {"event": event["event"], **{k: v for k, v in event.items() if k != "event"}}
+        if self.source:
+            payload.setdefault("source", self.source)
+        self._write(payload)
+
+    def _write(self, payload: dict) -> None:
+        line = json.dumps(payload, ensure_ascii=False, default=str)
+        stream = self._stream or sys.stderr
+        with self._lock:
+            stream.write(line + "\n")
+            stream.flush()
+
+    def stage_started(self, stage: str, percent: Optional[float] = None, message: Optional[str] = None) -> None:
+        self.emit("stage_started", stage=stage, percent=percent, message=message)
+
+    def stage_finished(self, stage: str, percent: Optional[float] = None, **fields) -> None:
+        self.emit("stage_finished", stage=stage, percent=percent, **fields)
+
+    def stage_failed(self, stage: str, error: str) -> None:
+        self.emit("stage_failed", stage=stage, error=error)
+
+    def progress(self, percent: float, message: Optional[str] = None, stage: Optional[str] = None) -> None:
+        self.emit("progress", percent=round(float(percent), 1), message=message, stage=stage)
+
+    def partial(self, text: str, stage: Optional[str] = None) -> None:
+        if text:
+            self.emit("partial", text=text[:MAX_PARTIAL_CHARS], stage=stage)
+
+    def heartbeat(self) -> None:
+        self.emit("heartbeat")
+
+    @contextmanager
+    def stage(self, name: str, percent: Optional[float] = None, done_percent: Optional[float] = None) -> Iterator[None]:
+        """阶段上下文：进入时 stage_started，正常退出 stage_finished（含耗时），异常时 stage_failed。"""
+        started = time.time()
+        self.stage_started(name, percent=percent)
+        try:
+            yield
+        except BaseException as exc:
+            self.stage_failed(name, str(exc) or type(exc).__name__)
+            raise
+        self.stage_finished(name, percent=done_percent, elapsed_sec=round(time.time() - started, 2))
+
+
+def get_reporter(source: str = "") -> ProgressReporter:
+    return ProgressReporter(source=source)
+
+
+LineCallback = Callable[[str], None]
+
+
+def run_streaming(
+    cmd: Sequence[str],
+    *,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout_sec: Optional[float] = None,
+    idle_timeout_sec: Optional[float] = None,
+    on_stdout_line: Optional[LineCallback] = None,
+    on_stderr_line: Optional[LineCallback] = None,
+    reporter: Optional[ProgressReporter] = None,
+    tail_chars: Optional[int] = None,
+) -> Tuple[int, str, str]:
+    """运行子进程并逐行回调 stdout/stderr，返回 (returncode, stdout, stderr)。
+
+    - stderr 中的进度事件交给 reporter.forward()，不计入返回的 stderr 文本；
+    - 子进程有任何输出时，reporter 至多每 HEARTBEAT_INTERVAL_SEC 秒发一次 heartbeat，
+      让上游知道子进程仍在工作（子进程静默时不会发心跳，卡死可被上游识别）；
+    - timeout_sec 为总时长上限，idle_timeout_sec 为两次输出之间的最长静默；
+      任一超限即终止子进程并抛出 subprocess.TimeoutExpired；
+    - tail_chars 不为空时每路输出只保留末尾约 tail_chars 个字符（完整内容交给回调处理），
+      内存占用与输出总量无关。
+    """
+    proc = subprocess.Popen(
+        list(cmd),
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+    )
+
+    out_lines: _LineBuffer = _LineBuffer(tail_chars)
+    err_lines: _LineBuffer = _LineBuffer(tail_chars)
+    last_activity = [time.monotonic()]
+    last_heartbeat = [time.monotonic()]
+
+    def _pump(pipe, sink: "_LineBuffer", callback: Optional[LineCallback], is_stderr: bool) -> None:
+        for raw in iter(pipe.readline, ""):
+            now = time.monotonic()
+            last_activity[0] = now
+            if reporter is not None and now - last_heartbeat[0] >= HEARTBEAT_INTERVAL_SEC:
+                last_heartbeat[0] = now
+                reporter.heartbeat()
+            line = raw.rstrip("\r\n")
+            if is_stderr:
+                event = parse_event(line)
+                if event is not None:
+                    if reporter is not None:
+                        reporter.forward(event)
+                    continue
+            sink.append(line)
+            if callback is not None:
+                try:
+                    callback(line)
+                except Exception as exc:  # 回调异常不应中断读取
+                    print(f"[progress_events] 回调失败: {exc}", file=sys.stderr)
+        pipe.close()
+
+    threads = [
+        threading.Thread(target=_pump, args=(proc.stdout, out_lines, on_stdout_line, False), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, err_lines, on_stderr_line, True), daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    started = time.monotonic()
+    limit: Optional[float] = None
+    while True:
+        try:
+            proc.wait(timeout=0.5)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        now = time.monotonic()
+        if timeout_sec and now - started > timeout_sec:
+            limit = timeout_sec
+        elif idle_timeout_sec and now - last_activity[0] > idle_timeout_sec:
+            limit = idle_timeout_sec
+        if limit is not None:
+            proc.kill()
+            proc.wait()
+            for t in threads:
+                t.join(timeout=5)
+            raise subprocess.TimeoutExpired(
+                list(cmd), limit, output=out_lines.text(), stderr=err_lines.text()
+            )
+
+    for t in threads:
+        t.join()
+    return proc.returncode, out_lines.text(), err_lines.text()
+
+
+class _LineBuffer:
+    """按行累积输出；limit 不为空时只保留末尾约 limit 个字符。"""
+
+    def __init__(self, limit: Optional[int] = None):
+        self._limit = limit
+        self._lines: deque = deque()
+        self._size = 0
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+        if self._limit is None:
+            return
+        self._size += len(line) + 1
+        while self._size > self._limit and len(self._lines) > 1:
+            self._size -= len(self._lines.popleft()) + 1
+        if self._size > self._limit:
+            self._lines[0] = self._lines[0][-self._limit :]
+            self._size = len(self._lines[0]) + 1
+
+    def text(self) -> str:
+        return "\n".join(self._lines)
+
+
+__all__ = [
+    "PROGRESS_ENV",
+    "ProgressReporter",
+    "get_reporter",
+    "is_event_line",
+    "parse_event",
+    "progress_enabled",
+    "run_streaming",
+]
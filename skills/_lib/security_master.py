@@ -0,0 +1,447 @@
+"""
+本地证券主表与名称索引（Aeolus 共享层）。
+
+妙想 / Tushare 类技能都要先把问句里的公司名、简称或代码解析成证券代码。原先每次都调用
+实体识别接口（如东方财富 dialogTagsV2），或只认几个写死的别名。本模块维护一份本地主表：
+
+- 每条记录：代码、名称、别名、市场后缀（marketChar：SH / SZ / BJ / HK / O / N …）、
+  classCode；emCode（``600519.SH``）与 Tushare ts_code 由代码 + 市场拼出；
+- 内存中按名称 / 别名 / 代码 / emCode 建哈希索引（按首字符登记键长），对问句做最左最长匹配，
+  一次扫描即可识别多个实体（单次查询为微秒级）；ASCII 键（代码、美股 ticker）要求前后不是字母数字，
+  避免 "T" 之类短代码误命中单词内部；
+- 主表来源：批量导入（CSV / JSON，见 import_file）+ 网络识别结果回填（add），
+  持久化在 ``securities.json``，其他进程写入后按 mtime 自动重载；
+- ReportPeriodCache：按 emCode 持久化报告期列表，披露季（1/3/4/7/8/10 月）缓存 1 天，其余月份 7 天。
+
+默认目录：$AEOLUS_DATA_DIR/security_master，未设置时为仓库 data/security_master。
+SECURITY_MASTER=off 时 lookup 一律未命中（调用方走网络识别）。
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+STORE_VERSION = 1
+TS_MARKETS = ("SH", "SZ", "BJ", "HK", "CSI", "CIC", "SI", "MI")
+DISCLOSURE_MONTHS = (1, 3, 4, 7, 8, 10)
+PERIOD_TTL_DISCLOSURE_SEC = 86400
+PERIOD_TTL_QUIET_SEC = 7 * 86400
+
+_CN_TZ = timezone(timedelta(hours=8))
+_WS_RE = re.compile(r"\s+")
+_SAFE_NAME_RE = re.compile(r"[^0-9A-Za-z._-]+")
+
+
+def master_enabled() -> bool:
+    return (os.environ.get("SECURITY_MASTER") or "").strip().lower() not in ("0", "off", "false", "no")
+
+
+def default_master_dir() -> Path:
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    base = Path(data_dir) if data_dir else REPO_ROOT / "data"
+    return base / "security_master"
+
+
+def normalize_name(text: str) -> str:
+    """全角转半角、合并空白、英文小写：索引键与问句用同一规则归一（空白保留为单词边界）。"""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip().lower()
+
+
+def _normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """逐字符按 normalize_name 的规则归一，同时记录每个归一字符在原文中的下标（末尾追加原文长度）。"""
+    chars: List[str] = []
+    offsets: List[int] = []
+    for i, ch in enumerate(text or ""):
+        for c in unicodedata.normalize("NFKC", ch).lower():
+            if c.isspace():
+                if not chars or chars[-1] == " ":
+                    continue
+                c = " "
+            chars.append(c)
+            offsets.append(i)
+    if chars and chars[-1] == " ":
+        chars.pop()
+        offsets.pop()
+    offsets.append(len(text or ""))
+    return "".join(chars), offsets
+
+
+def _is_ascii_alnum(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+@dataclass
+class Security:
+    code: str
+    name: str
+    market: str = ""
+    class_code: str = ""
+    aliases: List[str] = field(default_factory=list)
+    source: str = ""
+    kind: str = ""  # stock / index / fund，未知为空
+
+    @property
+    def em_code(self) -> str:
+        return f"{self.code}.{self.market}" if self.market else self.code
+
+    @property
+    def ts_code(self) -> Optional[str]:
+        """Tushare 代码；仅沪深京港市场与中证 / 申万等指数有对应代码。"""
+        return f"{self.code}.{self.market}" if self.market in TS_MARKETS else None
+
+    def keys(self) -> List[str]:
+        keys = [self.name, self.code, self.em_code, *self.aliases]
+        return [k for k in dict.fromkeys(normalize_name(k) for k in keys) if k]
+
+
+class NameIndex:
+    """名称索引：键 → 记录下标，并按首字符登记出现过的键长（降序）。
+
+    find_all 在每个位置按键长从长到短查哈希表，得到最左最长匹配，返回 (起点, 终点, 候选记录下标)。
+    与逐字符 Trie 等价，但构建只是一次字典插入，全市场数万条记录的加载开销小得多。
+    """
+
+    def __init__(self) -> None:
+        self._keys: Dict[str, List[int]] = {}
+        self._lengths: Dict[str, List[int]] = {}
+
+    def add(self, key: str, idx: int) -> None:
+        bucket = self._keys.get(key)
+        if bucket is None:
+            self._keys[key] = [idx]
+            lengths = self._lengths.setdefault(key[0], [])
+            if len(key) not in lengths:
+                lengths.append(len(key))
+                lengths.sort(reverse=True)
+        elif idx not in bucket:
+            bucket.append(idx)
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return self._keys
+
+    @classmethod
+    def from_dict(cls, keys: Dict[str, List[int]]) -> "NameIndex":
+        """从持久化的键表恢复（跳过逐条归一化，全市场主表加载只需一次 JSON 解析）。"""
+        index = cls()
+        index._keys = keys
+        lengths: Dict[str, set] = {}
+        for key in keys:
+            lengths.setdefault(key[0], set()).add(len(key))
+        index._lengths = {ch: sorted(ls, reverse=True) for ch, ls in lengths.items()}
+        return index
+
+    def find_all(self, text: str) -> List[Tuple[int, int, List[int]]]:
+        out: List[Tuple[int, int, List[int]]] = []
+        n = len(text)
+        i = 0
+        while i < n:
+            for length in self._lengths.get(text[i], ()):
+                end = i + length
+                if end > n:
+                    continue
+                hits = self._keys.get(text[i:end])
+                if hits and self._bounded(text, i, end):
+                    out.append((i, end, hits))
+                    i = end
+                    break
+            else:
+                i += 1
+        return out
+
+    @staticmethod
+    def _bounded(text: str, start: int, end: int) -> bool:
+        """ASCII 键前后不能紧邻字母数字（600519 不应命中 1600519 的一部分）。
+
+        一两个字母的 ticker（A、T、GE）连中文也不能紧邻，避免 "A股" 命中 A。
+        """
+        key = text[start:end]
+        if key.isascii() and len(key) <= 2 and key.isalpha():
+            adjacent = str.isalnum
+        else:
+            adjacent = _is_ascii_alnum
+        if _is_ascii_alnum(text[start]) and start > 0 and adjacent(text[start - 1]):
+            return False
+        if _is_ascii_alnum(text[end - 1]) and end < len(text) and adjacent(text[end]):
+            return False
+        return True
+
+
+class SecurityMaster:
+    """证券主表：lookup / find_all 走内存索引，add / import_file 写回 securities.json。"""
+
+    def __init__(self, master_dir: Optional[Path] = None):
+        self.master_dir = Path(master_dir) if master_dir else default_master_dir()
+        self.path = self.master_dir / "securities.json"
+        self._lock = threading.RLock()
+        self._records: List[Security] = []
+        self._by_em_code: Dict[str, int] = {}
+        self._index = NameIndex()
+        self._mtime: Optional[float] = None
+        self._reload()
+
+    def __len__(self) -> int:
+        self._maybe_reload()
+        return len(self._records)
+
+    # ── 查询 ──
+
+    def get(self, em_code: str) -> Optional[Security]:
+        self._maybe_reload()
+        idx = self._by_em_code.get(em_code.strip().upper())
+        return self._records[idx] if idx is not None else None
+
+    def find_spans(
+        self, text: str, class_codes: Optional[Iterable[str]] = None
+    ) -> List[Tuple[int, int, Security]]:
+        """问句中每处证券名称的 (起点, 终点, 证券)，下标对应原文；同名多条时按 class_codes 过滤后取首条。"""
+        if not master_enabled():
+            return []
+        self._maybe_reload()
+        allowed = set(class_codes) if class_codes else None
+        normalized, offsets = _normalize_with_offsets(text)
+        spans: List[Tuple[int, int, Security]] = []
+        for start, end, hits in self._index.find_all(normalized):
+            candidates = [self._records[i] for i in hits]
+            if allowed is not None:
+                candidates = [s for s in candidates if s.class_code in allowed]
+            if candidates:
+                spans.append((offsets[start], offsets[end - 1] + 1, candidates[0]))
+        return spans
+
+    def find_all(self, text: str, class_codes: Optional[Iterable[str]] = None) -> List[Security]:
+        """问句中出现的全部证券（按出现顺序去重）。"""
+        found: Dict[str, Security] = {}
+        for _, _, sec in self.find_spans(text, class_codes):
+            found.setdefault(sec.em_code, sec)
+        return list(found.values())
+
+    def lookup(self, text: str, class_codes: Optional[Iterable[str]] = None) -> Optional[Security]:
+        found = self.find_all(text, class_codes)
+        return found[0] if found else None
+
+    # ── 写入 ──
+
+    def add(self, securities: Iterable[Security]) -> int:
+        """按 emCode 合并写入（名称以新值为准，别名取并集），返回新增或变更的条数。"""
+        with self._lock:
+            self._reload()
+            changed = 0
+            for sec in securities:
+                if not sec.code or not sec.name or not isinstance(sec.name, str):
+                    continue
+                sec.aliases = [a for a in sec.aliases if isinstance(a, str) and a.strip()]
+                sec.market = sec.market.strip().lstrip(".").upper()
+                idx = self._by_em_code.get(sec.em_code.upper())
+                if idx is None:
+                    self._append(sec)
+                    changed += 1
+                    continue
+                old = self._records[idx]
+                aliases = list(dict.fromkeys([*old.aliases, *sec.aliases, *([old.name] if old.name != sec.name else [])]))
+                merged = Security(
+                    code=sec.code,
+                    name=sec.name,
+                    market=sec.market,
+                    class_code=sec.class_code or old.class_code,
+                    aliases=aliases,
+                    source=sec.source or old.source,
+                    kind=sec.kind or old.kind,
+                )
+                if merged != old:
+                    self._records[idx] = merged
+                    for key in merged.keys():
+                        self._index.add(key, idx)
+                    changed += 1
+            if changed:
+                self._save()
+            return changed
+
+    def import_file(self, path: Path, source: str = "import") -> int:
+        """导入 CSV / JSON：字段 code、name、market（或 marketChar）、class_code（或 classCode）、aliases（| 分隔）。
+
+        code 可直接写 emCode（600519.SH），此时 market 可省略。
+        """
+        path = Path(path)
+        if path.suffix.lower() == ".json":
+            rows = json.loads(path.read_text(encoding="utf-8-sig"))
+            rows = rows.get("securities", []) if isinstance(rows, dict) else rows
+        else:
+            with path.open(encoding="utf-8-sig", newline="") as fh:
+                rows = list(csv.DictReader(fh))
+        return self.add(_security_from_row(r, source) for r in rows if isinstance(r, dict))
+
+    # ── 持久化 ──
+
+    def _append(self, sec: Security) -> None:
+        idx = len(self._records)
+        self._records.append(sec)
+        self._by_em_code[sec.em_code.upper()] = idx
+        for key in sec.keys():
+            self._index.add(key, idx)
+
+    def _maybe_reload(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            with self._lock:
+                self._reload()
+
+    def _reload(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            mtime, data = None, {}
+        if mtime is not None and mtime == self._mtime:
+            return
+        self._records, self._by_em_code, self._index = [], {}, NameIndex()
+        if isinstance(data, dict) and data.get("version") == STORE_VERSION:
+            for row in data.get("securities", []):
+                try:
+                    sec = Security(**row)
+                except TypeError:
+                    continue
+                self._by_em_code[sec.em_code.upper()] = len(self._records)
+                self._records.append(sec)
+            index = data.get("index")
+            if isinstance(index, dict) and len(self._records) == len(data.get("securities", [])):
+                self._index = NameIndex.from_dict(index)
+            else:
+                for idx, sec in enumerate(self._records):
+                    for key in sec.keys():
+                        self._index.add(key, idx)
+        self._mtime = mtime
+
+    def _save(self) -> None:
+        payload = {
+            "version": STORE_VERSION,
+            "securities": [asdict(s) for s in self._records],
+            "index": self._index.to_dict(),
+        }
+        _atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+        self._mtime = self.path.stat().st_mtime
+
+
+def _security_from_row(row: Dict[str, Any], source: str) -> Security:
+    code = str(row.get("code") or row.get("secuCode") or "").strip()
+    market = str(row.get("market") or row.get("marketChar") or "").strip()
+    if "." in code and not market:
+        code, market = code.rsplit(".", 1)
+    aliases = row.get("aliases") or []
+    if isinstance(aliases, str):
+        aliases = [a.strip() for a in aliases.split("|") if a.strip()]
+    return Security(
+        code=code,
+        name=str(row.get("name") or row.get("shortName") or "").strip(),
+        market=market,
+        class_code=str(row.get("class_code") or row.get("classCode") or "").strip(),
+        aliases=list(aliases),
+        source=str(row.get("source") or source),
+        kind=str(row.get("kind") or ""),
+    )
+
+
+_shared: Dict[str, SecurityMaster] = {}
+_shared_lock = threading.Lock()
+
+
+def get_security_master(master_dir: Optional[Path] = None) -> SecurityMaster:
+    """进程内共享实例（索引只构建一次）。"""
+    key = str(Path(master_dir) if master_dir else default_master_dir())
+    with _shared_lock:
+        master = _shared.get(key)
+        if master is None:
+            master = _shared[key] = SecurityMaster(Path(key))
+        return master
+
+
+class ReportPeriodCache:
+    """报告期列表缓存：report_periods/<emCode>.json，存接口原始条目与抓取时间。"""
+
+    def __init__(self, master_dir: Optional[Path] = None):
+        self.cache_dir = (Path(master_dir) if master_dir else default_master_dir()) / "report_periods"
+
+    @staticmethod
+    def ttl_sec(now: Optional[datetime] = None) -> int:
+        month = (now or datetime.now(_CN_TZ)).month
+        return PERIOD_TTL_DISCLOSURE_SEC if month in DISCLOSURE_MONTHS else PERIOD_TTL_QUIET_SEC
+
+    def get(self, em_code: str) -> Optional[List[Any]]:
+        if not master_enabled():
+            return None
+        try:
+            entry = json.loads(self._path(em_code).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or time.time() - float(entry.get("fetched_at") or 0) > self.ttl_sec():
+            return None
+        items = entry.get("items")
+        return items if isinstance(items, list) and items else None
+
+    def put(self, em_code: str, items: List[Any]) -> None:
+        _atomic_write_text(
+            self._path(em_code),
+            json.dumps({"em_code": em_code, "fetched_at": time.time(), "items": items}, ensure_ascii=False),
+        )
+
+    def _path(self, em_code: str) -> Path:
+        return self.cache_dir / f"{_SAFE_NAME_RE.sub('_', em_code.upper())}.json"
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地证券主表：导入 / 查询")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_import = sub.add_parser("import", help="导入 CSV / JSON 证券列表")
+    p_import.add_argument("path")
+    p_lookup = sub.add_parser("lookup", help="识别问句中的证券")
+    p_lookup.add_argument("text")
+    sub.add_parser("stats", help="主表条数与路径")
+    args = parser.parse_args()
+
+    master = get_security_master()
+    if args.cmd == "import":
+        print(f"导入/更新: {master.import_file(Path(args.path))} 条，共 {len(master)} 条")
+    elif args.cmd == "lookup":
+        for sec in master.find_all(args.text):
+            print(json.dumps({**asdict(sec), "emCode": sec.em_code, "tsCode": sec.ts_code}, ensure_ascii=False))
+    else:
+        print(f"{master.path}: {len(master)} 条")
+
+
+__all__ = [
+    "NameIndex",
+    "ReportPeriodCache",
+    "Security",
+    "SecurityMaster",
+    "default_master_dir",
+    "get_security_master",
+    "master_enabled",
+    "normalize_name",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""Shared fixtures for the skills/_lib tests"""
+
+import os
+import sys
+
+# Add _lib directory to path so shared modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,97 @@
+"""Tests for the multi-entity fan-out helpers of the shared wind_alice_runner."""
+
+import pytest
+
+from wind_alice_runner import _entity_prompt, fanout_template, split_entities
+
+
+def _spans(text, *names):
+    """(start, end, key) spans of each name in text, in order of appearance."""
+    spans = []
+    pos = 0
+    for name in names:
+        start = text.index(name, pos)
+        spans.append((start, start + len(name), name))
+        pos = start + len(name)
+    return spans
+
+
+class TestSplitEntities:
+    def test_separators(self):
+        assert split_entities("贵州茅台,五粮液、泸州老窖；山西汾酒\n洋河股份") == [
+            "贵州茅台",
+            "五粮液",
+            "泸州老窖",
+            "山西汾酒",
+            "洋河股份",
+        ]
+
+    def test_spaced_connectors(self):
+        assert split_entities("AAPL vs MSFT 和 GOOG") == ["AAPL", "MSFT", "GOOG"]
+
+    def test_connector_inside_name_kept(self):
+        assert split_entities("和而泰,与德科技") == ["和而泰", "与德科技"]
+
+    def test_dedup_and_blanks(self):
+        assert split_entities(" 五粮液 ,, 五粮液，") == ["五粮液"]
+        assert split_entities("") == []
+
+
+class TestEntityPrompt:
+    def test_replaces_placeholder(self):
+        assert _entity_prompt("比较 {entity} 的近三年业绩", "五粮液") == "比较 五粮液 的近三年业绩"
+
+    def test_bare_placeholder(self):
+        assert _entity_prompt("{entity}", "贵州茅台") == "贵州茅台"
+
+
+class TestFanoutTemplate:
+    def test_keeps_rest_of_question(self):
+        text = "贵州茅台 和 五粮液 的近三年业绩点评"
+        entities, template = fanout_template(text, _spans(text, "贵州茅台", "五粮液"))
+        assert entities == ["贵州茅台", "五粮液"]
+        assert template == "{entity} 的近三年业绩点评"
+        assert [_entity_prompt(template, e) for e in entities] == [
+            "贵州茅台 的近三年业绩点评",
+            "五粮液 的近三年业绩点评",
+        ]
+
+    def test_enumeration(self):
+        text = "茅台、五粮液、AAPL 的估值"
+        entities, template = fanout_template(text, _spans(text, "茅台", "五粮液", "AAPL"))
+        assert entities == ["茅台", "五粮液", "AAPL"]
+        assert template == "{entity} 的估值"
+
+    @pytest.mark.parametrize(
+        "text,names",
+        [
+            ("比较 贵州茅台 和 五粮液 的近三年业绩", ("贵州茅台", "五粮液")),
+            ("易方达蓝筹精选 vs 兴全合润", ("易方达蓝筹精选", "兴全合润")),
+            ("易方达蓝筹精选VS兴全合润", ("易方达蓝筹精选", "兴全合润")),
+            ("AAPL、MSFT 哪个估值更低", ("AAPL", "MSFT")),
+        ],
+    )
+    def test_comparison_not_split(self, text, names):
+        assert fanout_template(text, _spans(text, *names)) is None
+
+    def test_comparison_word_inside_name_ignored(self):
+        text = "比较科技、五粮液 一页纸报告"
+        entities, template = fanout_template(text, _spans(text, "比较科技", "五粮液"))
+        assert entities == ["比较科技", "五粮液"]
+        assert template == "{entity} 一页纸报告"
+
+    @pytest.mark.parametrize(
+        "text,names",
+        [
+            ("贵州茅台的营收和五粮液的利润", ("贵州茅台", "五粮液")),
+            ("贵州茅台 一页纸投资报告", ("贵州茅台",)),
+            ("今日市场复盘", ()),
+        ],
+    )
+    def test_not_split(self, text, names):
+        assert fanout_template(text, _spans(text, *names)) is None
+
+    def test_same_security_twice_not_split(self):
+        text = "茅台 和 贵州茅台"
+        spans = [(0, 2, "600519.SH"), (5, 9, "600519.SH")]
+        assert fanout_template(text, spans) is None
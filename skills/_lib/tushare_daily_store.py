@@ -0,0 +1,416 @@
+"""
+Tushare 日线本地仓库（Aeolus 共享层）。
+
+Tushare 按积分限频，而大部分查询集中在几百只常用代码上。本模块把 pro.daily 的日线落到本地 SQLite：
+
+- ``daily(ts_code, trade_date)`` 为主键，另建 ``trade_date`` 索引，任意回看区间直接读本地；
+- 缺失交易日按 **trade_date 整市场同步**：一次 ``pro.daily(trade_date=...)`` 拉回当日全部代码
+  （约 5000 行，低于单次 6000 行上限），已同步的日期记在 ``synced_dates``，之后任何代码都不再请求；
+- 缺口超过 BULK_SYNC_MAX_DATES 个交易日（如首次查询多年历史）时改为按代码区间补拉，
+  覆盖区间记在 ``code_ranges``，避免为少数代码拉上千天的整市场数据；
+- 指数（000xxx.SH、399xxx.SZ、.CSI 等）走 index_daily，场内基金（5xxxxx.SH、15/16/18xxxx.SZ）走 fund_daily，
+  两者都不在 daily(trade_date=...) 的整市场数据里，始终按代码区间补拉；
+  指数成分（index_weight，月度快照）按 (指数, 截止日) 缓存；
+- 按代码补拉返回空（代码无数据、权限不足）时不记覆盖区间，下次查询会重新请求；
+- 交易日历（trade_cal，SSE）按年缓存；当天收盘数据未发布时接口返回空，不会记为已同步，
+  10 分钟后再次查询时自动补拉；
+- 相邻两次接口调用间隔至少 TUSHARE_MIN_INTERVAL_SEC 秒，触发限频时退避重试。
+
+默认路径：$AEOLUS_DATA_DIR/tushare/daily.sqlite3，未设置时为仓库 data/tushare/daily.sqlite3。
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+DAILY_COLUMNS = ("ts_code", "trade_date", "open", "high", "low", "close", "pre_close", "change", "pct_chg", "vol", "amount")
+BULK_SYNC_MAX_DATES = int(os.environ.get("TUSHARE_BULK_SYNC_MAX_DATES") or "30")
+MIN_INTERVAL_SEC = float(os.environ.get("TUSHARE_MIN_INTERVAL_SEC") or "0.15")
+MAX_RETRIES = 3
+CODE_FETCH_MAX_DAYS = 8000  # 单代码单次请求的自然日跨度（约 5500 个交易日，低于 6000 行上限）
+CALENDAR_REFRESH_SEC = 7 * 86400
+EMPTY_RETRY_SEC = 600  # 交易日接口返回空（当日数据未发布）后，10 分钟内不再重复请求
+
+INDEX_SUFFIXES = ("CSI", "CIC", "SI", "MI")
+SZ_FUND_PREFIXES = ("15", "16", "18")  # 深市 ETF / LOF / 封闭式基金；沪市场内基金均为 5 开头
+INDEX_WEIGHT_LOOKBACK_DAYS = 45  # index_weight 为月度快照，往前找一个多月内最近的一期
+
+_CN_TZ = timezone(timedelta(hours=8))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily (
+    ts_code TEXT NOT NULL,
+    trade_date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, pre_close REAL,
+    change REAL, pct_chg REAL, vol REAL, amount REAL,
+    PRIMARY KEY (ts_code, trade_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_daily_trade_date ON daily (trade_date);
+CREATE TABLE IF NOT EXISTS synced_dates (
+    trade_date TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS empty_dates (
+    trade_date TEXT PRIMARY KEY,
+    tried_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS code_ranges (
+    ts_code TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    PRIMARY KEY (ts_code, start_date)
+);
+CREATE TABLE IF NOT EXISTS index_weight (
+    index_code TEXT NOT NULL,
+    trade_date TEXT NOT NULL,
+    con_code TEXT NOT NULL,
+    weight REAL,
+    PRIMARY KEY (index_code, trade_date, con_code)
+);
+CREATE TABLE IF NOT EXISTS index_weight_fetches (
+    index_code TEXT NOT NULL,
+    as_of TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (index_code, as_of)
+);
+CREATE TABLE IF NOT EXISTS trade_cal (
+    cal_date TEXT PRIMARY KEY,
+    is_open INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trade_cal_years (
+    year TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def default_db_path() -> Path:
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    base = Path(data_dir) if data_dir else REPO_ROOT / "data"
+    return base / "tushare" / "daily.sqlite3"
+
+
+def today() -> str:
+    return datetime.now(_CN_TZ).strftime("%Y%m%d")
+
+
+def normalize_date(value: Any) -> str:
+    """'2026-04-01' / '20260401' / date → '20260401'。"""
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y%m%d")
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    if len(digits) < 8:
+        raise ValueError(f"无法识别的日期: {value!r}")
+    return digits[:8]
+
+
+def is_index_code(ts_code: str) -> bool:
+    """指数代码：000xxx.SH、399xxx.SZ，或中证 / 申万等指数后缀。"""
+    code, _, market = ts_code.upper().partition(".")
+    if market in INDEX_SUFFIXES:
+        return True
+    return (market == "SH" and code.startswith("000")) or (market == "SZ" and code.startswith("399"))
+
+
+def is_fund_code(ts_code: str) -> bool:
+    """场内基金代码：5xxxxx.SH，或 15 / 16 / 18 开头的 .SZ。"""
+    code, _, market = ts_code.upper().partition(".")
+    return (market == "SH" and code.startswith("5")) or (market == "SZ" and code.startswith(SZ_FUND_PREFIXES))
+
+
+def _code_api(ts_code: str) -> Optional[str]:
+    """按代码补拉时使用的接口；None 表示股票，走整市场 daily 同步。"""
+    if is_index_code(ts_code):
+        return "index_daily"
+    if is_fund_code(ts_code):
+        return "fund_daily"
+    return None
+
+
+def _shift(d: str, days: int) -> str:
+    return (datetime.strptime(d, "%Y%m%d") + timedelta(days=days)).strftime("%Y%m%d")
+
+
+class DailyBarStore:
+    """日线仓库：query() 读取前按需同步缺失交易日。pro 为 tushare.pro_api 实例，未传入时按 token 懒加载。"""
+
+    def __init__(self, db_path: Optional[Path] = None, pro: Any = None, token: str = ""):
+        self.db_path = Path(db_path) if db_path else default_db_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pro = pro
+        self._token = token or (os.environ.get("TUSHARE_TOKEN") or "").strip()
+        self._lock = threading.RLock()
+        self._last_call = 0.0
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.api_calls = 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "DailyBarStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── 查询 ──
+
+    def query(
+        self,
+        ts_codes: Sequence[str],
+        start_date: Any,
+        end_date: Any = None,
+        sync: bool = True,
+    ) -> pd.DataFrame:
+        """返回 [start, end] 内这些代码的日线（按 ts_code、trade_date 升序）。"""
+        codes = list(dict.fromkeys(c.strip().upper() for c in ts_codes if c and c.strip()))
+        start = normalize_date(start_date)
+        end = normalize_date(end_date) if end_date else today()
+        if sync and codes:
+            self.ensure(codes, start, end)
+        return self._read(codes, start, end)
+
+    def query_last(self, ts_codes: Sequence[str], days: int, end_date: Any = None, sync: bool = True) -> pd.DataFrame:
+        """最近 days 个交易日（含 end_date 当天，若为交易日）。"""
+        end = normalize_date(end_date) if end_date else today()
+        return self.query(ts_codes, self.trading_days_back(end, days), end, sync=sync)
+
+    def trading_days_back(self, end: Any, n: int) -> str:
+        """end 及之前的第 n 个交易日（n=1 为 end 当天或之前最近的交易日）。"""
+        end = normalize_date(end)
+        n = max(1, n)
+        dates = self.open_dates(_shift(end, -(n * 7 // 5 + 30)), end)
+        return dates[-n] if len(dates) >= n else (dates[0] if dates else end)
+
+    def open_dates(self, start: str, end: str) -> List[str]:
+        """[start, end] 内的交易日（SSE 日历，按年缓存）。"""
+        self._ensure_calendar(start, end)
+        rows = self._conn.execute(
+            "SELECT cal_date FROM trade_cal WHERE cal_date BETWEEN ? AND ? AND is_open = 1 ORDER BY cal_date",
+            (start, end),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    # ── 同步 ──
+
+    def ensure(self, ts_codes: Sequence[str], start: str, end: str) -> None:
+        """补齐这些代码在 [start, end] 内缺失的交易日：缺口少时整市场按日同步，多时按代码补拉。"""
+        with self._lock:
+            dates = [d for d in self.open_dates(start, end) if d <= today()]
+            if not dates:
+                return
+            stock_codes = []
+            for code in ts_codes:
+                api_name = _code_api(code)
+                if api_name is None:
+                    stock_codes.append(code)
+                    continue
+                gaps = self._code_gaps(code, dates)
+                if gaps:
+                    self._sync_code(code, gaps[0], gaps[-1], api_name=api_name)
+            if not stock_codes:
+                return
+            synced = self._synced_dates(dates[0], dates[-1])
+            missing = [d for d in dates if d not in synced]
+            if len(missing) > BULK_SYNC_MAX_DATES:
+                # 按代码补拉仍为空的代码（停牌、未上市、权限不足）不再为它整市场同步大段日期
+                pending = []
+                for code in stock_codes:
+                    gaps = self._code_gaps(code, missing)
+                    if len(gaps) <= BULK_SYNC_MAX_DATES or self._sync_code(code, gaps[0], gaps[-1]):
+                        pending.append(code)
+                missing = sorted(set().union(*(self._code_gaps(code, missing) for code in pending)))
+            if missing:
+                recent = self._recent_empty_dates()
+                self.sync_dates([d for d in missing if d not in recent])
+
+    def index_members(self, index_code: str, as_of: Any = None) -> List[str]:
+        """截至 as_of 最近一期的指数成分（按权重降序）。"""
+        index_code = index_code.strip().upper()
+        as_of = normalize_date(as_of) if as_of else today()
+        lo = _shift(as_of, -INDEX_WEIGHT_LOOKBACK_DAYS)
+        with self._lock:
+            fetched = self._conn.execute(
+                "SELECT 1 FROM index_weight_fetches WHERE index_code = ? AND as_of = ?", (index_code, as_of)
+            ).fetchone()
+            if not fetched:
+                df = self._call("index_weight", index_code=index_code, start_date=lo, end_date=as_of)
+                with self._conn:
+                    if df is not None and not df.empty:
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO index_weight (index_code, trade_date, con_code, weight) VALUES (?, ?, ?, ?)",
+                            [
+                                (index_code, str(d), str(c), None if pd.isna(w) else float(w))
+                                for d, c, w in zip(df["trade_date"], df["con_code"], df["weight"])
+                            ],
+                        )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO index_weight_fetches (index_code, as_of, fetched_at) VALUES (?, ?, ?)",
+                        (index_code, as_of, time.time()),
+                    )
+        rows = self._conn.execute(
+            "SELECT con_code FROM index_weight WHERE index_code = ? AND trade_date = ("
+            "  SELECT MAX(trade_date) FROM index_weight WHERE index_code = ? AND trade_date BETWEEN ? AND ?"
+            ") ORDER BY weight DESC, con_code",
+            (index_code, index_code, lo, as_of),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def sync_dates(self, dates: Iterable[str]) -> int:
+        """逐个交易日整市场拉取，返回写入行数。接口返回空（尚未发布）的日期不记为已同步。"""
+        total = 0
+        for d in dates:
+            df = self._call("daily", trade_date=d)
+            if df is None or df.empty:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO empty_dates (trade_date, tried_at) VALUES (?, ?)", (d, time.time())
+                    )
+                continue
+            n = self._upsert(df)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO synced_dates (trade_date, rows, synced_at) VALUES (?, ?, ?)",
+                    (d, n, time.time()),
+                )
+            total += n
+        return total
+
+    def _sync_code(self, code: str, start: str, end: str, api_name: str = "daily") -> bool:
+        """按代码分段补拉，返回是否拿到任何数据；返回空的分段不记为已覆盖。"""
+        got_rows = False
+        lo = start
+        while lo <= end:
+            hi = min(end, _shift(lo, CODE_FETCH_MAX_DAYS))
+            df = self._call(api_name, ts_code=code, start_date=lo, end_date=hi)
+            if df is None or df.empty:
+                lo = _shift(hi, 1)
+                continue
+            self._upsert(df)
+            got_rows = True
+            # 当天收盘数据可能尚未发布，按代码的覆盖区间只记到昨天，当天留待下次补拉
+            covered_hi = min(hi, _shift(today(), -1))
+            if covered_hi >= lo:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO code_ranges (ts_code, start_date, end_date) VALUES (?, ?, ?)",
+                        (code, lo, covered_hi),
+                    )
+            lo = _shift(hi, 1)
+        return got_rows
+
+    def _code_gaps(self, code: str, missing: List[str]) -> List[str]:
+        ranges = self._conn.execute(
+            "SELECT start_date, end_date FROM code_ranges WHERE ts_code = ? AND end_date >= ? AND start_date <= ?",
+            (code, missing[0], missing[-1]),
+        ).fetchall()
+        return [d for d in missing if not any(lo <= d <= hi for lo, hi in ranges)]
+
+    def _recent_empty_dates(self) -> set:
+        rows = self._conn.execute(
+            "SELECT trade_date FROM empty_dates WHERE tried_at > ?", (time.time() - EMPTY_RETRY_SEC,)
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def _synced_dates(self, start: str, end: str) -> set:
+        rows = self._conn.execute(
+            "SELECT trade_date FROM synced_dates WHERE trade_date BETWEEN ? AND ?", (start, end)
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def _ensure_calendar(self, start: str, end: str) -> None:
+        now = time.time()
+        current_year = today()[:4]
+        for year in range(int(start[:4]), int(end[:4]) + 1):
+            y = str(year)
+            row = self._conn.execute("SELECT fetched_at FROM trade_cal_years WHERE year = ?", (y,)).fetchone()
+            # 往年日历不变；今年及以后的日历每周刷新一次（临时休市调整）
+            if row and (y < current_year or now - row[0] < CALENDAR_REFRESH_SEC):
+                continue
+            df = self._call("trade_cal", exchange="SSE", start_date=f"{y}0101", end_date=f"{y}1231")
+            if df is None or df.empty:
+                continue
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO trade_cal (cal_date, is_open) VALUES (?, ?)",
+                    [(str(d), int(o)) for d, o in zip(df["cal_date"], df["is_open"])],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO trade_cal_years (year, fetched_at) VALUES (?, ?)", (y, now)
+                )
+
+    # ── 底层 ──
+
+    def _read(self, codes: List[str], start: str, end: str) -> pd.DataFrame:
+        if not codes:
+            return pd.DataFrame(columns=list(DAILY_COLUMNS))
+        placeholders = ",".join("?" * len(codes))
+        sql = (
+            f"SELECT {', '.join(DAILY_COLUMNS)} FROM daily "
+            f"WHERE ts_code IN ({placeholders}) AND trade_date BETWEEN ? AND ? ORDER BY ts_code, trade_date"
+        )
+        return pd.read_sql_query(sql, self._conn, params=[*codes, start, end])
+
+    def _upsert(self, df: pd.DataFrame) -> int:
+        frame = df.reindex(columns=list(DAILY_COLUMNS))
+        frame["trade_date"] = frame["trade_date"].astype(str)
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows: List[Tuple] = list(frame.itertuples(index=False, name=None))
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO daily ({', '.join(DAILY_COLUMNS)}) VALUES ({', '.join('?' * len(DAILY_COLUMNS))})",
+                rows,
+            )
+        return len(rows)
+
+    def _api(self) -> Any:
+        if self._pro is None:
+            if not self._token:
+                raise RuntimeError("未配置 TUSHARE_TOKEN，无法同步日线")
+            import tushare as ts
+
+            self._pro = ts.pro_api(self._token)
+        return self._pro
+
+    def _call(self, api_name: str, **params) -> Optional[pd.DataFrame]:
+        """限频调用 Tushare 接口；触发每分钟限额时退避后重试。"""
+        pro = self._api()
+        for attempt in range(MAX_RETRIES + 1):
+            wait = self._last_call + MIN_INTERVAL_SEC - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+            self.api_calls += 1
+            try:
+                return getattr(pro, api_name)(**params)
+            except Exception as exc:
+                if attempt >= MAX_RETRIES:
+                    raise
+                rate_limited = "每分钟" in str(exc) or "频率" in str(exc)
+                time.sleep(20 * (attempt + 1) if rate_limited else 2 ** attempt)
+        return None
+
+
+__all__ = [
+    "DAILY_COLUMNS",
+    "DailyBarStore",
+    "default_db_path",
+    "is_fund_code",
+    "is_index_code",
+    "normalize_date",
+    "today",
+]
@@ -0,0 +1,96 @@
+"""
+日线衍生指标（Aeolus 共享层）。
+
+输入为多代码长表（ts_code、trade_date、close、pct_chg、amount …），一次 NumPy 计算全部代码：
+按 (ts_code, trade_date) 排序后，滚动窗口用前缀和相减求得，窗口跨越代码边界或含缺失值的位置置 NaN，
+不做逐代码 groupby 循环。
+
+输出列：
+- ``ret``：日收益率（pct_chg / 100，已按除权前收盘价计算）；``log_ret``：对数收益率；
+- ``ma{N}``：收盘价 N 日均线；
+- ``vol{N}``：N 日收益率标准差，年化（× √252）；
+- ``amount_z{N}``：成交额相对过去 N 日均值的 z-score（放量 / 缩量）。
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+MA_WINDOWS = (5, 20, 60)
+VOL_WINDOW = 20
+Z_WINDOW = 20
+TRADING_DAYS_PER_YEAR = 252
+
+
+def warmup_days(ma_windows: Sequence[int] = MA_WINDOWS, vol_window: int = VOL_WINDOW, z_window: int = Z_WINDOW) -> int:
+    """区间起点之前需要额外读取的交易日数，保证区间首日的指标完整。"""
+    return max([*ma_windows, vol_window, z_window]) - 1
+
+
+def _rolling(values: np.ndarray, start: np.ndarray, window: int):
+    """按行返回窗口内 (和, 平方和)；不足 window 行、跨代码或含 NaN 的窗口为 NaN。"""
+    n = len(values)
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    cs = np.concatenate(([0.0], np.cumsum(x)))
+    cs2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    cnt = np.concatenate(([0], np.cumsum(valid)))
+    hi = np.arange(1, n + 1)
+    lo = hi - window
+    ok = (lo >= start) & (lo >= 0)
+    lo = np.clip(lo, 0, None)
+    full = ok & (cnt[hi] - cnt[lo] == window)
+    s = np.where(full, cs[hi] - cs[lo], np.nan)
+    s2 = np.where(full, cs2[hi] - cs2[lo], np.nan)
+    return s, s2
+
+
+def _rolling_mean_std(values: np.ndarray, start: np.ndarray, window: int):
+    s, s2 = _rolling(values, start, window)
+    mean = s / window
+    var = np.clip(s2 / window - mean * mean, 0.0, None) * window / max(window - 1, 1)
+    return mean, np.sqrt(var)
+
+
+def add_indicators(
+    df: pd.DataFrame,
+    ma_windows: Sequence[int] = MA_WINDOWS,
+    vol_window: int = VOL_WINDOW,
+    z_window: int = Z_WINDOW,
+) -> pd.DataFrame:
+    """返回按 (ts_code, trade_date) 升序、追加指标列的新表。"""
+    out = df.sort_values(["ts_code", "trade_date"], kind="mergesort").reset_index(drop=True)
+    if out.empty:
+        for col in ["ret", "log_ret", *(f"ma{w}" for w in ma_windows), f"vol{vol_window}", f"amount_z{z_window}"]:
+            out[col] = pd.Series(dtype="float64")
+        return out
+
+    codes = out["ts_code"].to_numpy()
+    first = np.ones(len(out), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    # 每行所在代码的起始行号
+    start = np.maximum.accumulate(np.where(first, np.arange(len(out)), 0))
+
+    close = out["close"].to_numpy(dtype="float64")
+    ret = out["pct_chg"].to_numpy(dtype="float64") / 100.0
+    amount = out["amount"].to_numpy(dtype="float64")
+
+    out["ret"] = ret
+    out["log_ret"] = np.log1p(ret)
+    for w in ma_windows:
+        out[f"ma{w}"] = _rolling_mean_std(close, start, w)[0]
+    out[f"vol{vol_window}"] = _rolling_mean_std(ret, start, vol_window)[1] * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    # 成交额 z-score：与前 N 日（不含当日）比较
+    prev_amount = np.concatenate(([np.nan], amount[:-1]))
+    prev_amount[first] = np.nan  # 代码首行没有前值，含它的窗口自然无效
+    mean, std = _rolling_mean_std(prev_amount, start, z_window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[f"amount_z{z_window}"] = np.where(std > 0, (amount - mean) / std, np.nan)
+    return out
+
+
+__all__ = ["MA_WINDOWS", "VOL_WINDOW", "Z_WINDOW", "add_indicators", "warmup_days"]
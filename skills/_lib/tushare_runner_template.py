@@ -7,10 +7,18 @@ import os
 import re
 import sys
 import uuid
-from datetime import datetime, timedelta
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from security_master import get_security_master
+from tushare_security_snapshot import ensure_snapshot
+from tushare_daily_store import DailyBarStore, normalize_date, today
+from tushare_indicators import add_indicators, warmup_days
+
 TUSHARE_TOKEN = (os.environ.get("TUSHARE_TOKEN") or "").strip()
+EXCEL_MAX_ROWS = 1_048_575
+PREVIEW_CODES = 20
+_CODE_SPLIT_RE = re.compile(r"[,，;；\s]+")
 
 
 def _require_token() -> None:
@@ -30,35 +38,53 @@ def _require_token() -> None:
     )
 
 
-def _guess_ts_code(query: str) -> str | None:
+def _fallback_ts_code(code: str) -> str:
+    """主表未收录时按代码段推断交易所：5/6/9 开头沪市（5 为沪市场内基金），4/8/92 开头北交所，其余深市。"""
+    if code.startswith(("4", "8", "92")):
+        return f"{code}.BJ"
+    if code.startswith(("5", "6", "9")):
+        return f"{code}.SH"
+    return f"{code}.SZ"
+
+
+def _guess_ts_codes(query: str) -> list[str]:
+    """问句中出现的全部代码（按出现顺序去重）：名称 / 拼音缩写 / 代码在本地全市场主表中最长匹配。"""
     q = query.strip()
-    m = re.search(r"\b(\d{6})\b", q)
-    if m:
-        code = m.group(1)
-        return f"{code}.SH" if code.startswith("6") else f"{code}.SZ"
-    aliases = {
-        "贵州茅台": "600519.SH",
-        "宁德时代": "300750.SZ",
-        "比亚迪": "002594.SZ",
-        "沪深300": "000300.SH",
-        "科创50": "000688.SH",
-    }
-    for name, ts in aliases.items():
-        if name in q:
-            return ts
-    return None
-
-
-def _fetch_daily(ts_code: str, days: int = 30):
-    import tushare as ts
-
-    pro = ts.pro_api(TUSHARE_TOKEN)
-    end = datetime.now().strftime("%Y%m%d")
-    start = (datetime.now() - timedelta(days=days + 30)).strftime("%Y%m%d")
-    df = pro.daily(ts_code=ts_code, start_date=start, end_date=end)
-    if df is None or df.empty:
-        return None
-    return df.sort_values("trade_date", ascending=False).head(days)
+    found = [sec.ts_code for sec in get_security_master().find_all(q) if sec.ts_code]
+    known = {c.split(".")[0] for c in found}
+    for code in re.findall(r"(?<![0-9A-Za-z])(\d{6})(?![0-9A-Za-z])", q):
+        if code not in known:
+            known.add(code)
+            found.append(_fallback_ts_code(code))
+    return list(dict.fromkeys(found))
+
+
+def _guess_ts_code(query: str) -> str | None:
+    codes = _guess_ts_codes(query)
+    return codes[0] if codes else None
+
+
+def _parse_codes(raw: str) -> list[str]:
+    return [c.upper() for c in _CODE_SPLIT_RE.split(raw or "") if c.strip()]
+
+
+def _fetch_bars(store: DailyBarStore, ts_codes: list[str], start: str, end: str):
+    """读取 [start, end] 日线并计算指标；起点前多读 warmup 个交易日，保证首日均线 / 波动率完整。"""
+    warm_start = store.trading_days_back(start, warmup_days() + 1)
+    df = store.query(ts_codes, warm_start, end)
+    if df.empty:
+        return df
+    df = add_indicators(df)
+    return df[df["trade_date"] >= start].reset_index(drop=True)
+
+
+def _preview(df) -> str:
+    latest = df.groupby("ts_code", sort=False).tail(1)
+    cols = ["ts_code", "trade_date", "close", "pct_chg", "ma20", "vol20", "amount_z20"]
+    lines = [latest[cols].head(PREVIEW_CODES).to_string(index=False, float_format=lambda v: f"{v:.4g}")]
+    if len(latest) > PREVIEW_CODES:
+        lines.append(f"…… 其余 {len(latest) - PREVIEW_CODES} 个代码见附件")
+    return "\n".join(lines)
 
 
 def main() -> None:
@@ -68,39 +94,66 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Tushare 金融数据")
     parser.add_argument("query", nargs="?", help="自然语言问句")
     parser.add_argument("--query", dest="query_opt")
+    parser.add_argument("--codes", default="", help="代码列表，逗号或空格分隔，如 600519.SH,000858.SZ")
+    parser.add_argument("--index", default="", help="指数代码，展开为最新成分股，如 000300.SH")
+    parser.add_argument("--start", default="", help="起始日期 YYYYMMDD / YYYY-MM-DD；不传则取最近 --days 个交易日")
+    parser.add_argument("--end", default="", help="截止日期，默认今天")
+    parser.add_argument("--days", type=int, default=30, help="回看交易日数（默认 30）")
     args = parser.parse_args()
     query = (args.query_opt or args.query or "").strip()
-    if not query:
+    if not query and not args.codes and not args.index:
         parser.print_help(sys.stderr)
         sys.exit(1)
 
     _require_token()
-    ts_code = _guess_ts_code(query)
-    if not ts_code:
-        raise RuntimeError("未能从问句中识别股票/指数代码，请包含 6 位代码或常见名称（如 贵州茅台）")
-
-    df = _fetch_daily(ts_code)
+    ts_codes = _parse_codes(args.codes)
+    if query:
+        # 全市场证券列表（股票 / 指数 / 场内基金）每天刷新一次到本地主表
+        ensure_snapshot(TUSHARE_TOKEN)
+        ts_codes += _guess_ts_codes(query)
+    end = normalize_date(args.end) if args.end else today()
+
+    with DailyBarStore(token=TUSHARE_TOKEN) as store:
+        index_members: list[str] = []
+        for index_code in _parse_codes(args.index):
+            members = store.index_members(index_code, end)
+            if not members:
+                raise RuntimeError(f"Tushare 未返回指数成分（{index_code}），请检查 Token 权限与积分")
+            index_members += members
+        ts_codes = list(dict.fromkeys(ts_codes + index_members))
+        if not ts_codes:
+            raise RuntimeError("未能从问句中识别股票/指数/基金代码，请包含名称、拼音缩写或 6 位代码，或使用 --codes / --index")
+        start = normalize_date(args.start) if args.start else store.trading_days_back(end, max(1, args.days))
+        df = _fetch_bars(store, ts_codes, start, end)
     if df is None or df.empty:
-        raise RuntimeError(f"Tushare 未返回数据（{ts_code}），请检查 Token 权限与积分")
+        raise RuntimeError(f"Tushare 未返回数据（{', '.join(ts_codes[:5])}），请检查 Token 权限与积分")
 
     out_dir = Path.cwd() / "miaoxiang" / "Tushare_FinData"
     out_dir.mkdir(parents=True, exist_ok=True)
     suffix = uuid.uuid4().hex[:8]
-    xlsx_path = out_dir / f"Tushare_{ts_code.replace('.', '_')}_{suffix}.xlsx"
-    df.to_excel(xlsx_path, index=False)
+    label = ts_codes[0].replace(".", "_") if len(ts_codes) == 1 else f"{len(ts_codes)}codes"
+    if len(df) <= EXCEL_MAX_ROWS:
+        data_path = out_dir / f"Tushare_{label}_{suffix}.xlsx"
+        df.to_excel(data_path, index=False)
+    else:
+        data_path = out_dir / f"Tushare_{label}_{suffix}.csv"
+        df.to_csv(data_path, index=False, encoding="utf-8-sig")
 
     desc_path = out_dir / f"Tushare_{suffix}_description.txt"
-    preview = df.head(10).to_string(index=False)
+    returned = df["ts_code"].nunique()
     desc_path.write_text(
         "\n".join([
-            f"Tushare Pro · {ts_code}",
+            f"Tushare Pro · {ts_codes[0] if len(ts_codes) == 1 else f'{len(ts_codes)} 个代码'}",
             "=" * 40,
-            f"查询: {query}",
+            f"查询: {query or args.codes or args.index}",
+            f"区间: {start} ~ {end}（有数据代码 {returned}/{len(ts_codes)}）",
+            "",
+            "指标：ret/log_ret 日收益率，ma5/ma20/ma60 均线，vol20 20 日年化波动率，amount_z20 成交额 20 日 z-score",
             "",
-            "最近交易日行情（预览）：",
-            preview,
+            "各代码最新交易日（预览）：",
+            _preview(df),
             "",
-            f"完整数据见附件 Excel（{len(df)} 行）",
+            f"完整数据见附件（长表，{len(df)} 行，每行一个代码一个交易日）",
             "",
             "官方 Agent Skill: npx skills add https://github.com/waditu-tushare/skills --skill tushare-data -y",
         ]),
@@ -108,7 +161,7 @@ def main() -> None:
     )
 
     print(f"描述: {desc_path}")
-    print(str(xlsx_path.resolve()))
+    print(str(data_path.resolve()))
 
 
 if __name__ == "__main__":
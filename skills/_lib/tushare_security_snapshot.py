@@ -0,0 +1,125 @@
+"""
+Tushare 全市场证券快照 → 本地证券主表（Aeolus 共享层）。
+
+把 stock_basic（沪深京上市股票，含拼音缩写 cnspell 与公司全称）、index_basic（上交所 / 深交所 / 中证指数）
+与 fund_basic（场内基金）写入 security_master，供名称 / 拼音缩写 / 代码的最长匹配识别使用。
+
+- 每个北京时间自然日至多刷新一次，刷新日期记在 ``<主表目录>/tushare_snapshot.json``；
+- 刷新失败（Token 权限不足、网络异常）不影响查询，沿用已有主表，一小时后再重试；
+- 记录写入顺序为 股票 → 指数 → 基金，同名 / 同代码（如 000001）时优先识别为股票。
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from security_master import Security, SecurityMaster, get_security_master
+
+A_SHARE_CLASS_CODE = "002001"  # 与东方财富实体识别的 classCode 一致（沪深京）
+INDEX_MARKETS = ("SSE", "SZSE", "CSI")
+RETRY_AFTER_FAILURE_SEC = 3600
+
+_CN_TZ = timezone(timedelta(hours=8))
+
+
+def _state_path(master: SecurityMaster) -> Path:
+    return master.master_dir / "tushare_snapshot.json"
+
+
+def _write_state(master: SecurityMaster, state: Dict[str, Any]) -> None:
+    path = _state_path(master)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+
+
+def _read_state(master: SecurityMaster) -> Dict[str, Any]:
+    try:
+        state = json.loads(_state_path(master).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def snapshot_is_fresh(master: Optional[SecurityMaster] = None) -> bool:
+    master = master or get_security_master()
+    return _read_state(master).get("fetched_date") == datetime.now(_CN_TZ).strftime("%Y%m%d")
+
+
+def _split(ts_code: str):
+    code, _, market = str(ts_code).partition(".")
+    return code, market
+
+
+def _rows(df) -> List[Dict[str, Any]]:
+    if df is None or df.empty:
+        return []
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def fetch_snapshot(pro: Any) -> List[Security]:
+    """拉取全市场快照并转换为主表记录（股票 → 指数 → 基金）。"""
+    out: List[Security] = []
+    stocks = pro.stock_basic(exchange="", list_status="L", fields="ts_code,symbol,name,cnspell,fullname")
+    for row in _rows(stocks):
+        code, market = _split(row["ts_code"])
+        aliases = [a for a in (row.get("cnspell"), row.get("fullname")) if a]
+        out.append(Security(code, row["name"], market, A_SHARE_CLASS_CODE, aliases, "tushare", "stock"))
+    for market_name in INDEX_MARKETS:
+        indices = pro.index_basic(market=market_name, fields="ts_code,name,fullname")
+        for row in _rows(indices):
+            code, market = _split(row["ts_code"])
+            aliases = [row["fullname"]] if row.get("fullname") else []
+            out.append(Security(code, row["name"], market, "", aliases, "tushare", "index"))
+    funds = pro.fund_basic(market="E", status="L", fields="ts_code,name")
+    for row in _rows(funds):
+        code, market = _split(row["ts_code"])
+        out.append(Security(code, row["name"], market, "", [], "tushare", "fund"))
+    return [s for s in out if s.code and s.name]
+
+
+def refresh_snapshot(pro: Any, master: Optional[SecurityMaster] = None) -> int:
+    """拉取快照写入主表，返回新增或变更的记录数。"""
+    master = master or get_security_master()
+    securities = fetch_snapshot(pro)
+    changed = master.add(securities)
+    kinds: Dict[str, int] = {}
+    for s in securities:
+        kinds[s.kind] = kinds.get(s.kind, 0) + 1
+    _write_state(
+        master, {"fetched_date": datetime.now(_CN_TZ).strftime("%Y%m%d"), "fetched_at": time.time(), "counts": kinds}
+    )
+    return changed
+
+
+def ensure_snapshot(token: str, master: Optional[SecurityMaster] = None, pro: Any = None) -> bool:
+    """当日快照未刷新时刷新；成功或无需刷新返回 True，失败返回 False（调用方沿用现有主表）。"""
+    master = master or get_security_master()
+    if snapshot_is_fresh(master):
+        return True
+    state = _read_state(master)
+    if time.time() - float(state.get("failed_at") or 0) < RETRY_AFTER_FAILURE_SEC:
+        return False
+    try:
+        if pro is None:
+            if not token:
+                return False
+            import tushare as ts
+
+            pro = ts.pro_api(token)
+        refresh_snapshot(pro, master)
+        return True
+    except Exception as exc:
+        print(f"[tushare_security_snapshot] 证券列表刷新失败，沿用本地主表: {exc}", file=sys.stderr)
+        try:
+            _write_state(master, {**state, "failed_at": time.time(), "error": str(exc)[:200]})
+        except OSError:
+            pass
+        return False
+
+
+__all__ = ["ensure_snapshot", "fetch_snapshot", "refresh_snapshot", "snapshot_is_fresh"]
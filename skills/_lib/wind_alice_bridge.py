@@ -0,0 +1,221 @@
+"""
+常驻 Alice 运行时客户端（Aeolus）。
+
+wind_alice_runner 默认通过本模块把提问交给常驻的 Node 进程
+（skills/wind-alice-runtime/scripts/alice-server.mjs）执行，而不是每次启动
+``node wind-alice.mjs``：省去 Node 启动与模块加载，并复用 HTTP keep-alive 连接。
+
+- 服务端监听 127.0.0.1 随机端口，连接信息（含随机 token）写在状态文件
+  $AEOLUS_DATA_DIR/wind_alice/server.json（未设置时为仓库 data/wind_alice/server.json）；
+- 首次调用时若服务端未运行则自动拉起，空闲 WIND_ALICE_SERVER_IDLE_SEC 秒（默认 900）后自动退出；
+- 每次提问独占一个 TCP 连接；断开连接即取消（服务端中止 HTTP 流），
+  总超时 / 空闲超时与 run_streaming 语义一致，超限抛出 subprocess.TimeoutExpired；
+- 设置 WIND_ALICE_TRANSPORT=cli 可强制回退到每次提问启动 node 的旧方式。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from progress_events import HEARTBEAT_INTERVAL_SEC, ProgressReporter, _LineBuffer
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVER_SCRIPT = REPO_ROOT / "skills" / "wind-alice-runtime" / "scripts" / "alice-server.mjs"
+
+TRANSPORT_ENV = "WIND_ALICE_TRANSPORT"
+STARTUP_TIMEOUT_SEC = 15.0
+CONNECT_TIMEOUT_SEC = 3.0
+POLL_INTERVAL_SEC = 0.5
+RECV_BYTES = 64 * 1024
+
+
+class BridgeUnavailable(RuntimeError):
+    """常驻进程无法连接或启动（调用方应回退到 CLI 方式）。"""
+
+
+def bridge_enabled() -> bool:
+    return (os.environ.get(TRANSPORT_ENV) or "").strip().lower() != "cli"
+
+
+def default_state_file() -> Path:
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    base = Path(data_dir) if data_dir else REPO_ROOT / "data"
+    return base / "wind_alice" / "server.json"
+
+
+def _read_state(state_file: Path) -> Optional[Dict]:
+    try:
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or not state.get("port") or not state.get("token"):
+        return None
+    return state
+
+
+def _connect(state: Dict, timeout: float = CONNECT_TIMEOUT_SEC) -> socket.socket:
+    return socket.create_connection((state.get("host") or "127.0.0.1", int(state["port"])), timeout=timeout)
+
+
+def _ping(state: Dict) -> bool:
+    try:
+        with _connect(state) as sock:
+            sock.sendall((json.dumps({"token": state["token"], "op": "ping"}) + "\n").encode("utf-8"))
+            data = b""
+            while b"\n" not in data:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        frame = json.loads(data.split(b"\n", 1)[0].decode("utf-8"))
+        return frame.get("type") == "pong"
+    except (OSError, ValueError):
+        return False
+
+
+def _spawn_server(state_file: Path, env: Optional[Dict[str, str]] = None) -> None:
+    if not SERVER_SCRIPT.is_file():
+        raise BridgeUnavailable(f"未找到 Alice 常驻进程脚本: {SERVER_SCRIPT}")
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+    else:
+        kwargs["start_new_session"] = True
+    try:
+        subprocess.Popen(
+            ["node", str(SERVER_SCRIPT), "--state-file", str(state_file)],
+            cwd=str(SERVER_SCRIPT.parent),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **kwargs,
+        )
+    except OSError as exc:
+        raise BridgeUnavailable(f"无法启动 Alice 常驻进程: {exc}") from exc
+
+
+def ensure_server(state_file: Optional[Path] = None, env: Optional[Dict[str, str]] = None) -> Dict:
+    """返回可用的服务端连接信息；未运行时拉起并等待就绪。"""
+    state_file = state_file or default_state_file()
+    state = _read_state(state_file)
+    if state and _ping(state):
+        return state
+
+    stale_pid = state.get("pid") if state else None
+    _spawn_server(state_file, env=env)
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SEC
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        state = _read_state(state_file)
+        if state and state.get("pid") != stale_pid and _ping(state):
+            return state
+    raise BridgeUnavailable(f"Alice 常驻进程 {STARTUP_TIMEOUT_SEC:.0f}s 内未就绪")
+
+
+def run_prompt(
+    prompt: str,
+    skill: str,
+    *,
+    cwd: str,
+    api_key: str = "",
+    env: Optional[Dict[str, str]] = None,
+    timeout_sec: Optional[float] = None,
+    idle_timeout_sec: Optional[float] = None,
+    on_stdout_line=None,
+    on_stderr_line=None,
+    reporter: Optional[ProgressReporter] = None,
+    tail_chars: Optional[int] = None,
+    state_file: Optional[Path] = None,
+) -> Tuple[int, str, str]:
+    """经常驻进程执行一次提问，返回 (returncode, stdout, stderr)，行为与 run_streaming 运行 CLI 一致。
+
+    连接 / 启动失败抛出 BridgeUnavailable（此时尚未产生任何输出，可安全回退）；
+    超时抛出 subprocess.TimeoutExpired，并断开连接让服务端取消本次提问。
+    """
+    state = ensure_server(state_file, env=env)
+    request = {
+        "token": state["token"],
+        "prompt": prompt,
+        "skill": skill,
+        "cwd": cwd,
+        "api_key": api_key,
+        "timeout_sec": timeout_sec or 0,
+    }
+    try:
+        sock = _connect(state)
+        sock.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+    except OSError as exc:
+        raise BridgeUnavailable(f"无法连接 Alice 常驻进程: {exc}") from exc
+
+    out_lines = _LineBuffer(tail_chars)
+    err_lines = _LineBuffer(tail_chars)
+    sinks = {"stdout": (out_lines, on_stdout_line), "stderr": (err_lines, on_stderr_line)}
+    returncode: Optional[int] = None
+    started = last_activity = last_heartbeat = time.monotonic()
+    pending = b""
+
+    def _dispatch(frame: Dict) -> None:
+        sink, callback = sinks[frame["type"]]
+        for line in str(frame.get("text", "")).split("\n"):
+            line = line.rstrip("\r")
+            sink.append(line)
+            if callback is not None:
+                try:
+                    callback(line)
+                except Exception as exc:  # 回调异常不应中断读取
+                    print(f"[wind_alice_bridge] 回调失败: {exc}", file=sys.stderr)
+
+    with sock:
+        sock.settimeout(POLL_INTERVAL_SEC)
+        while returncode is None:
+            try:
+                chunk = sock.recv(RECV_BYTES)
+            except socket.timeout:
+                chunk = None
+            except OSError as exc:
+                raise RuntimeError(f"Alice 常驻进程连接中断: {exc}") from exc
+
+            now = time.monotonic()
+            if chunk == b"":
+                raise RuntimeError("Alice 常驻进程意外断开连接")
+            if chunk:
+                last_activity = now
+                pending += chunk
+                *frames, pending = pending.split(b"\n")
+                for raw in frames:
+                    if not raw.strip():
+                        continue
+                    frame = json.loads(raw.decode("utf-8", errors="replace"))
+                    if frame.get("type") == "exit":
+                        returncode = int(frame.get("code", 1))
+                        break
+                    if frame.get("type") in sinks:
+                        _dispatch(frame)
+                if reporter is not None and now - last_heartbeat >= HEARTBEAT_INTERVAL_SEC:
+                    last_heartbeat = now
+                    reporter.heartbeat()
+                continue
+
+            limit = None
+            if timeout_sec and now - started > timeout_sec:
+                limit = timeout_sec
+            elif idle_timeout_sec and now - last_activity > idle_timeout_sec:
+                limit = idle_timeout_sec
+            if limit is not None:
+                raise subprocess.TimeoutExpired(
+                    ["alice-server", skill, prompt], limit, output=out_lines.text(), stderr=err_lines.text()
+                )
+
+    return returncode, out_lines.text(), err_lines.text()
+
+
+__all__ = ["BridgeUnavailable", "bridge_enabled", "default_state_file", "ensure_server", "run_prompt"]
@@ -0,0 +1,212 @@
+"""
+万得 Wind Alice 分析结果缓存（Aeolus 共享层）。
+
+Alice 报告生成一次需要数分钟，同一交易日内不同用户常提出相同问题。run_alice 先按
+(alice_skill, 规范化问句, 时间桶) 查缓存，命中时直接还原描述文件正文与附件：
+
+- 条目 ``entries/<key[:2]>/<key>.json``：正文文本 + 附件清单（文件名、sha256、大小）；
+- 附件按内容寻址存放在 ``blobs/<sha[:2]>/<sha>``，不同问句产出的相同文件只存一份；
+- 时间桶默认按交易日（北京时间，周末归入上周五），也可按自然日 / 小时，
+  由 WIND_ALICE_CACHE_BUCKET（trading_day / day / hour）或调用方指定；
+- WIND_ALICE_CACHE=off 全局关闭；单次请求可用 use_cache=False（CLI 参数 --no-cache）绕过；
+- 超过 WIND_ALICE_CACHE_DAYS 天（默认 30）的条目与不再被引用的附件每天至多清理一次。
+
+默认目录：$AEOLUS_DATA_DIR/wind_alice/cache，未设置时为仓库 data/wind_alice/cache。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+CACHE_VERSION = 1
+BUCKET_MODES = ("trading_day", "day", "hour")
+DEFAULT_BUCKET = (os.environ.get("WIND_ALICE_CACHE_BUCKET") or "trading_day").strip().lower()
+MAX_AGE_DAYS = int(os.environ.get("WIND_ALICE_CACHE_DAYS") or "30")
+PRUNE_INTERVAL_SEC = 86400
+HASH_CHUNK_BYTES = 1024 * 1024
+
+_CN_TZ = timezone(timedelta(hours=8))
+_WS_RE = re.compile(r"\s+")
+
+
+def cache_enabled() -> bool:
+    return (os.environ.get("WIND_ALICE_CACHE") or "").strip().lower() not in ("0", "off", "false", "no")
+
+
+def default_cache_dir() -> Path:
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    base = Path(data_dir) if data_dir else REPO_ROOT / "data"
+    return base / "wind_alice" / "cache"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """全角转半角、合并空白、英文小写：仅排版不同的问句命中同一条目。"""
+    text = unicodedata.normalize("NFKC", prompt or "")
+    return _WS_RE.sub(" ", text).strip().lower()
+
+
+def time_bucket(mode: str = DEFAULT_BUCKET, now: Optional[datetime] = None) -> str:
+    now = (now or datetime.now(_CN_TZ)).astimezone(_CN_TZ)
+    if mode == "hour":
+        return now.strftime("%Y%m%d%H")
+    day = now.date()
+    if mode == "trading_day" and day.weekday() >= 5:
+        day -= timedelta(days=day.weekday() - 4)
+    return day.strftime("%Y%m%d")
+
+
+def cache_key(alice_skill: str, prompt: str, bucket: str) -> str:
+    raw = json.dumps([CACHE_VERSION, alice_skill.strip(), normalize_prompt(prompt), bucket], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _unique_path(directory: Path, name: str) -> Path:
+    """与 wind-alice CLI 相同的冲突规则：已存在时追加 " (1)"、" (2)" …"""
+    candidate = directory / name
+    if not candidate.exists():
+        return candidate
+    stem, suffix = Path(name).stem, Path(name).suffix
+    for i in range(1, 1000):
+        candidate = directory / f"{stem} ({i}){suffix}"
+        if not candidate.exists():
+            return candidate
+    return directory / f"{stem}.{int(time.time() * 1000)}{suffix}"
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class AliceResultCache:
+    """Alice 结果缓存：lookup 命中时把附件复制到输出目录，store 在分析成功后写入。"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, bucket_mode: str = DEFAULT_BUCKET):
+        if bucket_mode not in BUCKET_MODES:
+            raise ValueError(f"未知的缓存时间桶: {bucket_mode}（可选 {', '.join(BUCKET_MODES)}）")
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.bucket_mode = bucket_mode
+
+    def key_for(self, alice_skill: str, prompt: str, now: Optional[datetime] = None) -> str:
+        """在请求开始时计算一次：耗时较长的分析跨越时间桶边界时仍写回同一条目。"""
+        return cache_key(alice_skill, prompt, time_bucket(self.bucket_mode, now))
+
+    def lookup(self, key: str, out_dir: Path) -> Optional[Dict]:
+        """命中返回 {"body", "attachments": [Path], "created_at"}；未命中或附件缺失返回 None。"""
+        entry = self._read_entry(key)
+        if entry is None:
+            return None
+        blobs = [(self._blob_path(a["sha256"]), a["name"]) for a in entry.get("attachments", [])]
+        if any(not blob.is_file() for blob, _ in blobs):
+            return None
+        out_dir.mkdir(parents=True, exist_ok=True)
+        restored: List[Path] = []
+        for blob, name in blobs:
+            target = _unique_path(out_dir, name)
+            shutil.copyfile(blob, target)
+            restored.append(target)
+        return {"body": entry.get("body", ""), "attachments": restored, "created_at": entry.get("created_at")}
+
+    def store(self, key: str, body: str, attachments: Sequence[Path], **meta) -> None:
+        """写入条目；meta（alice_skill、prompt 等）仅用于排查，不参与查找。"""
+        items = []
+        for path in attachments:
+            sha = file_sha256(path)
+            blob = self._blob_path(sha)
+            if not blob.is_file():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_name(f"{sha}.{os.getpid()}.{threading.get_ident()}.tmp")
+                shutil.copyfile(path, tmp)
+                os.replace(tmp, blob)
+            items.append({"name": path.name, "sha256": sha, "size": blob.stat().st_size})
+        entry = {
+            "version": CACHE_VERSION,
+            **meta,
+            "created_at": datetime.now(_CN_TZ).isoformat(timespec="seconds"),
+            "body": body,
+            "attachments": items,
+        }
+        _atomic_write_text(self._entry_path(key), json.dumps(entry, ensure_ascii=False))
+        self._maybe_prune()
+
+    def prune(self, max_age_days: int = MAX_AGE_DAYS) -> int:
+        """删除过期条目与不再被任何条目引用的附件，返回删除的条目数。"""
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        referenced = set()
+        for path in (self.cache_dir / "entries").glob("*/*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+                    continue
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            referenced.update(a.get("sha256") for a in entry.get("attachments", []))
+        # 刚写入、条目尚未落盘的附件（并发 store）留一小时余量
+        orphan_cutoff = time.time() - 3600
+        for blob in (self.cache_dir / "blobs").glob("*/*"):
+            try:
+                if blob.name not in referenced and blob.stat().st_mtime < orphan_cutoff:
+                    blob.unlink()
+            except OSError:
+                continue
+        return removed
+
+    def _maybe_prune(self) -> None:
+        marker = self.cache_dir / ".last_prune"
+        try:
+            if time.time() - marker.stat().st_mtime < PRUNE_INTERVAL_SEC:
+                return
+        except OSError:
+            pass
+        _atomic_write_text(marker, str(int(time.time())))
+        self.prune()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / "entries" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, sha: str) -> Path:
+        return self.cache_dir / "blobs" / sha[:2] / sha
+
+    def _read_entry(self, key: str) -> Optional[Dict]:
+        try:
+            entry = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            return None
+        return entry
+
+
+__all__ = [
+    "AliceResultCache",
+    "cache_enabled",
+    "cache_key",
+    "default_cache_dir",
+    "normalize_prompt",
+    "time_bucket",
+]
@@ -3,6 +3,12 @@
 
 通过内嵌的 skills/wind-alice-runtime 调用 Alice，将流式分析结果写入描述文件；
 若 Alice 返回可下载附件（xlsx/md 等），下载到同目录供前端预览。
+Alice 的输出逐行读取：agentResult.value 片段与“已保存：”附件行到达即解析，正文增量追加到
+描述文件，同时以 NDJSON 进度事件（progress_events）转发给后端；内存占用与报告长度无关。
+提问默认交给常驻 Alice 进程（wind_alice_bridge）执行，无法连接时回退为每次启动 node CLI。
+同一交易日内的相同问句直接由结果缓存（wind_alice_cache）还原正文与附件，--no-cache 可绕过。
+多标的问句可用 --entities（配合含 {entity} 的问句模板）或 --fanout（按证券主表识别问句中并列的标的）
+拆成逐标的提问并发执行（run_alice_fanout），结果合并为一个描述文件。
 """
 
 from __future__ import annotations
@@ -10,11 +16,18 @@ from __future__ import annotations
 import argparse
 import os
 import re
+import shutil
 import subprocess
 import sys
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+import wind_alice_bridge
+from wind_alice_cache import AliceResultCache, DEFAULT_BUCKET, cache_enabled
+from progress_events import get_reporter, run_streaming
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 ALICE_ROOT = REPO_ROOT / "skills" / "wind-alice-runtime"
@@ -22,9 +35,24 @@ ALICE_CLI = ALICE_ROOT / "scripts" / "wind-alice.mjs"
 
 WIND_API_KEY = (os.environ.get("WIND_API_KEY") or "").strip()
 DEFAULT_TIMEOUT_SEC = int(os.environ.get("WIND_ALICE_TIMEOUT_SEC") or "1800")
+# Alice 连续无任何输出的最长秒数，0 表示不限制
+IDLE_TIMEOUT_SEC = int(os.environ.get("WIND_ALICE_IDLE_TIMEOUT_SEC") or "0")
+# 多标的拆分时同时进行的 Alice 提问数
+FANOUT_CONCURRENCY = int(os.environ.get("WIND_ALICE_FANOUT_CONCURRENCY") or "4")
 
 AGENT_VALUE_PREFIX = "agentResult.value:"
 FILE_SAVED_RE = re.compile(r"已保存[：:]\s*(.+?)\s*$")
+ENTITY_SPLIT_RE = re.compile(r"\s+(?:vs\.?|VS\.?|Vs\.?|对比|和|与)\s+|[,，、;；\n]+")
+# 并列标的之间只允许出现的连接词与标点
+ENTITY_JOINER_RE = re.compile(r"(?:\s|以及|和|与|及|跟|[,，、;；/])*")
+# 比较类问句（“A vs B”、“比较 A 和 B”）要的是横向结论，逐标的拆开会丢失比较，不拆分
+COMPARISON_RE = re.compile(r"比较|对比|相比|比一比|差异|优劣|孰|哪个|哪只|哪家|(?<![a-z])(?:vs|pk)(?![a-z])", re.IGNORECASE)
+ENTITY_PLACEHOLDER = "{entity}"
+
+# 未出现 agentResult.value 时，按原文兜底保留的 stdout 上限（字符）
+RAW_FALLBACK_MAX_CHARS = 256 * 1024
+# 报错信息 / stderr 回显保留的末尾字符数
+OUTPUT_TAIL_CHARS = 64 * 1024
 
 
 def _require_wind_key() -> None:
@@ -48,54 +76,105 @@ def _default_output_dir(subdir: str) -> Path:
     return Path.cwd() / "miaoxiang" / subdir
 
 
-def _extract_alice_text(stdout: str) -> str:
-    chunks: List[str] = []
-    for line in (stdout or "").splitlines():
+class AliceStreamParser:
+    """逐行解析 wind-alice CLI 输出，正文增量追加到描述文件。
+
+    stdout 中以 ``agentResult.value:`` 开头的行开启一个正文片段，其后的续行（多行文本值）
+    归入同一片段，直到下一个片段或 CLI 打印的事件 JSON 块（单独一行 ``{``）；片段之间以空行分隔。
+    stderr 中的 ``已保存：<path>`` 行即时登记为附件。
+    """
+
+    def __init__(
+        self,
+        out: TextIO,
+        reporter=None,
+        raw_fallback_max_chars: int = RAW_FALLBACK_MAX_CHARS,
+        stage: str = "alice",
+    ):
+        self._out = out
+        self._reporter = reporter
+        self._stage = stage
+        self._raw_max = raw_fallback_max_chars
+        self._raw: List[str] = []
+        self._raw_size = 0
+        self._in_value = False
+        self.chunk_count = 0
+        self.attachments: List[Path] = []
+        self._seen_attachments: set = set()
+
+    @property
+    def has_body(self) -> bool:
+        return self.chunk_count > 0
+
+    def feed_stdout(self, line: str) -> None:
         if line.startswith(AGENT_VALUE_PREFIX):
-            chunks.append(line[len(AGENT_VALUE_PREFIX) :].strip())
-    if chunks:
-        return "\n\n".join(chunks).strip()
-    trimmed = (stdout or "").strip()
-    if trimmed and not trimmed.startswith("status:") and "headers:" not in trimmed[:200]:
-        return trimmed
-    return ""
-
-
-def _extract_downloaded_files(stderr: str) -> List[Path]:
-    found: List[Path] = []
-    seen = set()
-    for line in (stderr or "").splitlines():
+            self._start_chunk(line[len(AGENT_VALUE_PREFIX) :].strip())
+            return
+        if self._in_value:
+            if line == "{" or line.startswith("status:"):
+                self._in_value = False
+            else:
+                self._write(f"\n{line}")
+                if self._reporter is not None:
+                    self._reporter.partial(line, stage=self._stage)
+                return
+        if not self.chunk_count and self._raw_size < self._raw_max:
+            self._raw.append(line)
+            self._raw_size += len(line) + 1
+
+    def feed_stderr(self, line: str) -> None:
         m = FILE_SAVED_RE.search(line.strip())
         if not m:
-            continue
+            return
         raw = m.group(1).strip().strip('"').strip("'")
         if not raw:
-            continue
+            return
         p = Path(raw)
         key = str(p.resolve()) if p.exists() else raw
-        if key in seen:
-            continue
-        seen.add(key)
+        if key in self._seen_attachments:
+            return
+        self._seen_attachments.add(key)
         if p.is_file():
-            found.append(p)
-    return found
-
-
-def _split_body_and_attachments(text: str, files: List[Path]) -> Tuple[str, List[Path]]:
-    body = (text or "").strip()
-    if not body and files:
-        return "", files
-    return body, files
-
-
-def run_alice(
-    query: str,
-    alice_skill: str,
-    skill_label: str,
-    output_subdir: str,
-    timeout_sec: int = DEFAULT_TIMEOUT_SEC,
-    output_dir: Optional[Path] = None,
-) -> Path:
+            self.attachments.append(p)
+            if self._reporter is not None:
+                self._reporter.emit("progress", stage="download", message=f"已保存：{p}")
+
+    def raw_fallback_text(self) -> str:
+        """从未出现 agentResult.value 时的兜底正文（与旧版整段解析规则一致）。"""
+        if self.chunk_count:
+            return ""
+        trimmed = "\n".join(self._raw).strip()[: self._raw_max]
+        if trimmed and not trimmed.startswith("status:") and "headers:" not in trimmed[:200]:
+            return trimmed
+        return ""
+
+    def _start_chunk(self, text: str) -> None:
+        if not self.chunk_count:
+            self._raw = []
+            self._write("--- 分析结果 ---\n\n")
+        else:
+            self._write("\n\n")
+        self.chunk_count += 1
+        self._in_value = True
+        self._write(text)
+        if self._reporter is not None:
+            self._reporter.partial(text, stage=self._stage)
+
+    def _write(self, text: str) -> None:
+        self._out.write(text)
+        self._out.flush()
+
+
+class _AliceRun:
+    """单次 Alice 提问的结果（正文已写入目标文件）。"""
+
+    def __init__(self, attachments: List[Path], stderr: str = "", cached_at: Optional[str] = None):
+        self.attachments = attachments
+        self.stderr = stderr
+        self.cached_at = cached_at
+
+
+def _prepare(query: str, output_subdir: str, output_dir: Optional[Path]) -> Tuple[str, Path]:
     _require_wind_key()
     if not ALICE_CLI.is_file():
         raise FileNotFoundError(f"未找到 wind-alice CLI: {ALICE_CLI}")
@@ -106,6 +185,38 @@ def run_alice(
 
     out_dir = output_dir or _default_output_dir(output_subdir)
     out_dir.mkdir(parents=True, exist_ok=True)
+    return q, out_dir
+
+
+def _run_alice_into(
+    path: Path,
+    header: List[str],
+    q: str,
+    alice_skill: str,
+    out_dir: Path,
+    *,
+    reporter,
+    timeout_sec: int,
+    use_cache: bool,
+    cache_bucket: str,
+    stage: str = "alice",
+    percent: Optional[float] = 0,
+    done_percent: Optional[float] = 90,
+) -> _AliceRun:
+    """执行一次提问：表头 + 正文写入 path（先查结果缓存），附件下载到 out_dir。
+
+    header 为空列表时只写正文（并发拆分时的分片文件）。失败时删除 path 并抛出异常。
+    """
+    cache = AliceResultCache(bucket_mode=cache_bucket) if use_cache and cache_enabled() else None
+    cache_key = cache.key_for(alice_skill, q) if cache is not None else ""
+    if cache is not None:
+        hit = cache.lookup(cache_key, out_dir)
+        if hit is not None:
+            if header:
+                header = header[:-1] + [f"缓存: 命中（生成于 {hit.get('created_at') or '未知'}）", ""]
+            path.write_text("".join(line + "\n" for line in header) + hit["body"], encoding="utf-8")
+            reporter.emit("progress", percent=done_percent, message=f"{stage}: 缓存命中", stage=stage)
+            return _AliceRun(hit["attachments"], cached_at=hit.get("created_at") or "未知")
 
     cmd = [
         "node",
@@ -117,32 +228,76 @@ def run_alice(
     ]
     env = {**os.environ, "WIND_API_KEY": WIND_API_KEY}
 
-    proc = subprocess.run(
-        cmd,
-        cwd=str(out_dir),
-        env=env,
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        timeout=timeout_sec,
-    )
-
-    stdout = (proc.stdout or "").strip()
-    stderr = (proc.stderr or "").strip()
+    header_text = "".join(line + "\n" for line in header)
+    try:
+        with path.open("w", encoding="utf-8") as fh:
+            fh.write(header_text)
+            parser = AliceStreamParser(fh, reporter=reporter, stage=stage)
+            with reporter.stage(stage, percent=percent, done_percent=done_percent):
+                stream_opts = dict(
+                    cwd=str(out_dir),
+                    env=env,
+                    timeout_sec=timeout_sec,
+                    idle_timeout_sec=IDLE_TIMEOUT_SEC or None,
+                    on_stdout_line=parser.feed_stdout,
+                    on_stderr_line=parser.feed_stderr,
+                    reporter=reporter,
+                    tail_chars=OUTPUT_TAIL_CHARS,
+                )
+                try:
+                    if not wind_alice_bridge.bridge_enabled():
+                        raise wind_alice_bridge.BridgeUnavailable("已设置 WIND_ALICE_TRANSPORT=cli")
+                    returncode, stdout, stderr = wind_alice_bridge.run_prompt(
+                        q, alice_skill, api_key=WIND_API_KEY, **stream_opts
+                    )
+                except wind_alice_bridge.BridgeUnavailable:
+                    returncode, stdout, stderr = run_streaming(cmd, **stream_opts)
+
+            stdout = stdout.strip()
+            stderr = stderr.strip()
+            if returncode != 0:
+                msg = stdout or stderr or f"wind-alice 退出码 {returncode}"
+                raise RuntimeError(msg)
+
+            if not parser.has_body:
+                fallback = parser.raw_fallback_text()
+                if fallback:
+                    fh.write("--- 分析结果 ---\n\n" + fallback)
+                elif parser.attachments:
+                    fh.write("（本次结果以附件文件为主，请查看下方文件预览）")
+                else:
+                    fh.write("(Alice 未返回正文，请检查 Skill 名称与网络)")
+                    cache = None
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    if cache is not None:
+        try:
+            body = path.read_text(encoding="utf-8")[len(header_text) :]
+            cache.store(cache_key, body, parser.attachments, alice_skill=alice_skill, prompt=q)
+        except OSError as exc:
+            print(f"[wind_alice_cache] 写入缓存失败: {exc}", file=sys.stderr)
+
+    return _AliceRun(parser.attachments, stderr=stderr)
 
-    if proc.returncode != 0:
-        msg = stdout or stderr or f"wind-alice 退出码 {proc.returncode}"
-        raise RuntimeError(msg)
 
-    body_text = _extract_alice_text(stdout)
-    attachment_files = _extract_downloaded_files(stderr)
-    body_text, attachment_files = _split_body_and_attachments(body_text, attachment_files)
+def run_alice(
+    query: str,
+    alice_skill: str,
+    skill_label: str,
+    output_subdir: str,
+    timeout_sec: int = DEFAULT_TIMEOUT_SEC,
+    output_dir: Optional[Path] = None,
+    use_cache: bool = True,
+    cache_bucket: str = DEFAULT_BUCKET,
+) -> Path:
+    q, out_dir = _prepare(query, output_subdir, output_dir)
+    reporter = get_reporter(source=output_subdir)
 
     suffix = uuid.uuid4().hex[:8]
     desc_path = out_dir / f"{output_subdir}_{suffix}_description.txt"
-
-    lines = [
+    header = [
         f"万得 Wind · {skill_label}",
         "=" * 40,
         f"Alice Skill: {alice_skill}",
@@ -150,21 +305,187 @@ def run_alice(
         "",
     ]
 
-    if body_text:
-        lines.extend(["--- 分析结果 ---", "", body_text])
-    elif attachment_files:
-        lines.append("（本次结果以附件文件为主，请查看下方文件预览）")
-    else:
-        lines.append("(Alice 未返回正文，请检查 Skill 名称与网络)")
+    run = _run_alice_into(
+        desc_path,
+        header,
+        q,
+        alice_skill,
+        out_dir,
+        reporter=reporter,
+        timeout_sec=timeout_sec,
+        use_cache=use_cache,
+        cache_bucket=cache_bucket,
+    )
 
-    desc_path.write_text("\n".join(lines), encoding="utf-8")
+    reporter.progress(100, message=f"描述: {desc_path}", stage="write_description")
 
     print(f"描述: {desc_path}")
-    for fp in attachment_files:
+    for fp in run.attachments:
         print(str(fp.resolve()))
 
-    if stderr:
-        print(f"\n--- stderr ---\n{stderr}", file=sys.stderr)
+    if run.stderr:
+        print(f"\n--- stderr ---\n{run.stderr}", file=sys.stderr)
+
+    return desc_path
+
+
+def split_entities(text: str) -> List[str]:
+    """按 vs / 逗号 / 顿号 / 分号 / 换行拆分标的列表，去重并保持顺序。"""
+    parts = ENTITY_SPLIT_RE.split(text or "")
+    return list(dict.fromkeys(p.strip() for p in parts if p and p.strip()))
+
+
+def _entity_prompt(template: str, entity: str) -> str:
+    return template.replace(ENTITY_PLACEHOLDER, entity).strip()
+
+
+def fanout_template(text: str, spans: Sequence[Tuple[int, int, str]]) -> Optional[Tuple[List[str], str]]:
+    """由问句中识别出的标的位置 (起点, 终点, 标的键) 生成 (标的列表, 问句模板)。
+
+    只有两个以上不同标的、且彼此之间仅隔着连接词 / 标点（“A 和 B”、“A、B、C”）时才拆分：
+    并列段替换为 ``{entity}``，问句其余部分原样保留为模板；否则返回 None，按原问句整体提问。
+    标的名以外出现比较用语（COMPARISON_RE）时同样返回 None。
+    """
+    if len(spans) < 2:
+        return None
+    bounds = [0, *(i for start, end, _ in spans for i in (start, end)), len(text)]
+    if any(COMPARISON_RE.search(text, a, b) for a, b in zip(bounds[::2], bounds[1::2])):
+        return None
+    for (_, prev_end, _), (start, _, _) in zip(spans, spans[1:]):
+        if not ENTITY_JOINER_RE.fullmatch(text, prev_end, start):
+            return None
+    entities: Dict[str, str] = {}
+    for start, end, key in spans:
+        entities.setdefault(key, text[start:end])
+    if len(entities) < 2:
+        return None
+    template = text[: spans[0][0]] + ENTITY_PLACEHOLDER + text[spans[-1][1] :]
+    return list(entities.values()), template
+
+
+def _recognize_fanout(query: str) -> Optional[Tuple[List[str], str]]:
+    # 证券主表仅在 --fanout 时加载
+    from security_master import get_security_master
+
+    spans = [(start, end, sec.em_code) for start, end, sec in get_security_master().find_spans(query)]
+    return fanout_template(query, spans)
+
+
+def run_alice_fanout(
+    entities: Sequence[str],
+    alice_skill: str,
+    skill_label: str,
+    output_subdir: str,
+    prompt_template: str = "{entity}",
+    concurrency: int = FANOUT_CONCURRENCY,
+    timeout_sec: int = DEFAULT_TIMEOUT_SEC,
+    output_dir: Optional[Path] = None,
+    use_cache: bool = True,
+    cache_bucket: str = DEFAULT_BUCKET,
+) -> Path:
+    """多标的拆分：每个标的单独提问，在并发上限内同时执行，结果按输入顺序合并为一个描述文件。
+
+    prompt_template 须包含 ``{entity}`` 占位符，逐标的替换为问句。
+    单个标的失败只在对应章节记录错误，全部失败时抛出异常。
+    """
+    entities = list(dict.fromkeys(e.strip() for e in entities if e and e.strip()))
+    if not entities:
+        raise ValueError("缺少拆分标的")
+    if ENTITY_PLACEHOLDER not in prompt_template:
+        raise ValueError("问句模板缺少 {entity} 占位符")
+    prompts = [_entity_prompt(prompt_template, e) for e in entities]
+    _, out_dir = _prepare(prompts[0], output_subdir, output_dir)
+    reporter = get_reporter(source=output_subdir)
+
+    suffix = uuid.uuid4().hex[:8]
+    desc_path = out_dir / f"{output_subdir}_{suffix}_description.txt"
+    total = len(entities)
+    done = [0]
+    lock = threading.Lock()
+
+    def _one(i: int) -> _AliceRun:
+        # 各标的附件下载到独立子目录，避免并发下载同名文件时互相覆盖
+        part_dir = out_dir / f"{output_subdir}_{suffix}_{i + 1}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            return _run_alice_into(
+                part_dir / "body.txt",
+                [],
+                prompts[i],
+                alice_skill,
+                part_dir,
+                reporter=reporter,
+                timeout_sec=timeout_sec,
+                use_cache=use_cache,
+                cache_bucket=cache_bucket,
+                stage=f"alice:{entities[i]}",
+                percent=None,
+                done_percent=None,
+            )
+        finally:
+            with lock:
+                done[0] += 1
+                reporter.progress(90 * done[0] / total, message=f"已完成 {done[0]}/{total}：{entities[i]}", stage="alice")
+
+    results: List[object] = [None] * total
+    workers = max(1, min(int(concurrency or 1), total))
+    with reporter.stage("alice", percent=0, done_percent=90):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_one, i): i for i in range(total)}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    results[i] = fut.result()
+                except Exception as exc:
+                    results[i] = exc
+        if all(isinstance(r, Exception) for r in results):
+            for i in range(total):
+                shutil.rmtree(out_dir / f"{output_subdir}_{suffix}_{i + 1}", ignore_errors=True)
+            raise RuntimeError("; ".join(f"{e}: {r}" for e, r in zip(entities, results)))
+
+    attachments: List[Path] = []
+    stderr_parts: List[str] = []
+    with desc_path.open("w", encoding="utf-8") as fh:
+        fh.write(
+            "\n".join(
+                [
+                    f"万得 Wind · {skill_label}",
+                    "=" * 40,
+                    f"Alice Skill: {alice_skill}",
+                    f"查询模板: {prompt_template}",
+                    f"拆分标的: {'、'.join(entities)}（{total} 个，并发 {workers}）",
+                    "",
+                ]
+            )
+            + "\n"
+        )
+        for i, (entity, result) in enumerate(zip(entities, results)):
+            part_dir = out_dir / f"{output_subdir}_{suffix}_{i + 1}"
+            fh.write(f"\n=== {entity} ===\n问句: {prompts[i]}\n")
+            if isinstance(result, Exception):
+                fh.write(f"（该标的分析失败：{result}）\n")
+            else:
+                if result.cached_at:
+                    fh.write(f"缓存: 命中（生成于 {result.cached_at}）\n")
+                fh.write("\n")
+                with (part_dir / "body.txt").open("r", encoding="utf-8") as part:
+                    shutil.copyfileobj(part, fh)
+                fh.write("\n")
+                attachments.extend(result.attachments)
+                if result.stderr:
+                    stderr_parts.append(f"[{entity}]\n{result.stderr}")
+            (part_dir / "body.txt").unlink(missing_ok=True)
+            if part_dir.is_dir() and not any(part_dir.iterdir()):
+                part_dir.rmdir()
+
+    reporter.progress(100, message=f"描述: {desc_path}", stage="write_description")
+
+    print(f"描述: {desc_path}")
+    for fp in attachments:
+        print(str(fp.resolve()))
+
+    if stderr_parts:
+        print("\n--- stderr ---\n" + "\n".join(stderr_parts), file=sys.stderr)
 
     return desc_path
 
@@ -184,29 +505,70 @@ def main_entry(
     parser = argparse.ArgumentParser(description=skill_label)
     parser.add_argument("query", nargs="?", help="自然语言问句")
     parser.add_argument("--query", dest="query_opt", help="自然语言问句（显式参数）")
+    parser.add_argument("--no-cache", action="store_true", help="跳过结果缓存，强制重新调用 Alice")
+    parser.add_argument(
+        "--fanout",
+        action="store_true",
+        help="按证券主表识别问句中并列的多个标的（如“A 和 B”），逐标的并发提问后合并结果；识别不到或为比较类问句时整体提问",
+    )
+    parser.add_argument(
+        "--entities",
+        help="逗号 / 顿号分隔的标的列表；问句为含 {entity} 的模板（省略时直接以标的名提问）",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=FANOUT_CONCURRENCY,
+        help=f"拆分模式的并发数（默认 {FANOUT_CONCURRENCY}，环境变量 WIND_ALICE_FANOUT_CONCURRENCY）",
+    )
     args = parser.parse_args()
 
     query = (args.query_opt or args.query or default_query or "").strip()
-    if not query:
+    if not query and not args.entities:
         parser.print_help(sys.stderr)
         sys.exit(1)
 
+    entities: List[str] = []
+    template = query
+    if args.entities:
+        if query and ENTITY_PLACEHOLDER not in query:
+            print("错误: 使用 --entities 时问句须包含 {entity} 占位符", file=sys.stderr)
+            sys.exit(1)
+        entities, template = split_entities(args.entities), query or ENTITY_PLACEHOLDER
+    elif args.fanout:
+        plan = _recognize_fanout(query)
+        if plan:
+            entities, template = plan
+
     try:
-        run_alice(
-            query=query,
-            alice_skill=alice_skill,
-            skill_label=skill_label,
-            output_subdir=output_subdir,
-        )
-    except subprocess.TimeoutExpired:
-        print(
-            f"错误: Alice 分析超时（>{DEFAULT_TIMEOUT_SEC}s），可设置环境变量 WIND_ALICE_TIMEOUT_SEC 加大限制",
-            file=sys.stderr,
-        )
+        if len(entities) > 1:
+            run_alice_fanout(
+                entities,
+                alice_skill=alice_skill,
+                skill_label=skill_label,
+                output_subdir=output_subdir,
+                prompt_template=template,
+                concurrency=args.concurrency,
+                use_cache=not args.no_cache,
+            )
+        else:
+            run_alice(
+                query=_entity_prompt(template, entities[0]) if entities else query,
+                alice_skill=alice_skill,
+                skill_label=skill_label,
+                output_subdir=output_subdir,
+                use_cache=not args.no_cache,
+            )
+    except subprocess.TimeoutExpired as exc:
+        if IDLE_TIMEOUT_SEC and exc.timeout == IDLE_TIMEOUT_SEC:
+            hint = f"Alice 连续 {IDLE_TIMEOUT_SEC}s 无输出，已终止；可设置环境变量 WIND_ALICE_IDLE_TIMEOUT_SEC 调整"
+        else:
+            hint = f"Alice 分析超时（>{DEFAULT_TIMEOUT_SEC}s），可设置环境变量 WIND_ALICE_TIMEOUT_SEC 加大限制"
+        print(f"错误: {hint}", file=sys.stderr)
         sys.exit(2)
     except Exception as exc:
         print(f"错误: {exc}", file=sys.stderr)
         sys.exit(2)
 
 
-__all__ = ["run_alice", "main_entry"]
+__all__ = ["run_alice", "run_alice_fanout", "split_entities", "fanout_template", "main_entry"]
@@ -0,0 +1,362 @@
+"""
+万得 Wind K 线本地缓存（Aeolus 共享层）。
+
+按 (工具, windcode) 持久化 get_*_kline 返回的日线：
+- 每个代码一个结构化 ``bars.npy``（date 列 + 数值列，按日期升序）与 ``meta.json``；
+- meta.json 记录已覆盖的自然日区间（请求过的区间，而非有 K 线的日期，节假日不会被反复补拉），
+  写入时相邻 / 重叠区间自动合并；
+- 查询时只向 Wind 请求缺口区间，区间读取使用 ``np.load(mmap_mode="r")`` + 二分定位，
+  多年区间的重复请求无需任何网络调用。
+
+当天（及以后）的数据可能尚未收盘，写入但不计入覆盖区间，下次查询会重新拉取。
+默认目录：$AEOLUS_DATA_DIR/wind_kline，未设置时为仓库 data/wind_kline。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import warnings
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+DATE_COLUMN_CANDIDATES = ("日期", "交易日期", "交易日", "时间", "date", "trade_date", "time", "datetime")
+DATE_FIELD = "date"
+CACHE_VERSION = 1
+
+_CN_TZ = timezone(timedelta(hours=8))
+
+Range = Tuple[int, int]
+Fetcher = Callable[[str, str], List[Dict[str, Any]]]
+
+
+def default_cache_dir() -> Path:
+    data_dir = os.environ.get("AEOLUS_DATA_DIR")
+    base = Path(data_dir) if data_dir else REPO_ROOT / "data"
+    return base / "wind_kline"
+
+
+# ───── 日期工具（内部统一用 YYYYMMDD 整数）─────
+
+
+def _to_date(d: int) -> date:
+    return date(d // 10000, d // 100 % 100, d % 100)
+
+
+def _from_date(d: date) -> int:
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def _shift(d: int, days: int) -> int:
+    return _from_date(_to_date(d) + timedelta(days=days))
+
+
+def parse_date(value: Any) -> Optional[int]:
+    """'2026-04-01' / '20260401' / '2026/04/01 00:00:00' / 毫秒时间戳 → 20260401。"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        v = int(value)
+        if 19000101 <= v <= 21001231:
+            return v
+        if v > 10**11:  # 毫秒时间戳
+            return _from_date(datetime.fromtimestamp(v / 1000, tz=_CN_TZ).date())
+        return None
+    digits = re.sub(r"\D", "", str(value))
+    if len(digits) < 8:
+        return None
+    v = int(digits[:8])
+    try:
+        _to_date(v)
+    except ValueError:
+        return None
+    return v
+
+
+def format_date(d: int) -> str:
+    return f"{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}"
+
+
+def _today() -> int:
+    return _from_date(datetime.now(_CN_TZ).date())
+
+
+# ───── 区间运算 ─────
+
+
+def merge_ranges(ranges: Sequence[Range]) -> List[Range]:
+    """合并重叠或首尾相邻（差一天）的闭区间。"""
+    out: List[Range] = []
+    for lo, hi in sorted(ranges):
+        if out and lo <= _shift(out[-1][1], 1):
+            if hi > out[-1][1]:
+                out[-1] = (out[-1][0], hi)
+        else:
+            out.append((lo, hi))
+    return out
+
+
+def missing_ranges(covered: Sequence[Range], begin: int, end: int) -> List[Range]:
+    """[begin, end] 中未被 covered 覆盖的子区间。"""
+    gaps: List[Range] = []
+    cursor = begin
+    for lo, hi in merge_ranges(covered):
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, min(end, _shift(lo, -1))))
+        cursor = max(cursor, _shift(hi, 1))
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+# ───── 行 ↔ 结构化数组 ─────
+
+
+def _to_float(value: Any) -> Optional[float]:
+    """数值化单元格；空值返回 NaN，非数值返回 None。"""
+    if value is None:
+        return math.nan
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    s = str(value).strip().replace(",", "")
+    if s in ("", "-", "--", "None", "null", "NaN", "nan"):
+        return math.nan
+    if s.endswith("%"):
+        s = s[:-1]
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _detect_date_column(rows: List[Dict[str, Any]]) -> Optional[str]:
+    keys = list(rows[0].keys())
+    for cand in DATE_COLUMN_CANDIDATES:
+        for k in keys:
+            if k.lower() == cand.lower():
+                return k
+    for k in keys:
+        if parse_date(rows[0].get(k)) is not None and isinstance(rows[0].get(k), str):
+            return k
+    return None
+
+
+def rows_to_array(rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, str]:
+    """把工具返回的行转为按日期升序、日期去重的结构化数组；非数值列丢弃。"""
+    if not rows:
+        return np.zeros(0, dtype=[(DATE_FIELD, "<i4")]), ""
+    date_col = _detect_date_column(rows)
+    if date_col is None:
+        raise ValueError(f"K 线结果中找不到日期列: {list(rows[0].keys())}")
+
+    numeric_cols: List[str] = []
+    for key in rows[0].keys():
+        if key == date_col or key == DATE_FIELD:
+            continue
+        parsed = [_to_float(r.get(key)) for r in rows]
+        if all(v is not None for v in parsed) and any(not math.isnan(v) for v in parsed):
+            numeric_cols.append(key)
+
+    by_date: Dict[int, Dict[str, Any]] = {}
+    for r in rows:
+        d = parse_date(r.get(date_col))
+        if d is not None:
+            by_date[d] = r
+
+    dtype = [(DATE_FIELD, "<i4")] + [(c, "<f8") for c in numeric_cols]
+    arr = np.zeros(len(by_date), dtype=dtype)
+    for i, d in enumerate(sorted(by_date)):
+        arr[DATE_FIELD][i] = d
+        r = by_date[d]
+        for c in numeric_cols:
+            arr[c][i] = _to_float(r.get(c))
+    return arr, date_col
+
+
+def _merge_arrays(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """按日期合并两个结构化数组（同日期以 new 为准），列取并集，缺失值为 NaN。"""
+    names = list(old.dtype.names or ())
+    for n in new.dtype.names or ():
+        if n not in names:
+            names.append(n)
+    dtype = [(DATE_FIELD, "<i4")] + [(n, "<f8") for n in names if n != DATE_FIELD]
+
+    keep_old = old[~np.isin(old[DATE_FIELD], new[DATE_FIELD])] if len(old) else old
+    out = np.zeros(len(keep_old) + len(new), dtype=dtype)
+    for n in out.dtype.names:
+        if n != DATE_FIELD:
+            out[n] = np.nan
+    for part, offset in ((keep_old, 0), (new, len(keep_old))):
+        for n in part.dtype.names or ():
+            out[n][offset : offset + len(part)] = part[n]
+    return out[np.argsort(out[DATE_FIELD], kind="stable")]
+
+
+# ───── 缓存 ─────
+
+
+class KlineCache:
+    """按 windcode 持久化 K 线并只补拉缺口区间（线程安全；同一代码的补拉串行化）。
+
+    Args:
+        namespace: 缓存命名空间，通常为 ``"<server_type>.<tool_name>"``；
+            extra_args 不同（如复权方式）时通过 ``namespace_for`` 派生。
+        cache_dir: 缓存根目录，默认 ``default_cache_dir()``。
+    """
+
+    def __init__(self, namespace: str, cache_dir: Optional[Path] = None):
+        self.namespace = namespace
+        self.root = Path(cache_dir or default_cache_dir()) / _safe_name(namespace)
+        self.stats = {"hit_codes": 0, "fetched_ranges": 0, "fetched_rows": 0}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def namespace_for(server_type: str, tool_name: str, extra_args: Optional[Dict[str, Any]] = None) -> str:
+        ns = f"{server_type}.{tool_name}"
+        if extra_args:
+            digest = hashlib.sha1(json.dumps(extra_args, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+            ns += "." + digest.hexdigest()[:10]
+        return ns
+
+    # -- Public API ----------------------------------------------------------
+
+    def get_bars(self, windcode: str, begin: str, end: str, fetch: Fetcher) -> List[Dict[str, Any]]:
+        """返回 [begin, end] 内的 K 线行（日期列为 YYYY-MM-DD）；缺口区间通过 fetch(begin, end) 补拉。
+
+        fetch 接收 YYYYMMDD 字符串，返回工具原始行（dict 列表）；其异常原样抛出，
+        已成功补拉的缺口仍会写入缓存。
+        """
+        b, e = parse_date(begin), parse_date(end)
+        if b is None or e is None:
+            raise ValueError(f"日期格式无效: {begin} ~ {end}")
+        if b > e:
+            b, e = e, b
+
+        with self._lock_for(windcode):
+            meta = self._read_meta(windcode)
+            gaps = missing_ranges([tuple(r) for r in meta.get("ranges", [])], b, e)
+            if not gaps:
+                self.stats["hit_codes"] += 1
+            for lo, hi in gaps:
+                rows = fetch(str(lo), str(hi))
+                self._write(windcode, rows, (lo, hi), meta)
+                self.stats["fetched_ranges"] += 1
+                self.stats["fetched_rows"] += len(rows)
+            return self._read_range(windcode, b, e, meta.get("date_column") or "日期")
+
+    def covered_ranges(self, windcode: str) -> List[Range]:
+        return [tuple(r) for r in self._read_meta(windcode).get("ranges", [])]
+
+    # -- Storage -------------------------------------------------------------
+
+    def _dir(self, windcode: str) -> Path:
+        return self.root / _safe_name(windcode.upper())
+
+    def _lock_for(self, windcode: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(windcode.upper(), threading.Lock())
+
+    def _read_meta(self, windcode: str) -> Dict[str, Any]:
+        path = self._dir(windcode) / "meta.json"
+        try:
+            meta = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if meta.get("version") != CACHE_VERSION or not (self._dir(windcode) / "bars.npy").is_file():
+            return {}
+        return meta
+
+    def _load(self, windcode: str, mmap: bool) -> Optional[np.ndarray]:
+        path = self._dir(windcode) / "bars.npy"
+        if not path.is_file():
+            return None
+        try:
+            return np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, windcode: str, rows: List[Dict[str, Any]], fetched: Range, meta: Dict[str, Any]) -> None:
+        new, date_col = rows_to_array(rows)
+        existing = self._load(windcode, mmap=False) if meta else None
+        merged = _merge_arrays(existing, new) if existing is not None else new
+
+        # 未收盘的当天不计入覆盖区间
+        covered_hi = min(fetched[1], _shift(_today(), -1))
+        ranges = [tuple(r) for r in meta.get("ranges", [])]
+        if covered_hi >= fetched[0]:
+            ranges.append((fetched[0], covered_hi))
+
+        d = self._dir(windcode)
+        d.mkdir(parents=True, exist_ok=True)
+        tmp_bars = d / f"bars.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+        with warnings.catch_warnings():
+            # 中文列名需要 .npy 3.0 格式（numpy >= 1.17 可读），无需提示
+            warnings.simplefilter("ignore", UserWarning)
+            np.save(tmp_bars, merged, allow_pickle=False)
+        os.replace(tmp_bars, d / "bars.npy")
+
+        meta.update(
+            {
+                "version": CACHE_VERSION,
+                "windcode": windcode.upper(),
+                "namespace": self.namespace,
+                "date_column": meta.get("date_column") or date_col or "日期",
+                "ranges": [list(r) for r in merge_ranges(ranges)],
+                "rows": int(len(merged)),
+                "updated_at": int(time.time()),
+            }
+        )
+        tmp_meta = d / f"meta.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_meta, d / "meta.json")
+
+    def _read_range(self, windcode: str, begin: int, end: int, date_col: str) -> List[Dict[str, Any]]:
+        arr = self._load(windcode, mmap=True)
+        if arr is None or not len(arr):
+            return []
+        dates = arr[DATE_FIELD]
+        lo = int(np.searchsorted(dates, begin, side="left"))
+        hi = int(np.searchsorted(dates, end, side="right"))
+        window = np.array(arr[lo:hi])  # 仅拷贝命中的切片
+        cols = [n for n in window.dtype.names if n != DATE_FIELD]
+        out: List[Dict[str, Any]] = []
+        for rec in window:
+            row: Dict[str, Any] = {date_col: format_date(int(rec[DATE_FIELD]))}
+            for c in cols:
+                v = float(rec[c])
+                row[c] = None if math.isnan(v) else v
+            out.append(row)
+        return out
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z._-]", "_", name)
+
+
+__all__ = [
+    "KlineCache",
+    "default_cache_dir",
+    "merge_ranges",
+    "missing_ranges",
+    "parse_date",
+    "rows_to_array",
+]
@@ -0,0 +1,416 @@
+"""
+万得 Wind MCP 原生 Python 客户端（Aeolus 共享层）。
+
+与 skills/Wind_FinData/scripts/cli.mjs 的 ``call`` 命令使用同一套 JSON-RPC over HTTP 协议
+（initialize → tools/call，响应兼容 SSE / 纯 JSON），但直接在 Python 进程内发起请求：
+- 省去 node 进程启动、更新检查与会话探测的开销；
+- 同一进程内复用 httpx 连接池（keep-alive），每个 server 只 initialize 一次。
+
+失败时抛出 WindMcpError，其 ``envelope()`` 与 cli.mjs 的失败输出一致：
+``{"ok": false, "error": {"code": ..., "agent_action": ...}}``，
+调用方可沿用原有的 ``_parse_error_envelope`` 解析逻辑。
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - 由调用方回退到 node cli.mjs
+    httpx = None
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+TOOL_MANIFEST_PATH = REPO_ROOT / "skills" / "Wind_FinData" / "references" / "tool-manifest.json"
+
+# 与 cli.mjs 保持一致（服务端据此识别客户端版本）
+SKILL_VERSION = "1.6.1"
+CLIENT_NAME = "wind-mcp-skill"
+PROTOCOL_VERSION = "2025-03-26"
+
+INIT_TIMEOUT_SEC = 30.0
+CALL_TIMEOUT_SEC = float(os.environ.get("WIND_MCP_TIMEOUT_SEC") or "600")
+
+SERVERS: Dict[str, str] = {
+    "stock_data": "https://mcp.wind.com.cn/vserver_stock_data/mcp/",
+    "global_stock_data": "https://mcp.wind.com.cn/vserver_global_stock_data/mcp/",
+    "fund_data": "https://mcp.wind.com.cn/vserver_fund_data/mcp/",
+    "index_data": "https://mcp.wind.com.cn/vserver_index_data/mcp/",
+    "bond_data": "https://mcp.wind.com.cn/vserver_bond_data/mcp/",
+    "financial_docs": "https://mcp.wind.com.cn/vserver_financial_docs/mcp/",
+    "economic_data": "https://mcp.wind.com.cn/vserver_economic_data/mcp/",
+    "analytics_data": "https://mcp.wind.com.cn/vserver_analytics_data/mcp/",
+}
+
+# ───── 错误码体系（与 cli.mjs 一致）─────
+
+ERROR_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("RATE_LIMIT_DAILY", re.compile(r"单日请求次数超限|daily.*limit", re.I)),
+    ("BALANCE_INSUFFICIENT", re.compile(r"余额不足|请先充值|insufficient.*balance", re.I)),
+    ("RATE_LIMIT_QPS", re.compile(r"请求过于频繁|qps.*limit|too.*frequent", re.I)),
+    ("KEY_INVALID", re.compile(r"密钥无效|key.*invalid|unauthorized|认证失败|auth.*fail", re.I)),
+    ("NO_RESULTS", re.compile(r'未获取到数据|"NO_RESULTS"|no\s*results?|not\s*found|empty\s*result', re.I)),
+    (
+        "PARAM_VALIDATION_ERROR",
+        re.compile(
+            r"参数验证失败|参数.*(错误|非法|无效)|字段.*(不存在|不识别|不支持|非法)"
+            r"|invalid\s*(param|argument|field)|missing\s*(param|argument|field|required)",
+            re.I,
+        ),
+    ),
+    ("TOOL_RUNTIME_ERROR", re.compile(r"TOOL_ERROR|tool.*error|工具.*(执行|运行).*错误|runtime.*error", re.I)),
+    ("KEY_MISSING", re.compile(r"WIND_API_KEY 未配置")),
+    ("UNKNOWN_SERVER_TYPE", re.compile(r"未知 server_type")),
+    ("UNKNOWN_TOOL_NAME", re.compile(r"工具名不属于")),
+    ("TOOL_MANIFEST_INVALID", re.compile(r"工具清单读取失败")),
+    ("INVALID_PARAMS_JSON", re.compile(r"params JSON 解析失败")),
+]
+
+AGENT_ACTIONS: Dict[str, str] = {
+    "USAGE_ERROR": (
+        "命令用法不正确。读取 stdout 中的 USAGE 文本（每条 cli 调用都会输出），按可用子命令和参数格式重新构造命令后重试。"
+    ),
+    "INVALID_PARAMS_JSON": (
+        "`call` 命令第三参数必须是合法 JSON 字符串。按当前 shell 类型调整转义（Bash 用外层单引号、PowerShell 用 \\\" 转义内部双引号），修正后重试同一 server_type + tool_name；不要切换工具。"
+    ),
+    "UNKNOWN_SERVER_TYPE": (
+        "server_type 不在可用列表内。运行 `node scripts/cli.mjs`（无参）查看 USAGE 列出的合法 server_type，或读 SKILL.md 第 1 节\"数据范围\"重新选择，再重试。"
+    ),
+    "UNKNOWN_TOOL_NAME": (
+        "tool_name 不属于该 server_type。读取 `references/tool-manifest.json` 查询当前 server_type 的合法 tool 清单，按意图路由规则（SKILL.md \"意图判定与路由顺序\"）重新选择 tool 后重试；不要直接 fallback 到 analytics_data。"
+    ),
+    "TOOL_MANIFEST_INVALID": (
+        "本地 `references/tool-manifest.json` 缺失或非法 JSON。skill 安装可能不完整,提示用户重装：`npx skills update wind-mcp-skill -g -y`。"
+    ),
+    "UNKNOWN_SCOPE": (
+        "`setup-key` 命令必须带 --scope global 或 --scope skill。先用 AskUserQuestion 询问用户 Key 存放位置后,带上 --scope 参数重试。"
+    ),
+    "OPEN_PORTAL_FAILED": (
+        "本地无法自动打开浏览器。把 stdout 中的 `url` 字段告知用户,让用户在自己的浏览器中手动打开开发者中心。"
+    ),
+    "PARAM_VALIDATION_ERROR": (
+        "后端参数验证失败。按 SKILL.md \"## 3. 工具表\"和 `references/indicators.md` 逐字段核对：字段名、必填项、日期格式、枚举值、server_type、tool_name。修正后重试同一工具；若多次修正仍不通过且属于结构化取数问题,可改用 `analytics_data.get_financial_data`,但 question 必须忠实反映用户原始意图。"
+    ),
+    "CONFIG_WRITE_ERROR": (
+        "配置文件写入失败。检查目标路径权限,或用 AskUserQuestion 询问用户改用另一种 scope 后重试 setup-key。"
+    ),
+    "KEY_MISSING": (
+        "WIND_API_KEY 未配置。立即执行 `node scripts/cli.mjs open-portal` 打开万得开发者中心；获取 Key 后执行 `node scripts/cli.mjs setup-key <KEY> --scope <global|skill>`（先用 AskUserQuestion 询问 scope）再重试原调用。不要只把 URL 发给用户,也不要改用 analytics_data 绕过。"
+    ),
+    "KEY_INVALID": (
+        "API Key 无效或过期。引导用户在开发者中心重新生成 Key,用 setup-key 配置后重试；不要通过切换 Wind 工具绕过。"
+    ),
+    "KEY_FORBIDDEN_SERVER": (
+        "当前 Key 未订阅该 server 的权限。让用户在开发者中心确认权限,或选择已授权的其他 server；不要换 server 绕过。"
+    ),
+    "RATE_LIMIT_DAILY": (
+        "API Key 当日请求额度已用尽。等次日额度刷新,或让用户更换备用 Key；不要换工具绕过。"
+    ),
+    "RATE_LIMIT_QPS": (
+        "请求过于频繁触发 QPS 限流。等待 3-5 秒后原样重试同一工具；不要为绕过限流而切换工具。"
+    ),
+    "BALANCE_INSUFFICIENT": (
+        "API Key 计费余额不足。提示用户在开发者中心充值,或更换有余额的 Key 后重试。"
+    ),
+    "NETWORK_ERROR": (
+        "网络请求失败（DNS / 代理 / 超时 / 沙箱拦截）。检查网络环境；在 Codex 环境中确认使用 `sandbox_permissions: \"require_escalated\"` 联网。修复后原样重试。"
+    ),
+    "SERVER_5XX": (
+        "万得后端服务异常。稍后原样重试同一请求；若提示超时,可降低请求复杂度（缩短时间范围、减少字段）。"
+    ),
+    "RESPONSE_PARSE_ERROR": (
+        "后端响应格式异常。保留 stdout 错误原文,联系万得支持；不要盲目重试或切换工具。"
+    ),
+    "NO_RESULTS": (
+        "查询命中数据为空。先在不改变用户意图的前提下调整关键词或参数重试；若专项路径仍无结果且属于结构化取数,可改用 `analytics_data.get_financial_data` 兜底,question 必须忠实反映用户原始意图。"
+    ),
+    "MCP_PROTOCOL_ERROR": (
+        "MCP 协议层错误。读 stdout 错误原文,若能明确指向请求形态问题则修正后重试,否则保留原文联系万得支持。"
+    ),
+    "TOOL_RUNTIME_ERROR": (
+        "后端工具运行错误。读 stdout 错误原文,检查请求规模是否过大、字段口径是否受支持、数据覆盖范围；不能明确修正时停止并告知用户,不要盲目切换工具。"
+    ),
+    "UNKNOWN": (
+        "未知错误。不要盲目重试；先读 stdout 错误原文,能定位本地问题（参数 / 配置 / 网络）则修正后重试一次,否则保留原文告知用户并停止。"
+    ),
+}
+
+HTTP_ERROR_MAP: Dict[int, str] = {
+    401: "KEY_INVALID",
+    403: "KEY_FORBIDDEN_SERVER",
+    429: "RATE_LIMIT_QPS",
+    500: "SERVER_5XX",
+    502: "SERVER_5XX",
+    503: "SERVER_5XX",
+    504: "SERVER_5XX",
+}
+
+
+def infer_error_code(msg: str) -> str:
+    if not msg:
+        return "UNKNOWN"
+    for code, pat in ERROR_PATTERNS:
+        if pat.search(msg):
+            return code
+    return "UNKNOWN"
+
+
+def build_agent_action(code: str, detail: Optional[str] = None) -> str:
+    """后端原始诊断 + 标准处方；detail 上限 500 字（USAGE_ERROR 除外）。"""
+    template = AGENT_ACTIONS.get(code) or AGENT_ACTIONS["UNKNOWN"]
+    if detail and detail.strip():
+        d = detail.strip() if code == "USAGE_ERROR" else detail.strip()[:500]
+        return f"[{d}] {template}"
+    return template
+
+
+class WindMcpError(RuntimeError):
+    """Wind MCP 调用失败，code / agent_action 语义与 cli.mjs 失败 envelope 相同。"""
+
+    def __init__(self, code: str, detail: Optional[str] = None):
+        self.code = code
+        self.agent_action = build_agent_action(code, detail)
+        super().__init__(f"[{code}] {self.agent_action}")
+
+    def envelope(self) -> Dict[str, Any]:
+        return {"ok": False, "error": {"code": self.code, "agent_action": self.agent_action}}
+
+
+def parse_sse(text: str) -> Any:
+    """解析 MCP 响应：纯 JSON 直接解析，否则取最后一条 ``data: `` 行。"""
+    trimmed = text.strip()
+    if trimmed.startswith("{"):
+        try:
+            return json.loads(trimmed)
+        except json.JSONDecodeError:
+            pass
+    last = None
+    for line in text.splitlines():
+        if line.startswith("data: "):
+            last = line[6:]
+    if last is not None:
+        try:
+            return json.loads(last)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"SSE data 行 JSON 解析失败：{exc}。原文前 200 字符：{text[:200]}") from exc
+    raise ValueError(f"响应格式无法识别（既非 SSE 也非纯 JSON）。原文前 200 字符：{text[:200]}")
+
+
+def load_tool_manifest(path: Path = TOOL_MANIFEST_PATH) -> Dict[str, List[str]]:
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(manifest, dict):
+            raise ValueError("manifest 顶层必须是对象")
+        for server_type, tools in manifest.items():
+            if server_type not in SERVERS:
+                raise ValueError(f"manifest 包含未知 server_type: {server_type}")
+            if not isinstance(tools, list) or not all(isinstance(t, str) and t for t in tools):
+                raise ValueError(f"manifest 中 {server_type} 的工具清单必须是非空字符串数组")
+        return manifest
+    except (OSError, ValueError) as exc:
+        raise WindMcpError("TOOL_MANIFEST_INVALID", f"工具清单读取失败: {exc}") from exc
+
+
+def _check_tool_result(result: Any, server_type: str) -> None:
+    """业务错误可能在 result.isError 或 content[0].text 的内嵌 JSON 中。"""
+    if not isinstance(result, dict):
+        return
+    content = result.get("content")
+    first_text = None
+    if isinstance(content, list) and content and isinstance(content[0], dict):
+        first_text = content[0].get("text")
+
+    if result.get("isError"):
+        msg = first_text or json.dumps(result, ensure_ascii=False)
+        raise WindMcpError(infer_error_code(msg), f"{msg} (server={server_type})")
+
+    if not isinstance(first_text, str):
+        return
+    try:
+        inner = json.loads(first_text)
+    except json.JSONDecodeError:
+        return
+    if not isinstance(inner, dict):
+        return
+    err_code = inner.get("mcp_tool_error_code")
+    if isinstance(err_code, (int, float)) and not isinstance(err_code, bool) and err_code != 0:
+        msg = inner.get("mcp_tool_error_msg") or json.dumps(inner, ensure_ascii=False)
+        raise WindMcpError(infer_error_code(msg), f"{msg} (server={server_type})")
+    err = inner.get("error")
+    if isinstance(err, dict) and (err.get("code") or err.get("message")):
+        code = err.get("code") or ""
+        message = err.get("message") or ""
+        combined = f"{code}: {message}" if code else message
+        raise WindMcpError(infer_error_code(combined), f"{combined} (server={server_type})")
+
+
+class WindMcpClient:
+    """进程内 Wind MCP 客户端（线程安全，连接池复用）。
+
+    Args:
+        api_key: Wind API Key（默认读取 WIND_API_KEY）。
+        timeout_sec: tools/call 超时秒数。
+        max_connections: 连接池上限（批量并发调用时生效）。
+        validate_tools: 是否按 tool-manifest.json 校验 server_type + tool_name。
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout_sec: float = CALL_TIMEOUT_SEC,
+        max_connections: int = 16,
+        validate_tools: bool = True,
+    ):
+        if httpx is None:
+            raise RuntimeError("httpx 未安装，无法使用 Python Wind MCP 客户端")
+        self._api_key = (api_key or os.environ.get("WIND_API_KEY") or "").strip()
+        self._timeout_sec = timeout_sec
+        self._validate_tools = validate_tools
+        self._manifest: Optional[Dict[str, List[str]]] = None
+        self._initialized: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._http = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(timeout_sec, connect=INIT_TIMEOUT_SEC),
+        )
+
+    def close(self) -> None:
+        self._http.close()
+
+    def __enter__(self) -> "WindMcpClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- Public API ----------------------------------------------------------
+
+    def call_tool(self, server_type: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """调用 MCP 工具，返回 MCP ``result`` 对象（与 ``cli.mjs call`` 的成功输出相同）。"""
+        if server_type not in SERVERS:
+            raise WindMcpError(
+                "UNKNOWN_SERVER_TYPE",
+                f"未知 server_type: {server_type}. 可用: {' / '.join(SERVERS)}",
+            )
+        if self._validate_tools:
+            tools = self._tool_manifest().get(server_type, [])
+            if tool_name not in tools:
+                raise WindMcpError(
+                    "UNKNOWN_TOOL_NAME", f'工具名 "{tool_name}" 不属于 server_type "{server_type}"。'
+                )
+        self._ensure_initialized(server_type)
+        return self._request(
+            server_type,
+            "tools/call",
+            {"name": tool_name, "arguments": arguments, "_meta": {"clientVersion": SKILL_VERSION}},
+            timeout_sec=self._timeout_sec,
+        )
+
+    # -- Internals -----------------------------------------------------------
+
+    def _tool_manifest(self) -> Dict[str, List[str]]:
+        if self._manifest is None:
+            self._manifest = load_tool_manifest()
+        return self._manifest
+
+    def _ensure_initialized(self, server_type: str) -> None:
+        with self._lock:
+            if server_type in self._initialized:
+                return
+        self._request(
+            server_type,
+            "initialize",
+            {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": CLIENT_NAME, "version": SKILL_VERSION},
+            },
+            timeout_sec=INIT_TIMEOUT_SEC,
+        )
+
+    def _request(self, server_type: str, method: str, params: Dict[str, Any], timeout_sec: float) -> Any:
+        if not self._api_key:
+            raise WindMcpError("KEY_MISSING", "WIND_API_KEY 未配置")
+
+        headers = {
+            "Authorization": f"Bearer {self._api_key}",
+            "Accept": "application/json, text/event-stream",
+            "Content-Type": "application/json",
+        }
+        session_id = self._initialized.get(server_type)
+        if session_id:
+            headers["Mcp-Session-Id"] = session_id
+
+        body = json.dumps(
+            {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        try:
+            resp = self._http.post(SERVERS[server_type], content=body, headers=headers, timeout=timeout_sec)
+        except httpx.HTTPError as exc:
+            raise WindMcpError("NETWORK_ERROR", f"{exc} (server={server_type})") from exc
+
+        if resp.status_code >= 400:
+            code = HTTP_ERROR_MAP.get(resp.status_code, "UNKNOWN")
+            detail = f"HTTP {resp.status_code} {resp.reason_phrase} (server={server_type})"
+            if resp.text:
+                detail += f" | body: {resp.text[:200]}"
+            raise WindMcpError(code, detail)
+
+        try:
+            payload = parse_sse(resp.text)
+        except ValueError as exc:
+            raise WindMcpError("RESPONSE_PARSE_ERROR", f"{exc} (server={server_type})") from exc
+
+        if not isinstance(payload, dict):
+            raise WindMcpError("RESPONSE_PARSE_ERROR", f"响应不是 JSON 对象 (server={server_type})")
+        if payload.get("error"):
+            err = payload["error"]
+            msg = err.get("message") if isinstance(err, dict) else None
+            msg = msg or json.dumps(err, ensure_ascii=False)
+            raise WindMcpError("MCP_PROTOCOL_ERROR", f"{msg} (server={server_type})")
+
+        if method == "initialize":
+            with self._lock:
+                self._initialized[server_type] = resp.headers.get("mcp-session-id")
+
+        result = payload.get("result")
+        _check_tool_result(result, server_type)
+        return result
+
+
+_shared_client: Optional[WindMcpClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_client() -> WindMcpClient:
+    """进程级共享客户端（首次调用时创建，退出时关闭连接池）。"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = WindMcpClient()
+            atexit.register(_shared_client.close)
+        return _shared_client
+
+
+__all__ = [
+    "SERVERS",
+    "WindMcpClient",
+    "WindMcpError",
+    "build_agent_action",
+    "get_shared_client",
+    "infer_error_code",
+    "parse_sse",
+]
@@ -1,18 +1,28 @@
 """
 Build themed Excel for comparable-company analysis.
+
+The workbook is streamed in openpyxl write-only mode: fills, fonts and
+borders are registered once per workbook as named styles, and every cell
+is created with its final style as its row is appended.
 """
 
 import argparse
 import asyncio
+import os
 import re
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
 
-from get_data import fetch_comparable_company_data
+from get_data import BATCH_CONCURRENCY, fetch_comparable_company_batch, fetch_comparable_company_data
 
 
 DEFAULT_OUTPUT_DIR = Path.cwd() / "miaoxiang" / "comparable_company_analysis"
@@ -57,6 +67,46 @@ HIGHLIGHT_ROW_NAMES = {
     "Z-Score(目标公司)",
 }
 
+TOTAL_COLS = 13  # 公司名称 + 12 指标
+COL_WIDTHS = [18, 13, 17, 17, 17, 17, 18, 18, 18, 17, 17, 17, 17]
+NUMBER_FORMAT = "#,##0.00"
+FONT_NAME = "Microsoft YaHei"
+
+BATCH_WORKERS = int(os.environ.get("COMPARABLE_COMPANY_BATCH_WORKERS") or min(4, os.cpu_count() or 1))
+BATCH_SUMMARY_SHEET = "汇总"
+BATCH_PEERS_SHEET = "同业公司"
+BATCH_SUMMARY_HEADERS = ["序号", "问句", "状态", "报告标题", "财务行数", "估值行数", "Sheet/文件", "错误"]
+PEER_UNIVERSE_HEADERS = (
+    ["公司名称", "股票代码", "覆盖标的数", "覆盖标的"] + SECTION_FINANCE_HEADERS[1:] + SECTION_VALUATION_HEADERS[1:]
+)
+
+_SHEET_NAME_ILLEGAL_RE = re.compile(r"[:\\/?*\[\]]")
+_FILE_NAME_ILLEGAL_RE = re.compile(r'[\\/:*?"<>|\s]+')
+_NON_NUMERIC_RE = re.compile(r"[A-Za-z\u4e00-\u9fff]")
+_CENTER = Alignment(horizontal="center", vertical="center")
+_CENTER_WRAP = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_GRID_SIDE = Side(style="thin", color="BFBFBF")
+_GRID_BORDER = Border(left=_GRID_SIDE, right=_GRID_SIDE, top=_GRID_SIDE, bottom=_GRID_SIDE)
+
+_TITLE_FONT = {"size": 16, "bold": True, "color": "FFFFFF"}
+_SUBTITLE_FONT = {"size": 10, "color": "FFFFFF"}
+_SECTION_FONT = {"size": 12, "bold": True, "color": "FFFFFF"}
+_HEADER_FONT = {"size": 10, "bold": True, "color": "1F1F1F"}
+_BODY_FONT = {"size": 10, "color": "1F1F1F"}
+
+# Named style -> (fill colour, font, alignment, bordered, number format).
+_STYLE_SPECS = {
+    "cca_title": ("1F4E78", _TITLE_FONT, _CENTER, False, "General"),
+    "cca_subtitle": ("1F4E78", _SUBTITLE_FONT, _CENTER, False, "General"),
+    "cca_section": ("1F4E78", _SECTION_FONT, _CENTER, False, "General"),
+    "cca_header": ("DCE6F1", _HEADER_FONT, _CENTER_WRAP, True, "General"),
+    "cca_body": ("FFFFFF", _BODY_FONT, _CENTER_WRAP, True, "General"),
+    "cca_body_num": ("FFFFFF", _BODY_FONT, _CENTER_WRAP, True, NUMBER_FORMAT),
+    "cca_highlight": ("E6E6E6", _BODY_FONT, _CENTER_WRAP, True, "General"),
+    "cca_first": ("FFF2CC", _BODY_FONT, _CENTER_WRAP, True, "General"),
+    "cca_first_num": ("FFF2CC", _BODY_FONT, _CENTER_WRAP, True, NUMBER_FORMAT),
+}
+
 
 
 def _safe_text(value: Any, default: str = "") -> str:
@@ -84,7 +134,7 @@ def _coerce_numeric(value: Any) -> Any:
         normalized = normalized[:-1].strip()
 
     # Skip values that obviously contain letters or Chinese characters.
-    if re.search(r"[A-Za-z\u4e00-\u9fff]", normalized):
+    if _NON_NUMERIC_RE.search(normalized):
         return value
 
     try:
@@ -97,24 +147,6 @@ def _coerce_numeric(value: Any) -> Any:
     return num
 
 
-def _thousand_number_format_from_raw(value: Any) -> Optional[str]:
-    """
-    Build Excel number format with thousand separators and
-    default two decimal places.
-    """
-    text = _safe_text(value)
-    if not text or text == "-":
-        return None
-
-    normalized = text.replace(",", "").strip()
-    if normalized.endswith("%"):
-        normalized = normalized[:-1].strip()
-    if not normalized:
-        return None
-
-    return "#,##0.00"
-
-
 def _normalize_rows(table: Dict[str, Any], expected_cols: int) -> List[List[str]]:
     rows: List[List[str]] = []
     if not isinstance(table, dict):
@@ -131,112 +163,109 @@ def _normalize_rows(table: Dict[str, Any], expected_cols: int) -> List[List[str]
     return rows
 
 
-def _set_row_fill(ws, row_idx: int, start_col: int, end_col: int, fill: PatternFill) -> None:
-    for col_idx in range(start_col, end_col + 1):
-        ws.cell(row=row_idx, column=col_idx).fill = fill
-
-
-def _set_row_font(ws, row_idx: int, start_col: int, end_col: int, font: Font) -> None:
-    for col_idx in range(start_col, end_col + 1):
-        ws.cell(row=row_idx, column=col_idx).font = font
-
-
-def _set_row_alignment(ws, row_idx: int, start_col: int, end_col: int, alignment: Alignment) -> None:
-    for col_idx in range(start_col, end_col + 1):
-        ws.cell(row=row_idx, column=col_idx).alignment = alignment
-
-
-def _set_table_border(ws, row_start: int, row_end: int, col_start: int, col_end: int) -> None:
-    thin = Side(style="thin", color="BFBFBF")
-    border = Border(left=thin, right=thin, top=thin, bottom=thin)
-    for r in range(row_start, row_end + 1):
-        for c in range(col_start, col_end + 1):
-            ws.cell(row=r, column=c).border = border
+def _register_styles(workbook: Workbook) -> None:
+    """Register the report's named styles once per workbook."""
+    for name, (color, font, alignment, bordered, number_format) in _STYLE_SPECS.items():
+        if name not in workbook.named_styles:
+            workbook.add_named_style(
+                NamedStyle(
+                    name=name,
+                    fill=PatternFill(fill_type="solid", start_color=color, end_color=color),
+                    font=Font(name=FONT_NAME, **font),
+                    alignment=alignment,
+                    border=_GRID_BORDER if bordered else Border(),
+                    number_format=number_format,
+                )
+            )
+
+
+class _RowWriter:
+    """Append styled rows to a write-only sheet, tracking the current row number."""
+
+    def __init__(self, ws, total_cols: int) -> None:
+        self.ws = ws
+        self.total_cols = total_cols
+        self.row = 1
+
+    def cell(self, value: Any, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self.ws, value=value)
+        cell.style = style
+        return cell
+
+    def append(self, cells: List[WriteOnlyCell], height: Optional[float] = None) -> None:
+        # Row dimensions are streamed with the row, so they must be set first.
+        if height is not None:
+            self.ws.row_dimensions[self.row].height = height
+        self.ws.append(cells)
+        self.row += 1
+
+    def skip(self, count: int) -> None:
+        for _ in range(count):
+            self.ws.append([])
+        self.row += count
+
+    def header(self, names: List[str]) -> None:
+        padded = (list(names) + [None] * self.total_cols)[: self.total_cols]
+        self.append([self.cell(name, "cca_header") for name in padded], 34)
+
+    def body_cells(
+        self,
+        values: List[Any],
+        text_style: str,
+        number_style: str,
+        name_style: Optional[str] = None,
+        numeric_from: int = 3,
+    ) -> List[WriteOnlyCell]:
+        """
+        Cells for one data row padded to the table width; columns from
+        ``numeric_from`` (1-based) holding numeric text become numbers.
+        """
+        cell = self.cell
+        padded = (list(values) + [None] * self.total_cols)[: self.total_cols]
+        cells = [cell(padded[0], name_style or text_style)]
+        for col_idx, value in enumerate(padded[1:], start=2):
+            if col_idx >= numeric_from and value is not None:
+                value = _coerce_numeric(value)
+                if isinstance(value, (int, float)):
+                    cells.append(cell(value, number_style))
+                    continue
+            cells.append(cell(value, text_style))
+        return cells
+
+    def banner(self, text: str, style: str, height: float) -> None:
+        """Full-width merged row (report title, section title)."""
+        cells = [self.cell(text, style)] + [self.cell(None, style) for _ in range(self.total_cols - 1)]
+        self.ws.merged_cells.add(
+            CellRange(min_col=1, min_row=self.row, max_col=self.total_cols, max_row=self.row)
+        )
+        self.append(cells, height)
 
 
 def _write_section_table(
-    ws,
-    start_row: int,
+    writer: _RowWriter,
     section_title: str,
     headers: List[str],
     rows: List[List[str]],
-    total_cols: int,
-) -> int:
-    section_fill = PatternFill(fill_type="solid", start_color="1F4E78", end_color="1F4E78")
-    header_fill = PatternFill(fill_type="solid", start_color="DCE6F1", end_color="DCE6F1")
-    white_fill = PatternFill(fill_type="solid", start_color="FFFFFF", end_color="FFFFFF")
-    highlight_fill = PatternFill(fill_type="solid", start_color="E6E6E6", end_color="E6E6E6")
-    first_data_fill = PatternFill(fill_type="solid", start_color="FFF2CC", end_color="FFF2CC")
-
-    white_font = Font(name="Microsoft YaHei", size=12, bold=True, color="FFFFFF")
-    header_font = Font(name="Microsoft YaHei", size=10, bold=True, color="1F1F1F")
-    body_font = Font(name="Microsoft YaHei", size=10, color="1F1F1F")
-
-    ws.merge_cells(start_row=start_row, start_column=1, end_row=start_row, end_column=total_cols)
-    ws.cell(row=start_row, column=1, value=section_title)
-    _set_row_fill(ws, start_row, 1, total_cols, section_fill)
-    _set_row_font(ws, start_row, 1, total_cols, white_font)
-    _set_row_alignment(ws, start_row, 1, total_cols, Alignment(horizontal="center", vertical="center"))
-    ws.row_dimensions[start_row].height = 24
-
-    header_row = start_row + 1
-    table_headers = ["公司名称"] + headers
-    for idx, name in enumerate(table_headers, start=1):
-        ws.cell(row=header_row, column=idx, value=name)
-    _set_row_fill(ws, header_row, 1, total_cols, header_fill)
-    _set_row_font(ws, header_row, 1, total_cols, header_font)
-    _set_row_alignment(
-        ws,
-        header_row,
-        1,
-        total_cols,
-        Alignment(horizontal="center", vertical="center", wrap_text=True),
-    )
-    ws.row_dimensions[header_row].height = 34
+) -> None:
+    writer.banner(section_title, "cca_section", 24)
+    writer.header(["公司名称"] + headers)
 
-    current_row = header_row + 1
+    # A列=公司名称，B列=股票代码；从C列开始尝试转数字。
     for row_idx, values in enumerate(rows):
-        for col_idx, value in enumerate(values, start=1):
-            cell_value = value
-            # A列=公司名称，B列=股票代码；从C列开始尝试转数字。
-            if col_idx >= 3:
-                cell_value = _coerce_numeric(value)
-            cell = ws.cell(row=current_row, column=col_idx, value=cell_value)
-            if col_idx >= 3 and isinstance(cell_value, (int, float)):
-                num_fmt = _thousand_number_format_from_raw(value)
-                if num_fmt:
-                    cell.number_format = num_fmt
-        _set_row_fill(ws, current_row, 1, total_cols, white_fill)
-        row_name = values[0] if values else ""
-        if row_name in HIGHLIGHT_ROW_NAMES:
-            ws.cell(row=current_row, column=1).fill = highlight_fill
         if row_idx == 0:
-            for col_idx in range(1, total_cols + 1):
-                ws.cell(row=current_row, column=col_idx).fill = first_data_fill
-        _set_row_font(ws, current_row, 1, total_cols, body_font)
-        _set_row_alignment(
-            ws,
-            current_row,
-            1,
-            total_cols,
-            Alignment(horizontal="center", vertical="center", wrap_text=True),
-        )
-        ws.row_dimensions[current_row].height = 22
-        current_row += 1
-
-    data_end = current_row - 1 if current_row > header_row else header_row
-    _set_table_border(ws, header_row, data_end, 1, total_cols)
-    return current_row
+            writer.append(writer.body_cells(values, "cca_first", "cca_first_num"), 22)
+            continue
+        row_name = values[0] if values else ""
+        name_style = "cca_highlight" if row_name in HIGHLIGHT_ROW_NAMES else None
+        writer.append(writer.body_cells(values, "cca_body", "cca_body_num", name_style=name_style), 22)
 
 
-def build_themed_excel(
-    payload: Dict[str, Any],
-    output_dir: Optional[Path] = None,
-    output_filename: Optional[str] = None,
-) -> Dict[str, Any]:
+def _write_report_sheet(ws, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Stream one comparable-company report into a write-only worksheet."""
     header = payload.get("header") if isinstance(payload, dict) else {}
     section_finance = payload.get("section_finance") if isinstance(payload, dict) else {}
     section_valuation = payload.get("section_valuation") if isinstance(payload, dict) else {}
+    header = header if isinstance(header, dict) else {}
 
     title = _safe_text(header.get("title"), "可比公司分析")
     input_title = _safe_text(header.get("inputTitle"), "")
@@ -248,58 +277,32 @@ def build_themed_excel(
     finance_rows = _normalize_rows(finance_table, len(SECTION_FINANCE_HEADERS))
     valuation_rows = _normalize_rows(valuation_table, len(SECTION_VALUATION_HEADERS))
 
-    workbook = Workbook()
-    ws = workbook.active
-    ws.title = "可比公司分析"
-
-    total_cols = 13  # 公司名称 + 12 指标
-    top_fill = PatternFill(fill_type="solid", start_color="1F4E78", end_color="1F4E78")
-    top_font_title = Font(name="Microsoft YaHei", size=16, bold=True, color="FFFFFF")
-    top_font_sub = Font(name="Microsoft YaHei", size=10, color="FFFFFF")
-    center = Alignment(horizontal="center", vertical="center")
-
-    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=total_cols)
-    ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=total_cols)
-    ws.merge_cells(start_row=3, start_column=1, end_row=3, end_column=total_cols)
-
-    ws.cell(row=1, column=1, value=title)
-    ws.cell(row=2, column=1, value=input_title)
-    ws.cell(row=3, column=1, value=frontend_title)
-
-    for top_row in (1, 2, 3):
-        _set_row_fill(ws, top_row, 1, total_cols, top_fill)
-        _set_row_alignment(ws, top_row, 1, total_cols, center)
-    _set_row_font(ws, 1, 1, total_cols, top_font_title)
-    _set_row_font(ws, 2, 1, total_cols, top_font_sub)
-    _set_row_font(ws, 3, 1, total_cols, top_font_sub)
-    ws.row_dimensions[1].height = 30
-    ws.row_dimensions[2].height = 22
-    ws.row_dimensions[3].height = 20
-
-    current_row = 5
-    current_row = _write_section_table(
-        ws=ws,
-        start_row=current_row,
-        section_title="第一节：经营统计与财务指标",
-        headers=SECTION_FINANCE_HEADERS,
-        rows=finance_rows,
-        total_cols=total_cols,
-    )
+    # Column widths are written ahead of the rows in write-only mode.
+    for idx, width in enumerate(COL_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
 
-    current_row += 3
+    writer = _RowWriter(ws, TOTAL_COLS)
+    writer.banner(title, "cca_title", 30)
+    writer.banner(input_title, "cca_subtitle", 22)
+    writer.banner(frontend_title, "cca_subtitle", 20)
+    writer.skip(1)
 
-    _write_section_table(
-        ws=ws,
-        start_row=current_row,
-        section_title="第二节：估值情况",
-        headers=SECTION_VALUATION_HEADERS,
-        rows=valuation_rows,
-        total_cols=total_cols,
-    )
+    _write_section_table(writer, "第一节：经营统计与财务指标", SECTION_FINANCE_HEADERS, finance_rows)
+    writer.skip(3)
+    _write_section_table(writer, "第二节：估值情况", SECTION_VALUATION_HEADERS, valuation_rows)
+
+    return {"title": title, "row_count_finance": len(finance_rows), "row_count_valuation": len(valuation_rows)}
 
-    col_widths = [18, 13, 17, 17, 17, 17, 18, 18, 18, 17, 17, 17, 17]
-    for idx, width in enumerate(col_widths, start=1):
-        ws.column_dimensions[chr(64 + idx)].width = width
+
+def build_themed_excel(
+    payload: Dict[str, Any],
+    output_dir: Optional[Path] = None,
+    output_filename: Optional[str] = None,
+) -> Dict[str, Any]:
+    workbook = Workbook(write_only=True)
+    _register_styles(workbook)
+    ws = workbook.create_sheet("可比公司分析")
+    summary = _write_report_sheet(ws, payload)
 
     out_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -307,7 +310,7 @@ def build_themed_excel(
     output_path = out_dir / file_name
     workbook.save(str(output_path))
 
-    return {"output_path": str(output_path), "title": title, "row_count_finance": len(finance_rows), "row_count_valuation": len(valuation_rows)}
+    return {"output_path": str(output_path), **summary}
 
 
 async def generate_excel_from_query(
@@ -321,24 +324,313 @@ async def generate_excel_from_query(
     return build_themed_excel(payload=data, output_dir=output_dir, output_filename=output_filename)
 
 
+def _safe_sheet_name(raw_name: str, used_names: Set[str]) -> str:
+    """Legal, unique sheet name: illegal characters replaced, at most 31 chars."""
+    base = _SHEET_NAME_ILLEGAL_RE.sub("_", _safe_text(raw_name))[:31] or "Sheet"
+    candidate = base
+    idx = 2
+    while candidate in used_names:
+        suffix = "_{0}".format(idx)
+        candidate = base[: 31 - len(suffix)] + suffix
+        idx += 1
+    used_names.add(candidate)
+    return candidate
+
+
+def _collect_peer_universe(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge the company rows of every successful anchor into one peer list.
+
+    Companies are keyed by stock code (by name when the code is missing),
+    so a peer shared by several anchors appears once, together with the
+    anchors that cover it. Statistic rows are skipped; metrics come from
+    the first anchor that reports the company.
+    """
+    peers: Dict[str, Dict[str, Any]] = {}
+    sections = (
+        ("finance", "section_finance", SECTION_FINANCE_HEADERS),
+        ("valuation", "section_valuation", SECTION_VALUATION_HEADERS),
+    )
+    for entry in entries:
+        payload = entry.get("payload")
+        if not payload:
+            continue
+        for key, section_key, headers in sections:
+            section = payload.get(section_key)
+            table = section.get("table") if isinstance(section, dict) else {}
+            for row in _normalize_rows(table, len(headers)):
+                name, code = row[0], row[1]
+                if name in HIGHLIGHT_ROW_NAMES:
+                    continue
+                peer_key = code if code not in ("", "-") else name
+                peer = peers.get(peer_key)
+                if peer is None:
+                    peer = peers[peer_key] = {"name": name, "code": code, "anchors": []}
+                if key not in peer:
+                    peer[key] = row[2:]
+                if entry["query"] not in peer["anchors"]:
+                    peer["anchors"].append(entry["query"])
+    return list(peers.values())
+
+
+def _write_plain_sheet(
+    ws,
+    title: str,
+    headers: List[str],
+    rows: List[List[Any]],
+    widths: List[int],
+    numeric_from: int,
+) -> None:
+    for idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    writer = _RowWriter(ws, len(headers))
+    writer.banner(title, "cca_section", 24)
+    writer.header(headers)
+    for values in rows:
+        writer.append(writer.body_cells(values, "cca_body", "cca_body_num", numeric_from=numeric_from), 22)
+
+
+def _write_batch_workbook(
+    output_path: Path,
+    entries: List[Dict[str, Any]],
+    peers: List[Dict[str, Any]],
+    with_reports: bool,
+) -> None:
+    """
+    Batch workbook: a summary sheet (one row per anchor), the deduplicated
+    peer universe and, when ``with_reports`` is set, one themed report
+    sheet per successful anchor.
+    """
+    workbook = Workbook(write_only=True)
+    _register_styles(workbook)
+    # Write-only sheets stream to separate temp files, so the summary sheet
+    # can come first in the workbook yet be filled after the report sheets.
+    summary_ws = workbook.create_sheet(BATCH_SUMMARY_SHEET)
+    peers_ws = workbook.create_sheet(BATCH_PEERS_SHEET)
+
+    if with_reports:
+        used_names = {BATCH_SUMMARY_SHEET, BATCH_PEERS_SHEET}
+        width = len(str(len(entries)))
+        for entry in entries:
+            if "payload" not in entry:
+                continue
+            name = _safe_sheet_name("{0:0{1}d}_{2}".format(entry["index"] + 1, width, entry["query"]), used_names)
+            entry["sheet_name"] = name
+            entry.update(_write_report_sheet(workbook.create_sheet(name), entry["payload"]))
+
+    finance_blank = ["-"] * (len(SECTION_FINANCE_HEADERS) - 1)
+    valuation_blank = ["-"] * (len(SECTION_VALUATION_HEADERS) - 1)
+    peer_rows = [
+        [p["name"], p["code"], len(p["anchors"]), "、".join(p["anchors"])]
+        + p.get("finance", finance_blank)
+        + p.get("valuation", valuation_blank)
+        for p in peers
+    ]
+    _write_plain_sheet(
+        peers_ws,
+        "同业公司汇总（按股票代码去重，共 {0} 家）".format(len(peers)),
+        PEER_UNIVERSE_HEADERS,
+        peer_rows,
+        [18, 13, 12, 30] + [17] * (len(PEER_UNIVERSE_HEADERS) - 4),
+        numeric_from=5,
+    )
+
+    summary_rows = [
+        [
+            e["index"] + 1,
+            e["query"],
+            "失败" if "error" in e else "成功",
+            e.get("title", ""),
+            e.get("row_count_finance", ""),
+            e.get("row_count_valuation", ""),
+            e.get("sheet_name") or (Path(e["output_path"]).name if e.get("output_path") else ""),
+            e.get("error", ""),
+        ]
+        for e in entries
+    ]
+    _write_plain_sheet(
+        summary_ws,
+        "可比公司批量分析（{0} 个标的）".format(len(entries)),
+        BATCH_SUMMARY_HEADERS,
+        summary_rows,
+        [8, 24, 8, 30, 12, 12, 40, 40],
+        numeric_from=len(BATCH_SUMMARY_HEADERS) + 1,
+    )
+
+    workbook.save(str(output_path))
+
+
+def _render_report_files(entries: List[Dict[str, Any]], output_dir: Path, workers: int) -> None:
+    """
+    One themed workbook per successful anchor, rendered in worker processes
+    when ``workers`` > 1; each result is merged into its entry. A render
+    failure is recorded as that anchor's error on either path.
+    """
+    width = len(str(len(entries)))
+    jobs = []
+    for entry in entries:
+        if "payload" not in entry:
+            continue
+        slug = _FILE_NAME_ILLEGAL_RE.sub("_", entry["query"])[:40]
+        file_name = "comparable_company_analysis_{0:0{1}d}_{2}.xlsx".format(entry["index"] + 1, width, slug)
+        jobs.append((entry, file_name))
+
+    if workers <= 1 or len(jobs) <= 1:
+        for entry, file_name in jobs:
+            try:
+                entry.update(build_themed_excel(entry["payload"], output_dir, file_name))
+            except Exception as exc:
+                entry["error"] = "render failed: {0}".format(exc)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [
+            (entry, pool.submit(build_themed_excel, entry["payload"], output_dir, file_name))
+            for entry, file_name in jobs
+        ]
+        for entry, future in futures:
+            try:
+                entry.update(future.result())
+            except Exception as exc:
+                entry["error"] = "render failed: {0}".format(exc)
+
+
+async def generate_excel_batch(
+    queries: List[str],
+    output_dir: Optional[Path] = None,
+    output_filename: Optional[str] = None,
+    *,
+    split: bool = False,
+    concurrency: int = BATCH_CONCURRENCY,
+    workers: int = BATCH_WORKERS,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Comparable-company reports for many anchor companies.
+
+    The comparison calls run concurrently over one pooled client (see
+    ``fetch_comparable_company_batch``). By default each anchor becomes a
+    sheet of one batch workbook. With ``split`` each anchor gets its own
+    workbook, rendered in ``workers`` processes, and the batch workbook
+    keeps only the summary and the deduplicated peer universe. A failed
+    anchor is recorded in the summary and does not affect the others.
+    """
+    started = time.monotonic()
+    out_dir = Path(output_dir or DEFAULT_OUTPUT_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    fetched = await fetch_comparable_company_batch(queries, concurrency=concurrency, on_result=on_result)
+    entries: List[Dict[str, Any]] = []
+    for index, (query, data) in enumerate(zip(queries, fetched)):
+        entry: Dict[str, Any] = {"index": index, "query": _safe_text(query)}
+        if "error" in data:
+            entry["error"] = data["error"]
+        else:
+            entry["payload"] = {k: data.get(k) for k in ("header", "section_finance", "section_valuation")}
+        entries.append(entry)
+
+    peers = _collect_peer_universe(entries)
+    if split:
+        _render_report_files(entries, out_dir, workers)
+    file_name = output_filename or "comparable_company_batch_{0}.xlsx".format(uuid.uuid4().hex[:8])
+    output_path = out_dir / file_name
+    _write_batch_workbook(output_path, entries, peers, with_reports=not split)
+
+    keys = ("index", "query", "title", "row_count_finance", "row_count_valuation", "sheet_name", "output_path", "error")
+    return {
+        "output_path": str(output_path),
+        "total": len(entries),
+        "succeeded": sum(1 for e in entries if "error" not in e),
+        "failed": sum(1 for e in entries if "error" in e),
+        "peer_count": len(peers),
+        "results": [{k: e[k] for k in keys if k in e} for e in entries],
+        "elapsed_sec": round(time.monotonic() - started, 1),
+    }
+
+
+def _read_batch_queries(path: str) -> List[str]:
+    """One question per line ("-" reads stdin); blank and # lines are skipped."""
+    if path == "-":
+        import sys
+
+        text = sys.stdin.read()
+    else:
+        text = Path(path).read_text(encoding="utf-8-sig")
+    lines = [line.strip() for line in text.splitlines()]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
 def _build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Create themed comparable-company Excel report.")
     parser.add_argument("--query", type=str, help="Natural language company question.")
     parser.add_argument("--output", type=str, default="", help="Optional output xlsx file path.")
+    parser.add_argument(
+        "--batch-file",
+        type=str,
+        default="",
+        help='Batch mode: text file with one anchor company per line ("-" reads stdin).',
+    )
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        help="Batch mode: one workbook per anchor instead of one multi-sheet workbook.",
+    )
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Batch mode: concurrent API calls.")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Batch mode with --split: render processes.")
     return parser
 
 
+def _run_batch_cli(args: argparse.Namespace, output_dir: Optional[Path], output_filename: Optional[str]) -> None:
+    try:
+        queries = _read_batch_queries(args.batch_file)
+    except OSError as exc:
+        print("Error: cannot read batch file: {0}".format(exc))
+        raise SystemExit(1)
+    if not queries:
+        print("Error: batch file has no questions.")
+        raise SystemExit(1)
+
+    finished = 0
+
+    def _on_result(index: int, result: Dict[str, Any]) -> None:
+        nonlocal finished
+        finished += 1
+        status = "failed - {0}".format(result["error"]) if "error" in result else "ok"
+        print("[{0}/{1}] {2}: {3}".format(finished, len(queries), queries[index], status), flush=True)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        summary = loop.run_until_complete(
+            generate_excel_batch(
+                queries,
+                output_dir=output_dir,
+                output_filename=output_filename,
+                split=args.split,
+                concurrency=args.concurrency,
+                workers=args.workers,
+                on_result=_on_result,
+            )
+        )
+    finally:
+        loop.close()
+
+    print(
+        "Done: {0}/{1} succeeded, {2} failed, {3} unique peers, {4}s".format(
+            summary["succeeded"], summary["total"], summary["failed"], summary["peer_count"], summary["elapsed_sec"]
+        )
+    )
+    for item in summary["results"]:
+        if item.get("output_path"):
+            print("Saved: {0}".format(item["output_path"]))
+    print("Saved: {0}".format(summary["output_path"]))
+    if not summary["succeeded"]:
+        raise SystemExit(2)
+
+
 def run_cli() -> None:
     parser = _build_arg_parser()
     args = parser.parse_args()
-    query = _safe_text(args.query)
-    if not query:
-        import sys
-
-        query = _safe_text(sys.stdin.read())
-    if not query:
-        parser.print_help()
-        raise SystemExit(1)
 
     output_path_raw = _safe_text(args.output)
     output_dir = None
@@ -348,6 +640,22 @@ def run_cli() -> None:
         output_dir = output_path.parent
         output_filename = output_path.name
 
+    if args.batch_file:
+        if _safe_text(args.query):
+            print("Error: --batch-file cannot be combined with --query.")
+            raise SystemExit(1)
+        _run_batch_cli(args, output_dir, output_filename)
+        return
+
+    query = _safe_text(args.query)
+    if not query:
+        import sys
+
+        query = _safe_text(sys.stdin.read())
+    if not query:
+        parser.print_help()
+        raise SystemExit(1)
+
     async def _main() -> None:
         result = await generate_excel_from_query(
             query=query,
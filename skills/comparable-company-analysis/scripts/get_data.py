@@ -9,9 +9,9 @@ import argparse
 import asyncio
 import json
 import os
-from typing import Any, Dict, List
-from urllib import error as urllib_error
-from urllib import request as urllib_request
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
 
 # █████████████████████████████████████████████████████████████████████████
 # ██                                                                  ██
@@ -63,6 +63,7 @@ if not EM_API_KEY:
 
 COMPARE_API_URL = "https://ai-saas.eastmoney.com/proxy/app-robo-advisor-api/assistant/comparable-company-analysis"
 TIMEOUT_SECONDS = 60
+BATCH_CONCURRENCY = int(os.environ.get("COMPARABLE_COMPANY_BATCH_CONCURRENCY") or "8")
 
 
 def _extract_error_message(body: str) -> str:
@@ -96,30 +97,26 @@ def _is_success(payload: Dict[str, Any]) -> bool:
     return ok_code and ok_status and isinstance(payload.get("data"), list)
 
 
-def _http_call_compare(question: str) -> Dict[str, Any]:
+async def _http_call_compare(question: str, client: httpx.AsyncClient) -> Dict[str, Any]:
     req_body = json.dumps({"question": question}, ensure_ascii=False).encode("utf-8")
-    req = urllib_request.Request(
-        url=COMPARE_API_URL,
-        method="POST",
-        data=req_body,
-        headers={
-            "Content-Type": "application/json",
-            "em_api_key": EM_API_KEY,
-        },
-    )
-
     try:
-        with urllib_request.urlopen(req, timeout=TIMEOUT_SECONDS) as resp:
-            raw_body = resp.read().decode("utf-8", errors="replace")
-    except urllib_error.HTTPError as exc:
-        err_body = exc.read().decode("utf-8", errors="replace") if exc.fp else ""
-        message = _extract_error_message(err_body) or "http status {0}".format(exc.code)
+        resp = await client.post(
+            COMPARE_API_URL,
+            content=req_body,
+            headers={
+                "Content-Type": "application/json",
+                "em_api_key": EM_API_KEY,
+            },
+        )
+        resp.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        message = _extract_error_message(exc.response.text) or "http status {0}".format(exc.response.status_code)
         raise RuntimeError("Comparable-company API request failed: {0}".format(message))
-    except urllib_error.URLError as exc:
-        raise RuntimeError("Comparable-company API request failed: {0}".format(exc.reason))
+    except httpx.HTTPError as exc:
+        raise RuntimeError("Comparable-company API request failed: {0}".format(exc))
 
     try:
-        parsed = json.loads(raw_body)
+        parsed = json.loads(resp.text)
     except json.JSONDecodeError:
         raise RuntimeError("Comparable-company API returned invalid JSON response.")
 
@@ -134,7 +131,15 @@ def _pick_dict(data_list: List[Any], idx: int) -> Dict[str, Any]:
     return {}
 
 
-async def fetch_comparable_company_data(question: str) -> Dict[str, Any]:
+async def fetch_comparable_company_data(
+    question: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch and normalize one comparable-company analysis.
+    Without a client a private one is opened and closed; batch callers
+    pass a shared client so requests reuse its connection pool.
+    """
     question = (question or "").strip()
     if not question:
         return {
@@ -147,6 +152,10 @@ async def fetch_comparable_company_data(question: str) -> Dict[str, Any]:
             "error": "question is empty",
         }
 
+    if client is None:
+        async with httpx.AsyncClient(timeout=TIMEOUT_SECONDS) as own_client:
+            return await fetch_comparable_company_data(question, client=own_client)
+
     result = {
         "question": question,
         "header": {},
@@ -157,8 +166,7 @@ async def fetch_comparable_company_data(question: str) -> Dict[str, Any]:
     }
 
     try:
-        loop = asyncio.get_event_loop()
-        raw = await loop.run_in_executor(None, _http_call_compare, question)
+        raw = await _http_call_compare(question, client)
     except Exception as exc:
         result["error"] = str(exc)
         return result
@@ -185,6 +193,41 @@ async def fetch_comparable_company_data(question: str) -> Dict[str, Any]:
     return result
 
 
+async def fetch_comparable_company_batch(
+    questions: List[str],
+    *,
+    concurrency: int = BATCH_CONCURRENCY,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch many comparable-company analyses over one pooled client.
+
+    At most ``concurrency`` requests are in flight; repeated questions are
+    requested once and share the result. Results are index-aligned with
+    ``questions``; ``on_result(index, result)`` fires as each one completes.
+    A failed question carries ``error`` and does not affect the others.
+    """
+    concurrency = max(1, concurrency)
+    sem = asyncio.Semaphore(concurrency)
+    results: List[Dict[str, Any]] = [{} for _ in questions]
+    indexes: Dict[str, List[int]] = {}
+    for i, q in enumerate(questions):
+        indexes.setdefault((q or "").strip(), []).append(i)
+
+    async def _one(question: str, client: httpx.AsyncClient) -> None:
+        async with sem:
+            result = await fetch_comparable_company_data(question, client=client)
+        for index in indexes[question]:
+            results[index] = result
+            if on_result is not None:
+                on_result(index, result)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=TIMEOUT_SECONDS, limits=limits) as client:
+        await asyncio.gather(*(_one(q, client) for q in indexes))
+    return results
+
+
 def _build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Fetch comparable-company analysis data.")
     parser.add_argument("--query", type=str, help="Natural language company question.")
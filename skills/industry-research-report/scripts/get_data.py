@@ -13,10 +13,12 @@ import json
 import os
 from pathlib import Path
 import httpx
-import base64
 import argparse
 import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from base64_attachments import Base64JsonReader, save_base64
+
 # █████████████████████████████████████████████████████████████████████████
 # ██                                                                  ██
 # ██   ███████╗███╗   ███╗     █████╗ ██████╗ ██╗    ██╗ ██████╗       ██
@@ -74,15 +76,13 @@ print('默认输出目录为：',DEFAULT_OUTPUT_DIR.absolute())
 MCP_URL = "https://ai-saas.eastmoney.com/proxy/app-robo-advisor-api/assistant/write/industry/research"
 
 
-def _save_base64_file(b64_str: str, file_path: Path) -> bool:
-    """将 base64 字符串解码后写入文件。"""
-    if not b64_str:
-        return False
+ATTACHMENT_KEYS = ("pdfBase64", "wordBase64")
+
+
+def _save_base64_file(value, file_path: Path) -> bool:
+    """将 base64 附件字段（流式落盘的临时文件或字符串）写入文件。"""
     try:
-        raw = base64.b64decode(b64_str)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_bytes(raw)
-        return True
+        return save_base64(value, file_path)
     except Exception as exc:
         print(f"[WARN] 保存附件失败 ({file_path.name}): {exc}", file=sys.stderr)
         return False
@@ -135,18 +135,22 @@ async def get_industry_research_report(query: str, output_dir: Path):
 
     try:
         async with httpx.AsyncClient(timeout=1200.0) as client:
-            result = await client.post(
+            # 流式读取：PDF / Word 的 base64 字段边读边解码落盘，不在内存中保留完整响应
+            reader = Base64JsonReader(ATTACHMENT_KEYS, spool_dir=output_dir)
+            async with client.stream(
+                "POST",
                 MCP_URL,
                 json={"query": query},
                 headers={
                     "Content-Type": "application/json",
                     "em_api_key": EM_API_KEY,
                 },
-            )
+            ) as result:
+                result.raise_for_status()
+                async for chunk in result.aiter_bytes():
+                    reader.feed(chunk)
 
-            result.raise_for_status()
-            
-            result_data_api = result.json()
+            result_data_api = reader.result()
             
             title = result_data_api["data"]["title"]
             content = result_data_api["data"]["content"]
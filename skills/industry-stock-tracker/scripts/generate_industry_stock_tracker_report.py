@@ -15,7 +15,6 @@
 """
 
 import argparse
-import base64
 import json
 import os
 import socket
@@ -28,12 +27,17 @@ import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from base64_attachments import Base64JsonReader, has_base64, iter_response, save_base64
+
 
 API_URL = "https://ai-saas.eastmoney.com/proxy/app-robo-advisor-api/assistant/write/tracking/report"
 API_KEY = os.environ.get("EM_API_KEY", "")
 TOOL_NAME = "行业/个股跟踪报告"
 DEFAULT_OUTPUT_DIR = Path.cwd() / "miaoxiang" / "industry_stock_tracker"
 
+ATTACHMENT_KEYS = ("wordBase64", "pdfBase64")
+
 ERROR_ENTITY_MSG = "目前暂不支持此类实体体进行分析。"
 GENERAL_ERROR_MSG = "报告生成服务暂时不可用，请稍后重试。"
 
@@ -96,10 +100,16 @@ def _call_api(query: str, timeout: float = 1200.0) -> Dict[str, Any]:
             "User-Agent": "industry-stock-tracker/1.0",
         },
     )
+    # 流式读取：附件 base64 边读边解码落盘，不在内存中保留完整响应
+    reader = Base64JsonReader(ATTACHMENT_KEYS, spool_dir=DEFAULT_OUTPUT_DIR)
+    head = b""
     try:
         with urllib.request.urlopen(req, timeout=timeout) as resp:
             status_code = getattr(resp, "status", None) or resp.getcode()
-            content = resp.read()
+            for chunk in iter_response(resp):
+                if len(head) < 500:
+                    head += chunk[: 500 - len(head)]
+                reader.feed(chunk)
 
     except urllib.error.HTTPError as e:
         raw = e.read() if hasattr(e, "read") else b""
@@ -113,14 +123,14 @@ def _call_api(query: str, timeout: float = 1200.0) -> Dict[str, Any]:
             raise ApiCallError("TIMEOUT", "read operation timed out")
         raise ApiCallError("NETWORK_ERROR", _safe_str(reason))
 
-    text = content.decode("utf-8", errors="replace")
+    text = head.decode("utf-8", errors="replace")
     if status_code and int(status_code) >= 400:
-        raise ApiCallError("HTTP_ERROR", "status={0}, body={1}".format(status_code, text[:500]))
+        raise ApiCallError("HTTP_ERROR", "status={0}, body={1}".format(status_code, text))
 
     try:
-        parsed = json.loads(text) if text else {}
+        parsed = reader.result() if head.strip() else {}
     except Exception:
-        raise ApiCallError("INVALID_JSON", text[:500])
+        raise ApiCallError("INVALID_JSON", text)
 
     return parsed if isinstance(parsed, dict) else {"data": parsed}
 
@@ -146,17 +156,16 @@ def _decode_attachment_base64(data: Dict[str, Any], output_dir: str) -> List[Dic
     safe_article_id = re.sub(r"[^a-zA-Z0-9_-]+", "_", article_id)
 
     for key, ext, ftype in file_map:
-        b64_str = _safe_str(data.get(key))
-        if not b64_str:
+        b64_value = data.get(key)
+        if not has_base64(b64_value):
             continue
+        file_name = "{0}_{1}.{2}".format(safe_article_id, ftype.lower(), ext)
+        file_path = os.path.join(output_dir, file_name)
         try:
-            raw = base64.b64decode(b64_str)
+            if not save_base64(b64_value, Path(file_path)):
+                continue
         except Exception:
             continue
-        file_name = "{0}_{1}.{2}".format(safe_article_id, ftype.lower(), ext)
-        file_path = os.path.join(output_dir, file_name)
-        with open(file_path, "wb") as f:
-            f.write(raw)
         attachments.append({"type": ftype, "url": file_path})
     return attachments
 
@@ -10,7 +10,6 @@
 
 import argparse
 import asyncio
-import base64
 import os
 import sys
 import uuid
@@ -19,6 +18,9 @@ from typing import Any, Dict
 
 import httpx
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from base64_attachments import Base64JsonReader, has_base64, save_base64
+
 # █████████████████████████████████████████████████████████████████████████
 # ██                                                                  ██
 # ██   ███████╗███╗   ███╗     █████╗ ██████╗ ██╗    ██╗ ██████╗       ██
@@ -84,15 +86,13 @@ REPORT_TIMEOUT = 1200.0
 # ─────────────────── 调用首次覆盖写作接口 ───────────────────
 
 
-def _save_base64_file(b64_str: str, file_path: Path) -> bool:
-    """将 base64 字符串解码后写入文件。"""
-    if not b64_str:
-        return False
+ATTACHMENT_KEYS = ("pdfBase64", "wordBase64")
+
+
+def _save_base64_file(value: Any, file_path: Path) -> bool:
+    """将 base64 附件字段（流式落盘的临时文件或字符串）写入文件。"""
     try:
-        raw = base64.b64decode(b64_str)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_bytes(raw)
-        return True
+        return save_base64(value, file_path)
     except Exception as exc:
         print(f"[WARN] 保存附件失败 ({file_path.name}): {exc}", file=sys.stderr)
         return False
@@ -114,16 +114,21 @@ async def generate_report(query: str, output_dir: Path) -> Dict:
 
     try:
         async with httpx.AsyncClient(timeout=REPORT_TIMEOUT, follow_redirects=True) as client:
-            resp = await client.post(
+            # 流式读取：附件 base64 边读边解码落盘到输出目录，不在内存中保留完整响应
+            reader = Base64JsonReader(ATTACHMENT_KEYS, spool_dir=output_dir)
+            async with client.stream(
+                "POST",
                 FIRST_COVERAGE_URL,
                 json={"query": query},
                 headers={
                     "Content-Type": "application/json",
                     "em_api_key": EM_API_KEY,
                 },
-            )
-            resp.raise_for_status()
-            payload = resp.json()
+            ) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes():
+                    reader.feed(chunk)
+            payload = reader.result()
     except httpx.TimeoutException:
         return {**result_base, "error": "报告生成服务暂时不可用，请稍后重试。"}
     except httpx.HTTPStatusError as exc:
@@ -157,13 +162,13 @@ async def generate_report(query: str, output_dir: Path) -> Dict:
     }
 
     pdf_b64 = data.get("pdfBase64", "")
-    if pdf_b64:
+    if has_base64(pdf_b64):
         pdf_path = output_dir / f"initiation_of_coverage_or_deep_dive_{unique_suffix}.pdf"
         if _save_base64_file(pdf_b64, pdf_path):
             result["pdf_file_path"] = str(pdf_path)
 
     word_b64 = data.get("wordBase64", "")
-    if word_b64:
+    if has_base64(word_b64):
         word_path = output_dir / f"initiation_of_coverage_or_deep_dive_{unique_suffix}.docx"
         if _save_base64_file(word_b64, word_path):
             result["word_file_path"] = str(word_path)
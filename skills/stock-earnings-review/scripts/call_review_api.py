@@ -2,11 +2,12 @@ import argparse
 import asyncio
 import json
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import httpx
 
 from common import (
+    ATTACHMENT_BASE64_KEYS,
     PERFORMANCE_COMMENT_API,
     EntityInfo,
     build_comment_payload,
@@ -16,6 +17,10 @@ from common import (
     write_json_log,
     base_headers,
 )
+from base64_attachments import Base64JsonReader
+
+# 点评接口生成耗时较长（数分钟），单独使用较长的超时
+REVIEW_TIMEOUT_SEC = 1200.0
 
 
 async def call_review_api(
@@ -24,12 +29,20 @@ async def call_review_api(
     log_dir: str = "",
     attachment_dir: str = "",
     debug: bool = False,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> Dict[str, Any]:
+    if client is None:
+        async with httpx.AsyncClient(timeout=REVIEW_TIMEOUT_SEC, verify=False) as own_client:
+            return await call_review_api(entity, report_date, log_dir, attachment_dir, debug, client=own_client)
+
     payload = build_comment_payload(entity.em_code, report_date)
-    async with httpx.AsyncClient(timeout=1200.0, verify=False) as client:
-        resp = await client.post(PERFORMANCE_COMMENT_API, headers=base_headers(), json=payload)
+    # 流式读取：附件 base64 边读边解码落盘，不在内存中保留完整响应
+    reader = Base64JsonReader(ATTACHMENT_BASE64_KEYS, spool_dir=attachment_dir or None)
+    async with client.stream("POST", PERFORMANCE_COMMENT_API, headers=base_headers(), json=payload) as resp:
         resp.raise_for_status()
-        raw = resp.json()
+        async for chunk in resp.aiter_bytes():
+            reader.feed(chunk)
+    raw = reader.result()
 
     code = raw.get("code") if isinstance(raw, dict) else None
     status = raw.get("status") if isinstance(raw, dict) else None
@@ -1,17 +1,30 @@
 import json
 import os
 import re
+import sys
 import uuid
-import base64
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from base64_attachments import has_base64, save_base64
+
 ENTITY_API = "https://ai-saas.eastmoney.com/proxy/entity/dialogTagsV2"
 REPORT_LIST_API = "https://ai-saas.eastmoney.com/proxy/app-robo-advisor-api/assistant/write/choice/reportList"
 PERFORMANCE_COMMENT_API = "https://ai-saas.eastmoney.com/proxy/app-robo-advisor-api/assistant/write/performance/comment"
 SUPPORTED_CLASS_CODES = {"002001", "002003", "002004"}
+DATA_SHEET_BASE64_KEYS = (
+    "dataSheetBase64",
+    "excelBase64",
+    "dataBase64",
+    "sheetBase64",
+    "dataBase64Str",
+    "attachDataBase64",
+)
+# 业绩点评响应中内联 base64 附件的字段（流式读取时直接解码落盘）
+ATTACHMENT_BASE64_KEYS = ("pdfBase64", "wordBase64") + DATA_SHEET_BASE64_KEYS
 
 # 默认写入当前工作目录下的 miaoxiang/<skill_slug>/
 DEFAULT_OUTPUT_DIR = Path.cwd() / "miaoxiang" / "stock-earnings-review"
@@ -92,16 +105,9 @@ def extract_title(content: str) -> str:
 def _pick_data_sheet_base64(data: Dict[str, Any]) -> Any:
     if not isinstance(data, dict):
         return None
-    for k in (
-        "dataSheetBase64",
-        "excelBase64",
-        "dataBase64",
-        "sheetBase64",
-        "dataBase64Str",
-        "attachDataBase64",
-    ):
+    for k in DATA_SHEET_BASE64_KEYS:
         v = data.get(k)
-        if isinstance(v, str) and v.strip():
+        if has_base64(v):
             return v
     return None
 
@@ -200,19 +206,29 @@ def save_attachment_payload(
     name = str(payload.get("filename") or default_name)
     path = out / name
     if isinstance(payload.get("base64"), str):
-        b64 = payload["base64"].strip()
-        if not b64:
-            return None
-        raw = base64.b64decode(b64)
-        path.write_bytes(raw)
-        return str(path)
+        # 流式落盘的附件直接改名，字符串按块解码写入，均不生成完整的解码副本
+        return str(path) if save_base64(payload["base64"], path) else None
     for key in ("bytes", "binary"):
         arr = payload.get(key)
         if isinstance(arr, list):
             try:
-                path.write_bytes(bytes(int(x) & 0xFF for x in arr))
+                _write_byte_list(arr, path)
                 return str(path)
             except Exception:
                 return None
     return None
 
+
+BYTE_LIST_CHUNK = 1 << 20
+
+
+def _write_byte_list(arr: list, path: Path) -> None:
+    """整数列表分块写入；元素均在 0..255 时走 bytes(list) 的 C 实现，否则按位截断。"""
+    with path.open("wb") as fh:
+        for start in range(0, len(arr), BYTE_LIST_CHUNK):
+            part = arr[start : start + BYTE_LIST_CHUNK]
+            try:
+                fh.write(bytes(part))
+            except (TypeError, ValueError):
+                fh.write(bytes(int(x) & 0xFF for x in part))
+
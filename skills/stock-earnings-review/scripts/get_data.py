@@ -1,38 +1,35 @@
 import argparse
 import asyncio
+import json
+import os
+import re
+import time
 import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from call_review_api import call_review_api
-from common import default_output_root
-from normalize_report_period import choose_report_option_by_model, fetch_report_options
-from validate_entity import validate_entity
+import httpx
 
+from call_review_api import REVIEW_TIMEOUT_SEC, call_review_api
+from common import EntityInfo, default_output_root
+from normalize_report_period import ReportOption, choose_report_option_by_model, fetch_report_options
+from validate_entity import remember_entities, validate_entity
 
-async def query_stock_earnings_review(query: str, output_dir: Path) -> Dict[str, Any]:
-    output_dir.mkdir(parents=True, exist_ok=True)
+# 批量模式：实体识别 + 报告期查询耗时短，高并发先行；点评生成耗时长，单独限流
+LOOKUP_CONCURRENCY = int(os.environ.get("STOCK_EARNINGS_REVIEW_LOOKUP_CONCURRENCY") or "16")
+REVIEW_CONCURRENCY = int(os.environ.get("STOCK_EARNINGS_REVIEW_REVIEW_CONCURRENCY") or "4")
+LOOKUP_TIMEOUT_SEC = 30.0
 
-    result: Dict[str, Any] = {
-        "query": query,
-        "description_path": None,
-        "row_count": 0,
-    }
-
-    try:
-        entity = await validate_entity(query)
-        options = await fetch_report_options(entity)
-        matched = choose_report_option_by_model(options)
-        review = await call_review_api(
-            entity=entity,
-            report_date=matched.report_date,
-            attachment_dir=str(output_dir),
-            debug=False,
-        )
-    except Exception as exc:
-        result["error"] = f"业绩点评执行失败: {exc!s}"
-        return result
 
+def _finalize_review(
+    query: str,
+    entity: EntityInfo,
+    matched: ReportOption,
+    review: Dict[str, Any],
+    output_dir: Path,
+) -> Dict[str, Any]:
+    """附件改名为带唯一后缀的文件名，并写出描述文件。"""
     unique_suffix = uuid.uuid4().hex[:8]
     file_map = review.get("files") or {}
     for key, label in (("pdf", "pdf"), ("word", "doc"), ("dataSheet", "xlsx")):
@@ -68,16 +65,157 @@ async def query_stock_earnings_review(query: str, output_dir: Path) -> Dict[str,
         str(review.get("content") or ""),
     ]
     desc_path.write_text("\n".join(lines), encoding="utf-8")
+    return {
+        "query": query,
+        "description_path": str(desc_path),
+        "row_count": 1,
+        "title": review.get("title"),
+    }
 
-    result["description_path"] = str(desc_path)
-    result["row_count"] = 1
-    result["title"] = review.get("title")
-    return result
+
+async def query_stock_earnings_review(query: str, output_dir: Path) -> Dict[str, Any]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        entity = await validate_entity(query)
+        options = await fetch_report_options(entity)
+        matched = choose_report_option_by_model(options)
+        review = await call_review_api(
+            entity=entity,
+            report_date=matched.report_date,
+            attachment_dir=str(output_dir),
+            debug=False,
+        )
+    except Exception as exc:
+        return {
+            "query": query,
+            "description_path": None,
+            "row_count": 0,
+            "error": f"业绩点评执行失败: {exc!s}",
+        }
+
+    return _finalize_review(query, entity, matched, review, output_dir)
+
+
+_SAFE_NAME_RE = re.compile(r"[^0-9A-Za-z._-]+")
+
+
+async def query_stock_earnings_review_batch(
+    queries: List[str],
+    output_dir: Path,
+    *,
+    report_date: Optional[str] = None,
+    lookup_concurrency: int = LOOKUP_CONCURRENCY,
+    review_concurrency: int = REVIEW_CONCURRENCY,
+    on_result=None,
+) -> Dict[str, Any]:
+    """
+    财报季批量点评：多个实体的 实体识别 → 报告期 → 点评 三阶段流水线执行。
+
+    - 实体识别与报告期查询共用一个 client，并发上限 lookup_concurrency，会领先于点评阶段；
+    - 点评接口共用另一个 client，并发上限 review_concurrency；
+    - 每个实体完成（成功或失败）即追加一行到 results.jsonl，并回调 on_result(index, result)；
+    - 多个问句识别为同一实体、同一报告期时只生成一次点评，其余复用结果；
+    - 接口新识别的实体在批次结束后一次性写回证券主表。
+
+    输出目录为 output_dir/batch_<时间戳>_<短 UUID>/，每个实体一个子目录。
+    """
+    batch_dir = output_dir / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    results_path = batch_dir / "results.jsonl"
+
+    lookup_sem = asyncio.Semaphore(max(1, lookup_concurrency))
+    review_sem = asyncio.Semaphore(max(1, review_concurrency))
+    reviews: Dict[Tuple[str, str], "asyncio.Future[Tuple[int, Dict[str, Any]]]"] = {}
+    results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+    learned: List[EntityInfo] = []
+    started = time.monotonic()
+
+    def _record(index: int, result: Dict[str, Any]) -> None:
+        results[index] = result
+        with results_path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"index": index, **result}, ensure_ascii=False) + "\n")
+        if on_result is not None:
+            on_result(index, result)
+
+    async def _one(index: int, query: str, lookup_client: httpx.AsyncClient, review_client: httpx.AsyncClient) -> None:
+        result: Dict[str, Any] = {"query": query, "description_path": None, "row_count": 0}
+        try:
+            async with lookup_sem:
+                entity = await validate_entity(query, lookup_client, learned=learned)
+                options = await fetch_report_options(entity, lookup_client)
+            matched = choose_report_option_by_model(options, report_date)
+            result.update(emCode=entity.em_code, secuName=entity.secu_name, reportDate=matched.report_date)
+
+            key = (entity.em_code, matched.report_date)
+            shared = reviews.get(key)
+            if shared is not None:
+                first_index, first = await asyncio.shield(shared)
+                result.update({k: first[k] for k in ("description_path", "row_count", "title") if k in first})
+                result["duplicateOf"] = first_index
+                _record(index, result)
+                return
+            shared = reviews[key] = asyncio.get_running_loop().create_future()
+            try:
+                entity_dir = batch_dir / f"{index + 1:04d}_{_SAFE_NAME_RE.sub('_', entity.em_code)}"
+                entity_dir.mkdir(parents=True, exist_ok=True)
+                async with review_sem:
+                    review = await call_review_api(
+                        entity=entity,
+                        report_date=matched.report_date,
+                        attachment_dir=str(entity_dir),
+                        debug=False,
+                        client=review_client,
+                    )
+                result.update(_finalize_review(query, entity, matched, review, entity_dir))
+            except BaseException as exc:
+                shared.set_exception(exc if isinstance(exc, Exception) else RuntimeError("已取消"))
+                shared.exception()  # 重复项各自记录失败，避免未取回异常的告警
+                raise
+            shared.set_result((index, result))
+        except Exception as exc:
+            result["error"] = f"业绩点评执行失败: {exc!s}"
+        _record(index, result)
+
+    lookup_limits = httpx.Limits(max_connections=max(1, lookup_concurrency))
+    review_limits = httpx.Limits(max_connections=max(1, review_concurrency))
+    async with httpx.AsyncClient(timeout=LOOKUP_TIMEOUT_SEC, verify=False, limits=lookup_limits) as lookup_client, \
+            httpx.AsyncClient(timeout=REVIEW_TIMEOUT_SEC, verify=False, limits=review_limits) as review_client:
+        await asyncio.gather(*(_one(i, q, lookup_client, review_client) for i, q in enumerate(queries)))
+    remember_entities(learned)
+
+    done = [r for r in results if r is not None]
+    failed = [r for r in done if "error" in r]
+    summary = {
+        "total": len(queries),
+        "succeeded": len(done) - len(failed),
+        "failed": len(failed),
+        "elapsed_sec": round(time.monotonic() - started, 1),
+        "batch_dir": str(batch_dir),
+        "results_path": str(results_path),
+        "results": done,
+    }
+    summary_path = batch_dir / "summary.json"
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+    summary["summary_path"] = str(summary_path)
+    return summary
+
+
+def _read_batch_queries(path: str) -> List[str]:
+    """每行一个问句或代码；忽略空行与 # 开头的注释行。"""
+    lines = Path(path).read_text(encoding="utf-8-sig").splitlines()
+    return [ln.strip() for ln in lines if ln.strip() and not ln.strip().startswith("#")]
 
 
 def run_cli() -> None:
     parser = argparse.ArgumentParser(description="上市公司业绩点评")
-    parser.add_argument("--query", required=True, help="自然语言查询，例如：贵州茅台 业绩点评")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--query", help="自然语言查询，例如：贵州茅台 业绩点评")
+    group.add_argument("--batch", nargs="+", metavar="QUERY", help="批量模式：多个公司名称或代码")
+    group.add_argument("--batch-file", help="批量模式：每行一个公司名称或代码的文本文件")
+    parser.add_argument("--report-date", default="", help="批量模式：统一指定报告期（须在各实体候选列表中），默认取最新一期")
+    parser.add_argument("--lookup-concurrency", type=int, default=LOOKUP_CONCURRENCY, help="批量模式：实体识别/报告期查询并发数")
+    parser.add_argument("--review-concurrency", type=int, default=REVIEW_CONCURRENCY, help="批量模式：点评生成并发数")
     args = parser.parse_args()
 
     async def _main() -> None:
@@ -89,10 +227,38 @@ def run_cli() -> None:
         print(f"描述: {r['description_path']}")
         print(f"行数: {r['row_count']}")
 
+    async def _main_batch() -> None:
+        queries = _read_batch_queries(args.batch_file) if args.batch_file else [q.strip() for q in args.batch if q.strip()]
+        if not queries:
+            print("错误: 批量列表为空")
+            raise SystemExit(2)
+
+        finished = 0
+
+        def _on_result(index: int, r: Dict[str, Any]) -> None:
+            nonlocal finished
+            finished += 1
+            label = r.get("secuName") or r.get("emCode") or r["query"]
+            status = r["error"] if "error" in r else r["description_path"]
+            print(f"[{finished}/{len(queries)}] {label}: {status}", flush=True)
+
+        summary = await query_stock_earnings_review_batch(
+            queries,
+            default_output_root(),
+            report_date=args.report_date.strip() or None,
+            lookup_concurrency=args.lookup_concurrency,
+            review_concurrency=args.review_concurrency,
+            on_result=_on_result,
+        )
+        print(f"成功: {summary['succeeded']}/{summary['total']}，失败: {summary['failed']}，耗时 {summary['elapsed_sec']}s")
+        print(f"汇总: {summary['summary_path']}")
+        if summary["total"] and not summary["succeeded"]:
+            raise SystemExit(2)
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     try:
-        loop.run_until_complete(_main())
+        loop.run_until_complete(_main() if args.query else _main_batch())
     finally:
         loop.close()
 
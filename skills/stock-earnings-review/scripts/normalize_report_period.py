@@ -7,6 +7,7 @@ from typing import Any, List, Optional
 import httpx
 
 from common import REPORT_LIST_API, EntityInfo, base_headers
+from security_master import ReportPeriodCache
 
 
 @dataclass
@@ -16,11 +17,26 @@ class ReportOption:
     raw: Any = None
 
 
-async def fetch_report_options(entity: EntityInfo) -> List[ReportOption]:
-    async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-        resp = await client.post(REPORT_LIST_API, headers=base_headers(), json={"emCode": entity.em_code})
-        resp.raise_for_status()
-        raw = resp.json()
+async def fetch_report_options(
+    entity: EntityInfo,
+    client: Optional[httpx.AsyncClient] = None,
+    use_cache: bool = True,
+) -> List[ReportOption]:
+    # 报告期列表只在财报发布后变化，按 emCode 缓存（披露季 1 天，其余 7 天）
+    cache = ReportPeriodCache()
+    if use_cache:
+        cached = cache.get(entity.em_code)
+        if cached:
+            options = _parse_report_options(cached)
+            if options:
+                return options
+    if client is None:
+        async with httpx.AsyncClient(timeout=30.0, verify=False) as own_client:
+            return await fetch_report_options(entity, own_client, use_cache=False)
+
+    resp = await client.post(REPORT_LIST_API, headers=base_headers(), json={"emCode": entity.em_code})
+    resp.raise_for_status()
+    raw = resp.json()
 
     code = raw.get("code") if isinstance(raw, dict) else None
     status = raw.get("status") if isinstance(raw, dict) else None
@@ -33,6 +49,17 @@ async def fetch_report_options(entity: EntityInfo) -> List[ReportOption]:
     if not isinstance(src, list) or not src:
         raise RuntimeError("报告期列表获取失败或为空")
 
+    out = _parse_report_options(src)
+    if not out:
+        raise RuntimeError("报告期列表解析失败")
+    try:
+        cache.put(entity.em_code, src)
+    except OSError:
+        pass
+    return out
+
+
+def _parse_report_options(src: List[Any]) -> List[ReportOption]:
     out: List[ReportOption] = []
     for item in src:
         if isinstance(item, str):
@@ -47,8 +74,6 @@ async def fetch_report_options(entity: EntityInfo) -> List[ReportOption]:
                         raw=item,
                     )
                 )
-    if not out:
-        raise RuntimeError("报告期列表解析失败")
     return out
 
 
@@ -80,6 +105,7 @@ def run_cli() -> None:
     parser.add_argument("--secu-name", default="")
     parser.add_argument("--selected-report-date", default="")
     parser.add_argument("--non-strict", action="store_true")
+    parser.add_argument("--refresh", action="store_true", help="忽略本地报告期缓存，重新请求接口")
     args = parser.parse_args()
 
     async def _main() -> None:
@@ -89,7 +115,7 @@ def run_cli() -> None:
             market_char=args.market_char,
             secu_name=args.secu_name,
         )
-        options = await fetch_report_options(entity)
+        options = await fetch_report_options(entity, use_cache=not args.refresh)
         matched = choose_report_option_by_model(
             options,
             args.selected_report_date or None,
@@ -1,20 +1,67 @@
 import argparse
 import asyncio
 import json
+from typing import Iterable, List, Optional
 
 import httpx
 
 from common import ENTITY_API, SUPPORTED_CLASS_CODES, EntityInfo, auth_headers
+from security_master import Security, get_security_master
 
 
-async def validate_entity(query: str) -> EntityInfo:
+def lookup_local_entity(query: str) -> Optional[EntityInfo]:
+    """先查本地证券主表（名称 / 别名 / 代码），命中则无需调用实体识别接口。"""
+    sec = get_security_master().lookup(query, class_codes=SUPPORTED_CLASS_CODES)
+    if sec is None or not sec.market:
+        return None
+    return EntityInfo(class_code=sec.class_code, secu_code=sec.code, market_char=sec.market, secu_name=sec.name)
+
+
+def _to_security(entity: EntityInfo) -> Security:
+    code, _, market = entity.em_code.partition(".")
+    return Security(code=code, name=entity.secu_name, market=market, class_code=entity.class_code, source="dialogTagsV2")
+
+
+def remember_entities(entities: Iterable[EntityInfo]) -> None:
+    """把接口识别结果一次性写回主表（整表只重写一次），同名问句下次走本地。"""
+    securities = [_to_security(e) for e in entities]
+    if not securities:
+        return
+    try:
+        get_security_master().add(securities)
+    except OSError:
+        pass
+
+
+def remember_entity(entity: EntityInfo) -> None:
+    remember_entities([entity])
+
+
+async def validate_entity(
+    query: str,
+    client: Optional[httpx.AsyncClient] = None,
+    use_local: bool = True,
+    learned: Optional[List[EntityInfo]] = None,
+) -> EntityInfo:
+    """识别问句中的实体。
+
+    learned 为列表时（批量模式），新识别的实体只追加到列表，由调用方在批次结束后
+    用 remember_entities 一次写回主表，避免逐个重写 securities.json 阻塞事件循环。
+    """
+    if use_local:
+        local = lookup_local_entity(query)
+        if local is not None:
+            return local
+    # 批量模式传入共享 client 复用连接池；单次调用时自建
+    if client is None:
+        async with httpx.AsyncClient(timeout=30.0, verify=False) as own_client:
+            return await validate_entity(query, own_client, use_local=False, learned=learned)
+
     headers = {"Content-Type": "application/json", **auth_headers()}
     payload = {"content": query}
-    data = {}
-    async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-        resp = await client.post(ENTITY_API, headers=headers, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await client.post(ENTITY_API, headers=headers, json=payload)
+    resp.raise_for_status()
+    data = resp.json()
 
     # Compatible parse for dialogTagsV2 possible shapes.
     first = None
@@ -37,21 +84,28 @@ async def validate_entity(query: str) -> EntityInfo:
     if not secu_code:
         raise RuntimeError("实体识别缺少 secuCode")
 
-    return EntityInfo(
+    entity = EntityInfo(
         class_code=class_code,
         secu_code=secu_code,
         market_char=str(first.get("marketChar") or ""),
         secu_name=str(first.get("shortName") or ""),
     )
+    if entity.secu_name and ("." in entity.secu_code or entity.market_char):
+        if learned is not None:
+            learned.append(entity)
+        else:
+            remember_entity(entity)
+    return entity
 
 
 def run_cli() -> None:
     parser = argparse.ArgumentParser(description="Validate entity from query.")
     parser.add_argument("--query", required=True)
+    parser.add_argument("--no-local", action="store_true", help="跳过本地证券主表，强制调用实体识别接口")
     args = parser.parse_args()
 
     async def _main() -> None:
-        entity = await validate_entity(args.query)
+        entity = await validate_entity(args.query, use_local=not args.no_local)
         print(
             json.dumps(
                 {
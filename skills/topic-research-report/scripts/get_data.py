@@ -8,16 +8,19 @@ This module is intentionally self-contained:
 
 import argparse
 import asyncio
-import base64
 import json
 import os
 import re
+import sys
 import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from urllib import error as urllib_error
 from urllib import request as urllib_request
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_lib"))
+from base64_attachments import has_base64, iter_response, read_json_with_attachments, save_base64
+
 # █████████████████████████████████████████████████████████████████████████
 # ██                                                                  ██
 # ██   ███████╗███╗   ███╗     █████╗ ██████╗ ██╗    ██╗ ██████╗       ██
@@ -72,6 +75,7 @@ TOPIC_RESEARCH_URL = (
     "https://ai-saas.eastmoney.com/proxy/"
     "app-robo-advisor-api/assistant/write/thematic/research"
 )
+ATTACHMENT_KEYS = ("wordBase64", "pdfBase64")
 
 
 def _extract_error_message(body: str) -> str:
@@ -171,16 +175,15 @@ def _decode_attachment_base64(data: Dict[str, Any], output_dir: Path) -> List[Di
 
     for key, ext, ftype in file_map:
         b64_value = data.get(key)
-        b64_str = b64_value.strip() if isinstance(b64_value, str) else ""
-        if not b64_str:
+        if not has_base64(b64_value):
             continue
+        file_name = "{0}_{1}.{2}".format(safe_article_id, ftype.lower(), ext)
+        file_path = output_dir / file_name
         try:
-            raw = base64.b64decode(b64_str)
+            if not save_base64(b64_value, file_path):
+                continue
         except Exception:
             continue
-        file_name = "{0}_{1}.{2}".format(safe_article_id, ftype.lower(), ext)
-        file_path = output_dir / file_name
-        file_path.write_bytes(raw)
         attachments.append({"type": ftype, "path": str(file_path)})
     return attachments
 
@@ -200,17 +203,17 @@ def _http_call_topic_research(query: str) -> Dict[str, Any]:
 
     try:
         with urllib_request.urlopen(req, timeout=TIMEOUT_SECONDS) as resp:
-            raw_body = resp.read().decode("utf-8", errors="replace")
+            # 流式读取：附件 base64 边读边解码落盘，不在内存中保留完整响应
+            parsed = read_json_with_attachments(
+                iter_response(resp), ATTACHMENT_KEYS, spool_dir=DEFAULT_OUTPUT_DIR
+            )
     except urllib_error.HTTPError as exc:
         err_body = exc.read().decode("utf-8", errors="replace") if exc.fp else ""
         message = _extract_error_message(err_body) or "http status {0}".format(exc.code)
         raise RuntimeError("Topic research API request failed: {0}".format(message))
     except urllib_error.URLError as exc:
         raise RuntimeError("Topic research API request failed: {0}".format(exc.reason))
-
-    try:
-        parsed = json.loads(raw_body)
-    except json.JSONDecodeError:
+    except ValueError:
         raise RuntimeError("Topic research API returned invalid JSON response.")
 
     if isinstance(parsed, dict):
@@ -0,0 +1,200 @@
+#!/usr/bin/env node
+// 常驻 Alice 运行时：一个 Node 进程服务多次提问，省去每次 node 启动 + 模块加载，
+// 并复用 fetch（undici）的 keep-alive 连接池与已解析的 API Key。
+//
+// 协议（仅监听 127.0.0.1，每个 TCP 连接对应一次提问，换行分隔的 JSON）：
+//   客户端 → {"token": "...", "prompt": "...", "skill": "...", "cwd": "...", "api_key": "...", "timeout_sec": 1800}
+//            {"token": "...", "op": "ping"}
+//   服务端 → {"type": "stdout", "text": "..."}      与 CLI stdout 相同的内容
+//            {"type": "stderr", "text": "..."}      与 CLI stderr 相同的内容
+//            {"type": "exit", "code": 0}            结束帧，随后关闭连接
+//            {"type": "pong", "pid": 123, "active": 1, "queued": 0}
+// 客户端断开连接即取消该次提问（中止 HTTP 流与附件下载）；timeout_sec 为服务端兜底超时。
+//
+// 启动后把 {pid, host, port, token} 写入 --state-file（权限 0600），客户端据此连接；
+// 空闲（无进行中的提问）超过 --idle-exit-sec 秒后自动退出并删除状态文件。
+
+import { randomBytes } from "node:crypto";
+import { mkdirSync, readFileSync, renameSync, unlinkSync, writeFileSync } from "node:fs";
+import { createServer } from "node:net";
+import { dirname } from "node:path";
+import { parseArgs } from "node:util";
+import { runPrompt } from "./request.js";
+
+const { values: opts } = parseArgs({
+  options: {
+    host: { type: "string", default: "127.0.0.1" },
+    port: { type: "string", default: "0" },
+    "state-file": { type: "string" },
+    "idle-exit-sec": {
+      type: "string",
+      default: process.env.WIND_ALICE_SERVER_IDLE_SEC || "900",
+    },
+    concurrency: {
+      type: "string",
+      default: process.env.WIND_ALICE_SERVER_CONCURRENCY || "8",
+    },
+  },
+});
+
+const MAX_REQUEST_LINE = 1024 * 1024;
+const IDLE_EXIT_MS = Math.max(0, Number(opts["idle-exit-sec"]) || 0) * 1000;
+const MAX_CONCURRENCY = Math.max(1, Number(opts.concurrency) || 8);
+const TOKEN = randomBytes(24).toString("hex");
+const STATE_FILE = opts["state-file"] || null;
+
+let active = 0;
+const waiting = [];
+let idleTimer = null;
+
+function writeFrame(socket, frame) {
+  if (!socket.destroyed && socket.writable) {
+    socket.write(JSON.stringify(frame) + "\n");
+  }
+}
+
+function scheduleIdleExit() {
+  clearTimeout(idleTimer);
+  if (!IDLE_EXIT_MS || active > 0 || waiting.length > 0) return;
+  idleTimer = setTimeout(shutdown, IDLE_EXIT_MS);
+  idleTimer.unref();
+}
+
+function shutdown() {
+  removeStateFile();
+  server.close();
+  process.exit(0);
+}
+
+function removeStateFile() {
+  if (!STATE_FILE) return;
+  try {
+    // 只删除自己写的状态文件（并发启动时可能已被新实例覆盖）
+    const state = JSON.parse(readFileSync(STATE_FILE, "utf8"));
+    if (state.pid === process.pid) unlinkSync(STATE_FILE);
+  } catch {}
+}
+
+/** 有界并发：超过上限的提问排队，先到先服务。 */
+function acquireSlot(signal) {
+  if (active < MAX_CONCURRENCY) {
+    active++;
+    return Promise.resolve(true);
+  }
+  return new Promise((resolve) => {
+    const entry = { resolve, signal };
+    waiting.push(entry);
+    signal.addEventListener(
+      "abort",
+      () => {
+        const idx = waiting.indexOf(entry);
+        if (idx >= 0) waiting.splice(idx, 1);
+        resolve(false);
+      },
+      { once: true },
+    );
+  });
+}
+
+function releaseSlot() {
+  const next = waiting.shift();
+  if (next) {
+    next.resolve(true);
+    return;
+  }
+  active--;
+  scheduleIdleExit();
+}
+
+async function handleRequest(socket, req) {
+  if (req.op === "ping") {
+    writeFrame(socket, { type: "pong", pid: process.pid, active, queued: waiting.length });
+    socket.end();
+    return;
+  }
+
+  const controller = new AbortController();
+  socket.once("close", () => controller.abort());
+
+  const timeoutSec = Number(req.timeout_sec) || 0;
+  const timer = timeoutSec > 0 ? setTimeout(() => controller.abort(), timeoutSec * 1000) : null;
+
+  clearTimeout(idleTimer);
+  if (!(await acquireSlot(controller.signal))) {
+    clearTimeout(timer);
+    return;
+  }
+  let code = 1;
+  try {
+    code = await runPrompt({
+      prompt: req.prompt,
+      skill: req.skill || null,
+      apiKey: req.api_key || null,
+      cwd: req.cwd || process.cwd(),
+      signal: controller.signal,
+      writeOut: (text) => writeFrame(socket, { type: "stdout", text }),
+      writeErr: (text) => writeFrame(socket, { type: "stderr", text }),
+    });
+  } finally {
+    clearTimeout(timer);
+    releaseSlot();
+  }
+  writeFrame(socket, { type: "exit", code });
+  socket.end();
+}
+
+const server = createServer((socket) => {
+  socket.setEncoding("utf8");
+  let buffer = "";
+  let handled = false;
+
+  socket.on("error", () => {});
+  socket.on("data", (chunk) => {
+    if (handled) return;
+    buffer += chunk;
+    const nl = buffer.indexOf("\n");
+    if (nl < 0) {
+      if (buffer.length > MAX_REQUEST_LINE) socket.destroy();
+      return;
+    }
+    handled = true;
+    let req;
+    try {
+      req = JSON.parse(buffer.slice(0, nl));
+    } catch {
+      writeFrame(socket, { type: "stderr", text: "bad request: invalid JSON" });
+      writeFrame(socket, { type: "exit", code: 2 });
+      socket.end();
+      return;
+    }
+    if (!req || req.token !== TOKEN) {
+      writeFrame(socket, { type: "stderr", text: "bad request: invalid token" });
+      writeFrame(socket, { type: "exit", code: 2 });
+      socket.end();
+      return;
+    }
+    handleRequest(socket, req).catch((error) => {
+      writeFrame(socket, { type: "stderr", text: `server error: ${error?.message || error}` });
+      writeFrame(socket, { type: "exit", code: 1 });
+      socket.end();
+    });
+  });
+});
+
+server.listen(Number(opts.port) || 0, opts.host, () => {
+  const { address, port } = server.address();
+  const state = { pid: process.pid, host: address, port, token: TOKEN, started_at: Date.now() };
+  if (STATE_FILE) {
+    mkdirSync(dirname(STATE_FILE), { recursive: true });
+    const tmp = `${STATE_FILE}.${process.pid}.tmp`;
+    writeFileSync(tmp, JSON.stringify(state), { mode: 0o600 });
+    renameSync(tmp, STATE_FILE);
+  } else {
+    console.log(JSON.stringify(state));
+  }
+  scheduleIdleExit();
+});
+
+for (const sig of ["SIGINT", "SIGTERM"]) {
+  process.once(sig, shutdown);
+}
@@ -1,11 +1,13 @@
 import randomUUID from "./uuidv7.js";
 import { spawnUpdateCheck, maybePrintUpdateNotice } from "./update-notify.mjs";
+import { AsyncLocalStorage } from "node:async_hooks";
 import { createWriteStream, existsSync, readFileSync, unlinkSync } from "node:fs";
 import { homedir } from "node:os";
 import { join, dirname, parse as parsePath } from "node:path";
 import { Readable } from "node:stream";
 import { pipeline } from "node:stream/promises";
 import { fileURLToPath, pathToFileURL } from "node:url";
+import { format } from "node:util";
 
 const DEFAULT_API_URL = "https://alice.wind.com.cn/Weaver/ChatAgent";
 const SKILL_DIR = dirname(dirname(fileURLToPath(import.meta.url))); // .../wind-alice
@@ -18,9 +20,51 @@ const WIND_AIFINMARKET_PORTAL = "https://aifinmarket.wind.com.cn";
 const WIND_TRIAL_DAY_QUOTA_SNIPPET =
   "很抱歉，今日已超出体验期任务限额，欢迎您明日再来尝试。";
 
-// 模块单例：单次进程内只触发一次"token已使用完"的处理，避免在
-// 流里多次重复打印 / 抛错。
-let windTrialQuotaHandled = false;
+/**
+ * 单次提问的运行上下文：输出去向、工作目录（附件下载位置）、取消信号、退出码，
+ * 以及本次提问内的体验配额标记与累计下载链接。
+ *
+ * CLI 直接运行时使用进程级默认上下文（输出到 console、退出码写 process.exitCode）；
+ * 常驻进程（alice-server.mjs）通过 runPrompt() 为每个请求建立独立上下文，
+ * 多个提问并发执行互不串扰。
+ */
+export function createRunContext({ cwd, signal, writeOut, writeErr } = {}) {
+  return {
+    cwd: cwd || process.cwd(),
+    signal: signal || null,
+    writeOut: writeOut || ((text) => console.log(text)),
+    writeErr: writeErr || ((text) => console.error(text)),
+    exitCode: 0,
+    // 单次提问内只触发一次"token已使用完"的处理，避免在流里多次重复打印 / 抛错。
+    quotaHandled: false,
+    // 累计的下载链接（按 url 去重），最后统一在提问末尾下载一次。
+    downloads: new Map(), // url -> filename
+  };
+}
+
+const runStorage = new AsyncLocalStorage();
+let cliRun = null;
+
+function currentRun() {
+  const run = runStorage.getStore();
+  if (run) return run;
+  cliRun ??= createRunContext();
+  return cliRun;
+}
+
+function out(...args) {
+  currentRun().writeOut(format(...args));
+}
+
+function err(...args) {
+  currentRun().writeErr(format(...args));
+}
+
+function setExitCode(code) {
+  const run = currentRun();
+  run.exitCode = code;
+  if (run === cliRun) process.exitCode = code;
+}
 
 export class WindTrialQuotaExceeded extends Error {
   constructor() {
@@ -30,7 +74,8 @@ export class WindTrialQuotaExceeded extends Error {
 }
 
 function logWindTrialQuotaIfPresent(events) {
-  if (windTrialQuotaHandled || !Array.isArray(events) || events.length === 0) {
+  const run = currentRun();
+  if (run.quotaHandled || !Array.isArray(events) || events.length === 0) {
     return;
   }
   for (const ev of events) {
@@ -41,8 +86,8 @@ function logWindTrialQuotaIfPresent(events) {
       continue;
     }
     if (text.includes(WIND_TRIAL_DAY_QUOTA_SNIPPET)) {
-      windTrialQuotaHandled = true;
-      console.error("token已使用完");
+      run.quotaHandled = true;
+      err("token已使用完");
       throw new WindTrialQuotaExceeded();
     }
   }
@@ -268,8 +313,8 @@ function getApiUrl() {
 
 function die(code, message, { extraHint } = {}) {
   const payload = { code, message, ...(extraHint ? { hint: extraHint } : {}) };
-  console.error(JSON.stringify(payload, null, 2));
-  process.exitCode = 2;
+  err(JSON.stringify(payload, null, 2));
+  setExitCode(2);
   throw new Error(message);
 }
 
@@ -501,9 +546,9 @@ export function parseSsePayload(payload) {
       try {
         return [JSON.parse(data)];
       } catch (error) {
-        console.error("failed to parse SSE event:");
-        console.error(block);
-        console.error(error);
+        err("failed to parse SSE event:");
+        err(block);
+        err(error);
         return [];
       }
     });
@@ -615,11 +660,9 @@ export function collectDownloadLinks(value) {
   return Array.from(found, ([url, filename]) => ({ url, filename }));
 }
 
-// 进程级累计的下载链接（按 url 去重），最后统一在 main 末尾打印一次。
-const collectedDownloads = new Map(); // url -> filename
-
 function accumulateDownloadsFromValues(values) {
   if (!Array.isArray(values) || values.length === 0) return;
+  const collectedDownloads = currentRun().downloads;
   for (const value of values) {
     for (const { url, filename } of collectDownloadLinks(value)) {
       if (!collectedDownloads.has(url)) collectedDownloads.set(url, filename);
@@ -661,12 +704,13 @@ function resolveUniqueTargetPath(dir, filename) {
  * 用 Bearer Token GET 一个文件并写入磁盘。
  * 成功返回 { ok: true, path }；失败返回 { ok: false, error }，不抛异常。
  */
-async function downloadOneFile({ url, targetPath, apiKey }) {
+async function downloadOneFile({ url, targetPath, apiKey, signal }) {
   let response;
   try {
     response = await fetch(url, {
       method: "GET",
       headers: apiKey ? { Authorization: `Bearer ${apiKey}` } : {},
+      signal: signal || undefined,
     });
   } catch (e) {
     return { ok: false, error: `网络错误：${e.message}` };
@@ -704,25 +748,25 @@ async function downloadOneFile({ url, targetPath, apiKey }) {
  * 重复调用幂等：调用即清空累计列表。
  */
 async function downloadCollectedFiles(apiKey) {
+  const { downloads: collectedDownloads, cwd, signal } = currentRun();
   if (collectedDownloads.size === 0) return;
 
   const items = Array.from(collectedDownloads, ([url, filename]) => ({ url, filename }));
   collectedDownloads.clear();
 
-  const cwd = process.cwd();
-  console.error("");
-  console.error(`=== 检测到 ${items.length} 个可下载文件，正在下载到当前目录：${cwd} ===`);
+  err("");
+  err(`=== 检测到 ${items.length} 个可下载文件，正在下载到当前目录：${cwd} ===`);
 
   for (const { url, filename } of items) {
     const targetPath = resolveUniqueTargetPath(cwd, filename);
-    const result = await downloadOneFile({ url, targetPath, apiKey });
+    const result = await downloadOneFile({ url, targetPath, apiKey, signal });
     if (result.ok) {
-      console.error(`- ${filename}`);
-      console.error(`  已保存：${result.path}`);
+      err(`- ${filename}`);
+      err(`  已保存：${result.path}`);
     } else {
-      console.error(`- ${filename}`);
-      console.error(`  下载失败：${result.error}`);
-      console.error(`  原始 URL：${url}`);
+      err(`- ${filename}`);
+      err(`  下载失败：${result.error}`);
+      err(`  原始 URL：${url}`);
     }
   }
 }
@@ -753,13 +797,13 @@ function printEvents(events) {
     ) {
       continue;
     }
-    console.log(formatEventOutput(event));
+    out(formatEventOutput(event));
   }
 }
 
 function printAgentResultValues(values) {
   for (const value of values) {
-    console.log(formatValueOutput(value));
+    out(formatValueOutput(value));
   }
 }
 
@@ -780,7 +824,7 @@ function emitParsedEventsUnlessQuota(events) {
     return false;
   } catch (e) {
     if (e instanceof WindTrialQuotaExceeded) {
-      process.exitCode = 1;
+      setExitCode(1);
       return true;
     }
     throw e;
@@ -795,7 +839,7 @@ async function emitParsedEventsUnlessQuotaStreaming(reader, events) {
   } catch (e) {
     if (e instanceof WindTrialQuotaExceeded) {
       await reader.cancel().catch(() => {});
-      process.exitCode = 1;
+      setExitCode(1);
       return true;
     }
     throw e;
@@ -842,7 +886,7 @@ function consumeNonStreamBody(raw) {
     if (Array.isArray(parsed)) {
       if (emitParsedEventsUnlessQuota(parsed)) return;
       if (parsed.some((e) => e && typeof e === "object" && e.error != null)) {
-        process.exitCode = 1;
+        setExitCode(1);
       }
       return;
     }
@@ -851,9 +895,9 @@ function consumeNonStreamBody(raw) {
         if (parsed.error.code === KEY_MISSING_CODE) {
           dieKeyMissing();
         }
-        console.error("request failed (jsonrpc error):");
-        console.error(JSON.stringify(parsed.error, null, 2));
-        process.exitCode = 1;
+        err("request failed (jsonrpc error):");
+        err(JSON.stringify(parsed.error, null, 2));
+        setExitCode(1);
         return;
       }
       if (emitParsedEventsUnlessQuota([parsed])) return;
@@ -863,7 +907,7 @@ function consumeNonStreamBody(raw) {
     /* 非 JSON，按原文输出 */
   }
 
-  console.log(trimmed);
+  out(trimmed);
 }
 
 async function drainSseStream(response) {
@@ -896,7 +940,7 @@ async function main() {
   const argv = parseArgs(process.argv);
 
   if (argv.help) {
-    console.log(usage());
+    out(usage());
     return;
   }
   if (argv.command === "list-skills" || argv.listSkills) {
@@ -906,20 +950,55 @@ async function main() {
 
   const { prompt, skill } = argv;
   if (!prompt || !prompt.trim()) {
-    console.error("missing --prompt");
-    console.error(usage());
-    process.exitCode = 2;
+    err("missing --prompt");
+    err(usage());
+    setExitCode(2);
     return;
   }
 
   // 每次有效提问都 spawn 探针（对齐 cli.mjs 每次 call）；TTL 在 update-check.mjs 内判定
   spawnUpdateCheck();
 
+  try {
+    await executePrompt({ prompt, skill });
+  } finally {
+    maybePrintUpdateNotice();
+  }
+}
+
+/** 已取消（常驻进程中客户端断开 / 超时）时打印提示并返回 true，调用方停止重试。 */
+function stopIfCancelled() {
+  const { signal } = currentRun();
+  if (!signal?.aborted) return false;
+  err("[cancelled] 请求已取消");
+  setExitCode(130);
+  return true;
+}
+
+function sleep(ms, signal) {
+  return new Promise((resolve) => {
+    const timer = setTimeout(done, ms);
+    function done() {
+      clearTimeout(timer);
+      signal?.removeEventListener("abort", done);
+      resolve();
+    }
+    signal?.addEventListener("abort", done, { once: true });
+  });
+}
+
+/**
+ * 执行一次提问：请求 + SSE 流式输出 + 断线重连（resubscribe）+ 附件下载。
+ * 输出与退出码写入当前运行上下文。
+ */
+async function executePrompt({ prompt, skill, apiKey: explicitKey }) {
+  const { signal } = currentRun();
+
   let skillName = null;
   if (skill && skill.trim()) {
     const resolved = resolveSkillName(skill);
     if (!resolved.matched) {
-      console.error(
+      err(
         `[warn] 未在 KNOWN_SKILLS 中匹配到 Skill "${skill}"（中英文都试过了），将按字面值拼入文本前缀提交；若服务端返回空流请用 \`wind-alice list-skills\` 核对中/英文名。`,
       );
     }
@@ -927,20 +1006,21 @@ async function main() {
   }
 
   const url = getApiUrl();
-  const apiKey = getApiKey();
+  const apiKey = explicitKey || getApiKey();
   const headers = buildHeaders(apiKey);
   const body = buildBody(prompt, skillName);
 
   const MAX_RETRIES = 10;
 
-  try {
   for (let attempt = 0; attempt <= MAX_RETRIES; attempt++) {
+    if (stopIfCancelled()) return;
     if (attempt > 0) {
       const delay = Math.min(1000 * attempt, 10000);
-      console.error(
+      err(
         `[reconnect] attempt ${attempt}/${MAX_RETRIES}, waiting ${delay}ms...`,
       );
-      await new Promise((resolve) => setTimeout(resolve, delay));
+      await sleep(delay, signal);
+      if (stopIfCancelled()) return;
     }
 
     const requestBody =
@@ -952,27 +1032,29 @@ async function main() {
         method: "POST",
         headers,
         body: JSON.stringify(requestBody),
+        signal: signal || undefined,
       });
     } catch (e) {
-      console.error(`[network error] ${e.message}`);
+      if (stopIfCancelled()) return;
+      err(`[network error] ${e.message}`);
       if (attempt < MAX_RETRIES) continue;
-      console.error("max retries exceeded");
-      process.exitCode = 1;
+      err("max retries exceeded");
+      setExitCode(1);
       return;
     }
 
-    console.log("status:", response.status, response.statusText);
-    console.log(
+    out("status:", response.status, response.statusText);
+    out(
       "headers:",
       Object.fromEntries(response.headers.entries()),
     );
 
     if (!response.ok) {
       const errorText = await response.text();
-      console.error("request failed:");
-      console.error(errorText);
+      err("request failed:");
+      err(errorText);
       if (response.status >= 500 && attempt < MAX_RETRIES) continue;
-      process.exitCode = 1;
+      setExitCode(1);
       return;
     }
 
@@ -990,10 +1072,11 @@ async function main() {
         streamError = e;
       }
 
-      console.error(`[stream error] ${streamError.message}`);
+      if (stopIfCancelled()) return;
+      err(`[stream error] ${streamError.message}`);
       if (attempt < MAX_RETRIES) continue;
-      console.error("max retries exceeded");
-      process.exitCode = 1;
+      err("max retries exceeded");
+      setExitCode(1);
       return;
     }
 
@@ -1002,10 +1085,11 @@ async function main() {
     try {
       bodyText = await response.text();
     } catch (e) {
-      console.error(`[read body error] ${e.message}`);
+      if (stopIfCancelled()) return;
+      err(`[read body error] ${e.message}`);
       if (attempt < MAX_RETRIES) continue;
-      console.error("max retries exceeded");
-      process.exitCode = 1;
+      err("max retries exceeded");
+      setExitCode(1);
       return;
     }
 
@@ -1013,9 +1097,32 @@ async function main() {
     await downloadCollectedFiles(apiKey);
     return;
   }
-  } finally {
-    maybePrintUpdateNotice();
-  }
+}
+
+/**
+ * 供常驻进程调用：在独立的运行上下文中执行一次提问，返回退出码（语义与 CLI 一致）。
+ * @param {{ prompt: string, skill?: string, apiKey?: string, cwd?: string,
+ *           signal?: AbortSignal, writeOut?: (text: string) => void,
+ *           writeErr?: (text: string) => void }} opts
+ */
+export async function runPrompt({ prompt, skill, apiKey, cwd, signal, writeOut, writeErr }) {
+  const run = createRunContext({ cwd, signal, writeOut, writeErr });
+  await runStorage.run(run, async () => {
+    if (!prompt || !String(prompt).trim()) {
+      err("missing --prompt");
+      setExitCode(2);
+      return;
+    }
+    try {
+      await executePrompt({ prompt: String(prompt), skill, apiKey });
+    } catch (error) {
+      if (stopIfCancelled()) return;
+      err("request error:");
+      err(error);
+      setExitCode(1);
+    }
+  });
+  return run.exitCode;
 }
 
 if (
@@ -1023,8 +1130,8 @@ if (
   import.meta.url === pathToFileURL(process.argv[1]).href
 ) {
   main().catch((error) => {
-    console.error("request error:");
-    console.error(error);
-    process.exitCode = 1;
+    err("request error:");
+    err(error);
+    setExitCode(1);
   });
 }